@@ -1,25 +1,134 @@
 import bottle
 import os
 import sys
-import routes
+
+from utils.settings import env_int
 
 if '--debug' in sys.argv[1:] or 'SERVER_DEBUG' in os.environ:
     bottle.debug(True)
 
+
+def _cli_int(name, env_name, default):
+    """Прочитать ``--name=N`` из командной строки, затем ``env_name``, затем default."""
+    prefix = f'--{name}='
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            try:
+                return int(arg[len(prefix):])
+            except ValueError:
+                break
+    return env_int(env_name, default)
+
+
+# Production-режим: несколько процессов gunicorn с потоками внутри каждого.
+# Таблицы сессий и картинки отчётов должны быть видны всем процессам, поэтому
+# по умолчанию включаются дисковые хранилища (выбираются при импорте routes).
+PRODUCTION = (
+    '--production' in sys.argv[1:]
+    or os.environ.get('SERVER_MODE', '').lower() == 'production'
+)
+SERVER_WORKERS = max(1, _cli_int('workers', 'SERVER_WORKERS', os.cpu_count() or 1))
+if PRODUCTION:
+    os.environ.setdefault('SESSION_STORE', 'disk')
+    os.environ.setdefault('IMAGE_STORE_DIR', os.path.join('data', 'images'))
+    # Пул фоновых задач создаётся в каждом процессе: делим на них половину ядер.
+    # Состояние задач не разделяется между процессами, поэтому при нескольких
+    # процессах опрос /jobs/<id> попал бы в чужой процесс — async выключается.
+    os.environ.setdefault('JOB_WORKERS', str(max(1, (os.cpu_count() or 2) // 2 // SERVER_WORKERS)))
+    # То же для пула отрисовки по столбцам (generators.parallel)
+    os.environ.setdefault('RENDER_WORKERS', str(max(1, (os.cpu_count() or 2) // 2 // SERVER_WORKERS)))
+    if SERVER_WORKERS > 1:
+        os.environ.setdefault('JOB_ASYNC', '0')
+
+import routes
+from utils.compression import CompressionMiddleware
+from utils.lazy_import import prewarm, prewarm_in_background
+from utils.static_files import StaticFiles, install as install_static_files, precompress
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(__file__))
+STATIC_ROOT = os.path.join(PROJECT_ROOT, 'static')
+static_files = install_static_files(StaticFiles(STATIC_ROOT))
+
+
+@bottle.route('/static/<filepath:path>')
+def server_static(filepath):
+    """Статика с ETag, 304 и предварительно сжатыми копиями (см. utils.static_files)."""
+    return static_files.serve(filepath)
+
+
 def wsgi_app():
-    return bottle.default_app()
+    """WSGI-приложение со сжатием ответов (RESPONSE_COMPRESSION=0 — отключить)."""
+    app = bottle.default_app()
+    if os.environ.get('RESPONSE_COMPRESSION', '1') == '0':
+        return app
+    return CompressionMiddleware(
+        app,
+        min_size=env_int('COMPRESSION_MIN_BYTES', 1024),
+        gzip_level=env_int('GZIP_LEVEL', 6),
+        brotli_quality=env_int('BROTLI_QUALITY', 5),
+    )
+
+
+def preload_heavy_modules():
+    """Импортировать тяжёлые библиотеки и прогреть matplotlib до fork().
+
+    Рабочие процессы наследуют уже загруженные модули и кэш шрифтов
+    copy-on-write, поэтому не тратят секунды на импорт при первом запросе
+    и делят страницы памяти с мастер-процессом. Без прогрева
+    (``SERVER_PREWARM=0``) сервисы импортируются при первом запросе
+    (см. utils.lazy_import).
+    """
+    prewarm()
+
+    from generators.rendering import new_figure
+
+    fig = new_figure(figsize=(1, 1))
+    fig.text(0.5, 0.5, 'warm-up')  # загружает шрифты и FreeType
+    fig.canvas.draw()
+
+
+def run_production(host, port):
+    """Запустить pre-fork сервер gunicorn (gthread) через адаптер Bottle.
+
+    Каждый из ``--workers`` процессов обслуживает запросы ``--threads``
+    потоками; после ``--max-requests`` запросов (± jitter) процесс
+    корректно завершает начатые запросы и заменяется новым, что
+    ограничивает рост памяти из-за фрагментации кучи matplotlib/pandas.
+    """
+    threads = _cli_int('threads', 'SERVER_THREADS', 4)
+    max_requests = _cli_int('max-requests', 'SERVER_MAX_REQUESTS', 1000)
+    jitter = _cli_int('max-requests-jitter', 'SERVER_MAX_REQUESTS_JITTER', max_requests // 10)
+    timeout = _cli_int('timeout', 'SERVER_TIMEOUT', 120)
+
+    if os.environ.get('SERVER_PREWARM', '1') != '0':
+        preload_heavy_modules()
+    precompress(STATIC_ROOT)  # .gz/.br копии css/js; актуальные не пересоздаются
+    bottle.run(
+        app=wsgi_app(),
+        server='gunicorn',
+        host=host,
+        port=port,
+        workers=SERVER_WORKERS,
+        threads=max(1, threads),
+        worker_class='gthread',
+        preload_app=True,
+        max_requests=max(0, max_requests),
+        max_requests_jitter=max(0, jitter),
+        timeout=timeout,
+        graceful_timeout=timeout,
+    )
+
 
 if __name__ == '__main__':
-    PROJECT_ROOT = os.path.abspath(os.path.dirname(__file__))
-    STATIC_ROOT = os.path.join(PROJECT_ROOT, 'static').replace('\\', '/')
     HOST = os.environ.get('SERVER_HOST', 'localhost')
     try:
         PORT = int(os.environ.get('SERVER_PORT', '5555'))
     except ValueError:
         PORT = 5555
 
-    @bottle.route('/static/<filepath:path>')
-    def server_static(filepath):
-        return bottle.static_file(filepath, root=STATIC_ROOT)
-
-    bottle.run(server='wsgiref', host=HOST, port=PORT)
+    if PRODUCTION:
+        run_production(HOST, PORT)
+    else:
+        if os.environ.get('SERVER_PREWARM') == '1':
+            prewarm_in_background()  # первая страница отчёта откроется без задержки на импорт
+        bottle.run(app=wsgi_app(), server='wsgiref', host=HOST, port=PORT)
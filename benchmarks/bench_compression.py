@@ -0,0 +1,90 @@
+"""
+Бенчмарк сжатия ответов: байты «на проводе» для отчётов анализа.
+
+Запуск из корня проекта::
+
+    python -m benchmarks.bench_compression [--rows=1000] [--cols=10]
+
+Для каждого маршрута строится отчёт по случайной таблице и сравниваются
+размер без сжатия, с gzip и с brotli (если установлен пакет ``brotli``),
+а также время сжатия. Отчёты берутся из кэша результатов, поэтому время
+после первого прогона — это почти целиком работа компрессора.
+"""
+
+from __future__ import annotations
+
+import io
+import sys
+import time
+
+import bottle
+
+import routes  # noqa: F401 — регистрирует маршруты
+from utils.compression import CompressionMiddleware, brotli
+
+ROUTES = (
+    ("/generate_distributions", {}),
+    ("/generate_plot", {"plot_type": "hist"}),
+    ("/generate_correlation", {}),
+)
+
+
+def _arg(name: str, default: int) -> int:
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return int(arg.split("=", 1)[1])
+    return default
+
+
+def _call(app, path, form=None, cookie=None, accept_encoding=None):
+    body = "&".join(f"{k}={v}" for k, v in (form or {}).items()).encode()
+    environ = {
+        "REQUEST_METHOD": "POST", "PATH_INFO": path, "QUERY_STRING": "",
+        "SERVER_NAME": "bench", "SERVER_PORT": "80", "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(body), "wsgi.errors": io.StringIO(),
+        "CONTENT_LENGTH": str(len(body)),
+        "CONTENT_TYPE": "application/x-www-form-urlencoded",
+    }
+    if cookie:
+        environ["HTTP_COOKIE"] = cookie
+    if accept_encoding:
+        environ["HTTP_ACCEPT_ENCODING"] = accept_encoding
+    out = {}
+
+    def start_response(status, headers, exc_info=None):
+        out["headers"] = dict(headers)
+
+    chunks = app(environ, start_response)
+    payload = b"".join(chunks)
+    if hasattr(chunks, "close"):
+        chunks.close()
+    return out["headers"], payload
+
+
+def main() -> None:
+    rows, cols = _arg("rows", 1000), _arg("cols", 10)
+    inner = bottle.default_app()
+    app = CompressionMiddleware(inner)
+
+    headers, _ = _call(inner, "/generate_table", {"mode": "random", "rows": rows, "cols": cols})
+    cookie = headers["Set-Cookie"].split(";", 1)[0]
+
+    encodings = [("identity", None), ("gzip", "gzip")]
+    if brotli is not None:
+        encodings.append(("br", "br"))
+
+    print(f"Таблица {rows}×{cols}")
+    print(f"{'маршрут':<26}{'кодирование':<12}{'байт':>12}{'доля':>8}{'мс':>9}")
+    for path, form in ROUTES:
+        _call(inner, path, form, cookie)  # прогрев: отчёт попадает в кэш
+        raw_size = None
+        for label, accept in encodings:
+            start = time.perf_counter()
+            _, payload = _call(app, path, form, cookie, accept)
+            elapsed = (time.perf_counter() - start) * 1000
+            raw_size = raw_size or len(payload)
+            print(f"{path:<26}{label:<12}{len(payload):>12,}{len(payload) / raw_size:>8.1%}{elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Бенчмарк корреляционного отчёта без картинки: прежний расчёт (по
+``DataFrame.corr`` на таблицу, тепловую карту и выводы, классификация пар
+двойным циклом) против одного :func:`generators.correlation.compute_correlation`.
+
+Запуск из корня проекта::
+
+    python -m benchmarks.bench_correlation [--rows=1000] [--cols=50] [--wide=auto] [--float32=0]
+
+``--wide=1`` считает таблицу как широкую (полосами, с отбором лучших пар),
+``--wide=0`` — с полной матрицей, ``auto`` — по ``CORRELATION_WIDE_COLUMNS``;
+``--float32=1`` — в float32; ``--baseline=0`` пропускает прежний расчёт
+(для тысяч столбцов он идёт минутами). Выводится время на таблицу,
+пиковый прирост памяти процесса и наибольшее расхождение отобранных
+коэффициентов с pandas.
+"""
+
+from __future__ import annotations
+
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from generators.correlation import STRONG_NEGATIVE, STRONG_POSITIVE, WEAK, compute_correlation
+
+
+def _arg(name: str, default: str) -> str:
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def _loop_pairs(corr: pd.DataFrame) -> tuple:
+    """Классификация пар двойным циклом, как до общего результата."""
+    high, negative, low = [], [], []
+    for i in range(len(corr.columns)):
+        for j in range(i + 1, len(corr.columns)):
+            a, b = corr.columns[i], corr.columns[j]
+            val = corr.iloc[i, j]
+            if val < STRONG_NEGATIVE:
+                negative.append((a, b, val))
+            elif val > STRONG_POSITIVE:
+                high.append((a, b, val))
+            elif abs(val) < WEAK:
+                low.append((a, b, val))
+    return high, negative, low[:5]
+
+
+def main() -> None:
+    rows = int(_arg("rows", "1000"))
+    cols = int(_arg("cols", "50"))
+    wide = {"1": 0, "0": cols}.get(_arg("wide", "auto"))  # Порог широкой таблицы
+    float32 = _arg("float32", "0") == "1"
+    baseline = _arg("baseline", "1") == "1"
+
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(rows, cols))
+    data[:, 1::2] += data[:, ::2][:, :cols // 2] * np.linspace(-3, 3, cols // 2)
+    df = pd.DataFrame(data, columns=[f"col{i}" for i in range(cols)]).assign(label="x")
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    result = compute_correlation(df.select_dtypes(include="number"), wide_columns=wide,
+                                 float32=float32)
+    result.strong_positive(), result.strong_negative(), result.weak(limit=5)
+    new_ms = (time.perf_counter() - start) * 1000
+    memory_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - peak) / 1024
+
+    print(f"Таблица {rows}×{cols}, мс на отчёт (без картинки)")
+    if not baseline:
+        print(f"{'общий':>10} {'память, МБ':>12}\n{new_ms:>10.1f} {memory_mb:>12.1f}")
+        return
+
+    start = time.perf_counter()
+    numeric = df.select_dtypes(include="number")
+    for _ in range(2):  # Таблица и тепловая карта
+        numeric.corr()
+    expected = numeric.corr()
+    _loop_pairs(expected)
+    old_ms = (time.perf_counter() - start) * 1000
+
+    error = np.nanmax(np.abs(result.values - expected.to_numpy()[result.first, result.second]))
+    print(f"{'прежний':>10} {'общий':>10} {'ускорение':>10} {'память, МБ':>12} {'ошибка':>10}")
+    print(f"{old_ms:>10.1f} {new_ms:>10.1f} {old_ms / new_ms:>9.1f}× {memory_mb:>12.1f} {error:>10.1e}")
+
+
+if __name__ == "__main__":
+    main()
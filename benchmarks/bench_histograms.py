@@ -0,0 +1,62 @@
+"""
+Бенчмарк гистограмм: ``np.histogram`` по каждому столбцу против
+:func:`generators.histograms.compute_histograms` для всей таблицы сразу.
+
+Запуск из корня проекта::
+
+    python -m benchmarks.bench_histograms [--rows=1000] [--cols=10] [--repeat=20]
+
+Выводится медиана времени на всю таблицу (правило ``bins="auto"``).
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from generators.histograms import compute_histograms
+
+
+def _arg(name: str, default: str) -> str:
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def _per_column(df: pd.DataFrame) -> list:
+    return [np.histogram(df[col].dropna().to_numpy(), bins="auto") for col in df.columns]
+
+
+def _median_ms(func, df: pd.DataFrame, repeat: int) -> float:
+    func(df)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    rows = int(_arg("rows", "1000"))
+    cols = int(_arg("cols", "10"))
+    repeat = int(_arg("repeat", "20"))
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(rows, cols)), columns=[f"col{i}" for i in range(cols)])
+    df.iloc[::11, ::2] = np.nan  # пропуски в половине столбцов
+
+    per_column = _median_ms(_per_column, df, repeat)
+    engine = _median_ms(compute_histograms, df, repeat)
+    print(f"Таблица {rows}×{cols}, мс на таблицу (медиана {repeat} замеров)")
+    print(f"{'по столбцам':>14} {'одним проходом':>16} {'ускорение':>10}")
+    print(f"{per_column:>14.2f} {engine:>16.2f} {per_column / engine:>9.2f}×")
+
+
+if __name__ == "__main__":
+    main()
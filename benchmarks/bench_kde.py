@@ -0,0 +1,59 @@
+"""
+Бенчмарк кривых KDE: точная ``scipy.stats.gaussian_kde`` по каждому столбцу
+против бинированной :func:`generators.kde.compute_kde` для всей таблицы.
+
+Запуск из корня проекта::
+
+    python -m benchmarks.bench_kde [--rows=1000] [--cols=10] [--points=200]
+
+Выводится время на всю таблицу и наибольшая ошибка бинированной кривой
+относительно максимума точной плотности.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from generators.kde import compute_kde
+
+
+def _arg(name: str, default: str) -> str:
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def main() -> None:
+    rows = int(_arg("rows", "1000"))
+    cols = int(_arg("cols", "10"))
+    points = int(_arg("points", "200"))
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(rows, cols)), columns=[f"col{i}" for i in range(cols)])
+
+    start = time.perf_counter()
+    exact = {}
+    for col in df.columns:
+        x = np.linspace(df[col].min(), df[col].max(), points)
+        exact[col] = stats.gaussian_kde(df[col].to_numpy())(x)
+    exact_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    curves = compute_kde(df)
+    binned = {col: curves.curve(col, points)[1] for col in df.columns}
+    binned_ms = (time.perf_counter() - start) * 1000
+
+    error = max(np.abs(binned[col] - exact[col]).max() / exact[col].max() for col in df.columns)
+    print(f"Таблица {rows}×{cols}, {points} точек кривой, мс на таблицу")
+    print(f"{'точная':>10} {'бинированная':>14} {'ускорение':>10} {'ошибка':>10}")
+    print(f"{exact_ms:>10.1f} {binned_ms:>14.1f} {exact_ms / binned_ms:>9.1f}× {error:>10.1e}")
+
+
+if __name__ == "__main__":
+    main()
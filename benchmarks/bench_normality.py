@@ -0,0 +1,74 @@
+"""
+Бенчмарк тестов нормальности: функции scipy по каждому столбцу против
+:func:`generators.normality.check_normality` для всей таблицы.
+
+Запуск из корня проекта::
+
+    python -m benchmarks.bench_normality [--rows=100000] [--cols=10] [--method=auto]
+
+Выводится выбранный тест, время на всю таблицу и наибольшее расхождение
+p-value с scipy (для ``shapiro_subsample`` эталона в scipy нет).
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from generators.column_stats import compute_column_stats
+from generators.normality import check_normality
+
+# Эталон scipy для каждого теста: (статистика, p-value) столбца
+_SCIPY = {
+    "shapiro": lambda values: tuple(stats.shapiro(values)),
+    "dagostino": lambda values: tuple(stats.normaltest(values)),
+    "jarque_bera": lambda values: tuple(stats.jarque_bera(values)),
+    "anderson": lambda values: (stats.anderson(values).statistic, np.nan),
+}
+
+
+def _arg(name: str, default: str) -> str:
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def main() -> None:
+    rows = int(_arg("rows", "100000"))
+    cols = int(_arg("cols", "10"))
+    method = _arg("method", "auto")
+
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(rows, cols)) + rng.exponential(size=(rows, cols)) * np.linspace(0, 0.1, cols)
+    df = pd.DataFrame(data, columns=[f"col{i}" for i in range(cols)])
+    column_stats = compute_column_stats(df)
+
+    start = time.perf_counter()
+    result = check_normality(df, column_stats, method)
+    engine_ms = (time.perf_counter() - start) * 1000
+    test = result.test[0]
+
+    print(f"Таблица {rows}×{cols}, тест {test}, мс на таблицу")
+    if test not in _SCIPY:
+        print(f"{'движок':>10}\n{engine_ms:>10.1f}")
+        return
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # scipy предупреждает о точности shapiro и anderson
+        expected = [_SCIPY[test](df[col].to_numpy()) for col in df.columns]
+    scipy_ms = (time.perf_counter() - start) * 1000
+    statistic = max(abs(result.statistic[k] / value[0] - 1) for k, value in enumerate(expected))
+
+    print(f"{'scipy':>10} {'движок':>10} {'ускорение':>10} {'ошибка':>10}")
+    print(f"{scipy_ms:>10.1f} {engine_ms:>10.1f} {scipy_ms / engine_ms:>9.1f}× {statistic:>10.1e}")
+    print("p-value:", " ".join(f"{p:.3g}" for p in result.p_value))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Бенчмарк параллельной отрисовки по столбцам.
+
+Запуск из корня проекта::
+
+    python -m benchmarks.bench_render [--rows=1000] [--cols=50] [--workers=1,2,4]
+
+Для каждого числа процессов строятся гистограммы (``_build_histograms``) и
+карточки распределений (``analyze_distributions``) по случайной таблице.
+Запуск пула и импорт библиотек в его процессах выполняются заранее и
+выводятся отдельной строкой; запись HTML-файлов отключена, чтобы мерить
+только отрисовку. Ускорение ограничено числом доступных ядер.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from generators import parallel
+from generators.distrib_generator import analyze_distributions
+from generators.parallel import RenderPool
+from generators.plot_generator import _build_histograms, _render_histogram
+from utils.image_store import IMAGES
+
+
+def _arg(name: str, default: str) -> str:
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def _timed(func) -> float:
+    IMAGES.clear()
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    rows = int(_arg("rows", "1000"))
+    cols = int(_arg("cols", "50"))
+    workers_list = [int(w) for w in _arg("workers", "1,2,4").split(",")]
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(rows, cols)), columns=[f"col{i}" for i in range(cols)])
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"Таблица {rows}×{cols}, доступно ядер: {cores}")
+    print(f"{'процессов':>10} {'гистограммы, с':>16} {'распределения, с':>18} {'ускорение':>10}")
+
+    _render_histogram("warm-up", np.ones(9), np.arange(10.0))  # шрифты и ленивые импорты — до замеров
+    analyze_distributions(df.iloc[:, :1])
+
+    baseline = None
+    with patch("generators.plot_generator._save_html_file"):
+        for workers in workers_list:
+            pool = RenderPool(workers=workers, min_tasks=1)
+            previous = parallel.install(pool)
+            try:
+                if workers > 1:
+                    start = time.perf_counter()
+                    pool.map(_render_histogram, [("warm-up", np.ones(9), np.arange(10.0))] * workers)
+                    print(f"{'':>10} запуск пула: {time.perf_counter() - start:.2f} с")
+                hist_s = _timed(lambda: _build_histograms(df))
+                dist_s = _timed(lambda: analyze_distributions(df))
+            finally:
+                parallel.install(previous)
+                pool.shutdown()
+            total = hist_s + dist_s
+            baseline = baseline or total
+            print(f"{workers:>10} {hist_s:>16.2f} {dist_s:>18.2f} {baseline / total:>9.2f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Бенчмарк холодного старта: время импорта ``app`` и занимаемая память.
+
+Запуск из корня проекта::
+
+    python -m benchmarks.bench_startup [--runs=5]
+
+Каждый замер — новый процесс интерпретатора, поэтому библиотеки
+импортируются «с нуля» (кэш файловой системы после первого запуска уже
+тёплый). Выводятся медианы:
+
+* ``import app`` — то, что ждёт процесс, отдающий только страницы и статику;
+* прогрев — импорт отложенных сервисов (:func:`utils.lazy_import.prewarm`),
+  то есть прежняя стоимость старта минус ``import app``; без прогрева её
+  платит первый запрос к отчёту;
+* RSS процесса после каждого шага.
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import subprocess
+import sys
+
+_CHILD = r"""
+import json, resource, time
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+rss_app = rss_mb()
+from utils.lazy_import import prewarm
+prewarm()
+warmed = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start,
+    "prewarm_s": warmed - imported,
+    "rss_app_mb": rss_app,
+    "rss_warm_mb": rss_mb(),
+}))
+"""
+
+
+def _arg(name: str, default: str) -> str:
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def main() -> None:
+    runs = int(_arg("runs", "5"))
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD], check=True, capture_output=True, text=True,
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+
+    def median(key: str) -> float:
+        return statistics.median(sample[key] for sample in samples)
+
+    print(f"Холодный старт, медиана {runs} запусков")
+    print(f"{'шаг':>22} {'время, с':>10} {'RSS, МБ':>9}")
+    print(f"{'import app':>22} {median('import_s'):>10.2f} {median('rss_app_mb'):>9.0f}")
+    print(f"{'+ прогрев сервисов':>22} {median('prewarm_s'):>10.2f} {median('rss_warm_mb'):>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Бенчмарк шаблонов фигур: время картинки на столбец.
+
+Запуск из корня проекта::
+
+    python -m benchmarks.bench_templates [--rows=1000] [--cols=20]
+
+Сравниваются два способа нарисовать гистограмму и карточку распределения:
+
+* «новая фигура» — прежний путь: для каждого столбца создаются фигура и
+  оси, ``Axes.hist`` / ``seaborn.histplot`` и ``bbox_inches="tight"``;
+* «шаблон» — :func:`generators.plot_generator._render_histogram` и
+  :func:`generators.distrib_generator._render_distribution`, которые
+  обновляют данные художников в шаблоне текущего потока.
+
+Время включает кодирование PNG; хранилище картинок очищается перед
+каждым замером. Отрисовка идёт в одном потоке, без пула процессов.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from scipy import stats
+
+from generators.distrib_generator import KDE_GRID, _render_distribution
+from generators.kde import compute_kde
+from generators.plot_generator import _render_histogram
+from generators.rendering import new_figure, store_figure
+from utils.image_store import IMAGES
+
+
+def _arg(name: str, default: str) -> str:
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def _histogram_new_figure(col: str, values: np.ndarray) -> str:
+    fig = new_figure(figsize=(6, 4))
+    ax = fig.add_subplot()
+    ax.hist(values, bins="auto", density=True, label="Распределение данных")
+    ax.grid(True)
+    ax.set_title(f"Гистограмма • {col}")
+    ax.set_xlabel(col)
+    ax.set_ylabel("Плотность")
+    ax.legend()
+    return store_figure(fig, bbox_inches="tight")
+
+
+def _distribution_new_figure(col: str, col_data: pd.Series, normal_fit: tuple | None) -> str:
+    fig = new_figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    sns.histplot(col_data, kde=True, stat="density", label="Распределение данных", ax=ax)
+    ax.set_title(f"Распределение {col}")
+    if normal_fit is not None:
+        mean, std = normal_fit
+        ax.axvline(mean, color="r", linestyle="--", label="Среднее")
+        x = np.linspace(col_data.min(), col_data.max(), 100)
+        ax.plot(x, stats.norm.pdf(x, mean, std), "r-", lw=2, label="Нормальное распределение")
+    ax.legend()
+    return store_figure(fig, bbox_inches="tight")
+
+
+def _histogram_template(col: str, values: np.ndarray) -> str:
+    return _render_histogram(col, *np.histogram(values, bins="auto", density=True))
+
+
+def _distribution_template(col: str, col_data: pd.Series, normal_fit: tuple | None) -> str:
+    histogram = np.histogram(col_data, bins="auto", density=True)
+    curve = compute_kde(col_data.to_frame()).curve(col, KDE_GRID)
+    return _render_distribution(col, (col_data.min(), col_data.max()), histogram, curve, normal_fit)
+
+
+def _per_column_ms(func, tasks) -> float:
+    func(*tasks[0])  # шрифты, ленивые импорты и сам шаблон — до замера
+    IMAGES.clear()
+    start = time.perf_counter()
+    for args in tasks:
+        func(*args)
+    return (time.perf_counter() - start) / len(tasks) * 1000
+
+
+def main() -> None:
+    rows = int(_arg("rows", "1000"))
+    cols = int(_arg("cols", "20"))
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(rows, cols)), columns=[f"col{i}" for i in range(cols)])
+    hist_tasks = [(col, df[col].to_numpy()) for col in df.columns]
+    dist_tasks = [
+        (col, df[col], (df[col].mean(), df[col].std()) if k % 2 == 0 else None)
+        for k, col in enumerate(df.columns)
+    ]
+
+    print(f"Таблица {rows}×{cols}, мс на столбец")
+    print(f"{'график':>14} {'новая фигура':>14} {'шаблон':>10} {'ускорение':>10}")
+    for name, legacy, template, tasks in (
+        ("гистограмма", _histogram_new_figure, _histogram_template, hist_tasks),
+        ("распределение", _distribution_new_figure, _distribution_template, dist_tasks),
+    ):
+        legacy_ms = _per_column_ms(legacy, tasks)
+        template_ms = _per_column_ms(template, tasks)
+        print(f"{name:>14} {legacy_ms:>14.1f} {template_ms:>10.1f} {legacy_ms / template_ms:>9.2f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Компактные JSON-сводки для отрисовки графиков в браузере.
+
+В режиме ``render=client`` маршруты ``/generate_plot`` и
+``/generate_distributions`` не растеризуют картинки matplotlib, а отдают
+только то, что нужно для рисования: границы и высоты столбиков
+гистограмм, точки кривых KDE, квартили box-plot, корреляционную матрицу
+и двумерные гистограммы пар. Рисует их ``static/scripts/charts.js``.
+
+Числа округляются до 6 значащих цифр — на экране этого достаточно, а JSON
+получается в несколько раз короче. ``NaN`` и бесконечности передаются как
+``null``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from typing import Any, Iterable, List, Optional
+
+import numpy as np
+
+__all__ = ["compact", "compact_list", "to_json"]
+
+SIGNIFICANT_DIGITS = 6
+
+
+def compact(value: Any) -> Optional[float]:
+    """Округлить число до 6 значащих цифр (``None`` для NaN/inf)."""
+    value = float(value)
+    if not math.isfinite(value):
+        return None
+    return float(f"{value:.{SIGNIFICANT_DIGITS}g}")
+
+
+def compact_list(values: Iterable[Any]) -> List[Optional[float]]:
+    """Округлить все элементы последовательности (массивы numpy — тоже)."""
+    array = np.asarray(values, dtype=float).ravel()
+    rounded = [float(f"{v:.{SIGNIFICANT_DIGITS}g}") for v in array.tolist()]
+    finite = np.isfinite(array)
+    if finite.all():
+        return rounded
+    return [v if ok else None for v, ok in zip(rounded, finite.tolist())]
+
+
+def to_json(payload: Any) -> str:
+    """Сериализовать сводку без пробелов (NaN к этому моменту уже ``None``)."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
@@ -0,0 +1,226 @@
+"""
+Описательные статистики сразу всех числовых столбцов таблицы.
+
+:func:`compute_column_stats` заменяет отдельные расчёты генераторов
+(``Series.mean``/``median``/``std``/``skew``/``kurt``/``quantile`` и подсчёт
+выбросов по столбцу) одним проходом по двумерному массиву:
+
+* моменты — суммы центрированных степеней по всей матрице сразу;
+* все квартили и медиана — из одного ``np.partition`` на матрицу
+  (:func:`column_quantiles`);
+* экстремумы, границы усов box-plot и число выбросов по правилу
+  1.5·IQR — сравнения по всей матрице.
+
+Формулы совпадают с pandas: несмещённые ``std`` (ddof=1), ``skew`` и
+``kurt`` (эксцесс Фишера), линейная интерполяция квантилей, обнуление
+моментов постоянного столбца с учётом ошибки округления. Пропуски (NaN)
+исключаются по каждому столбцу отдельно.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Hashable, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+__all__ = ["ColumnStats", "column_positions", "column_quantiles", "compute_column_stats", "moment_statistics"]
+
+# Множитель IQR для границ выбросов (правило Тьюки)
+OUTLIER_IQR_FACTOR = 1.5
+
+
+def column_positions(columns: Sequence[Hashable]) -> Dict[Hashable, int]:
+    """Номер каждого столбца по имени (при повторяющихся именах — первый).
+
+    Сводки строят словарь один раз, чтобы поиск столбца в цикле по всем
+    столбцам не был линейным (``tuple.index``).
+    """
+    positions: Dict[Hashable, int] = {}
+    for k, col in enumerate(columns):
+        positions.setdefault(col, k)
+    return positions
+
+
+def column_quantiles(values: np.ndarray, n: np.ndarray, levels: Sequence[float]) -> np.ndarray:
+    """Квантили уровней *levels* каждого столбца по одному ``np.partition``.
+
+    NaN при разбиении уходят в конец столбца, поэтому k-я порядковая
+    статистика столбца — ``part[k, col]`` при ``k < n[col]``. Нужные номера
+    всех столбцов передаются в ``np.partition`` одним списком (у столбцов
+    без пропусков они совпадают), так что матрица разбивается один раз, без
+    полной сортировки. Интерполяция линейная, как у ``np.percentile``.
+
+    Args:
+        values: Матрица «строки × столбцы» (NaN — пропуски).
+        n: Число значений в каждом столбце.
+        levels: Уровни квантилей от 0 до 1.
+
+    Returns:
+        Массив формы ``(len(levels), столбцы)``; у пустых столбцов — NaN.
+    """
+    cols = np.arange(values.shape[1])
+    last = np.maximum(n - 1, 0)
+    positions = []
+    for level in levels:
+        pos = last * level
+        below = np.floor(pos).astype(np.intp)
+        positions.append((pos - below, below, np.minimum(below + 1, last)))
+    if not values.shape[0]:
+        return np.full((len(levels), values.shape[1]), np.nan)
+    kth = np.unique(np.concatenate([idx for _, *pair in positions for idx in pair]))
+    part = np.partition(values, kth, axis=0)
+
+    result = np.empty((len(levels), values.shape[1]))
+    for row, (frac, below, above) in enumerate(positions):
+        low, high = part[below, cols], part[above, cols]
+        result[row] = np.where(frac >= 0.5, high - (high - low) * (1 - frac), low + (high - low) * frac)
+    result[:, n == 0] = np.nan
+    return result
+
+
+@dataclass(frozen=True)
+class ColumnStats:
+    """Статистики нескольких столбцов: по массиву на показатель.
+
+    Attributes:
+        columns: Имена столбцов.
+        count: Число значений (без пропусков).
+        mean, std, min, max: Среднее, стандартное отклонение (ddof=1) и экстремумы.
+        skew, kurt: Асимметрия и эксцесс (как ``Series.skew``/``Series.kurt``).
+        q1, median, q3: Квартили.
+        whisker_low, whisker_high: Крайние значения внутри границ 1.5·IQR.
+        outliers: Число значений за границами 1.5·IQR.
+    """
+
+    columns: Tuple[Hashable, ...]
+    count: np.ndarray
+    mean: np.ndarray
+    std: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    skew: np.ndarray
+    kurt: np.ndarray
+    q1: np.ndarray
+    median: np.ndarray
+    q3: np.ndarray
+    whisker_low: np.ndarray
+    whisker_high: np.ndarray
+    outliers: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @cached_property
+    def _positions(self) -> Dict[Hashable, int]:
+        return column_positions(self.columns)
+
+    def column(self, col: Hashable) -> Dict[str, float]:
+        """Все показатели столбца *col* в виде словаря."""
+        k = self._positions[col]
+        count = int(self.count[k])
+        outliers = int(self.outliers[k])
+        return {
+            "count": count,
+            "mean": float(self.mean[k]),
+            "median": float(self.median[k]),
+            "std": float(self.std[k]),
+            "min": float(self.min[k]),
+            "max": float(self.max[k]),
+            "skewness": float(self.skew[k]),
+            "kurtosis": float(self.kurt[k]),
+            "q1": float(self.q1[k]),
+            "q3": float(self.q3[k]),
+            "iqr": float(self.q3[k] - self.q1[k]),
+            "whisker_low": float(self.whisker_low[k]),
+            "whisker_high": float(self.whisker_high[k]),
+            "outliers_count": outliers,
+            "outliers_percent": outliers / count * 100 if count else float("nan"),
+        }
+
+
+def moment_statistics(
+    n: np.ndarray, m2: np.ndarray, m3: np.ndarray, m4: np.ndarray, max_abs: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Стандартное отклонение, асимметрия и эксцесс по суммам степеней отклонений.
+
+    Формулы ``pandas.core.nanops`` (``std`` с ddof=1, ``nanskew``, ``nankurt``).
+
+    Args:
+        n: Число значений каждого столбца.
+        m2, m3, m4: Суммы 2-й, 3-й и 4-й степеней отклонений от среднего.
+        max_abs: Наибольший модуль значения (порог ошибки округления).
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Постоянный столбец: суммы степеней отклонений — лишь ошибка округления
+        eps = np.finfo(float).eps
+        m2 = np.where(np.abs(m2) < (eps * max_abs) ** 2 * n, 0.0, m2)
+        m3 = np.where(np.abs(m3) < (eps * max_abs) ** 3 * n, 0.0, m3)
+        m4 = np.where(np.abs(m4) < (eps * max_abs) ** 4 * n, 0.0, m4)
+
+        std = np.sqrt(m2 / (n - 1))
+        skew = n * (n - 1) ** 0.5 / (n - 2) * (m3 / m2 ** 1.5)
+        skew = np.where(m2 == 0, 0.0, skew)
+        denominator = (n - 2) * (n - 3) * m2 ** 2
+        kurt = n * (n + 1) * (n - 1) * m4 / denominator - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        kurt = np.where(denominator == 0, 0.0, kurt)
+    std = np.where(n > 1, std, np.nan)
+    return std, np.where(n > 2, skew, np.nan), np.where(n > 3, kurt, np.nan)
+
+
+def _moments(values: np.ndarray, mask: np.ndarray, n: np.ndarray):
+    """Среднее, std, skew и kurt всех столбцов."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        filled = np.where(mask, values, 0.0)
+        mean = filled.sum(axis=0) / n
+        centered = np.where(mask, values - mean, 0.0)
+        squared = centered ** 2
+        m2 = squared.sum(axis=0)
+        m3 = (squared * centered).sum(axis=0)
+        m4 = (squared ** 2).sum(axis=0)
+    max_abs = np.abs(filled).max(axis=0, initial=0.0)
+    return (mean, *moment_statistics(n, m2, m3, m4, max_abs))
+
+
+def compute_column_stats(data: pd.DataFrame) -> ColumnStats:
+    """Описательные статистики всех столбцов *data* одним проходом.
+
+    Args:
+        data: Таблица числовых столбцов (NaN — пропуски).
+    """
+    values = data.to_numpy(dtype=float, na_value=np.nan)
+    mask = ~np.isnan(values)
+    n = mask.sum(axis=0)
+    empty = n == 0
+
+    mean, std, skew, kurt = _moments(values, mask, n)
+    low, q1, median, q3, high = column_quantiles(values, n, (0.0, 0.25, 0.5, 0.75, 1.0))
+
+    # Выбросы и усы box-plot: сравнения NaN всегда ложны
+    iqr = q3 - q1
+    low_fence, high_fence = q1 - OUTLIER_IQR_FACTOR * iqr, q3 + OUTLIER_IQR_FACTOR * iqr
+    with np.errstate(invalid="ignore"):
+        below, above = values < low_fence, values > high_fence
+        inside = mask & ~below & ~above
+        whisker_low = np.where(inside, values, np.inf).min(axis=0, initial=np.inf)
+        whisker_high = np.where(inside, values, -np.inf).max(axis=0, initial=-np.inf)
+    outliers = below.sum(axis=0) + above.sum(axis=0)
+
+    return ColumnStats(
+        columns=tuple(data.columns),
+        count=n,
+        mean=mean,
+        std=std,
+        min=low,
+        max=high,
+        skew=skew,
+        kurt=kurt,
+        q1=q1,
+        median=median,
+        q3=q3,
+        whisker_low=np.where(empty, np.nan, whisker_low),
+        whisker_high=np.where(empty, np.nan, whisker_high),
+        outliers=outliers,
+    )
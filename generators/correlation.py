@@ -0,0 +1,294 @@
+"""
+Корреляционная матрица Пирсона и классификация пар столбцов.
+
+:func:`compute_correlation` считает коэффициенты один раз по непрерывному
+массиву числовых столбцов, а таблица, тепловая карта и выводы отчёта
+(:mod:`generators.correlation_generator`) берут их из общего
+:class:`CorrelationResult`:
+
+* без пропусков столбцы один раз центрируются и нормируются, и матрица —
+  произведение ``Zᵀ·Z``;
+* с пропусками, как у ``DataFrame.corr``, каждая пара считается по строкам,
+  где заданы оба значения: суммы по таким строкам — произведения матриц
+  значений и масок присутствия (значения предварительно центрируются
+  средним столбца, чтобы не терять точность).
+
+Пары верхнего треугольника сортируются по убыванию коэффициента; сильные
+положительные, сильные отрицательные и слабые связи — отрезки этого
+порядка, границы которых находит ``np.searchsorted``. Столбцы с нулевым
+разбросом дают NaN, как в pandas.
+
+Широкие таблицы (больше :data:`CORRELATION_WIDE_COLUMNS` столбцов)
+обрабатываются без полной матрицы: она считается полосами строк не больше
+:data:`CORRELATION_BLOCK_MB` мегабайт (при ``CORRELATION_FLOAT32=1`` — в
+float32, вдвое быстрее и компактнее), и из каждой полосы частичной
+выборкой (``np.argpartition``) остаются только :data:`TOP_PAIRS` самых
+сильных положительных, самых сильных отрицательных и самых слабых пар.
+Число пар каждого класса считается точно. Таблице и тепловой карте такой
+таблицы нужна лишь подматрица выбранных столбцов
+(:meth:`CorrelationResult.leading_columns`, :meth:`CorrelationResult.submatrix`).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.settings import env_int
+
+__all__ = [
+    "CORRELATION_BLOCK_MB",
+    "CORRELATION_FLOAT32",
+    "CORRELATION_WIDE_COLUMNS",
+    "STRONG_NEGATIVE",
+    "STRONG_POSITIVE",
+    "TOP_PAIRS",
+    "WEAK",
+    "CorrelationResult",
+    "compute_correlation",
+]
+
+#: Сильная положительная связь: r > STRONG_POSITIVE.
+STRONG_POSITIVE = 0.8
+#: Сильная отрицательная связь: r < STRONG_NEGATIVE.
+STRONG_NEGATIVE = -0.5
+#: Слабая связь или её отсутствие: |r| < WEAK.
+WEAK = 0.2
+
+#: Начиная с этого числа столбцов полная матрица не хранится.
+CORRELATION_WIDE_COLUMNS = env_int("CORRELATION_WIDE_COLUMNS", 1000)
+#: Объём полосы матрицы, считаемой за один раз (мегабайты).
+CORRELATION_BLOCK_MB = env_int("CORRELATION_BLOCK_MB", 64)
+#: 1 — считать широкие таблицы в float32.
+CORRELATION_FLOAT32 = env_int("CORRELATION_FLOAT32", 0) == 1
+#: Сколько пар каждого класса остаётся у широкой таблицы.
+TOP_PAIRS = env_int("CORRELATION_TOP_PAIRS", 20)
+
+Pair = Tuple[Hashable, Hashable, float]
+
+# Классы пар: (условие на r, ключ отбора — чем меньше, тем важнее пара)
+_CLASSES = {
+    "positive": (lambda r: r > STRONG_POSITIVE, lambda r: -r),
+    "negative": (lambda r: r < STRONG_NEGATIVE, lambda r: r),
+    "weak": (lambda r: np.abs(r) < WEAK, np.abs),
+}
+
+
+@dataclass(frozen=True)
+class CorrelationResult:
+    """Корреляционная матрица и пары столбцов, упорядоченные по коэффициенту.
+
+    Attributes:
+        columns: Имена столбцов.
+        matrix: Матрица коэффициентов формы ``(столбцы, столбцы)``; у широкой
+            таблицы — ``None`` (см. :meth:`submatrix`).
+        first, second: Номера столбцов пар (``first < second``) в порядке
+            убывания коэффициента, без NaN. У широкой таблицы — только
+            отобранные пары каждого класса.
+        values: Коэффициенты этих пар.
+        totals: Число пар каждого класса (``positive``, ``negative``, ``weak``).
+        source: Значения столбцов широкой таблицы для :meth:`submatrix`.
+    """
+
+    columns: Tuple[Hashable, ...]
+    matrix: Optional[np.ndarray]
+    first: np.ndarray
+    second: np.ndarray
+    values: np.ndarray
+    totals: Dict[str, int]
+    source: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def submatrix(self, indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Коэффициенты столбцов с номерами *indices* (по умолчанию — всех)."""
+        if self.matrix is not None:
+            return self.matrix if indices is None else self.matrix[np.ix_(indices, indices)]
+        values = self.source if indices is None else self.source[:, indices]
+        return _block(_prepare(values, np.float64), 0, values.shape[1], 0)
+
+    def frame(self, indices: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """Матрица (или подматрица *indices*) в виде таблицы, как ``DataFrame.corr``."""
+        names = list(self.columns) if indices is None else [self.columns[k] for k in indices]
+        return pd.DataFrame(self.submatrix(indices), index=names, columns=names)
+
+    def leading_columns(self, limit: int) -> np.ndarray:
+        """Номера не более *limit* столбцов для усечённой таблицы.
+
+        Сначала — столбцы самых сильных связей любого знака, затем, если
+        места осталось, первые по порядку; номера возвращаются по возрастанию.
+        """
+        if len(self) <= limit:
+            return np.arange(len(self))
+        strong = (self.values > STRONG_POSITIVE) | (self.values < STRONG_NEGATIVE)
+        order = np.flatnonzero(strong)[np.argsort(-np.abs(self.values[strong]), kind="stable")]
+        ranked = np.concatenate([np.column_stack([self.first[order], self.second[order]]).ravel(),
+                                 np.arange(len(self))])
+        _, first_seen = np.unique(ranked, return_index=True)
+        return np.sort(ranked[np.sort(first_seen)][:limit])
+
+    def _pairs(self, order: np.ndarray, limit: Optional[int] = None) -> List[Pair]:
+        order = order[:limit]
+        return [(self.columns[i], self.columns[j], float(r))
+                for i, j, r in zip(self.first[order], self.second[order], self.values[order])]
+
+    def _cut(self, value: float, side: str) -> int:
+        """Число пар с коэффициентом больше *value* (``left``) или не меньше (``right``)."""
+        return int(np.searchsorted(-self.values, -value, side=side))
+
+    def strong_positive(self, limit: Optional[int] = None) -> List[Pair]:
+        """Пары с r > :data:`STRONG_POSITIVE`, от самой сильной связи."""
+        return self._pairs(np.arange(self._cut(STRONG_POSITIVE, "left")), limit)
+
+    def strong_negative(self, limit: Optional[int] = None) -> List[Pair]:
+        """Пары с r < :data:`STRONG_NEGATIVE`, от самой сильной связи."""
+        start = self._cut(STRONG_NEGATIVE, "right")
+        return self._pairs(np.arange(self.values.size - 1, start - 1, -1), limit)
+
+    def weak(self, limit: Optional[int] = None) -> List[Pair]:
+        """Пары с |r| < :data:`WEAK`, от самой слабой связи."""
+        start, stop = self._cut(WEAK, "right"), self._cut(-WEAK, "left")
+        order = np.arange(start, max(start, stop))
+        return self._pairs(order[np.argsort(np.abs(self.values[order]), kind="stable")], limit)
+
+
+# ---------------------------------------------------------------------------
+#   Полосы матрицы
+# ---------------------------------------------------------------------------
+
+def _prepare(values: np.ndarray, dtype) -> tuple:
+    """Центрированные (и при полных данных нормированные) столбцы.
+
+    Массивы хранятся по столбцам (Fortran order), чтобы полоса столбцов была
+    непрерывной для BLAS.
+    """
+    mask = ~np.isnan(values)
+    n = mask.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        centered = np.where(mask, values - np.where(mask, values, 0.0).sum(axis=0) / n, 0.0)
+        if mask.all():
+            scale = np.sqrt((centered ** 2).sum(axis=0))
+            return np.asfortranarray(centered / scale, dtype=dtype), None, None, scale
+    present = np.asfortranarray(mask, dtype=dtype)
+    squared = np.asfortranarray(centered ** 2, dtype=dtype)
+    return np.asfortranarray(centered, dtype=dtype), present, squared, np.sqrt(squared.sum(axis=0))
+
+
+def _block(state: tuple, start: int, stop: int, offset: int) -> np.ndarray:
+    """Коэффициенты строк ``start:stop`` со столбцами ``offset:`` (float64)."""
+    centered, present, squared, scale = state
+    rows, cols = slice(start, stop), slice(offset, None)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if present is None:
+            block = (centered[:, rows].T @ centered[:, cols]).astype(np.float64)
+        else:
+            # Суммы по строкам, где заданы оба столбца пары
+            count = present[:, rows].T @ present[:, cols]
+            sum_x = centered[:, rows].T @ present[:, cols]
+            sum_y = present[:, rows].T @ centered[:, cols]
+            var_x = squared[:, rows].T @ present[:, cols] - sum_x ** 2 / count
+            var_y = present[:, rows].T @ squared[:, cols] - sum_y ** 2 / count
+            covariance = centered[:, rows].T @ centered[:, cols] - sum_x * sum_y / count
+            block = (covariance / np.sqrt(var_x * var_y)).astype(np.float64)
+    block = np.clip(block, -1.0, 1.0)
+    # Диагональ: 1 у столбцов с разбросом, NaN у постоянных
+    diagonal = np.arange(max(start, offset), min(stop, offset + block.shape[1]))
+    block[diagonal - start, diagonal - offset] = np.where(scale[diagonal] > 0, 1.0, np.nan)
+    return block
+
+
+def _smallest(key: np.ndarray, k: int) -> np.ndarray:
+    """Номера *k* наименьших значений *key* (без полной сортировки)."""
+    if key.size <= k:
+        return np.arange(key.size)
+    return np.argpartition(key, k - 1)[:k]
+
+
+def _wide_pairs(values: np.ndarray, top_k: int, block_mb: int, dtype) -> tuple:
+    """Отобранные пары и число пар каждого класса, по полосам матрицы."""
+    width = values.shape[1]
+    state = _prepare(values, dtype)
+    # Промежуточных массивов размера полосы: сама полоса, ключи отбора и
+    # номера argpartition (с пропусками — ещё суммы по парам)
+    arrays = 4 if state[1] is None else 8
+    step = max(1, block_mb * 2 ** 20 // (8 * arrays * width))
+    totals = dict.fromkeys(_CLASSES, 0)
+    kept = {name: (np.empty(0, np.intp), np.empty(0, np.intp), np.empty(0)) for name in _CLASSES}
+
+    for start in range(0, width, step):
+        stop = min(start + step, width)
+        block = _block(state, start, stop, start)
+        # Верхний треугольник полосы: столбец правее строки
+        upper = np.arange(block.shape[1])[None, :] > np.arange(stop - start)[:, None]
+        for name, (condition, key) in _CLASSES.items():
+            with np.errstate(invalid="ignore"):
+                hit = condition(block) & upper
+            totals[name] += int(np.count_nonzero(hit))
+            ranked = np.where(hit, key(block), np.inf).ravel()
+            chosen = _smallest(ranked, top_k)
+            chosen = chosen[np.isfinite(ranked[chosen])]
+            rows, cols = np.divmod(chosen, block.shape[1])
+            first, second, found = kept[name]
+            first = np.concatenate([first, rows + start])
+            second = np.concatenate([second, cols + start])
+            found = np.concatenate([found, block[rows, cols]])
+            best = _smallest(key(found), top_k)
+            kept[name] = first[best], second[best], found[best]
+
+    first, second, found = (np.concatenate(parts) for parts in zip(*kept.values()))
+    return first, second, found, totals
+
+
+def compute_correlation(
+    data: pd.DataFrame,
+    top_k: Optional[int] = None,
+    wide_columns: Optional[int] = None,
+    block_mb: Optional[int] = None,
+    float32: Optional[bool] = None,
+) -> CorrelationResult:
+    """Корреляционная матрица Пирсона столбцов *data* и упорядоченные пары.
+
+    Args:
+        data: Таблица числовых столбцов (NaN — пропуски).
+        top_k: Пар каждого класса у широкой таблицы (по умолчанию :data:`TOP_PAIRS`).
+        wide_columns: Порог широкой таблицы (по умолчанию :data:`CORRELATION_WIDE_COLUMNS`).
+        block_mb: Объём полосы матрицы (по умолчанию :data:`CORRELATION_BLOCK_MB`).
+        float32: Считать широкую таблицу в float32 (по умолчанию :data:`CORRELATION_FLOAT32`).
+    """
+    values = np.ascontiguousarray(data.to_numpy(dtype=float, na_value=np.nan))
+    width = values.shape[1]
+    wide = width > (wide_columns if wide_columns is not None else CORRELATION_WIDE_COLUMNS)
+
+    if wide:
+        matrix = None
+        first, second, pairs, totals = _wide_pairs(
+            values,
+            top_k if top_k is not None else TOP_PAIRS,
+            block_mb if block_mb is not None else CORRELATION_BLOCK_MB,
+            np.float32 if (float32 if float32 is not None else CORRELATION_FLOAT32) else np.float64,
+        )
+    else:
+        matrix = _block(_prepare(values, np.float64), 0, width, 0) if width else np.empty((0, 0))
+        first, second = np.triu_indices(width, k=1)
+        pairs = matrix[first, second]
+        with np.errstate(invalid="ignore"):
+            totals = {name: int(np.count_nonzero(condition(pairs))) for name, (condition, _) in _CLASSES.items()}
+
+    # По убыванию коэффициента, при равенстве — по номерам столбцов; NaN отбрасываются
+    valid = ~np.isnan(pairs)
+    first, second, pairs = first[valid], second[valid], pairs[valid]
+    order = np.lexsort((second, first, -pairs))
+
+    return CorrelationResult(
+        columns=tuple(data.columns),
+        matrix=matrix,
+        first=first[order],
+        second=second[order],
+        values=pairs[order],
+        totals=totals,
+        source=values if wide else None,
+    )
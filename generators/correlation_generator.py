@@ -1,69 +1,118 @@
 from __future__ import annotations
 
-import base64
-import io
 import pandas as pd
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+from generators.correlation import TOP_PAIRS, CorrelationResult, compute_correlation
+from generators.rendering import new_figure, store_figure
+from generators.summary import NumericSummary
+from utils.image_store import IMAGES
+from utils.metrics import phase
+from utils.settings import env_int
 import seaborn as sns
 import os
 from datetime import datetime
 
-def build_correlation_table(df):
+WEAK_PAIRS_SHOWN = 5  # Сколько самых слабых пар показывать в выводах
+# Ограничения ниже действуют только для широкой таблицы (без полной матрицы,
+# см. generators.correlation): обычная показывает все столбцы и все сильные пары.
+STRONG_PAIRS_SHOWN = TOP_PAIRS  # Сколько самых сильных пар каждого знака показывать в выводах
+# Таблица и тепловая карта широкой таблицы — только столбцы самых сильных связей
+TABLE_MAX_COLUMNS = env_int("CORRELATION_TABLE_MAX_COLUMNS", 30)
+HEATMAP_ANNOT_MAX_COLUMNS = 20  # Подписи коэффициентов в ячейках — только у небольших карт
+
+def _correlation_or_compute(df: pd.DataFrame, correlation: CorrelationResult | None) -> CorrelationResult:
+    """Вернуть готовый результат *correlation* или посчитать его по числовым столбцам."""
+    if correlation is not None:
+        return correlation
+    with phase("statistics"):
+        return compute_correlation(df.select_dtypes(include="number"))
+
+
+def shown_matrix(correlation: CorrelationResult) -> pd.DataFrame:
+    """Матрица для таблицы и тепловой карты.
+
+    Обычная таблица показывается целиком; у широкой — не больше
+    TABLE_MAX_COLUMNS столбцов самых сильных связей (подматрица считается
+    по исходным значениям, поэтому её стоит построить один раз).
+    """
+    if correlation.matrix is not None:
+        return correlation.frame()
+    return correlation.frame(correlation.leading_columns(TABLE_MAX_COLUMNS))
+
+
+def build_correlation_table(df, correlation: CorrelationResult | None = None,
+                            matrix: pd.DataFrame | None = None):
     """
     Строит HTML-таблицу с коэффициентами корреляции.
     Возвращает сообщение, если таблицу построить нельзя.
+    Готовый результат можно передать в *correlation*, чтобы не считать матрицу повторно,
+    а готовую показываемую матрицу (см. shown_matrix) — в *matrix*.
     """
     if df.empty or df.shape[1] < 2:
         return "<p>Нет данных для отображения корреляционной таблицы.</p>"
 
-    corr_matrix = df.corr()
+    correlation = _correlation_or_compute(df, correlation)
 
-    if corr_matrix.empty:
+    if not len(correlation):
         return "<p>Нет данных для отображения корреляционной таблицы.</p>"
 
+    matrix = matrix if matrix is not None else shown_matrix(correlation)
     html = "<h3 class='mt-3'>Correlation Matrix</h3>"
-    html += corr_matrix.to_html(classes="dataframe table table-bordered table-striped", border=1)
+    html += _truncation_note(correlation, matrix)
+    html += matrix.to_html(classes="dataframe table table-bordered table-striped", border=1)
     return html
 
 
+def _truncation_note(correlation: CorrelationResult, matrix: pd.DataFrame) -> str:
+    """Пояснение к усечённой матрице широкой таблицы (пустое, если показаны все столбцы)."""
+    if len(matrix) == len(correlation):
+        return ""
+    return (f"<p class='text-muted'>Показаны {len(matrix)} из {len(correlation)} столбцов: "
+            "участвующие в самых сильных связях.</p>")
 
-def _fig_to_base64(fig: plt.Figure) -> str:
-    """Преобразует matplotlib-график в base64-строку для вставки в HTML."""
-    buf = io.BytesIO()                              # Создаём буфер в памяти
-    fig.savefig(buf, format="png", bbox_inches="tight")  # Сохраняем график в буфер
-    buf.seek(0)                                      # Перемещаемся в начало буфера
-    return base64.b64encode(buf.read()).decode("ascii")  # Кодируем в base64
 
 
+def build_correlation_heatmap(df, correlation: CorrelationResult | None = None,
+                              matrix: pd.DataFrame | None = None):
+    """Строит тепловую карту корреляций и возвращает тег ``<img>``.
 
-def build_correlation_heatmap(df):
-    corr_matrix = df.corr()
+    *matrix* — та же показываемая матрица, что и у таблицы (см. shown_matrix).
+    """
+    correlation = _correlation_or_compute(df, correlation)
+    corr_matrix = matrix if matrix is not None else shown_matrix(correlation)
 
     # Проверка: пустая или полностью NaN корреляционная матрица
     if corr_matrix.empty or corr_matrix.isnull().all().all():
         return "<p>Нет данных для отображения тепловой карты.</p>"
 
-    plt.figure(figsize=(8, 6))
-    ax = sns.heatmap(corr_matrix, annot=True, cmap="coolwarm", fmt=".2f")
+    with phase("render"):
+        fig = new_figure(figsize=(8, 6))                 # Своя фигура, без pyplot
+        sns.heatmap(corr_matrix, annot=len(corr_matrix) <= HEATMAP_ANNOT_MAX_COLUMNS,
+                    cmap="coolwarm", fmt=".2f", ax=fig.add_subplot())
+    img_url = store_figure(fig, bbox_inches="tight")     # PNG в хранилище картинок
 
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight')
-    plt.close()
-    buf.seek(0)
-    img_base64 = base64.b64encode(buf.read()).decode('utf-8')
+    return f'<img src="{img_url}" alt="Correlation Heatmap">'
 
-    return f'<img src="data:image/png;base64,{img_base64}" alt="Correlation Heatmap">'
 
 
+def _pairs_html(css: str, title: str, pairs: list, total: int) -> str:
+    """Блок выводов: заголовок и список пар с коэффициентами (из *total* пар класса)."""
+    items = "".join(f"<li><strong>{a}</strong> и <strong>{b}</strong>: r = {val:.2f}</li>" for a, b, val in pairs)
+    if total > len(pairs):
+        items += f"<li class='text-muted'>… и ещё {total - len(pairs)}</li>"
+    return f"<div class='list-group-item list-group-item-{css}'><h6>{title}:</h6><ul class='mb-0'>{items}</ul></div>"
 
-def analyze_correlations(df: pd.DataFrame) -> str:
+
+def analyze_correlations(df: pd.DataFrame, correlation: CorrelationResult | None = None) -> str:
     """
     Проводит анализ значений корреляции и выделяет:
     - Сильную положительную (> 0.8)
     - Сильную отрицательную (< -0.5)
     - Слабую (< 0.2)
+    Пары уже упорядочены в *correlation* (generators.correlation): списки
+    начинаются с самых сильных (для слабой связи — с самых слабых) пар.
+    Слабых пар показывается не больше WEAK_PAIRS_SHOWN, сильных — все, а у
+    широкой таблицы не больше STRONG_PAIRS_SHOWN; число остальных пар
+    класса выводится отдельной строкой.
     """
     # Проверка на пустой или малый DataFrame
     if df.empty or df.shape[1] < 2:
@@ -78,20 +127,11 @@ def analyze_correlations(df: pd.DataFrame) -> str:
         </div>
         """
 
-    corr = df.corr(numeric_only=True)
-    high_corr_pairs, negative_corr_pairs, low_corr_pairs = [], [], []
-
-    # Проходим по всем уникальным парам
-    for i in range(len(corr.columns)):
-        for j in range(i + 1, len(corr.columns)):
-            a, b = corr.columns[i], corr.columns[j]
-            val = corr.iloc[i, j]
-            if val < -0.5:
-                negative_corr_pairs.append((a, b, val))
-            elif val > 0.8:
-                high_corr_pairs.append((a, b, val))
-            elif abs(val) < 0.2:
-                low_corr_pairs.append((a, b, val))
+    correlation = _correlation_or_compute(df, correlation)
+    strong_limit = STRONG_PAIRS_SHOWN if correlation.matrix is None else None
+    high_corr_pairs = correlation.strong_positive(limit=strong_limit)
+    negative_corr_pairs = correlation.strong_negative(limit=strong_limit)
+    low_corr_pairs = correlation.weak(limit=WEAK_PAIRS_SHOWN)
 
     # Формируем HTML-блоки
     html = """
@@ -102,22 +142,16 @@ def analyze_correlations(df: pd.DataFrame) -> str:
 
     # Добавляем списки в зависимости от наличия корреляций
     if high_corr_pairs:
-        html += "<div class='list-group-item list-group-item-success'><h6>Сильная положительная корреляция:</h6><ul class='mb-0'>"
-        for a, b, val in high_corr_pairs:
-            html += f"<li><strong>{a}</strong> и <strong>{b}</strong>: r = {val:.2f}</li>"
-        html += "</ul></div>"
+        html += _pairs_html("success", "Сильная положительная корреляция", high_corr_pairs,
+                            correlation.totals["positive"])
 
     if negative_corr_pairs:
-        html += "<div class='list-group-item list-group-item-danger'><h6>Сильная отрицательная корреляция:</h6><ul class='mb-0'>"
-        for a, b, val in negative_corr_pairs:
-            html += f"<li><strong>{a}</strong> и <strong>{b}</strong>: r = {val:.2f}</li>"
-        html += "</ul></div>"
+        html += _pairs_html("danger", "Сильная отрицательная корреляция", negative_corr_pairs,
+                            correlation.totals["negative"])
 
     if low_corr_pairs:
-        html += "<div class='list-group-item list-group-item-warning'><h6>Слабая или отсутствующая корреляция:</h6><ul class='mb-0'>"
-        for a, b, val in low_corr_pairs[:5]:  # максимум 5
-            html += f"<li><strong>{a}</strong> и <strong>{b}</strong>: r = {val:.2f}</li>"
-        html += "</ul></div>"
+        html += _pairs_html("warning", "Слабая или отсутствующая корреляция", low_corr_pairs,
+                            correlation.totals["weak"])
 
     if not (high_corr_pairs or negative_corr_pairs or low_corr_pairs):
         html += "<div class='list-group-item list-group-item-secondary'><em>Значимых корреляций не обнаружено.</em></div>"
@@ -127,25 +161,48 @@ def analyze_correlations(df: pd.DataFrame) -> str:
 
 
 
-def save_correlation_report(html: str, output_dir: str = "data/variant2") -> str:
-    """Сохраняет HTML-отчёт в файл с уникальным именем."""
+def save_correlation_report(
+    html: str,
+    output_dir: str = "data/variant2",
+    tag: str | None = None,
+) -> str:
+    """Сохраняет HTML-отчёт в файл с уникальным именем.
+
+    Необязательный *tag* (например, короткий отпечаток набора данных)
+    добавляется к имени файла.
+    """
     os.makedirs(output_dir, exist_ok=True)                           # Создаём папку, если не существует
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")             # Текущая дата и время
-    filename = f"correlation_report_{timestamp}.html"
+    suffix = f"_{tag}" if tag else ""
+    filename = f"correlation_report_{timestamp}{suffix}.html"
     filepath = os.path.join(output_dir, filename)
 
-    with open(filepath, "w", encoding="utf-8") as f:
+    html = IMAGES.inline(html)                                       # Файл должен открываться без сервера
+    with phase("disk_save"), open(filepath, "w", encoding="utf-8") as f:
         f.write(html)                                                # Сохраняем HTML в файл
 
     return filepath
 
 
 
-def build_correlation_html(df: pd.DataFrame) -> str:
+def build_correlation_sections(df: pd.DataFrame, summary: NumericSummary | None = None) -> str:
+    """Таблица, тепловая карта и выводы по одной общей корреляционной матрице."""
+    summary = summary if summary is not None else NumericSummary(df)
+    correlation = summary.correlation
+    numeric = summary.numeric
+    matrix = shown_matrix(correlation)  # Подматрица широкой таблицы считается один раз
+    return f"""
+                {build_correlation_table(numeric, correlation, matrix)}
+                <hr class="my-4">
+                {build_correlation_heatmap(numeric, correlation, matrix)}
+                <hr class="my-4">
+                {analyze_correlations(numeric, correlation)}
+    """
+
+
+def build_correlation_html(df: pd.DataFrame, summary: NumericSummary | None = None) -> str:
     """Объединяет таблицу, тепловую карту и выводы в единый HTML-отчёт."""
-    table_html = build_correlation_table(df)
-    heatmap_html = build_correlation_heatmap(df)
-    analysis_html = analyze_correlations(df)
+    sections_html = build_correlation_sections(df, summary)
 
     return f"""
         <!DOCTYPE html>
@@ -163,11 +220,7 @@ def build_correlation_html(df: pd.DataFrame) -> str:
         <body>
             <div class="container">
                 <h2 class="mb-4">Correlation Analysis Report</h2>
-                {table_html}
-                <hr class="my-4">
-                {heatmap_html}
-                <hr class="my-4">
-                {analysis_html}
+                {sections_html}
             </div>
         </body>
         </html>
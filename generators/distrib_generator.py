@@ -1,101 +1,244 @@
 from __future__ import annotations  # Позволяет использовать типы в аннотациях (например, pd.DataFrame)
-import base64  
-import io
 import os     
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt  # Построение графиков
-import seaborn as sns          # Улучшенная визуализация графиков
+from generators.rendering import FigureTemplate, figure_template, new_figure  # Шаблоны фигур без pyplot
 from scipy import stats        # Статистические функции
+from generators.parallel import render_pool  # Отрисовка по столбцам в пуле процессов
+from generators.chart_data import compact, compact_list  # Сводки для браузерного режима
+from utils.metrics import phase                # Замер фаз для /metrics
+from generators.summary import NumericSummary  # Общие статистики столбцов
+from generators.streaming import StreamingSummary  # Сводка таблицы, читаемой по частям
+from generators.kde import compute_kde          # KDE по выборке потоковой сводки
+from generators.normality import TEST_TITLES    # Названия тестов нормальности
 
-def _fig_to_base64(fig: plt.Figure) -> str:
+KDE_POINTS = 128  # Точек кривой KDE в сводке для браузера
+KDE_GRID = 200    # Точек кривой KDE на картинке (как gridsize у seaborn)
+DIST_FIGSIZE = (10, 6)
+
+def _distribution_template() -> FigureTemplate:
+    """
+    Шаблон карточки распределения: гистограмма, линия KDE, среднее и
+    теоретическая нормальная кривая. Строится один раз на поток.
+    """
+    fig = new_figure(figsize=DIST_FIGSIZE)
+    fig.subplots_adjust(left=0.09, right=0.98, bottom=0.1, top=0.93)
+    ax = fig.add_subplot()
+    bars = ax.stairs([0.0], [0.0, 1.0], fill=True, alpha=0.6, label='Распределение данных')
+    kde, = ax.plot([], [], color='C0', lw=1.5)
+    mean = ax.axvline(0.0, color='r', linestyle='--', label='Среднее')
+    normal, = ax.plot([], [], 'r-', lw=2, label='Нормальное распределение')
+    ax.set_ylabel('Плотность')
+    return FigureTemplate(fig, ax, bars=bars, kde=kde, mean=mean, normal=normal)
+
+def _render_distribution(col, span: tuple, histogram: tuple, curve: tuple | None,
+                         normal_fit: tuple | None) -> str:
     """
-    Преобразует график matplotlib в строку в формате base64.
-    Это позволяет вставить изображение прямо в HTML-документ.
+    Строит гистограмму с KDE для одного столбца и возвращает URL картинки.
+    *span* = (минимум, максимум) столбца, *histogram* = (плотности, границы
+    корзин) из NumericSummary.histograms, *curve* = (x, y) кривой KDE из
+    NumericSummary.kde или None.
+    Если передан *normal_fit* = (среднее, ст. отклонение), добавляет
+    теоретическую кривую нормального распределения. Функция уровня модуля:
+    выполняется и в процессах пула (см. generators.parallel).
     """
-    buf = io.BytesIO()               # Создаем буфер в памяти
-    fig.savefig(buf, format='png', bbox_inches='tight')  # Сохраняем график как PNG
-    buf.seek(0)                      # Возвращаем указатель на начало буфера
-    return base64.b64encode(buf.read()).decode('ascii')  # Кодируем в base64 и возвращаем строку
+    # Рисуем в шаблоне текущего потока: меняются только данные художников
+    with phase('render'):
+        template = figure_template(('distribution', DIST_FIGSIZE), _distribution_template)
+        ax, artists = template.ax, template.artists
+        artists['bars'].set_data(*histogram)
+        artists['kde'].set_visible(curve is not None)
+        if curve is not None:
+            artists['kde'].set_data(*curve)
 
-def analyze_distributions(df: pd.DataFrame) -> dict:
+        # Если распределение нормальное, показываем среднее и теоретическую кривую
+        handles = [artists['bars']]
+        for name in ('mean', 'normal'):
+            artists[name].set_visible(normal_fit is not None)
+        if normal_fit is not None:
+            mean, std = normal_fit
+            artists['mean'].set_xdata([mean, mean])
+            x = np.linspace(*span, 100)
+            artists['normal'].set_data(x, stats.norm.pdf(x, mean, std))
+            handles += [artists['mean'], artists['normal']]
+
+        template.autoscale()
+        ax.set_title(f'Распределение {col}')
+        ax.set_xlabel(col)
+        ax.legend(handles=handles, loc='upper right')
+
+    # Сохраняем PNG в хранилище картинок и получаем его URL
+    return template.store()
+
+def _column_stats(col_summary: dict, normality: dict) -> dict:
+    """
+    Статистики карточки одного столбца: моменты, тест нормальности, выбросы.
+    Моменты и число выбросов берутся из *col_summary* (строка NumericSummary),
+    результат теста нормальности — из *normality* (строка NumericSummary.normality).
+    """
+    # Основные статистики уже посчитаны сразу по всем столбцам
+    stats_dict = {
+        'mean': col_summary['mean'],
+        'median': col_summary['median'],
+        'std': col_summary['std'],
+        'skewness': col_summary['skewness'],   # Асимметрия
+        'kurtosis': col_summary['kurtosis'],   # Эксцесс
+    }
+
+    # Тест нормальности выбран по длине столбца (generators.normality):
+    # is_normal — p > 0.05, нет оснований отвергать гипотезу о нормальности
+    stats_dict.update(normality)
+
+    # Выбросы через межквартильный размах (IQR) тоже посчитаны в сводке
+    stats_dict['outliers_count'] = col_summary['outliers_count']
+    stats_dict['outliers_percent'] = col_summary['outliers_percent']
+
+    return stats_dict
+
+def analyze_distributions(df: pd.DataFrame, summary: NumericSummary | None = None) -> dict:
     """
     Для каждого числового столбца рассчитывает статистики и строит гистограмму с KDE.
     Возвращает словарь, где ключ — имя столбца, значение — словарь со статистикой и изображением.
+    Моменты и квартили берутся из *summary* (общей для всех разделов отчёта сводки).
     """
     results = {}  # Хранилище результатов анализа
+    tasks = []    # Аргументы отрисовки картинок по столбцам
+    summary = summary if summary is not None else NumericSummary(df)
 
     # Перебираем только числовые столбцы
-    for col in df.select_dtypes(include=['number']).columns:
-        col_data = df[col].dropna()  # Удаляем пропуски
+    for col in summary.columns:
+        col_data = summary.numeric[col].dropna()  # Удаляем пропуски
 
         if len(col_data) < 2:  # Пропускаем слишком маленькие выборки
             continue
 
-        # Вычисляем основные статистики
-        stats_dict = {
-            'mean': col_data.mean(),
-            'median': col_data.median(),
-            'std': col_data.std(),
-            'skewness': col_data.skew(),         # Асимметрия
-            'kurtosis': col_data.kurtosis(),     # Эксцесс
-            # Тест Шапиро-Уилка на нормальность (только если данных не больше 5000)
-            'shapiro_p': stats.shapiro(col_data)[1] if len(col_data) <= 5000 else None
-        }
-
-        # Определяем, является ли распределение нормальным по тесту Шапиро
-        is_normal = False
-        if stats_dict['shapiro_p'] is not None:
-            is_normal = stats_dict['shapiro_p'] > 0.05  # p > 0.05 → нет оснований отвергать нулевую гипотезу о нормальности
-
-        # Добавляем признак нормальности
-        stats_dict['is_normal'] = is_normal
-
-        # Определение выбросов через межквартильный размах (IQR)
-        q1 = col_data.quantile(0.25)
-        q3 = col_data.quantile(0.75)
-        iqr = q3 - q1
-        outliers = col_data[(col_data < (q1 - 1.5 * iqr)) | (col_data > (q3 + 1.5 * iqr))]
-        stats_dict['outliers_count'] = len(outliers)
-        stats_dict['outliers_percent'] = len(outliers) / len(col_data) * 100
-
-        # Строим график
-        plt.figure(figsize=(10, 6))
-        sns.histplot(col_data, kde=True, stat='density', label='Распределение данных')
-
-        plt.title(f'Распределение {col}')
-
-        # Если распределение нормальное, рисуем теоретическую кривую нормального распределения
-        if is_normal:
-            plt.axvline(stats_dict['mean'], color='r', linestyle='--', label='Среднее')
-            x = np.linspace(col_data.min(), col_data.max(), 100)
-            plt.plot(x, stats.norm.pdf(x, stats_dict['mean'], stats_dict['std']), 'r-', lw=2, label='Нормальное распределение')
-            plt.legend()
-        else:
-            plt.legend()
-
-        # Конвертируем график в base64
-        plot_b64 = _fig_to_base64(plt.gcf())
-        plt.close()  # Закрываем текущий график, чтобы не мешал следующим построениям
-
-        # Сохраняем данные по столбцу
-        results[col] = {'stats': stats_dict, 'plot': plot_b64}
+        col_summary = summary.column(col)
+        stats_dict = _column_stats(col_summary, summary.normality.column(col))
+
+        # Сохраняем данные по столбцу; картинки строятся ниже, все сразу
+        results[col] = {'stats': stats_dict, 'plot': None}
+        histogram = summary.histograms.column(col, density=True)
+        curve = summary.kde.curve(col, KDE_GRID)
+        tasks.append((col, (col_summary['min'], col_summary['max']), histogram, curve, _normal_fit(stats_dict)))
+
+    return _render_results(results, tasks)
 
+def analyze_distribution_stream(stream: StreamingSummary) -> dict:
+    """
+    То же, что analyze_distributions, но по потоковой сводке (generators.streaming):
+    таблица читается по частям и целиком в памяти не нужна. Для столбцов
+    длиннее выборки сводки квантили, выбросы и гистограмма приближённые
+    (границы ошибки — в StreamingSummary.column), а кривая KDE строится по
+    равномерной выборке столбца.
+    """
+    results = {}
+    tasks = []
+    for col in stream.columns or ():
+        col_summary = stream.column(col)
+        if col_summary['count'] < 2:  # Те же правила пропуска, что и в analyze_distributions
+            continue
+
+        stats_dict = stream.distribution_stats(col, col_summary)
+        results[col] = {'stats': stats_dict, 'plot': None}
+        histogram = stream.histogram(col, density=True, column=col_summary)
+        curve = compute_kde(stream.sample_frame(col)).curve(col, KDE_GRID)
+        tasks.append((col, (col_summary['min'], col_summary['max']), histogram, curve, _normal_fit(stats_dict)))
+
+    return _render_results(results, tasks)
+
+def _normal_fit(stats_dict: dict) -> tuple | None:
+    """(среднее, ст. отклонение) для теоретической кривой, если распределение нормальное."""
+    return (stats_dict['mean'], stats_dict['std']) if stats_dict['is_normal'] else None
+
+def _render_results(results: dict, tasks: list) -> dict:
+    """Строит графики: по столбцу на задачу, параллельно при большом числе столбцов."""
+    for (col, *_), plot_url in zip(tasks, render_pool().map(_render_distribution, tasks)):
+        results[col]['plot'] = plot_url
     return results
 
-def generate_distribution_html(df: pd.DataFrame) -> str:
+def build_distribution_data(df: pd.DataFrame, summary: NumericSummary | None = None) -> dict:
+    """
+    Сводка распределений для отрисовки в браузере (режим render=client).
+    Для каждого столбца: границы и плотности корзин гистограммы, точки KDE,
+    при нормальном распределении — точки теоретической кривой, и таблица
+    статистик в HTML. Формат ``chart`` описан в static/scripts/charts.js.
+    """
+    items = []
+    summary = summary if summary is not None else NumericSummary(df)
+
+    for col in summary.columns:
+        col_data = summary.numeric[col].dropna()
+        if len(col_data) < 2:  # Те же правила пропуска, что и в analyze_distributions
+            continue
+
+        stats_dict = _column_stats(summary.column(col), summary.normality.column(col))
+        values = col_data.to_numpy(dtype=float)
+        with phase('statistics'):
+            heights, edges = summary.histograms.column(col, density=True)
+            x = np.linspace(values.min(), values.max(), KDE_POINTS)
+            curves = []
+            curve = summary.kde.curve(col, KDE_POINTS)
+            if curve is not None:  # Постоянный столбец: ядерная оценка вырождена
+                curves.append({'label': 'KDE', 'x': compact_list(curve[0]), 'y': compact_list(curve[1])})
+            if stats_dict['is_normal']:
+                curves.append({'label': 'Нормальное распределение', 'color': 'red', 'x': compact_list(x),
+                               'y': compact_list(stats.norm.pdf(x, stats_dict['mean'], stats_dict['std']))})
+
+        items.append({
+            'title': f'Столбец: {col}',
+            'chart': {
+                'type': 'hist', 'edges': compact_list(edges), 'heights': compact_list(heights),
+                'curves': curves, 'mean': compact(stats_dict['mean']) if stats_dict['is_normal'] else None,
+                'xlabel': str(col), 'ylabel': 'Плотность',
+            },
+            'stats_html': _stats_table_html(stats_dict),
+        })
+
+    return {'title': 'Анализ распределений', 'items': items}
+
+def generate_distribution_html(df: pd.DataFrame, summary: NumericSummary | None = None) -> str:
     """
     Генерирует HTML-страницу с анализом распределений числовых столбцов.
     """
-    analysis = analyze_distributions(df)
+    return render_distribution_html(analyze_distributions(df, summary))
 
+def _stats_table_html(stats: dict) -> str:
+    """
+    Таблица статистик карточки столбца (общая для PNG- и браузерного режима).
+    """
+    return f"""<table class='table table-bordered'>
+                            <tr><th>Характеристика</th><th>Значение</th></tr>
+                            <tr><td>Среднее</td><td>{stats['mean']:.4f}</td></tr>
+                            <tr><td>Медиана</td><td>{stats['median']:.4f}</td></tr>
+                            <tr><td>Станд. отклонение</td><td>{stats['std']:.4f}</td></tr>
+                            <tr><td>Асимметрия</td><td>{stats['skewness']:.4f}</td></tr>
+                            <tr><td>Эксцесс</td><td>{stats['kurtosis']:.4f}</td></tr>
+                            <tr><td>Нормальное распределение?</td>
+                                <td>{'Да' if stats['is_normal'] else 'Нет'}</td></tr>
+                            <tr><td>Тест нормальности</td><td>{_normality_text(stats)}</td></tr>
+                            <tr><td>Количество выбросов</td><td>{stats['outliers_count']}</td></tr>
+                            <tr><td>Процент выбросов</td><td>{stats['outliers_percent']:.2f}%</td></tr>
+                        </table>"""
+
+def _normality_text(stats: dict) -> str:
+    """
+    Название теста нормальности, p-value и время теста для таблицы статистик.
+    """
+    if stats['normality_p'] is None:
+        return 'не выполнялся'
+    return (f"{TEST_TITLES[stats['normality_test']]}: p = {stats['normality_p']:.4g} "
+            f"({stats['normality_seconds'] * 1000:.1f} мс)")
+
+def render_distribution_html(analysis: dict) -> str:
+    """
+    Собирает HTML-карточки из результата analyze_distributions.
+    """
     # Если нет числовых столбцов, выводим предупреждение
     if not analysis:
         return "<div class='alert alert-warning'>Нет числовых столбцов для анализа</div>"
 
     html_parts = []  # Список HTML-частей для объединения в финальный документ
     for col, data in analysis.items():
-        stats = data['stats']
         # Формируем HTML-карточку для каждого столбца
         stats_html = f"""
         <div class='card mb-4'>
@@ -105,21 +248,10 @@ def generate_distribution_html(df: pd.DataFrame) -> str:
             <div class='card-body'>
                 <div class='row'>
                     <div class='col-md-6'>
-                        <img class='img-fluid' src='data:image/png;base64,{data["plot"]}'>
+                        <img class='img-fluid' src='{data["plot"]}'>
                     </div>
                     <div class='col-md-6'>
-                        <table class='table table-bordered'>
-                            <tr><th>Характеристика</th><th>Значение</th></tr>
-                            <tr><td>Среднее</td><td>{stats['mean']:.4f}</td></tr>
-                            <tr><td>Медиана</td><td>{stats['median']:.4f}</td></tr>
-                            <tr><td>Станд. отклонение</td><td>{stats['std']:.4f}</td></tr>
-                            <tr><td>Асимметрия</td><td>{stats['skewness']:.4f}</td></tr>
-                            <tr><td>Эксцесс</td><td>{stats['kurtosis']:.4f}</td></tr>
-                            <tr><td>Нормальное распределение?</td>
-                                <td>{'Да' if stats['is_normal'] else 'Нет'}</td></tr>
-                            <tr><td>Количество выбросов</td><td>{stats['outliers_count']}</td></tr>
-                            <tr><td>Процент выбросов</td><td>{stats['outliers_percent']:.2f}%</td></tr>
-                        </table>
+                        {_stats_table_html(data['stats'])}
                     </div>
                 </div>
             </div>
@@ -0,0 +1,222 @@
+"""
+Гистограммы сразу всех числовых столбцов таблицы.
+
+:func:`compute_histograms` считает границы и высоты корзин для всех
+столбцов одним векторизованным проходом по данным вместо отдельного
+``np.histogram`` (или ``seaborn.histplot``) на каждый столбец:
+
+1. экстремумы всех столбцов считаются сразу по матрице, а квартили
+   (для правил ``"auto"`` и ``"fd"``) — одним ``np.partition``
+   (:func:`generators.column_stats.column_quantiles`);
+2. ширина корзины выбирается правилом для каждого столбца отдельно:
+
+   * ``"fd"`` (Фридман — Диаконис): ``2·IQR·n^(-1/3)``;
+   * ``"sturges"``: ``ptp / (log2(n) + 1)``;
+   * ``"auto"``: ``min(max(fd, sqrt / 2), sturges)``, где
+     ``sqrt = ptp / √n`` — то же правило, что у ``np.histogram(bins="auto")``
+     в NumPy 2.x; нижняя граница ``sqrt / 2`` не даёт столбцу с выбросами
+     и почти нулевым IQR получить миллионы корзин;
+   * целое число — одинаковое число корзин у всех столбцов;
+
+3. номера корзин всех значений вычисляются одной формулой по всей
+   матрице, а высоты — одним ``np.bincount`` по общему плоскому массиву.
+
+Результат совпадает с ``np.histogram`` для каждого столбца (включая
+правую границу последней корзины и поправку на ошибку округления у
+границ). Пропуски (NaN) не учитываются. Веса строк (``weights``)
+суммируются вместо единиц; правило ширины корзины при этом считается по
+невзвешенным данным (NumPy автоматический выбор с весами не поддерживает).
+
+Все корзины хранятся в общих плоских массивах (:class:`Histograms`):
+такую сводку дёшево передать в процессы пула и отдать в браузер.
+"""
+
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Hashable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from generators.column_stats import column_positions, column_quantiles
+
+__all__ = ["BIN_RULES", "Histograms", "bin_counts", "compute_histograms"]
+
+#: Правила выбора ширины корзины (см. описание модуля).
+BIN_RULES = ("auto", "fd", "sturges")
+
+Bins = Union[str, int]
+
+
+@dataclass(frozen=True)
+class Histograms:
+    """Гистограммы нескольких столбцов в общих плоских массивах.
+
+    Attributes:
+        columns: Имена столбцов.
+        edges: Границы корзин всех столбцов подряд (у столбца *k* их
+            ``bins(k) + 1``).
+        counts: Высоты корзин всех столбцов подряд (число значений или
+            сумма весов).
+        offsets: Начало корзин столбца *k* в ``counts`` — ``offsets[k]``;
+            последний элемент равен общему числу корзин.
+        totals: Число значений (сумма весов) по каждому столбцу.
+    """
+
+    columns: Tuple[Hashable, ...]
+    edges: np.ndarray
+    counts: np.ndarray
+    offsets: np.ndarray
+    totals: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def bins(self, k: int) -> int:
+        """Число корзин столбца с номером *k*."""
+        return int(self.offsets[k + 1] - self.offsets[k])
+
+    @cached_property
+    def _positions(self) -> Dict[Hashable, int]:
+        return column_positions(self.columns)
+
+    def position(self, col: Hashable) -> int:
+        """Номер столбца *col*."""
+        return self._positions[col]
+
+    def column(self, col: Hashable, density: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Высоты и границы корзин столбца *col* (как у ``np.histogram``).
+
+        Args:
+            col: Имя столбца.
+            density: Нормировать высоты так, чтобы площадь гистограммы была 1.
+        """
+        k = self.position(col)
+        start, stop = self.offsets[k], self.offsets[k + 1]
+        counts = self.counts[start:stop]
+        edges = self.edges[start + k:stop + k + 1]
+        if density:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                counts = counts / np.diff(edges) / self.totals[k]
+        return counts, edges
+
+
+def bin_counts(
+    rule: Bins, n: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+    q25: np.ndarray, q75: np.ndarray, integer: np.ndarray,
+) -> np.ndarray:
+    """Число корзин каждого столбца по правилу *rule*.
+
+    Args:
+        rule: Правило из :data:`BIN_RULES` или число корзин.
+        n: Число значений; lo, hi — экстремумы; q25, q75 — квартили.
+        integer: Признак целочисленного столбца (корзина не уже единицы).
+    """
+    if not isinstance(rule, str):
+        if int(rule) < 1:
+            raise ValueError("Число корзин должно быть положительным")
+        return np.full(n.shape, int(rule), dtype=np.intp)
+    if rule not in BIN_RULES:
+        raise ValueError(f"Неизвестное правило корзин: {rule!r}")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ptp = hi - lo
+        fd = 2.0 * (q75 - q25) * n ** (-1.0 / 3.0)
+        sturges = ptp / (np.log2(n) + 1.0)
+        width = {
+            "fd": fd,
+            "sturges": sturges,
+            "auto": np.minimum(np.maximum(fd, ptp / np.sqrt(n) / 2), sturges),
+        }[rule]
+        # Целочисленные столбцы: корзина не уже единицы (как в NumPy)
+        width = np.where(integer & (width > 0) & (width < 1), 1.0, width)
+        span = np.where(lo == hi, 1.0, ptp)  # у постоянного столбца диапазон [x-0.5, x+0.5]
+        bins = np.where(width > 0, np.ceil(span / width), 1)
+    return np.where(n > 0, bins, 1).astype(np.intp)
+
+
+def compute_histograms(
+    data: pd.DataFrame,
+    bins: Bins = "auto",
+    weights: Optional[Sequence[float]] = None,
+) -> Histograms:
+    """Гистограммы всех столбцов *data* одним проходом.
+
+    Args:
+        data: Таблица числовых столбцов (NaN — пропуски).
+        bins: Правило ширины корзины (``"auto"``, ``"fd"``, ``"sturges"``)
+            или число корзин.
+        weights: Веса строк (длина — число строк); ``None`` — единичные.
+
+    Raises:
+        ValueError: Для неизвестного правила или нечисловых/бесконечных данных.
+    """
+    values = data.to_numpy(dtype=float, na_value=np.nan)
+    if np.isinf(values).any():
+        raise ValueError("Бесконечные значения не могут попасть в гистограмму")
+    rows, ncols = values.shape
+    mask = ~np.isnan(values)
+    n = mask.sum(axis=0)
+    integer = np.array([pd.api.types.is_integer_dtype(dtype) for dtype in data.dtypes], dtype=bool)
+
+    data_lo = data_hi = q25 = q75 = np.zeros(ncols)
+    if n.any():
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # пустые столбцы: All-NaN slice
+            data_lo, data_hi = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+        if isinstance(bins, str) and bins != "sturges":
+            q25, q75 = column_quantiles(values, n, (0.25, 0.75))
+    nbins = bin_counts(bins, n, data_lo, data_hi, q25, q75, integer)
+
+    # Внешние границы как в np.histogram: пустой столбец — [0, 1],
+    # постоянный — [x - 0.5, x + 0.5]
+    lo = np.where(n > 0, data_lo, 0.0)
+    hi = np.where(n > 0, data_hi, 1.0)
+    same = lo == hi
+    lo, hi = np.where(same, lo - 0.5, lo), np.where(same, hi + 0.5, hi)
+
+    offsets = np.concatenate(([0], np.cumsum(nbins)))
+    edges = np.concatenate([np.linspace(lo[k], hi[k], nbins[k] + 1) for k in range(ncols)]) \
+        if ncols else np.zeros(0)
+    edge_start = offsets[:-1] + np.arange(ncols)
+
+    # Номер корзины каждого значения — сразу для всей матрицы
+    complete = bool(n.min(initial=rows) == rows)  # пропусков нет: маска не нужна
+    with np.errstate(invalid="ignore"):
+        scaled = values - lo
+        scaled *= nbins / (hi - lo)
+    if not complete:
+        scaled[~mask] = 0.0
+    index = scaled.astype(np.intp)
+    np.minimum(index, nbins - 1, out=index)
+    # Поправка на округление у границ: корзина k — [edges[k], edges[k+1])
+    index += edge_start
+    below = values < edges[index]
+    index[below] -= 1
+    above = (values >= edges[index + 1]) & (index != edge_start + nbins - 1)
+    index[above] += 1
+    index -= np.arange(ncols)  # номер в общем массиве высот
+
+    flat = index.ravel() if complete else index[mask]
+    if weights is None:
+        counts = np.bincount(flat, minlength=offsets[-1])
+        totals = n.astype(float)
+    else:
+        row_weights = np.asarray(weights, dtype=float)
+        if row_weights.shape != (rows,):
+            raise ValueError("Длина weights должна совпадать с числом строк")
+        weight_matrix = np.broadcast_to(row_weights[:, None], values.shape)
+        flat_weights = weight_matrix.ravel() if complete else weight_matrix[mask]
+        counts = np.bincount(flat, weights=flat_weights, minlength=offsets[-1])
+        totals = np.where(mask, weight_matrix, 0.0).sum(axis=0)
+
+    return Histograms(
+        columns=tuple(data.columns),
+        edges=edges,
+        counts=counts,
+        offsets=offsets,
+        totals=totals,
+    )
@@ -0,0 +1,368 @@
+"""
+Проверка нормальности сразу всех числовых столбцов таблицы.
+
+Тест Шапиро — Уилка (``scipy.stats.shapiro``) даёт точный p-value только
+до 5000 значений, поэтому раньше длинные столбцы не проверялись вовсе и
+всегда считались ненормальными. :func:`check_normality` выбирает тест по
+длине столбца (:func:`choose_test`):
+
+* до :data:`SHAPIRO_MAX_N` значений — Шапиро — Уилка, как и раньше;
+* до :data:`ANDERSON_MAX_N` — Андерсона — Дарлинга с оценёнными средним и
+  дисперсией (p-value — аппроксимация Стивенса по статистике A*);
+* длиннее — K² Д'Агостино: z-оценки асимметрии и эксцесса, которые уже
+  посчитаны в :class:`~generators.column_stats.ColumnStats`, так что тест
+  не требует нового прохода по данным.
+
+Переменная окружения ``NORMALITY_TEST`` задаёт тест явно: ``shapiro``,
+``dagostino``, ``anderson``, ``jarque_bera`` (Харке — Бера, тоже по
+моментам) или ``shapiro_subsample`` — медиана p-value теста Шапиро — Уилка
+на :data:`SUBSAMPLE_DRAWS` случайных подвыборках по 5000 значений
+(генератор инициализируется постоянным зерном, результат воспроизводим).
+Если для выбранного теста столбец слишком короткий, используется
+Шапиро — Уилк; Шапиро — Уилк для длинного столбца заменяется подвыборками.
+
+Тесты по моментам и Андерсона — Дарлинга считаются одной операцией над
+всеми столбцами группы; Шапиро — Уилк — по столбцу. Для каждого столбца
+сохраняется имя теста и время: у векторных тестов — доля времени группы.
+В словарь столбца (:meth:`NormalityTests.column`) время не входит, чтобы
+отчёт по одной и той же таблице не менялся от запуска к запуску.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import special, stats
+
+from generators.column_stats import ColumnStats, column_positions, compute_column_stats
+
+__all__ = [
+    "ALPHA",
+    "ANDERSON_MAX_N",
+    "NORMALITY_METHODS",
+    "SHAPIRO_MAX_N",
+    "SUBSAMPLE_DRAWS",
+    "TEST_TITLES",
+    "NormalityTests",
+    "anderson_darling",
+    "check_normality",
+    "check_sample",
+    "choose_test",
+    "moment_test",
+    "shapiro_subsample",
+]
+
+#: Уровень значимости: при p > ALPHA распределение считается нормальным.
+ALPHA = 0.05
+#: Наибольшая длина столбца для теста Шапиро — Уилка (предел точности scipy).
+SHAPIRO_MAX_N = 5000
+#: Наибольшая длина столбца для теста Андерсона — Дарлинга в режиме auto.
+ANDERSON_MAX_N = 50_000
+#: Число подвыборок теста ``shapiro_subsample``.
+SUBSAMPLE_DRAWS = 5
+#: Постоянное зерно подвыборок: отчёт по той же таблице не меняется.
+SUBSAMPLE_SEED = 0
+
+#: Названия тестов для таблицы статистик.
+TEST_TITLES = {
+    "shapiro": "Шапиро — Уилка",
+    "anderson": "Андерсона — Дарлинга",
+    "dagostino": "K² Д'Агостино",
+    "jarque_bera": "Харке — Бера",
+    "shapiro_subsample": "Шапиро — Уилка по подвыборкам",
+}
+#: Допустимые значения ``NORMALITY_TEST``.
+NORMALITY_METHODS = ("auto", *TEST_TITLES)
+
+# Наименьшая длина столбца, с которой тест применим
+_MIN_N = {"shapiro": 3, "anderson": 8, "dagostino": 20, "jarque_bera": 20, "shapiro_subsample": 3}
+_MOMENT_TESTS = ("dagostino", "jarque_bera")
+
+NORMALITY_TEST = os.environ.get("NORMALITY_TEST", "auto").lower()
+
+
+def choose_test(n: int, method: Optional[str] = None) -> Optional[str]:
+    """Тест нормальности для столбца из *n* значений.
+
+    Args:
+        n: Число значений (без пропусков).
+        method: ``auto`` или имя теста; по умолчанию — ``NORMALITY_TEST``.
+
+    Returns:
+        Имя теста или ``None``, если значений меньше трёх.
+    """
+    method = method or NORMALITY_TEST
+    if method not in NORMALITY_METHODS:
+        method = "auto"
+    if n < _MIN_N["shapiro"]:
+        return None
+    if method == "auto":
+        if n <= SHAPIRO_MAX_N:
+            return "shapiro"
+        return "anderson" if n <= ANDERSON_MAX_N else "dagostino"
+    if n < _MIN_N[method]:
+        return "shapiro"
+    if method == "shapiro" and n > SHAPIRO_MAX_N:
+        return "shapiro_subsample"
+    return method
+
+
+# ---------------------------------------------------------------------------
+#   Тесты
+# ---------------------------------------------------------------------------
+
+def moment_test(
+    test: str, n: np.ndarray, skew: np.ndarray, kurt: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """K² Д'Агостино или Харке — Бера для нескольких столбцов сразу.
+
+    Принимает несмещённые асимметрию и эксцесс (как ``Series.skew`` и
+    ``Series.kurt``) и переводит их в выборочные g1 и b2, по которым
+    определены оба теста (формулы ``scipy.stats.normaltest`` и
+    ``scipy.stats.jarque_bera``).
+
+    Args:
+        test: ``dagostino`` или ``jarque_bera``.
+        n: Число значений каждого столбца.
+        skew, kurt: Асимметрия и эксцесс Фишера каждого столбца.
+
+    Returns:
+        Статистики и p-value (распределение χ² с двумя степенями свободы).
+    """
+    n = np.asarray(n, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        g1 = skew * (n - 2) / np.sqrt(n * (n - 1))
+        b2 = (kurt * (n - 2) * (n - 3) / (n - 1) - 6) / (n + 1) + 3
+        if test == "jarque_bera":
+            statistic = n / 6 * (g1 ** 2 + (b2 - 3) ** 2 / 4)
+        else:
+            statistic = _skew_z(g1, n) ** 2 + _kurtosis_z(b2, n) ** 2
+    return statistic, stats.chi2.sf(statistic, 2)
+
+
+def _skew_z(g1: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """z-оценка асимметрии (``scipy.stats.skewtest``)."""
+    y = g1 * np.sqrt((n + 1) * (n + 3) / (6.0 * (n - 2)))
+    beta2 = 3.0 * (n ** 2 + 27 * n - 70) * (n + 1) * (n + 3) / ((n - 2) * (n + 5) * (n + 7) * (n + 9))
+    w2 = -1 + np.sqrt(2 * (beta2 - 1))
+    delta = 1 / np.sqrt(0.5 * np.log(w2))
+    alpha = np.sqrt(2.0 / (w2 - 1))
+    y = np.where(y == 0, 1, y)
+    return delta * np.log(y / alpha + np.sqrt((y / alpha) ** 2 + 1))
+
+
+def _kurtosis_z(b2: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """z-оценка эксцесса (``scipy.stats.kurtosistest``)."""
+    mean = 3.0 * (n - 1) / (n + 1)
+    variance = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) ** 2 * (n + 3) * (n + 5))
+    x = (b2 - mean) / np.sqrt(variance)
+    root_beta1 = (6.0 * (n * n - 5 * n + 2) / ((n + 7) * (n + 9))
+                  * np.sqrt(6.0 * (n + 3) * (n + 5) / (n * (n - 2) * (n - 3))))
+    a = 6.0 + 8.0 / root_beta1 * (2.0 / root_beta1 + np.sqrt(1 + 4.0 / root_beta1 ** 2))
+    term1 = 1 - 2 / (9.0 * a)
+    denominator = 1 + x * np.sqrt(2 / (a - 4.0))
+    term2 = np.sign(denominator) * np.where(
+        denominator == 0, np.nan, ((1 - 2.0 / a) / np.abs(denominator)) ** (1 / 3.0))
+    return (term1 - term2) / np.sqrt(2 / (9.0 * a))
+
+
+def anderson_darling(values: np.ndarray, n: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Тест Андерсона — Дарлинга для всех столбцов матрицы *values*.
+
+    Среднее и дисперсия оцениваются по данным (ddof=1, как в
+    ``scipy.stats.anderson``). Столбцы сортируются одним ``np.sort``; NaN
+    уходят в конец, и суммы берутся только по первым ``n`` строкам
+    столбца. p-value — аппроксимация Стивенса (D'Agostino & Stephens,
+    1986) по статистике ``A* = A²·(1 + 0.75/n + 2.25/n²)``.
+
+    Args:
+        values: Матрица «строки × столбцы» (NaN — пропуски).
+        n: Число значений в каждом столбце.
+
+    Returns:
+        Статистики A² и p-value.
+    """
+    ordered = np.sort(values, axis=0)
+    index = np.arange(values.shape[0])[:, None]
+    valid = index < n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid, ordered, 0.0).sum(axis=0) / n
+        std = np.sqrt((np.where(valid, ordered - mean, 0.0) ** 2).sum(axis=0) / (n - 1))
+        z = (ordered - mean) / std
+        # Ранг i сочетается с (n + 1 - i)-м значением того же столбца
+        mirrored = np.take_along_axis(z, np.where(valid, n - 1 - index, 0), axis=0)
+        terms = (2 * index + 1) * (special.log_ndtr(z) + special.log_ndtr(-mirrored))
+        a2 = -n - np.where(valid, terms, 0.0).sum(axis=0) / n
+        a_star = np.minimum(a2 * (1 + 0.75 / n + 2.25 / n ** 2), 153.0)
+        p_value = np.select(
+            [a_star >= 0.6, a_star >= 0.34, a_star >= 0.2],
+            [np.exp(1.2937 - 5.709 * a_star + 0.0186 * a_star ** 2),
+             np.exp(0.9177 - 4.279 * a_star - 1.38 * a_star ** 2),
+             1 - np.exp(-8.318 + 42.796 * a_star - 59.938 * a_star ** 2)],
+            1 - np.exp(-13.436 + 101.14 * a_star - 223.73 * a_star ** 2),
+        )
+    p_value = np.where(std > 0, np.clip(p_value, 0.0, 1.0), np.nan)
+    return a2, p_value
+
+
+def shapiro_subsample(
+    values: np.ndarray, draws: int = SUBSAMPLE_DRAWS, size: int = SHAPIRO_MAX_N, seed: int = SUBSAMPLE_SEED,
+) -> Tuple[float, float]:
+    """Медианы статистики и p-value теста Шапиро — Уилка на подвыборках.
+
+    Args:
+        values: Значения столбца без пропусков.
+        draws: Число подвыборок без возвращения.
+        size: Размер подвыборки (не больше длины столбца).
+        seed: Зерно генератора подвыборок.
+    """
+    rng = np.random.default_rng(seed)
+    size = min(size, values.size)
+    results = np.array([stats.shapiro(rng.choice(values, size, replace=False)) for _ in range(draws)])
+    statistic, p_value = np.median(results, axis=0)
+    return float(statistic), float(p_value)
+
+
+# ---------------------------------------------------------------------------
+#   Все столбцы таблицы
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class NormalityTests:
+    """Результаты проверки нормальности нескольких столбцов.
+
+    Attributes:
+        columns: Имена столбцов.
+        test: Имя теста по столбцу (``None`` — столбец слишком короткий).
+        statistic: Статистика теста.
+        p_value: p-value (NaN, если тест не выполнялся или данные вырождены).
+        seconds: Время теста; у векторных тестов — доля времени группы.
+    """
+
+    columns: Tuple[Hashable, ...]
+    test: Tuple[Optional[str], ...]
+    statistic: np.ndarray
+    p_value: np.ndarray
+    seconds: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @cached_property
+    def _positions(self) -> Dict[Hashable, int]:
+        return column_positions(self.columns)
+
+    def column(self, col: Hashable) -> Dict[str, object]:
+        """Результат столбца *col* в виде словаря.
+
+        Ключи: normality_test, normality_statistic, normality_p, is_normal,
+        normality_seconds.
+        """
+        k = self._positions[col]
+        return _result(self.test[k], self.statistic[k], self.p_value[k], self.seconds[k])
+
+
+def _result(test: Optional[str], statistic: float, p_value: float, seconds: float) -> Dict[str, object]:
+    """Словарь результата одного столбца (общий для таблицы и потоковой сводки)."""
+    p_value = None if test is None or np.isnan(p_value) else float(p_value)
+    return {
+        "normality_test": test,
+        "normality_statistic": None if p_value is None else float(statistic),
+        "normality_p": p_value,
+        "is_normal": p_value is not None and p_value > ALPHA,
+        "normality_seconds": None if test is None else float(seconds),
+    }
+
+
+def check_normality(
+    data: pd.DataFrame, column_stats: Optional[ColumnStats] = None, method: Optional[str] = None,
+) -> NormalityTests:
+    """Проверить нормальность всех столбцов *data*.
+
+    Args:
+        data: Таблица числовых столбцов (NaN — пропуски).
+        column_stats: Готовые статистики столбцов (моменты для K² и
+            Харке — Бера); без них считаются заново.
+        method: ``auto`` или имя теста; по умолчанию — ``NORMALITY_TEST``.
+    """
+    column_stats = column_stats if column_stats is not None else compute_column_stats(data)
+    values = data.to_numpy(dtype=float, na_value=np.nan)
+    n = column_stats.count
+    tests = tuple(choose_test(int(count), method) for count in n)
+    statistic = np.full(len(tests), np.nan)
+    p_value = np.full(len(tests), np.nan)
+    seconds = np.zeros(len(tests))
+
+    for name in set(tests) - {None}:
+        group = np.array([k for k, test in enumerate(tests) if test == name])
+        started = time.perf_counter()
+        if name in _MOMENT_TESTS:
+            statistic[group], p_value[group] = moment_test(
+                name, n[group], column_stats.skew[group], column_stats.kurt[group])
+        elif name == "anderson":
+            statistic[group], p_value[group] = anderson_darling(values[:, group], n[group])
+        else:
+            # Шапиро — Уилк в scipy одномерный: по столбцу
+            for k in group:
+                column = values[:, k]
+                column = column[~np.isnan(column)]
+                begun = time.perf_counter()
+                if name == "shapiro":
+                    statistic[k], p_value[k] = stats.shapiro(column)
+                else:
+                    statistic[k], p_value[k] = shapiro_subsample(column)
+                seconds[k] = time.perf_counter() - begun
+            continue
+        seconds[group] = (time.perf_counter() - started) / group.size
+
+    return NormalityTests(
+        columns=tuple(data.columns),
+        test=tests,
+        statistic=statistic,
+        p_value=p_value,
+        seconds=seconds,
+    )
+
+
+def check_sample(
+    sample: np.ndarray, complete: bool, n: int, skew: float, kurt: float, method: Optional[str] = None,
+) -> Dict[str, object]:
+    """Проверка нормальности столбца, от которого есть лишь выборка и моменты.
+
+    Для таблиц, читаемых по частям (:mod:`generators.streaming`): тест
+    выбирается по полной длине *n*. Шапиро — Уилк выполняется по выборке,
+    пока она содержит весь столбец, иначе выборка служит единственной
+    подвыборкой ``shapiro_subsample``. Тест Андерсона — Дарлинга требует всех
+    значений и заменяется K² Д'Агостино по точным моментам.
+
+    Args:
+        sample: Равномерная выборка значений столбца.
+        complete: Содержит ли выборка все значения столбца.
+        n: Число значений столбца.
+        skew, kurt: Точные асимметрия и эксцесс столбца.
+        method: ``auto`` или имя теста; по умолчанию — ``NORMALITY_TEST``.
+
+    Returns:
+        Словарь с ключами :meth:`NormalityTests.column`.
+    """
+    test = choose_test(n, method)
+    if test == "shapiro" and not complete:
+        test = "shapiro_subsample"
+    elif test == "anderson":
+        test = "dagostino" if n >= _MIN_N["dagostino"] else "shapiro_subsample"
+    statistic = p_value = np.nan
+    started = time.perf_counter()
+    if test in _MOMENT_TESTS:
+        statistic, p_value = (float(value[0]) for value in moment_test(test, np.array([n]), skew, kurt))
+    elif test == "shapiro":
+        statistic, p_value = stats.shapiro(sample)
+    elif test == "shapiro_subsample":
+        draws = 1 if sample.size <= SHAPIRO_MAX_N else SUBSAMPLE_DRAWS
+        statistic, p_value = shapiro_subsample(sample, draws=draws)
+    return _result(test, statistic, p_value, time.perf_counter() - started)
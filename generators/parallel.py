@@ -0,0 +1,127 @@
+"""
+Параллельная отрисовка картинок по столбцам в пуле процессов.
+
+Гистограммы (:mod:`generators.plot_generator`) и карточки распределений
+(:mod:`generators.distrib_generator`) строятся для каждого числового
+столбца отдельно; растеризация Agg и сжатие PNG занимают почти всё время
+запроса и упираются в одно ядро (GIL). :class:`RenderPool` раздаёт такие
+задачи процессам пула:
+
+* результаты возвращаются **в порядке задач**, независимо от того, какой
+  процесс закончил первым, поэтому HTML не отличается от построенного
+  последовательно;
+* при числе задач меньше ``min_tasks``, при одном процессе и внутри
+  фоновой задачи (:mod:`utils.job_queue` сам занимает процессы) задачи
+  выполняются последовательно в текущем процессе — запуск пула и передача
+  данных дороже отрисовки пары картинок;
+* картинки, сохранённые в дочернем процессе, и замеры фаз передаются
+  родителю вместе с результатом (см. :func:`utils.image_store.collect_images`
+  и :func:`utils.metrics.collect_phases`), а политика вывода картинок
+  запроса — процессу пула (см. :mod:`utils.image_policy`).
+
+Функция задачи должна быть функцией уровня модуля, а аргументы —
+сериализоваться pickle (массивы numpy, числа, строки). Пул создаётся
+лениво при первой параллельной отрисовке и общий для всех потоков процесса.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from utils.image_policy import ImagePolicy, current_image_policy, use_image_policy
+from utils.image_store import IMAGES, collect_images
+from utils.job_queue import current_job, default_mp_context, report_progress
+from utils.metrics import collect_phases, current_route, record_phases, route_context
+from utils.settings import env_int
+
+__all__ = ["RenderPool", "install", "render_pool"]
+
+
+def _run_task(route: str, policy: ImagePolicy, func: Callable[..., Any], args: tuple) -> tuple:
+    """Выполнить задачу в процессе пула; вернуть ``(результат, фазы, картинки)``."""
+    with route_context(route), use_image_policy(policy), \
+            collect_phases() as phases, collect_images() as images:
+        value = func(*args)
+    return value, phases, images
+
+
+class RenderPool:
+    """Пул процессов для отрисовки по столбцам с последовательным запасным путём.
+
+    Args:
+        workers: Число процессов; ``1`` — всегда последовательно.
+        min_tasks: Минимальное число задач для параллельного запуска.
+    """
+
+    def __init__(self, workers: int, min_tasks: int = 8) -> None:
+        self.workers = max(1, workers)
+        self.min_tasks = max(1, min_tasks)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def parallel_for(self, n_tasks: int) -> bool:
+        """Будут ли *n_tasks* задач выполнены в пуле процессов."""
+        return self.workers > 1 and n_tasks >= self.min_tasks and current_job() is None
+
+    def map(self, func: Callable[..., Any], tasks: Sequence[Tuple[Any, ...]]) -> List[Any]:
+        """Вызвать ``func(*args)`` для каждого набора аргументов, сохранив порядок.
+
+        Ход работы передаётся в :func:`utils.job_queue.report_progress`.
+        """
+        total = len(tasks)
+        results: List[Any] = []
+        if not self.parallel_for(total):
+            for done, args in enumerate(tasks):
+                report_progress(done, total)
+                results.append(func(*args))
+            return results
+
+        route, policy = current_route(), current_image_policy()
+        executor = self._ensure_executor()
+        futures = [executor.submit(_run_task, route, policy, func, tuple(args)) for args in tasks]
+        for done, future in enumerate(futures):
+            report_progress(done, total)
+            value, phases, images = future.result()
+            record_phases(phases)
+            IMAGES.put_many(images)
+            results.append(value)
+        return results
+
+    def shutdown(self) -> None:
+        """Остановить процессы пула (следующая параллельная отрисовка создаст новый)."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=default_mp_context(),
+                )
+            return self._executor
+
+
+# ---------------------------------------------------------------------------
+#   Пул по умолчанию
+# ---------------------------------------------------------------------------
+_default_pool = RenderPool(
+    workers=env_int("RENDER_WORKERS", max(1, (os.cpu_count() or 2) // 2)),
+    min_tasks=env_int("RENDER_PARALLEL_MIN_COLUMNS", 8),
+)
+
+
+def render_pool() -> RenderPool:
+    """Пул, которым пользуются генераторы."""
+    return _default_pool
+
+
+def install(pool: RenderPool) -> RenderPool:
+    """Сделать *pool* пулом генераторов; вернуть предыдущий (например, для бенчмарка)."""
+    global _default_pool
+    previous, _default_pool = _default_pool, pool
+    return previous
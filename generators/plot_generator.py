@@ -7,52 +7,50 @@ box‑plot, scatter‑matrix — для числовых столбцов таб
 build_plot_html
     Центральная точка входа, возвращающая готовый HTML‑код выбранного
     типа графиков ("hist", "box", "scatter").
+build_plot_data
+    Те же графики в виде компактной сводки для отрисовки в браузере.
 """
 
 from __future__ import annotations
 
 # --- Стандартная библиотека ---
-import base64
-import io
 import os
 import uuid
 from typing import Dict, List, Tuple
 
 # --- Сторонние библиотеки ---
-import matplotlib
-
-matplotlib.use("Agg")  
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from pandas.plotting import scatter_matrix
-
-__all__ = ["build_plot_html"]  # Ограничиваем публичный интерфейс модуля
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+
+from generators.chart_data import compact, compact_list
+from generators.histograms import compute_histograms
+from generators.parallel import render_pool
+from generators.rendering import (  # Фигуры без pyplot, PNG в хранилище
+    FigureTemplate,
+    figure_template,
+    new_figure,
+    store_figure,
+)
+
+from generators.summary import NumericSummary
+from utils.image_store import IMAGES
+from utils.metrics import phase
+from utils.settings import env_int
+
+__all__ = ["build_plot_data", "build_plot_html"]  # Ограничиваем публичный интерфейс модуля
 
 # ---------------------------------------------------------------------------
 #   Вспомогательные функции
 # ---------------------------------------------------------------------------
 
-def _fig_to_base64(fig: plt.Figure) -> str:
-    """Преобразовать объект *Figure* в строку base64.
-
-    Args:
-        fig: Объект matplotlib *Figure*.
-
-    Returns:
-        Base64‑закодированная PNG‑картинка без переноса строк.
-    """
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight")
-    buf.seek(0)
-    return base64.b64encode(buf.read()).decode("ascii")
-
-
 def _save_html_file(content: str, base_name: str) -> None:
     """Сохранить HTML‑контент в файл с уникальным суффиксом.
 
     Файлы кладутся в директорию ``data/variant3``; при отсутствии каталога
-    он создаётся.
+    он создаётся. Ссылки на картинки хранилища заменяются на ``data:``-URI,
+    чтобы файл открывался без сервера.
 
     Args:
         content: Готовый HTML‑код.
@@ -62,10 +60,16 @@ def _save_html_file(content: str, base_name: str) -> None:
     uid = uuid.uuid4().hex[:8]  # короткий уникальный идентификатор
     filename = f"{base_name}_{uid}.html"
     filepath = os.path.join("data/variant3", filename)
-    with open(filepath, "w", encoding="utf-8") as file:
+    content = IMAGES.inline(content)
+    with phase("disk_save"), open(filepath, "w", encoding="utf-8") as file:
         file.write(content)
 
 
+# Scatter-matrix: начиная с этого числа строк ячейки рисуются картой плотности
+SCATTER_DENSITY_MIN_ROWS = env_int("SCATTER_DENSITY_MIN_ROWS", 5000)
+# Число корзин по каждой оси карты плотности
+SCATTER_DENSITY_BINS = 64
+
 # Словарь русских описаний к статистическим ключам
 _HIST_DESCRIPTIONS: Dict[str, str] = {
     "count": "Количество наблюдений",
@@ -77,15 +81,21 @@ _HIST_DESCRIPTIONS: Dict[str, str] = {
 }
 
 
-def _basic_hist_stats(series: pd.Series) -> Dict[str, float]:
+def _basic_hist_stats(
+    series: pd.Series, col_summary: Dict[str, float] | None = None,
+) -> Dict[str, float]:
     """Посчитать базовые статистики для столбца.
 
     Args:
         series: Числовой столбец DataFrame.
+        col_summary: Готовые показатели столбца из :class:`NumericSummary`;
+            если переданы, повторно ничего не считается.
 
     Returns:
         Словарь со статистическими метриками.
     """
+    if col_summary is not None:
+        return {key: col_summary[key] for key in _HIST_DESCRIPTIONS}
     return {
         "count": series.count(),
         "mean": series.mean(),
@@ -136,145 +146,447 @@ def _box_stats_table(stats: Dict[str, Dict[str, float]]) -> str:
 #   Генераторы конкретных графиков
 # ---------------------------------------------------------------------------
 
-def _build_histograms(df: pd.DataFrame) -> List[Tuple[str, str, str]]:
+HIST_FIGSIZE = (6, 4)
+
+
+def _histogram_template() -> FigureTemplate:
+    """Шаблон гистограммы: оси, сетка, подписи и легенда строятся один раз."""
+    fig = new_figure(figsize=HIST_FIGSIZE)
+    fig.subplots_adjust(left=0.15, right=0.97, bottom=0.13, top=0.92)
+    ax = fig.add_subplot()
+    # Одна ступенчатая заливка вместо прямоугольника на корзину: число
+    # корзин у столбцов разное, а данные StepPatch меняются через set_data
+    bars = ax.stairs([0.0], [0.0, 1.0], fill=True, label="Распределение данных")
+    ax.grid(True)
+    ax.set_ylabel("Плотность")
+    ax.legend(loc="upper right")
+    return FigureTemplate(fig, ax, bars=bars)
+
+
+def _render_histogram(col: str, heights: np.ndarray, edges: np.ndarray) -> str:
+    """Нарисовать готовую гистограмму одного столбца и вернуть URL картинки.
+
+    Высоты и границы корзин берутся из :attr:`NumericSummary.histograms`.
+    Рисует в шаблоне текущего потока (см. :func:`generators.rendering.figure_template`).
+    Функция уровня модуля: выполняется и в процессах пула
+    (см. :mod:`generators.parallel`).
+    """
+    with phase("render"):
+        template = figure_template(("hist", HIST_FIGSIZE), _histogram_template)
+        template.artists["bars"].set_data(np.nan_to_num(heights), edges)
+        template.autoscale()
+        template.ax.set_title(f"Гистограмма • {col}")
+        template.ax.set_xlabel(col)
+    return template.store()
+
+
+def _build_histograms(
+    df: pd.DataFrame, summary: NumericSummary | None = None,
+) -> List[Tuple[str, str, str]]:
     """Построить гистограммы для всех числовых столбцов.
 
     Args:
         df: Входной *DataFrame*.
+        summary: Готовая сводка по столбцам (создаётся, если не передана).
 
     Returns:
-        Список кортежей *(col_name, base64_img, stats_html)*.
+        Список кортежей *(col_name, img_url, stats_html)*.
 
     Raises:
         ValueError: Если нет числовых столбцов.
     """
-    numeric = df.select_dtypes(include="number")
+    summary = summary if summary is not None else NumericSummary(df)
+    numeric = summary.numeric
     if numeric.empty:
         raise ValueError("Нет числовых столбцов для гистограмм.")
 
-    outs: List[Tuple[str, str, str]] = []
-    for col in numeric.columns:
-        # --- График ---
-        fig = plt.figure(figsize=(6, 4))
-        numeric[col].hist(bins="auto", density=True, label="Распределение данных")
-        plt.title(f"Гистограмма • {col}")
-        plt.xlabel(col)
-        plt.ylabel("Плотность")
-        plt.legend()
-        img64 = _fig_to_base64(fig)
-        plt.close(fig)
+    # --- Графики: по столбцу на задачу, параллельно при большом числе столбцов ---
+    histograms = summary.histograms
+    urls = render_pool().map(
+        _render_histogram,
+        [(col, *histograms.column(col, density=True)) for col in numeric.columns],
+    )
 
+    outs: List[Tuple[str, str, str]] = []
+    for col, img_url in zip(numeric.columns, urls):
         # --- Статистическая сводка ---
-        stats_html = _hist_stats_table(_basic_hist_stats(numeric[col]))
+        stats_html = _hist_stats_table(_basic_hist_stats(numeric[col], summary.column(col)))
 
         # --- Индивидуальный HTML‑отчёт ---
         html = f"""
         <html><head><meta charset='utf-8'><title>Гистограмма: {col}</title></head><body>
         <h3>Гистограмма: {col}</h3>
-        <img src='data:image/png;base64,{img64}' alt='Гистограмма: {col}'>
+        <img src='{img_url}' alt='Гистограмма: {col}'>
         <hr>{stats_html}</body></html>
         """
         _save_html_file(html, f"histogram_{col}")
 
-        outs.append((col, img64, stats_html))
+        outs.append((col, img_url, stats_html))
     return outs
 
 
-def _build_boxplots(df: pd.DataFrame) -> List[Tuple[str, str, str]]:
+def _box_stats(summary: NumericSummary) -> Dict[str, Dict[str, float]]:
+    """Квартили, IQR и доля выбросов (правило 1.5·IQR) для каждого столбца."""
+    keys = ("min", "q1", "median", "q3", "max", "iqr", "outliers_percent")
+    return {col: {key: summary.column(col)[key] for key in keys} for col in summary.columns}
+
+
+def _build_boxplots(
+    df: pd.DataFrame, summary: NumericSummary | None = None,
+) -> List[Tuple[str, str, str]]:
     """Построить единый box‑plot для всех числовых столбцов."""
-    numeric = df.select_dtypes(include="number")
+    summary = summary if summary is not None else NumericSummary(df)
+    numeric = summary.numeric
     if numeric.empty:
         raise ValueError("Нет числовых столбцов для box‑plot.")
 
     # --- График ---
-    fig = plt.figure(figsize=(8, 6))
-    numeric.plot.box(ax=fig.add_subplot(1, 1, 1), vert=True)
-    plt.title("Box‑plot всех числовых столбцов")
-    plt.xlabel("Столбцы")
-    plt.ylabel("Значения")
-    img64 = _fig_to_base64(fig)
-    plt.close(fig)
+    with phase("render"):
+        fig = new_figure(figsize=(8, 6))
+        ax = fig.add_subplot()
+        ax.boxplot(
+            [numeric[col].dropna() for col in numeric.columns],
+            tick_labels=[str(col) for col in numeric.columns],
+        )
+        ax.set_title("Box‑plot всех числовых столбцов")
+        ax.set_xlabel("Столбцы")
+        ax.set_ylabel("Значения")
+    img_url = store_figure(fig, bbox_inches="tight")
 
     # --- Расчёт статистик для таблицы ---
-    stats: Dict[str, Dict[str, float]] = {}
-    for col in numeric.columns:
-        col_data = numeric[col].dropna()
-        q1, q3 = col_data.quantile([0.25, 0.75])
-        iqr = q3 - q1
-        outliers = col_data[(col_data < q1 - 1.5 * iqr) | (col_data > q3 + 1.5 * iqr)]
-        stats[col] = {
-            "min": col_data.min(),
-            "q1": q1,
-            "median": col_data.median(),
-            "q3": q3,
-            "max": col_data.max(),
-            "iqr": iqr,
-            "outliers_percent": len(outliers) / len(col_data) * 100,
-        }
-
-    stats_html = _box_stats_table(stats)
+    stats_html = _box_stats_table(_box_stats(summary))
 
     # --- Сохраняем индивидуальный отчёт ---
     html = f"""
     <html><head><meta charset='utf-8'><title>Box-plot</title></head><body>
     <h3>Box-plot всех числовых столбцов</h3>
-    <img src='data:image/png;base64,{img64}' alt='Box-plot'>
+    <img src='{img_url}' alt='Box-plot'>
     <hr>{stats_html}</body></html>
     """
     _save_html_file(html, "boxplot_all_columns")
 
-    return [("Box-plot", img64, stats_html)]
+    return [("Box-plot", img_url, stats_html)]
+
+
+def _axis_bounds(values: np.ndarray, mask: np.ndarray) -> List[Tuple[float, float] | None]:
+    """Пределы осей scatter-matrix: размах столбца плюс поля 5 %.
+
+    Для пустого столбца — ``None`` (пределы подберёт matplotlib), для
+    константного — ±0.5 вокруг значения.
+    """
+    bounds: List[Tuple[float, float] | None] = []
+    for k in range(values.shape[1]):
+        column = values[mask[:, k], k]
+        if column.size == 0:
+            bounds.append(None)
+            continue
+        lo, hi = column.min(), column.max()
+        pad = (hi - lo) * 0.05 / 2 if hi > lo else 0.5
+        bounds.append((lo - pad, hi + pad))
+    return bounds
+
+
+def _pair_densities(
+    values: np.ndarray, mask: np.ndarray, bounds: List[Tuple[float, float] | None], bins: int,
+) -> Dict[Tuple[int, int], np.ndarray]:
+    """Двумерные гистограммы всех пар столбцов (ключ ``(i, j)``, ``i < j``).
+
+    Номер корзины каждого значения считается один раз на столбец, после
+    чего гистограмма пары — один ``np.bincount`` по общим непропущенным
+    строкам. Результат для пары ``(i, j)`` совпадает с
+    ``np.histogram2d(values[:, i], values[:, j], bins, range=[bounds[i], bounds[j]])``
+    (строки — корзины столбца *i*); для ``(j, i)`` достаточно транспонировать.
+    """
+    n = values.shape[1]
+    index = np.zeros(values.shape, dtype=np.intp)
+    for k in range(n):
+        if bounds[k] is None:
+            continue
+        lo, hi = bounds[k]
+        scaled = (values[mask[:, k], k] - lo) * (bins / (hi - lo))
+        # правая граница диапазона попадает в последнюю корзину, как в histogram2d
+        index[mask[:, k], k] = np.clip(scaled.astype(np.intp), 0, bins - 1)
+
+    densities: Dict[Tuple[int, int], np.ndarray] = {}
+    for i in range(n):
+        for j in range(i + 1, n):
+            if bounds[i] is None or bounds[j] is None:
+                continue
+            common = mask[:, i] & mask[:, j]
+            flat = index[common, i] * bins + index[common, j]
+            densities[i, j] = np.bincount(flat, minlength=bins * bins).reshape(bins, bins)
+    return densities
+
+
+def _draw_scatter_matrix(
+    fig: Figure, numeric: pd.DataFrame, density: bool | None = None,
+) -> np.ndarray:
+    """Нарисовать матрицу попарных диаграмм рассеяния на фигуре *fig*.
+
+    Повторяет оформление ``pandas.plotting.scatter_matrix`` (гистограммы на
+    диагонали, поля 5 % по краям, подписи только у крайних осей), но
+    работает с переданной фигурой и не обращается к pyplot.
 
+    Маркер на каждую точку в каждой ячейке стоит O(строк × столбцов²)
+    отрисовок, поэтому для больших таблиц ячейки вне диагонали рисуются
+    как карта плотности: пары раскладываются по двумерным корзинам
+    (:func:`_pair_densities`) и выводятся одной картинкой с логарифмической
+    шкалой цвета (пустые корзины прозрачны).
 
-def _build_scatter_matrix(df: pd.DataFrame) -> List[Tuple[str, str, str]]:
+    Args:
+        fig: Фигура, на которой создаются оси.
+        numeric: Числовые столбцы.
+        density: ``True`` — карта плотности, ``False`` — точки, ``None`` —
+            плотность, если строк не меньше ``SCATTER_DENSITY_MIN_ROWS``.
+
+    Returns:
+        Массив осей ``n × n``.
+    """
+    cols = numeric.columns
+    n = len(cols)
+    if density is None:
+        density = len(numeric) >= SCATTER_DENSITY_MIN_ROWS
+    axes = fig.subplots(n, n, squeeze=False)
+    fig.subplots_adjust(wspace=0, hspace=0)
+
+    mask = numeric.notna().to_numpy()
+    values = numeric.to_numpy(dtype=float)
+    bounds = _axis_bounds(values, mask)
+
+    densities = _pair_densities(values, mask, bounds, SCATTER_DENSITY_BINS) if density else {}
+
+    for i in range(n):
+        for j in range(n):
+            ax = axes[i, j]
+            if i == j:
+                ax.hist(values[mask[:, i], i])
+                if bounds[i] is not None:
+                    ax.set_xlim(bounds[i])
+            elif density:
+                # Строки картинки — корзины столбца по оси Y (i), столбцы — по оси X (j)
+                pair = densities.get((i, j)) if i < j else densities.get((j, i))
+                counts = None if pair is None else (pair if i < j else pair.T)
+                if counts is not None and counts.any():
+                    ax.imshow(
+                        np.ma.masked_equal(counts, 0),
+                        origin="lower",
+                        extent=(*bounds[j], *bounds[i]),
+                        aspect="auto",
+                        interpolation="nearest",
+                        cmap="viridis",
+                        norm=LogNorm(vmin=1, vmax=max(counts.max(), 2)),
+                    )
+                if bounds[j] is not None:
+                    ax.set_xlim(bounds[j])
+                if bounds[i] is not None:
+                    ax.set_ylim(bounds[i])
+            else:
+                common = mask[:, i] & mask[:, j]
+                ax.scatter(values[common, j], values[common, i], marker=".", alpha=0.5)
+                if bounds[j] is not None:
+                    ax.set_xlim(bounds[j])
+                if bounds[i] is not None:
+                    ax.set_ylim(bounds[i])
+            ax.set_xlabel(str(cols[j]))
+            ax.set_ylabel(str(cols[i]))
+            ax.tick_params(axis="x", labelsize=8, labelrotation=90)
+            ax.tick_params(axis="y", labelsize=8)
+            if j != 0:
+                ax.yaxis.set_visible(False)
+            if i != n - 1:
+                ax.xaxis.set_visible(False)
+
+    # Левая верхняя ячейка — гистограмма: подписываем её ось Y значениями
+    # первого столбца, как у соседних диаграмм рассеяния.
+    if n > 1 and bounds[0] is not None:
+        lim = bounds[0]
+        locs = axes[0, 1].yaxis.get_majorticklocs()
+        locs = locs[(lim[0] <= locs) & (locs <= lim[1])]
+        hist_lim = axes[0, 0].get_ylim()
+        axes[0, 0].yaxis.set_ticks(
+            (locs - lim[0]) / (lim[1] - lim[0]) * (hist_lim[1] - hist_lim[0]) + hist_lim[0],
+        )
+        if np.all(locs == locs.astype(int)):
+            locs = locs.astype(int)
+        axes[0, 0].yaxis.set_ticklabels(locs)
+    return axes
+
+
+def _build_scatter_matrix(
+    df: pd.DataFrame, summary: NumericSummary | None = None,
+) -> List[Tuple[str, str, str]]:
     """Построить scatter‑matrix и аннотировать коэффициенты корреляции."""
-    numeric = df.select_dtypes(include="number")
+    summary = summary if summary is not None else NumericSummary(df)
+    numeric = summary.numeric
     if numeric.shape[1] < 2:
         raise ValueError("Для scatter‑matrix нужно минимум два числовых столбца.")
 
-    axes = scatter_matrix(numeric, figsize=(8, 8), diagonal="hist")
-    corr = numeric.corr().values
+    corr = summary.correlation.submatrix()
     cols = numeric.columns
-    # Аннотируем ячейки вне диагонали значениями корреляции
-    for i in range(len(cols)):
-        for j in range(len(cols)):
-            if i == j:
-                continue
-            axes[i, j].annotate(
-                f"ρ = {corr[i, j]:.2f}",
-                xy=(0.95, 0.85),
-                xycoords="axes fraction",
-                ha="right",
-                va="center",
-                fontsize=8,
-                fontweight="bold",
-                bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=0.7),
-            )
-
-    img64 = _fig_to_base64(axes[0, 0].get_figure())
-    plt.close(axes[0, 0].get_figure())
+    with phase("render"):
+        fig = new_figure(figsize=(8, 8))
+        axes = _draw_scatter_matrix(fig, numeric)
+        # Аннотируем ячейки вне диагонали значениями корреляции
+        for i in range(len(cols)):
+            for j in range(len(cols)):
+                if i == j:
+                    continue
+                axes[i, j].annotate(
+                    f"ρ = {corr[i, j]:.2f}",
+                    xy=(0.95, 0.85),
+                    xycoords="axes fraction",
+                    ha="right",
+                    va="center",
+                    fontsize=8,
+                    fontweight="bold",
+                    bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=0.7),
+                )
+
+    img_url = store_figure(fig, bbox_inches="tight")
 
     # Отдельный HTML‑файл отчёта
     html = f"""
     <html><head><meta charset='utf-8'><title>Scatter Matrix</title></head><body>
     <h3>Scatter-matrix для числовых признаков</h3>
-    <img src='data:image/png;base64,{img64}' alt='Scatter-matrix'>
+    <img src='{img_url}' alt='Scatter-matrix'>
     </body></html>
     """
     _save_html_file(html, "scatter_matrix")
 
-    return [("Scatter-matrix", img64, "")]
+    return [("Scatter-matrix", img_url, "")]
+
+# ---------------------------------------------------------------------------
+#   Сводки для отрисовки в браузере (render=client)
+# ---------------------------------------------------------------------------
+
+# Корзин по оси в карте плотности для браузера: 32² чисел на пару столбцов
+CLIENT_DENSITY_BINS = 32
+# Не больше стольких выбросов на столбец box-plot передаётся клиенту
+CLIENT_MAX_OUTLIERS = 200
+
+
+def _histogram_data(df: pd.DataFrame, summary: NumericSummary) -> List[Dict]:
+    """Границы и плотности корзин гистограмм (правило ``bins="auto"``)."""
+    numeric = summary.numeric
+    if numeric.empty:
+        raise ValueError("Нет числовых столбцов для гистограмм.")
+    histograms = summary.histograms
+    items = []
+    for col in numeric.columns:
+        density, edges = histograms.column(col, density=True)
+        items.append({
+            "title": str(col),
+            "chart": {"type": "hist", "edges": compact_list(edges), "heights": compact_list(density),
+                      "xlabel": str(col), "ylabel": "Плотность"},
+            "stats_html": _hist_stats_table(_basic_hist_stats(numeric[col], summary.column(col))),
+        })
+    return items
+
+
+def _boxplot_data(df: pd.DataFrame, summary: NumericSummary) -> List[Dict]:
+    """Квартили, усы и выбросы всех столбцов для одного общего box-plot."""
+    numeric = summary.numeric
+    if numeric.empty:
+        raise ValueError("Нет числовых столбцов для box‑plot.")
+    stats = _box_stats(summary)
+    boxes = []
+    for col in numeric.columns:
+        st = summary.column(col)
+        values = numeric[col].to_numpy(dtype=float)
+        low_fence, high_fence = st["q1"] - 1.5 * st["iqr"], st["q3"] + 1.5 * st["iqr"]
+        outliers = np.sort(values[(values < low_fence) | (values > high_fence)])
+        if outliers.size > CLIENT_MAX_OUTLIERS:
+            outliers = outliers[np.linspace(0, outliers.size - 1, CLIENT_MAX_OUTLIERS).astype(int)]
+        boxes.append({
+            "name": str(col),
+            "q1": compact(st["q1"]), "median": compact(st["median"]), "q3": compact(st["q3"]),
+            "whisker_low": compact(st["whisker_low"]),
+            "whisker_high": compact(st["whisker_high"]),
+            "outliers": compact_list(outliers),
+        })
+    return [{
+        "title": "Box-plot",
+        "chart": {"type": "box", "boxes": boxes, "xlabel": "Столбцы", "ylabel": "Значения"},
+        "stats_html": _box_stats_table(stats),
+    }]
+
+
+def _scatter_data(df: pd.DataFrame, summary: NumericSummary) -> List[Dict]:
+    """Пределы осей, корреляции, гистограммы диагонали и точки либо плотности пар."""
+    numeric = summary.numeric
+    if numeric.shape[1] < 2:
+        raise ValueError("Для scatter‑matrix нужно минимум два числовых столбца.")
+    mask = numeric.notna().to_numpy()
+    values = numeric.to_numpy(dtype=float)
+    bounds = _axis_bounds(values, mask)
+    with phase("statistics"):
+        histograms = compute_histograms(numeric, bins=10)
+        diagonal = []
+        for col in numeric.columns:
+            counts, edges = histograms.column(col)
+            diagonal.append({"edges": compact_list(edges), "heights": counts.tolist()})
+        chart = {
+            "type": "scatter",
+            "columns": [str(col) for col in numeric.columns],
+            "bounds": [compact_list(b) if b is not None else None for b in bounds],
+            "corr": [compact_list(row) for row in summary.correlation.submatrix()],
+            "diagonal": diagonal,
+        }
+        if len(numeric) >= SCATTER_DENSITY_MIN_ROWS:
+            densities = _pair_densities(values, mask, bounds, CLIENT_DENSITY_BINS)
+            chart["bins"] = CLIENT_DENSITY_BINS
+            chart["pairs"] = [
+                {"i": i, "j": j, "counts": counts.ravel().tolist()}
+                for (i, j), counts in densities.items()
+            ]
+        else:
+            chart["points"] = [compact_list(values[:, k]) for k in range(values.shape[1])]
+    return [{"title": "Scatter-matrix", "chart": chart, "stats_html": ""}]
+
+
+def build_plot_data(
+    df: pd.DataFrame, plot_type: str, summary: NumericSummary | None = None,
+) -> Dict:
+    """Сводка графиков для отрисовки в браузере вместо PNG.
+
+    Структура: ``{"title", "items": [{"title", "chart", "stats_html"}]}``;
+    ``chart`` описан в ``static/scripts/charts.js``. Таблицы статистик —
+    те же HTML-фрагменты, что и в серверном режиме.
+
+    Raises:
+        ValueError: Если ``plot_type`` не поддерживается или нет данных.
+    """
+    builders = {
+        "hist": (_histogram_data, "Гистограммы"),
+        "box": (_boxplot_data, "Box-plot"),
+        "scatter": (_scatter_data, "Scatter-matrix"),
+    }
+    if plot_type not in builders:
+        raise ValueError(f"Неизвестный plot_type: {plot_type!r}")
+    build_func, title = builders[plot_type]
+    summary = summary if summary is not None else NumericSummary(df)
+    return {"title": title, "items": build_func(df, summary)}
+
 
 # ---------------------------------------------------------------------------
 #   Главная функция‑обёртка
 # ---------------------------------------------------------------------------
 
-def build_plot_html(df: pd.DataFrame, plot_type: str) -> str:
+def build_plot_html(
+    df: pd.DataFrame,
+    plot_type: str,
+    summary: NumericSummary | None = None,
+    *,
+    standalone: bool = True,
+) -> str:
     """Сформировать HTML‑блок с визуализациями.
 
     Args:
         df: Входной набор данных.
         plot_type: Один из ``{"hist", "box", "scatter"}``.
+        summary: Готовая сводка по столбцам (общая с другими отчётами).
+        standalone: Фрагмент показывается в отдельном iframe (добавляются
+            стили, убирающие его собственную прокрутку).
 
     Returns:
         HTML‑фрагмент, который можно отдать фронтенду.
@@ -291,15 +603,14 @@ def build_plot_html(df: pd.DataFrame, plot_type: str) -> str:
         raise ValueError(f"Неизвестный plot_type: {plot_type!r}")
 
     build_func, title = builders[plot_type]
-    items = build_func(df)  # Генерируем графики
+    items = build_func(df, summary)  # Генерируем графики
 
     # --- Сборка карточек Bootstrap ---
-    html_parts: List[str] = [
-        "<style>html,body{margin:0;padding:0;overflow:hidden}</style>",
-        f"<h3 class='mt-3 mb-4'>{title}</h3>",
-    ]
+    html_parts: List[str] = [f"<h3 class='mt-3 mb-4'>{title}</h3>"]
+    if standalone:
+        html_parts.insert(0, "<style>html,body{margin:0;padding:0;overflow:hidden}</style>")
 
-    for label, img64, stats_html in items:
+    for label, img_url, stats_html in items:
         card_title = label if plot_type == "hist" else title
         if plot_type == "box":
             # Box‑plot содержит одну общую картинку + таблицу статистик
@@ -308,7 +619,7 @@ def build_plot_html(df: pd.DataFrame, plot_type: str) -> str:
                 <div class='card mb-4'>
                   <div class='card-body text-center'>
                     <img class='img-fluid d-block mx-auto'
-                         src='data:image/png;base64,{img64}' alt='{card_title}'>
+                         src='{img_url}' alt='{card_title}'>
                     <div class='mt-3'>{stats_html}</div>
                   </div>
                 </div>
@@ -324,7 +635,7 @@ def build_plot_html(df: pd.DataFrame, plot_type: str) -> str:
                     <div class='row justify-content-center'>
                       <div class='col-md-6 text-center'>
                         <img class='img-fluid d-block mx-auto'
-                             src='data:image/png;base64,{img64}' alt='{card_title}'>
+                             src='{img_url}' alt='{card_title}'>
                       </div>
                       {stats_block}
                     </div>
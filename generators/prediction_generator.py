@@ -5,12 +5,24 @@ import pandas as pd
 from sklearn.linear_model import LinearRegression
 from bottle import request
 
-def build_prediction_numbers(df: pd.DataFrame) -> str:
-    """Возвращает предсказанные числа"""
+from utils.metrics import phase
+
+def build_prediction_numbers(
+    df: pd.DataFrame, target_col: str | None = None, features: str | None = None,
+) -> str:
+    """Возвращает предсказанные числа.
+
+    *target_col* (номер столбца с 1) и *features* (значения через пробел) —
+    поля формы; если не переданы, берутся из текущего запроса.
+    """
     try:
         # Получаем параметры из формы
-        target_col_num = int(request.forms.get('target_col')) - 1
-        features_input = request.forms.get('features')
+        if target_col is None:
+            target_col = request.forms.get('target_col')
+        if features is None:
+            features = request.forms.get('features')
+        target_col_num = int(target_col) - 1
+        features_input = features
         
         # Проверяем корректность ввода
         if target_col_num < 0 or target_col_num >= len(df.columns):
@@ -28,9 +40,10 @@ def build_prediction_numbers(df: pd.DataFrame) -> str:
         new_data = np.array(features).reshape(1, -1)
         
         # Строим модель и делаем предсказание
-        model = LinearRegression()
-        model.fit(X, y)
-        prediction = model.predict(new_data)[0]
+        with phase("model_fit"):
+            model = LinearRegression()
+            model.fit(X, y)
+            prediction = model.predict(new_data)[0]
         
         # Формируем результат
         result = f"""
@@ -62,9 +75,10 @@ def build_prediction_numbers_(df: pd.DataFrame, target_col_num: int, features: l
 
         new_data = np.array(features).reshape(1, -1)
 
-        model = LinearRegression()
-        model.fit(X, y)
-        prediction = model.predict(new_data)[0]
+        with phase("model_fit"):
+            model = LinearRegression()
+            model.fit(X, y)
+            prediction = model.predict(new_data)[0]
 
         result = f"""
         <div class="alert alert-success">
@@ -87,9 +101,10 @@ def save_data_with_prediction(df: pd.DataFrame, prediction_text: str) -> None:
     folder = "data/variant4"
     os.makedirs(folder, exist_ok=True)
 
-    # Сохраняем таблицу
-    df.to_csv(os.path.join(folder, "generated_table.csv"), index=False)
+    with phase("disk_save"):
+        # Сохраняем таблицу
+        df.to_csv(os.path.join(folder, "generated_table.csv"), index=False)
 
-    # Сохраняем результат
-    with open(os.path.join(folder, "prediction_result.txt"), "w", encoding="utf-8") as f:
-        f.write(prediction_text)
+        # Сохраняем результат
+        with open(os.path.join(folder, "prediction_result.txt"), "w", encoding="utf-8") as f:
+            f.write(prediction_text)
@@ -0,0 +1,194 @@
+"""
+Общий движок отрисовки графиков для генераторов отчётов.
+
+Потокобезопасность
+------------------
+Интерфейс ``matplotlib.pyplot`` хранит «текущую» фигуру и оси в глобальном
+состоянии процесса, поэтому два потока, одновременно вызывающие
+``plt.figure()``/``plt.title()``/``plt.gcf()``, рисуют в чужую фигуру.
+Генераторы не используют pyplot вовсе: :func:`new_figure` создаёт
+самостоятельный :class:`~matplotlib.figure.Figure` с собственным холстом
+Agg, а рисование идёт только через методы его осей (seaborn получает оси
+явно через ``ax=``). Такая фигура не регистрируется в менеджере фигур
+pyplot, не требует ``plt.close`` и освобождается сборщиком мусора.
+
+Поэтому построение и кодирование картинок не сериализуется: потоки
+многопоточного сервера (``python app.py --production``) рисуют
+параллельно, каждый в свою фигуру.
+
+Шаблоны фигур
+-------------
+Построение фигуры, осей, подписей и легенды стоит дороже, чем сама
+отрисовка столбиков. Однотипные картинки (гистограммы по столбцам,
+карточки распределений) поэтому рисуются в шаблоне: :func:`figure_template`
+строит фигуру один раз на поток и ключ (вид графика, размер), а генератор
+лишь обновляет данные художников (``set_data``), подписи и пределы осей.
+Шаблоны хранятся отдельно для каждого потока (и процесса пула), поэтому
+потоки по-прежнему не делят фигуры. Разметка полей задаётся в шаблоне
+заранее, без ``bbox_inches="tight"``, который требует лишней отрисовки;
+:meth:`FigureTemplate.store` включает его, только если заголовок или
+подпись оси (в них имя столбца) не помещаются в фигуру.
+
+Картинки
+--------
+:func:`store_figure` кодирует фигуру по текущей политике вывода
+(PNG/WebP/SVG, DPI, предел размера, палитра — см. :mod:`utils.image_policy`),
+кладёт байты в :data:`utils.image_store.IMAGES` и возвращает URL
+``/img/<хэш>.<формат>`` для атрибута ``src`` — отчёты не встраивают
+картинки в HTML.
+"""
+
+from __future__ import annotations
+
+import io
+import threading
+from typing import Callable, Dict, Hashable, Tuple, TypeVar
+
+import matplotlib
+
+matplotlib.use("Agg")  # без GUI: если кто-то всё же импортирует pyplot
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.artist import Artist
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+
+from PIL import Image
+
+from utils.image_policy import ImagePolicy, current_image_policy
+from utils.image_store import IMAGES, image_url
+from utils.metrics import phase
+
+__all__ = ["FigureTemplate", "clear_templates", "figure_template", "new_figure", "store_figure"]
+
+T = TypeVar("T")
+
+
+def new_figure(figsize: Tuple[float, float] = (6.4, 4.8), **kwargs) -> Figure:
+    """Создать фигуру с собственным холстом Agg, не связанную с pyplot.
+
+    Args:
+        figsize: Размер фигуры в дюймах.
+        **kwargs: Дополнительные параметры :class:`~matplotlib.figure.Figure`.
+    """
+    fig = Figure(figsize=figsize, **kwargs)
+    FigureCanvasAgg(fig)  # холст привязывается к фигуре в конструкторе
+    return fig
+
+
+def store_figure(fig: Figure, **savefig_kwargs) -> str:
+    """Закодировать фигуру по текущей политике, сохранить и вернуть её URL.
+
+    Формат, DPI, предел размера, палитра и оптимизация PNG берутся из
+    :func:`utils.image_policy.current_image_policy`.
+
+    Args:
+        fig: Объект matplotlib *Figure*.
+        **savefig_kwargs: Дополнительные параметры ``savefig``
+            (например, ``bbox_inches="tight"``).
+    """
+    policy = current_image_policy()
+    with phase("png_encode"):
+        data = _encode(fig, policy, savefig_kwargs)
+    return image_url(IMAGES.put(data, policy.format))
+
+
+def _encode(fig: Figure, policy: ImagePolicy, savefig_kwargs: dict) -> bytes:
+    """Байты картинки *fig* в формате и с параметрами *policy*."""
+    buf = io.BytesIO()
+    if policy.format == "svg":
+        fig.savefig(buf, format="svg", **savefig_kwargs)
+        return buf.getvalue()
+
+    dpi = policy.effective_dpi(*fig.get_size_inches())
+    if policy.format == "webp":
+        fig.savefig(buf, format="webp", dpi=dpi, pil_kwargs={"quality": policy.quality}, **savefig_kwargs)
+        return buf.getvalue()
+    if not policy.quantize and not policy.optimize:
+        fig.savefig(buf, format="png", dpi=dpi, **savefig_kwargs)
+        return buf.getvalue()
+
+    # Палитра и оптимизация — через Pillow: растр сохраняется без сжатия
+    # (его быстро прочитать) и перекодируется один раз
+    fig.savefig(buf, format="png", dpi=dpi, pil_kwargs={"compress_level": 0}, **savefig_kwargs)
+    buf.seek(0)
+    image = Image.open(buf).convert("RGB")
+    if policy.quantize:
+        image = image.quantize(colors=policy.quantize, method=Image.Quantize.FASTOCTREE)
+    out = io.BytesIO()
+    image.save(out, format="PNG", optimize=policy.optimize)
+    return out.getvalue()
+
+
+# ---------------------------------------------------------------------------
+#   Шаблоны фигур
+# ---------------------------------------------------------------------------
+class FigureTemplate:
+    """Фигура с готовой разметкой и художниками, данные которых меняются.
+
+    Args:
+        fig: Фигура шаблона (см. :func:`new_figure`).
+        ax: Оси, в которых рисуются данные.
+        **artists: Именованные художники, обновляемые между картинками.
+    """
+
+    def __init__(self, fig: Figure, ax: Axes, **artists: Artist) -> None:
+        self.fig = fig
+        self.ax = ax
+        self.artists: Dict[str, Artist] = artists
+
+    def autoscale(self) -> None:
+        """Пересчитать пределы осей по видимым художникам (с обычными полями)."""
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+
+    def store(self) -> str:
+        """Сохранить фигуру шаблона (см. :func:`store_figure`) и вернуть её URL.
+
+        Длинное имя столбца в заголовке или подписи оси вышло бы за заданные
+        в шаблоне поля и было бы обрезано — тогда фигура сохраняется с
+        ``bbox_inches="tight"``.
+        """
+        if self.labels_fit():
+            return store_figure(self.fig)
+        return store_figure(self.fig, bbox_inches="tight")
+
+    def labels_fit(self) -> bool:
+        """Помещаются ли заголовок и подпись оси X в фигуру по ширине.
+
+        Размер текста считается без отрисовки фигуры. Горизонтальное
+        положение этих подписей известно до отрисовки (центр осей), а
+        положение подписи оси Y уточняется только при ней, поэтому она не
+        проверяется — в шаблонах она постоянная и поля под неё заданы.
+        """
+        renderer = self.fig.canvas.get_renderer()
+        bounds = self.fig.bbox
+        for text in (self.ax.title, self.ax.xaxis.label):
+            box = text.get_window_extent(renderer)
+            if box.x0 < bounds.x0 or box.x1 > bounds.x1:
+                return False
+        return True
+
+
+_templates = threading.local()
+
+
+def figure_template(key: Hashable, build: Callable[[], T]) -> T:
+    """Шаблон *key* текущего потока; ``build()`` вызывается при первом обращении.
+
+    Args:
+        key: Вид графика и размер, например ``("hist", (6, 4))``.
+        build: Функция, создающая шаблон.
+    """
+    cache = getattr(_templates, "cache", None)
+    if cache is None:
+        cache = _templates.cache = {}
+    template = cache.get(key)
+    if template is None:
+        template = cache[key] = build()
+    return template
+
+
+def clear_templates() -> None:
+    """Забыть шаблоны текущего потока (следующая картинка построит новые)."""
+    _templates.cache = {}
@@ -0,0 +1,651 @@
+"""
+Потоковые (онлайн) статистики для таблиц, которые не помещаются в память.
+
+:class:`StreamingSummary` читает таблицу по частям (``update``) и хранит
+только накопители фиксированного размера. Две сводки, посчитанные по
+разным частям таблицы (например, в разных процессах), объединяются
+``merge`` — результат тот же, что и при последовательном чтении (для
+точных показателей — с точностью до ошибки округления).
+
+Накопители:
+
+* :class:`Moments` — число значений, экстремумы, среднее и суммы 2–4-й
+  степеней отклонений всех столбцов. Часть таблицы сводится двумя
+  проходами по ней, а части объединяются формулами Чана — Терриберри;
+  асимметрия и эксцесс — по формулам pandas. Показатели точные.
+* :class:`KllSketch` — эскиз квантилей KLL (Karnin — Lang — Liberty)
+  одного столбца: O(k · log(n / k)) значений вместо n. Ошибка
+  по рангу ограничена гарантированно: каждое сжатие уровня *h* сдвигает
+  ранг любого значения не больше чем на ``2^h``, эти сдвиги суммируются
+  в :attr:`KllSketch.rank_error`. Квантиль уровня *q* — значение, ранг
+  которого отличается от ``q · n`` не больше чем на ``rank_error``
+  (нормированная граница — :meth:`KllSketch.normalized_error`). Сдвиги
+  случайны и в основном гасят друг друга, поэтому фактическая ошибка
+  обычно в разы меньше границы: при ``k = 200`` — десятые доли процента
+  ранга (см. ``tests/test_streaming.py``).
+* :class:`StreamHistogram` — гистограмма одного столбца с корзинами
+  ширины ``2^e``, привязанными к нулю: корзины разных частей совпадают,
+  поэтому гистограммы объединяются сложением; когда значения не
+  помещаются в :data:`HISTOGRAM_BINS` корзин, соседние корзины
+  сливаются попарно. Перестроение в корзины отчёта
+  (:meth:`StreamHistogram.rebin`) ошибается не больше чем на число
+  значений в двух мелких корзинах на границах каждой корзины отчёта.
+* :class:`BottomKSample` — равномерная выборка без возвращения
+  фиксированного размера (значения с наименьшими случайными ключами),
+  объединяемая точно. Пока значений не больше :data:`SAMPLE_SIZE`,
+  выборка содержит весь столбец — и квантили, выбросы, гистограмма и
+  тест Шапиро — Уилка считаются по нему точно, как в
+  :func:`generators.distrib_generator.analyze_distributions`.
+
+Поля отчёта (:meth:`StreamingSummary.distribution_stats`) совпадают с
+полями ``analyze_distributions``. Для столбцов длиннее выборки медиана и
+квартили берутся из эскиза KLL, число выбросов — по рангам границ
+1.5·IQR в гистограмме или в эскизе (где граница ошибки меньше), а тест
+нормальности выбирается по длине столбца, как в ``analyze_distributions``,
+но выполняется по точным моментам или по выборке
+(:func:`generators.normality.check_sample`).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from generators.column_stats import OUTLIER_IQR_FACTOR, column_positions, compute_column_stats, moment_statistics
+from generators.histograms import bin_counts, compute_histograms
+from generators.normality import check_sample
+
+__all__ = [
+    "HISTOGRAM_BINS",
+    "KLL_K",
+    "SAMPLE_SIZE",
+    "BottomKSample",
+    "KllSketch",
+    "Moments",
+    "StreamHistogram",
+    "StreamingSummary",
+]
+
+#: Параметр точности эскиза KLL (ёмкость верхнего уровня).
+KLL_K = 200
+#: Наибольшее число корзин потоковой гистограммы.
+HISTOGRAM_BINS = 1024
+#: Размер равномерной выборки столбца (и предел теста Шапиро — Уилка).
+SAMPLE_SIZE = 5000
+
+
+# ---------------------------------------------------------------------------
+#   Моменты
+# ---------------------------------------------------------------------------
+
+class Moments:
+    """Точные моменты и экстремумы нескольких столбцов.
+
+    Args:
+        width: Число столбцов.
+    """
+
+    def __init__(self, width: int) -> None:
+        self.count = np.zeros(width)
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.m3 = np.zeros(width)
+        self.m4 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+        self._statistics: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    def update(self, values: np.ndarray) -> None:
+        """Добавить часть таблицы: матрицу «строки × столбцы» (NaN — пропуски)."""
+        mask = ~np.isnan(values)
+        part = Moments(values.shape[1])
+        part.count = mask.sum(axis=0).astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            part.mean = np.where(part.count > 0, np.where(mask, values, 0.0).sum(axis=0) / part.count, 0.0)
+        centered = np.where(mask, values - part.mean, 0.0)
+        squared = centered ** 2
+        part.m2 = squared.sum(axis=0)
+        part.m3 = (squared * centered).sum(axis=0)
+        part.m4 = (squared ** 2).sum(axis=0)
+        part.min = np.where(mask, values, np.inf).min(axis=0, initial=np.inf)
+        part.max = np.where(mask, values, -np.inf).max(axis=0, initial=-np.inf)
+        self.merge(part)
+
+    def merge(self, other: "Moments") -> None:
+        """Добавить моменты другой части таблицы (формулы Чана — Терриберри)."""
+        na, nb = self.count, other.count
+        n = na + nb
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = other.mean - self.mean
+            ratio = np.where(n > 0, nb / n, 0.0)
+            mean = self.mean + delta * ratio
+            m2 = self.m2 + other.m2 + delta ** 2 * na * ratio
+            m3 = (
+                self.m3 + other.m3
+                + delta ** 3 * na * ratio * (na - nb) / n
+                + 3 * delta * (na * other.m2 - nb * self.m2) / n
+            )
+            m4 = (
+                self.m4 + other.m4
+                + delta ** 4 * na * ratio * (na * na - na * nb + nb * nb) / n ** 2
+                + 6 * delta ** 2 * (na * na * other.m2 + nb * nb * self.m2) / n ** 2
+                + 4 * delta * (na * other.m3 - nb * self.m3) / n
+            )
+        # Если одна из частей пуста, формулы дают NaN — берём другую как есть
+        for name, merged in (("mean", mean), ("m2", m2), ("m3", m3), ("m4", m4)):
+            own, theirs = getattr(self, name), getattr(other, name)
+            setattr(self, name, np.where(na == 0, theirs, np.where(nb == 0, own, merged)))
+        self.count = n
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self._statistics = None
+
+    def statistics(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Стандартное отклонение, асимметрия и эксцесс (как у pandas).
+
+        Результат запоминается до следующего :meth:`update`/:meth:`merge`.
+        """
+        if self._statistics is None:
+            max_abs = np.maximum(np.abs(np.where(self.count > 0, self.min, 0.0)),
+                                 np.abs(np.where(self.count > 0, self.max, 0.0)))
+            self._statistics = moment_statistics(self.count, self.m2, self.m3, self.m4, max_abs)
+        return self._statistics
+
+
+# ---------------------------------------------------------------------------
+#   Квантили: эскиз KLL
+# ---------------------------------------------------------------------------
+
+class KllSketch:
+    """Объединяемый эскиз квантилей KLL одного столбца.
+
+    Уровень *h* хранит значения веса ``2^h``. Когда уровень переполняется,
+    он сортируется и каждое второе значение (со случайным сдвигом 0 или 1)
+    переходит на уровень выше с удвоенным весом. Ёмкость уровней убывает
+    от верхнего к нижним в 2/3 раза, но не ниже 2.
+
+    Args:
+        k: Ёмкость верхнего уровня (точность эскиза).
+        rng: Генератор случайных сдвигов сжатия.
+    """
+
+    def __init__(self, k: int = KLL_K, rng: Optional[np.random.Generator] = None) -> None:
+        if k < 8:
+            raise ValueError("Параметр k эскиза KLL должен быть не меньше 8")
+        self.k = k
+        self.count = 0
+        self.rank_error = 0  # Гарантированная граница ошибки ранга (в значениях)
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self._sorted: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            keep = items.size % 2  # нечётное значение остаётся на уровне
+            promoted = items[int(self._rng.integers(2)):items.size - keep:2]
+            self.levels[level] = items[items.size - keep:]
+            self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+            self.rank_error += 2 ** level
+            level = 0  # новый уровень уменьшил ёмкость нижних — проверяем заново
+
+    def update(self, values: np.ndarray) -> None:
+        """Добавить значения (без NaN)."""
+        if values.size:
+            self.levels[0] = np.concatenate((self.levels[0], np.asarray(values, dtype=float)))
+            self.count += values.size
+            self._compress()
+            self._sorted = None
+
+    def merge(self, other: "KllSketch") -> None:
+        """Добавить эскиз другой части столбца."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.count += other.count
+        self.rank_error += other.rank_error
+        self._compress()
+        self._sorted = None
+
+    def sorted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Значения эскиза по возрастанию и их накопленные веса (оценки рангов).
+
+        Сортировка запоминается до следующего :meth:`update`/:meth:`merge`.
+        """
+        if self._sorted is None:
+            values = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(items.size, 2.0 ** h) for h, items in enumerate(self.levels)])
+            order = np.argsort(values, kind="stable")
+            self._sorted = values[order], np.cumsum(weights[order])
+        return self._sorted
+
+    def quantile(self, levels) -> np.ndarray:
+        """Значения, ранг которых ≈ ``level · n`` (ошибка — не больше :attr:`rank_error`)."""
+        levels = np.atleast_1d(np.asarray(levels, dtype=float))
+        if not self.count:
+            return np.full(levels.shape, np.nan)
+        values, cumulative = self.sorted_items()
+        target = levels * (cumulative[-1] - 1) + 1  # ранг от 1 до n
+        index = np.minimum(np.searchsorted(cumulative, target), values.size - 1)
+        return values[index]
+
+    def rank(self, value: float, inclusive: bool = False) -> float:
+        """Оценка числа значений ``< value`` (``<=`` при *inclusive*)."""
+        if not self.count:
+            return 0.0
+        values, cumulative = self.sorted_items()
+        index = np.searchsorted(values, value, side="right" if inclusive else "left")
+        return float(cumulative[index - 1]) if index else 0.0
+
+    def normalized_error(self) -> float:
+        """Гарантированная граница ошибки ранга в долях от числа значений."""
+        return self.rank_error / self.count if self.count else 0.0
+
+
+# ---------------------------------------------------------------------------
+#   Гистограмма и выборка
+# ---------------------------------------------------------------------------
+
+class StreamHistogram:
+    """Объединяемая гистограмма одного столбца с корзинами ширины ``2^e``.
+
+    Корзина *i* — полуинтервал ``[i · 2^e, (i + 1) · 2^e)``.
+
+    Args:
+        max_bins: Наибольшее число корзин.
+    """
+
+    def __init__(self, max_bins: int = HISTOGRAM_BINS) -> None:
+        self.max_bins = max_bins
+        self.exponent: Optional[int] = None
+        self.start = 0
+        self.counts = np.zeros(0)
+        self.low, self.high = np.inf, -np.inf  # экстремумы: края крайних корзин
+
+    @property
+    def width(self) -> float:
+        return 2.0 ** self.exponent
+
+    def _coarsen(self, exponent: int) -> None:
+        """Слить корзины до ширины ``2^exponent``."""
+        while self.exponent < exponent:
+            index = (self.start + np.arange(self.counts.size)) // 2
+            start = int(index[0]) if index.size else self.start // 2
+            self.counts = np.bincount(index - start, weights=self.counts)
+            self.start, self.exponent = start, self.exponent + 1
+
+    def _span(self, low: float, high: float, exponent: int) -> int:
+        return int(np.floor(high / 2.0 ** exponent) - np.floor(low / 2.0 ** exponent)) + 1
+
+    def _cover(self, low: float, high: float) -> None:
+        """Подобрать ширину так, чтобы [low, high] и уже накопленное уместились.
+
+        Ширина корзин выбирается по размаху значений, а не по их удалённости
+        от нуля. Пока все накопленные значения равны, размаха нет, и ширина
+        берётся от модуля значения; как только новые значения расширяют
+        отрезок, корзины выбираются заново, а накопленное переносится в
+        корзину этого значения.
+        """
+        point = None
+        if self.counts.size and self.low == self.high and (low < self.low or high > self.high):
+            point = self.low, float(self.counts.sum())
+            low, high = min(low, self.low), max(high, self.high)
+            self.exponent, self.counts = None, np.zeros(0)
+        if self.exponent is None:
+            spread = high - low if high > low else max(abs(high), abs(low), np.finfo(float).tiny)
+            self.exponent = int(np.floor(np.log2(spread / self.max_bins)))
+            self.start = int(np.floor(low / self.width))
+        if self.counts.size:
+            low = min(low, self.start * self.width)
+            high = max(high, (self.start + self.counts.size - 1) * self.width)
+        exponent = self.exponent
+        while self._span(low, high, exponent) > self.max_bins:
+            exponent += 1
+        self._coarsen(exponent)
+        start = int(np.floor(low / self.width))
+        stop = int(np.floor(high / self.width)) + 1
+        counts = np.zeros(stop - start)
+        counts[self.start - start:self.start - start + self.counts.size] = self.counts
+        self.start, self.counts = start, counts
+        if point is not None:
+            self.counts[int(np.floor(point[0] / self.width)) - self.start] += point[1]
+
+    def update(self, values: np.ndarray) -> None:
+        """Добавить значения (без NaN)."""
+        if not values.size:
+            return
+        low, high = float(values.min()), float(values.max())
+        self._cover(low, high)
+        self.low, self.high = min(self.low, low), max(self.high, high)
+        index = np.floor(values / self.width).astype(np.int64) - self.start
+        self.counts += np.bincount(index, minlength=self.counts.size)
+
+    def _add_point(self, value: float, count: float) -> None:
+        """Добавить ``count`` одинаковых значений ``value``."""
+        self._cover(value, value)
+        self.low, self.high = min(self.low, value), max(self.high, value)
+        self.counts[int(np.floor(value / self.width)) - self.start] += count
+
+    def merge(self, other: "StreamHistogram") -> None:
+        """Добавить гистограмму другой части столбца."""
+        if other.exponent is None:
+            return
+        if other.low == other.high:
+            self._add_point(other.low, float(other.counts.sum()))
+            return
+        if self.exponent is not None and self.low == self.high:
+            # У точки нет своей ширины корзин: берём корзины другой части
+            value, count = self.low, float(self.counts.sum())
+            self.exponent, self.start, self.counts = other.exponent, other.start, other.counts.copy()
+            self.low, self.high = other.low, other.high
+            self._add_point(value, count)
+            return
+        other = other.copy()
+        self.low, self.high = min(self.low, other.low), max(self.high, other.high)
+        if self.exponent is None:
+            self.exponent, self.start, self.counts = other.exponent, other.start, other.counts
+            return
+        exponent = max(self.exponent, other.exponent)
+        self._coarsen(exponent)
+        other._coarsen(exponent)
+        self._cover(other.start * self.width, (other.start + other.counts.size - 1) * self.width)
+        if other.exponent < self.exponent:  # _cover могла укрупнить корзины ещё раз
+            other._coarsen(self.exponent)
+        offset = other.start - self.start
+        self.counts[offset:offset + other.counts.size] += other.counts
+
+    def copy(self) -> "StreamHistogram":
+        clone = StreamHistogram(self.max_bins)
+        clone.exponent, clone.start, clone.counts = self.exponent, self.start, self.counts.copy()
+        clone.low, clone.high = self.low, self.high
+        return clone
+
+    @property
+    def edges(self) -> np.ndarray:
+        """Границы корзин."""
+        return (self.start + np.arange(self.counts.size + 1)) * self.width
+
+    def rank(self, value: float) -> Tuple[float, float]:
+        """Оценка числа значений ``< value`` и граница её ошибки.
+
+        Ошибка — не больше числа значений в корзине, содержащей *value*.
+        """
+        if not self.counts.size:
+            return 0.0, 0.0
+        cumulative = np.concatenate(([0.0], np.cumsum(self.counts)))
+        index = int(np.floor(value / self.width)) - self.start
+        error = float(self.counts[index]) if 0 <= index < self.counts.size else 0.0
+        return float(np.interp(value, self.edges, cumulative)), error
+
+    def inner_extremes(self, low: float, high: float) -> Tuple[float, float]:
+        """Оценка наименьшего и наибольшего значений внутри [low, high].
+
+        Берутся края первой и последней непустых корзин внутри отрезка,
+        поэтому ошибка — не больше ширины корзины.
+        """
+        edges = self.edges
+        occupied = (self.counts > 0) & (edges[1:] > low) & (edges[:-1] <= high)
+        if not occupied.any():
+            return low, high
+        first, last = np.flatnonzero(occupied)[[0, -1]]
+        return float(max(edges[first], low)), float(min(edges[last + 1], high))
+
+    def rebin(self, edges: np.ndarray) -> np.ndarray:
+        """Число значений в корзинах с границами *edges*.
+
+        Значения внутри мелкой корзины считаются распределёнными равномерно
+        (крайние корзины — только между экстремумами), поэтому ошибка каждой
+        корзины — не больше числа значений в мелких корзинах на её двух
+        границах.
+        """
+        if not self.counts.size:
+            return np.zeros(len(edges) - 1)
+        cumulative = np.concatenate(([0.0], np.cumsum(self.counts)))
+        return np.diff(np.interp(edges, np.clip(self.edges, self.low, self.high), cumulative))
+
+
+class BottomKSample:
+    """Равномерная выборка без возвращения: *size* значений с наименьшими ключами.
+
+    Каждому значению присваивается случайный ключ из U(0, 1); выборка двух
+    частей — *size* наименьших ключей их объединения, поэтому объединение
+    точное и не зависит от порядка частей.
+
+    Args:
+        size: Размер выборки.
+        rng: Генератор случайных ключей.
+    """
+
+    def __init__(self, size: int = SAMPLE_SIZE, rng: Optional[np.random.Generator] = None) -> None:
+        self.size = size
+        self.count = 0
+        self.keys = np.empty(0)
+        self.values = np.empty(0)
+        self._rng = rng if rng is not None else np.random.default_rng()
+
+    @property
+    def complete(self) -> bool:
+        """Содержит ли выборка все значения столбца."""
+        return self.count <= self.size
+
+    def _keep(self, keys: np.ndarray, values: np.ndarray) -> None:
+        if keys.size > self.size:
+            chosen = np.argpartition(keys, self.size - 1)[:self.size]
+            keys, values = keys[chosen], values[chosen]
+        self.keys, self.values = keys, values
+
+    def update(self, values: np.ndarray) -> None:
+        """Добавить значения (без NaN)."""
+        self.count += values.size
+        keys = self._rng.random(values.size)
+        self._keep(np.concatenate((self.keys, keys)), np.concatenate((self.values, values)))
+
+    def merge(self, other: "BottomKSample") -> None:
+        """Добавить выборку другой части столбца."""
+        self.count += other.count
+        self._keep(np.concatenate((self.keys, other.keys)), np.concatenate((self.values, other.values)))
+
+
+# ---------------------------------------------------------------------------
+#   Сводка таблицы
+# ---------------------------------------------------------------------------
+
+class StreamingSummary:
+    """Потоковая сводка по числовым столбцам таблицы.
+
+    Столбцы определяются по первой части; нечисловые столбцы игнорируются.
+
+    Args:
+        k: Точность эскизов KLL.
+        sample_size: Размер выборки столбца.
+        seed: Зерно генератора случайных чисел (для воспроизводимости).
+    """
+
+    def __init__(self, k: int = KLL_K, sample_size: int = SAMPLE_SIZE, seed: Optional[int] = None) -> None:
+        self.k = k
+        self.sample_size = sample_size
+        self._rng = np.random.default_rng(seed)
+        self.columns: Optional[Tuple[Hashable, ...]] = None
+        self._positions: Dict[Hashable, int] = {}
+        self.integer: Dict[Hashable, bool] = {}
+        self.moments: Optional[Moments] = None
+        self.sketches: Dict[Hashable, KllSketch] = {}
+        self.histograms: Dict[Hashable, StreamHistogram] = {}
+        self.samples: Dict[Hashable, BottomKSample] = {}
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame], **kwargs) -> "StreamingSummary":
+        """Сводка по последовательности частей таблицы."""
+        summary = cls(**kwargs)
+        for chunk in chunks:
+            summary.update(chunk)
+        return summary
+
+    def _init_columns(self, numeric: pd.DataFrame) -> None:
+        self.columns = tuple(numeric.columns)
+        self._positions = column_positions(self.columns)
+        self.integer = {col: pd.api.types.is_integer_dtype(dtype) for col, dtype in numeric.dtypes.items()}
+        self.moments = Moments(len(self.columns))
+        for col in self.columns:
+            self.sketches[col] = KllSketch(self.k, self._rng)
+            self.histograms[col] = StreamHistogram()
+            self.samples[col] = BottomKSample(self.sample_size, self._rng)
+
+    def update(self, chunk: pd.DataFrame) -> "StreamingSummary":
+        """Добавить часть таблицы.
+
+        Raises:
+            ValueError: Если столбцы части не совпадают с первой частью или
+                в ней есть бесконечные значения.
+        """
+        numeric = chunk.select_dtypes(include="number")
+        if self.columns is None:
+            self._init_columns(numeric)
+        elif tuple(numeric.columns) != self.columns:
+            raise ValueError("Числовые столбцы части не совпадают с предыдущими частями")
+        values = numeric.to_numpy(dtype=float, na_value=np.nan)
+        if np.isinf(values).any():
+            raise ValueError("Бесконечные значения не поддерживаются потоковой сводкой")
+        self.moments.update(values)
+        for k, col in enumerate(self.columns):
+            present = values[:, k][~np.isnan(values[:, k])]
+            self.sketches[col].update(present)
+            self.histograms[col].update(present)
+            self.samples[col].update(present)
+        return self
+
+    def merge(self, other: "StreamingSummary") -> "StreamingSummary":
+        """Добавить сводку, посчитанную по другим частям той же таблицы."""
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self._init_columns(pd.DataFrame(columns=other.columns))
+            self.integer = dict(other.integer)
+        elif other.columns != self.columns:
+            raise ValueError("Сводки построены по разным столбцам")
+        self.moments.merge(other.moments)
+        for col in self.columns:
+            self.sketches[col].merge(other.sketches[col])
+            self.histograms[col].merge(other.histograms[col])
+            self.samples[col].merge(other.samples[col])
+        return self
+
+    # --- Отчёт ---------------------------------------------------------------
+
+    def sample_frame(self, col: Hashable) -> pd.DataFrame:
+        """Равномерная выборка столбца *col* (весь столбец, пока он короче выборки)."""
+        sample = self.samples[col].values
+        return pd.DataFrame({col: sample.astype(np.int64) if self.integer[col] else sample})
+
+    def column(self, col: Hashable) -> Dict[str, float]:
+        """Показатели столбца — те же ключи, что у :meth:`NumericSummary.column`.
+
+        Дополнительно ``exact`` — посчитаны ли квантили и выбросы точно,
+        ``rank_error`` — граница ошибки ранга квантилей в долях и
+        ``outliers_error`` — граница ошибки числа выбросов при найденных
+        квартилях (обе 0 для точных).
+        """
+        k = self._positions[col]
+        moments = self.moments
+        std, skew, kurt = (values[k] for values in moments.statistics())
+        count = int(moments.count[k])
+        sample, sketch = self.samples[col], self.sketches[col]
+        if sample.complete:
+            # Весь столбец в выборке: квантили и выбросы точные
+            exact = compute_column_stats(self.sample_frame(col)).column(col)
+            q1, median, q3 = exact["q1"], exact["median"], exact["q3"]
+            outliers, whisker_low, whisker_high = exact["outliers_count"], exact["whisker_low"], exact["whisker_high"]
+            rank_error = outliers_error = 0.0
+        else:
+            q1, median, q3 = (float(value) for value in sketch.quantile([0.25, 0.5, 0.75]))
+            iqr = q3 - q1
+            low_fence, high_fence = q1 - OUTLIER_IQR_FACTOR * iqr, q3 + OUTLIER_IQR_FACTOR * iqr
+            # Ранги границ — по гистограмме или эскизу, у кого граница ошибки меньше
+            histogram = self.histograms[col]
+            below, below_error = min(histogram.rank(low_fence), (sketch.rank(low_fence), sketch.rank_error),
+                                     key=lambda estimate: estimate[1])
+            upto, upto_error = min(histogram.rank(high_fence), (sketch.rank(high_fence, inclusive=True),
+                                   sketch.rank_error), key=lambda estimate: estimate[1])
+            outliers = int(round(below + count - upto))
+            outliers_error = below_error + upto_error
+            whisker_low, whisker_high = self.histograms[col].inner_extremes(low_fence, high_fence)
+            whisker_low = max(whisker_low, float(moments.min[k]))
+            whisker_high = min(whisker_high, float(moments.max[k]))
+            rank_error = sketch.normalized_error()
+        return {
+            "count": count,
+            "mean": float(moments.mean[k]) if count else float("nan"),
+            "median": median,
+            "std": float(std),
+            "min": float(moments.min[k]) if count else float("nan"),
+            "max": float(moments.max[k]) if count else float("nan"),
+            "skewness": float(skew),
+            "kurtosis": float(kurt),
+            "q1": q1,
+            "q3": q3,
+            "iqr": q3 - q1,
+            "whisker_low": whisker_low,
+            "whisker_high": whisker_high,
+            "outliers_count": outliers,
+            "outliers_percent": outliers / count * 100 if count else float("nan"),
+            "exact": sample.complete,
+            "rank_error": rank_error,
+            "outliers_error": outliers_error,
+        }
+
+    def histogram(
+        self, col: Hashable, density: bool = False, column: Optional[Dict[str, float]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Гистограмма столбца по правилу ``bins="auto"`` (как у ``np.histogram``).
+
+        *column* — уже посчитанный :meth:`column` этого столбца.
+        """
+        if self.samples[col].complete:
+            return compute_histograms(self.sample_frame(col)).column(col, density=density)
+        column = column if column is not None else self.column(col)
+        nbins = int(bin_counts(
+            "auto", np.array([column["count"]]), np.array([column["min"]]), np.array([column["max"]]),
+            np.array([column["q1"]]), np.array([column["q3"]]), np.array([self.integer[col]]),
+        )[0])
+        low, high = column["min"], column["max"]
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        edges = np.linspace(low, high, nbins + 1)
+        counts = self.histograms[col].rebin(edges)
+        if density:
+            counts = counts / np.diff(edges) / column["count"]
+        return counts, edges
+
+    def distribution_stats(self, col: Hashable, column: Optional[Dict[str, float]] = None) -> Dict[str, object]:
+        """Статистики карточки столбца — поля ``analyze_distributions``.
+
+        *column* — уже посчитанный :meth:`column` этого столбца.
+        """
+        column = column if column is not None else self.column(col)
+        sample = self.samples[col]
+        normality = check_sample(sample.values, sample.complete, column["count"],
+                                 column["skewness"], column["kurtosis"])
+        return {
+            "mean": column["mean"],
+            "median": column["median"],
+            "std": column["std"],
+            "skewness": column["skewness"],
+            "kurtosis": column["kurtosis"],
+            **normality,
+            "outliers_count": column["outliers_count"],
+            "outliers_percent": column["outliers_percent"],
+        }
@@ -0,0 +1,92 @@
+"""
+Общие промежуточные результаты для всех генераторов отчётов.
+
+:class:`NumericSummary` выделяет числовые столбцы таблицы один раз и
+лениво, по первому обращению, считает для них сразу по всем столбцам:
+
+* описательные статистики — моменты, экстремумы, квартили, IQR и число
+  выбросов (см. :mod:`generators.column_stats`);
+* корреляционную матрицу Пирсона и упорядоченные пары столбцов (см.
+  :mod:`generators.correlation`);
+* гистограммы по правилу ``bins="auto"`` (см. :mod:`generators.histograms`);
+* кривые ядерной оценки плотности (см. :mod:`generators.kde`);
+* тесты нормальности, выбранные по длине столбца (см.
+  :mod:`generators.normality`).
+
+Генераторы распределений, корреляций и графиков принимают готовую сводку
+необязательным аргументом ``summary``; без него создают собственную. Так
+маршрут ``/analyze_all`` считает статистики один раз на все разделы отчёта.
+Пропуски (NaN) исключаются по каждому столбцу отдельно — как в
+соответствующих методах ``pandas.Series``.
+"""
+
+from __future__ import annotations
+
+from functools import cached_property
+from typing import Dict, Hashable
+
+import pandas as pd
+
+from generators.column_stats import ColumnStats, compute_column_stats
+from generators.correlation import CorrelationResult, compute_correlation
+from generators.histograms import Histograms, compute_histograms
+from generators.kde import DensityCurves, compute_kde
+from generators.normality import NormalityTests, check_normality
+from utils.metrics import phase
+
+__all__ = ["NumericSummary"]
+
+
+class NumericSummary:
+    """Ленивая сводка по числовым столбцам таблицы.
+
+    Args:
+        df: Исходная таблица (нечисловые столбцы игнорируются).
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.numeric: pd.DataFrame = df.select_dtypes(include="number")
+
+    @property
+    def columns(self) -> pd.Index:
+        """Имена числовых столбцов."""
+        return self.numeric.columns
+
+    @cached_property
+    def stats(self) -> ColumnStats:
+        """Описательные статистики всех столбцов, посчитанные одним проходом."""
+        with phase("statistics"):
+            return compute_column_stats(self.numeric)
+
+    @cached_property
+    def correlation(self) -> CorrelationResult:
+        """Корреляционная матрица Пирсона и пары столбцов по убыванию коэффициента."""
+        with phase("statistics"):
+            return compute_correlation(self.numeric)
+
+    @cached_property
+    def histograms(self) -> Histograms:
+        """Гистограммы всех столбцов (``bins="auto"``), посчитанные одним проходом."""
+        with phase("statistics"):
+            return compute_histograms(self.numeric)
+
+    @cached_property
+    def kde(self) -> DensityCurves:
+        """Бинированная KDE всех столбцов (ширина окна — правило Скотта)."""
+        with phase("statistics"):
+            return compute_kde(self.numeric)
+
+    @cached_property
+    def normality(self) -> NormalityTests:
+        """Тесты нормальности всех столбцов (моменты берутся из :attr:`stats`)."""
+        column_stats = self.stats
+        with phase("normality"):
+            return check_normality(self.numeric, column_stats)
+
+    def column(self, col: Hashable) -> Dict[str, float]:
+        """Все сводные показатели одного столбца в виде словаря.
+
+        Ключи: count, mean, median, std, min, max, skewness, kurtosis, q1, q3,
+        iqr, whisker_low, whisker_high, outliers_count, outliers_percent.
+        """
+        return self.stats.column(col)
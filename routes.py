@@ -5,27 +5,118 @@ HTTP-маршруты Bottle-приложения
 from __future__ import annotations
 
 import logging
+import os
 import traceback
 from datetime import datetime
 from uuid import uuid4
 import html
-from typing import List, Dict
+from typing import Any, Callable, Hashable, List
 
 import pandas as pd
-from bottle import request, response, route, view
+from bottle import HTTPResponse, install, request, response, route, view
 
 # --- Внутренние пакеты -------------------------------------------------------
+from utils.settings import env_float, env_int
+from utils.session_store import SessionStore
+from utils.disk_session_store import DiskSessionStore
+from utils.dataset_handle import DatasetHandle
+from utils.image_policy import ImagePolicy, default_image_policy, use_image_policy
+from utils.image_store import IMAGES, media_type
+from utils.job_queue import JobQueue, QueueFullError
+from utils.metrics import REGISTRY, MetricsPlugin
+from utils.result_cache import ResultCache
 from utils.table_maker import render_page
+from utils.lazy_import import lazy_module
 from services.table_service import generate_table, build_sample_html
-from services.correlation_service import build_correlation_report
-from services.plot_service import build_plot
-from services.prediction_service import build_prediction, save_prediction
-from services.distribution_service import build_distribution_report
+
+# Сервисы отчётов тянут matplotlib, seaborn, scipy и scikit-learn: они
+# импортируются при первом запросе к своему маршруту (или при прогреве,
+# см. utils.lazy_import), а не при старте процесса.
+correlation_service = lazy_module("services.correlation_service")
+plot_service = lazy_module("services.plot_service")
+prediction_service = lazy_module("services.prediction_service")
+distribution_service = lazy_module("services.distribution_service")
+analysis_service = lazy_module("services.analysis_service")
 
 # -----------------------------------------------------------------------------
 #   Хранилище наборов данных по идентификатору сессии
 # -----------------------------------------------------------------------------
-session_store: Dict[str, pd.DataFrame] = {}
+def _create_session_store() -> SessionStore | DiskSessionStore:
+    """Create the session store selected by ``SESSION_STORE`` (memory|disk)."""
+    max_bytes = env_int("SESSION_STORE_MAX_MB", 512) * 2**20
+    ttl = env_float("SESSION_TTL_SECONDS", 3600.0)
+    if os.environ.get("SESSION_STORE", "memory").lower() == "disk":
+        root = os.environ.get("SESSION_STORE_DIR", os.path.join("data", "sessions"))
+        return DiskSessionStore(root, max_bytes=max_bytes, ttl=ttl)
+    return SessionStore(max_bytes=max_bytes, ttl=ttl)
+
+
+session_store = _create_session_store()
+result_cache = ResultCache(max_bytes=env_int("RESULT_CACHE_MAX_MB", 64) * 2**20)
+# Состояние задач живёт в процессе, принявшем задачу; при нескольких процессах
+# сервера production-режим выключает фоновый режим (JOB_ASYNC=0, см. app.py),
+# и запросы с async=1 выполняются синхронно.
+JOB_ASYNC = os.environ.get("JOB_ASYNC", "1") != "0"
+job_queue = JobQueue(
+    max_workers=env_int("JOB_WORKERS", max(1, (os.cpu_count() or 2) // 2)),
+    max_pending=env_int("JOB_QUEUE_MAX_PENDING", 32),
+    result_ttl=env_float("JOB_RESULT_TTL_SECONDS", 600.0),
+)
+
+install(MetricsPlugin(REGISTRY))
+
+
+def _collect_store_metrics():
+    """Показатели кэшей, хранилищ и очереди задач для ``/metrics``."""
+    cache = result_cache.stats()
+    sessions = session_store.stats()
+    jobs = job_queue.stats()
+    images = IMAGES.stats()
+    return [
+        ("result_cache_entries", "gauge", "Записей в кэше результатов.",
+         [({}, cache.entries)]),
+        ("result_cache_bytes", "gauge", "Объём кэша результатов, байт.",
+         [({}, cache.bytes_used)]),
+        ("result_cache_lookups_total", "counter", "Обращения к кэшу результатов.",
+         [({"result": "hit"}, cache.hits), ({"result": "miss"}, cache.misses)]),
+        ("result_cache_evictions_total", "counter", "Вытеснения из кэша результатов.",
+         [({}, cache.evictions)]),
+        ("session_store_entries", "gauge", "Сохранённых таблиц сессий.",
+         [({}, sessions.entries)]),
+        ("session_store_bytes", "gauge", "Объём таблиц сессий, байт.",
+         [({}, sessions.bytes_used)]),
+        ("session_store_lookups_total", "counter", "Обращения к хранилищу сессий.",
+         [({"result": "hit"}, sessions.hits), ({"result": "miss"}, sessions.misses)]),
+        ("session_store_removals_total", "counter", "Таблицы, удалённые хранилищем.",
+         [({"reason": "evicted"}, sessions.evictions),
+          ({"reason": "expired"}, sessions.expirations)]),
+        ("job_queue_pending", "gauge", "Незавершённые фоновые задачи.",
+         [({}, jobs.pending)]),
+        ("job_queue_jobs_total", "counter", "Фоновые задачи по исходу.",
+         [({"outcome": "submitted"}, jobs.submitted),
+          ({"outcome": "rejected"}, jobs.rejected),
+          ({"outcome": "failed"}, jobs.failed)]),
+        ("image_store_entries", "gauge", "Картинок в памяти хранилища.",
+         [({}, images.entries)]),
+        ("image_store_bytes", "gauge", "Объём картинок хранилища, байт.",
+         [({"tier": "memory"}, images.bytes_used), ({"tier": "disk"}, images.disk_bytes)]),
+        ("image_store_lookups_total", "counter", "Обращения к хранилищу картинок.",
+         [({"result": "hit"}, images.hits), ({"result": "miss"}, images.misses)]),
+        ("image_store_evictions_total", "counter", "Картинки, вытесненные из памяти.",
+         [({}, images.evictions)]),
+    ]
+
+
+REGISTRY.register_collector(_collect_store_metrics)
+
+_NO_DATA_HTML = (
+    "<div class='alert alert-danger'>Сначала сгенерируйте или загрузите "
+    "таблицу</div>"
+)
+_EXPIRED_HTML = (
+    "<div class='alert alert-warning'>Срок хранения набора данных истёк. "
+    "Сгенерируйте или загрузите таблицу заново</div>"
+)
 
 
 def _get_session_id() -> str:
@@ -37,14 +128,141 @@ def _get_session_id() -> str:
     return sid
 
 
+def get_current_dataset() -> DatasetHandle | None:
+    """Retrieve the versioned dataset handle stored for current session."""
+    return session_store.get(_get_session_id())
+
+
 def get_current_df() -> pd.DataFrame | None:
     """Retrieve DataFrame stored for current session."""
-    return session_store.get(_get_session_id())
+    dataset = get_current_dataset()
+    return dataset.df if dataset is not None else None
+
+
+def set_current_df(df: pd.DataFrame) -> DatasetHandle:
+    """Save DataFrame for current session and drop results cached for the old one.
+
+    The frame is fingerprinted once here; the returned handle carries the
+    fingerprint and the per-session version number.
+    """
+    sid = _get_session_id()
+    # version_of() does not touch the TTL, LRU order, hit counters or data files
+    old = session_store.version_of(sid)
+    old_version, old_fingerprint = old if old is not None else (0, None)
+    dataset = DatasetHandle.from_frame(df, version=old_version + 1)
+    session_store.set(sid, dataset)
+    if old_fingerprint is not None and old_fingerprint != dataset.fingerprint:
+        result_cache.invalidate(old_fingerprint)
+    return dataset
+
+
+def _cached(
+    dataset: DatasetHandle,
+    route_name: str,
+    params: Hashable,
+    compute: Callable[[], Any],
+    cacheable: Callable[[Any], bool] | None = None,
+) -> Any:
+    """Return a cached result for (dataset, route, params) or compute it.
+
+    Images are encoded with the request's image policy, which is part of the key.
+    """
+    policy = _request_image_policy()
+    key = (dataset.fingerprint, route_name, params, policy)
+    with use_image_policy(policy):
+        return result_cache.get_or_compute(key, compute, cacheable, valid=IMAGES.available)
+
+
+def _wants_async() -> bool:
+    """Whether the client asked to run the analysis as a background job.
+
+    Always ``False`` when background jobs are disabled with ``JOB_ASYNC=0``.
+    """
+    if not JOB_ASYNC:
+        return False
+    return request.forms.get("async") == "1" or request.query.get("async") == "1"
+
+
+def _request_image_policy() -> ImagePolicy:
+    """Deployment image policy with the request's ``img_format``/``img_dpi`` applied.
+
+    Invalid values are answered with ``400 {"error": ...}``.
+    """
+    try:
+        return default_image_policy().override(
+            format=request.forms.get("img_format") or request.query.get("img_format"),
+            dpi=request.forms.get("img_dpi") or request.query.get("img_dpi"),
+        )
+    except ValueError as exc:
+        raise HTTPResponse({"error": str(exc)}, status=400)
+
+
+def _wants_client_render() -> bool:
+    """Whether the client draws the charts itself from a JSON summary."""
+    return request.forms.get("render") == "client" or request.query.get("render") == "client"
+
+
+def _chart_json(payload: str, error: str | None = None) -> str:
+    """Answer with a chart summary, or with ``400 {"error": ...}``."""
+    if error is not None:
+        raise HTTPResponse({"error": error}, status=400)
+    response.content_type = "application/json; charset=utf-8"
+    return payload
+
+
+def _run_analysis(
+    dataset: DatasetHandle,
+    route_name: str,
+    params: Hashable,
+    func: Callable[..., Any],
+    args: tuple,
+    render: Callable[[Any], str],
+    cacheable: Callable[[Any], bool] | None = None,
+) -> str:
+    """Run ``func(*args)`` synchronously or as a background job.
+
+    The raw result goes through the result cache in both modes and is turned
+    into the final HTML by ``render``. In async mode a cache hit is answered
+    immediately; otherwise the job id is returned with ``202 Accepted``.
+    Images are encoded with the request's image policy, which is part of the key.
+    """
+    policy = _request_image_policy()
+    key = (dataset.fingerprint, route_name, params, policy)
+    if not _wants_async():
+        with use_image_policy(policy):
+            return render(result_cache.get_or_compute(
+                key, lambda: func(*args), cacheable, valid=IMAGES.available,
+            ))
+
+    cached = result_cache.get(key, valid=IMAGES.available)
+    if cached is not None:
+        response.content_type = "text/html; charset=utf-8"
+        return render(cached)
 
+    def on_done(value: Any) -> str:
+        result_cache.put_if(key, value, cacheable)
+        return render(value)
 
-def set_current_df(df: pd.DataFrame) -> None:
-    """Save DataFrame for current session."""
-    session_store[_get_session_id()] = df
+    try:
+        with use_image_policy(policy):  # передаётся процессу задачи
+            job_id = job_queue.submit(func, *args, on_done=on_done)
+    except QueueFullError as exc:
+        raise HTTPResponse(
+            {"status": "rejected", "error": str(exc)},
+            status=503,
+            headers={"Retry-After": "5"},
+        )
+    raise HTTPResponse(
+        {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"},
+        status=202,
+    )
+
+
+def _missing_df_html() -> str:
+    """HTML alert explaining why the current session has no DataFrame."""
+    if session_store.is_expired(_get_session_id()):
+        return _EXPIRED_HTML
+    return _NO_DATA_HTML
 
 # -----------------------------------------------------------------------------
 #   Базовые статические страницы
@@ -70,18 +288,15 @@ def about() -> dict[str, int]:
 @route("/show_sample", method="POST")
 def show_sample() -> str:
     """Показать выборку строк из текущей таблицы."""
-    df = get_current_df()
+    dataset = get_current_dataset()
 
-    if df is None:
-        return (
-            "<div class='alert alert-danger'>Сначала сгенерируйте или загрузите "
-            "таблицу</div>"
-        )
+    if dataset is None:
+        return _missing_df_html()
 
     try:
         n = int(request.forms.get("n", 5))
         mode = request.forms.get("mode", "head")
-        return build_sample_html(df, n, mode)
+        return build_sample_html(dataset, n, mode)
     except Exception:  # noqa: WPS440
         logging.error("Ошибка в show_sample", exc_info=True)
         return (
@@ -112,7 +327,12 @@ def generate_table_route() -> str:
             )
 
         if df is not None:
-            set_current_df(df)
+            try:
+                set_current_df(df)
+            except ValueError as exc:
+                message_html = (
+                    f"<div class='alert alert-danger'>{html.escape(str(exc))}</div>"
+                )
 
         # Минимальная страница-обёртка (загружается во <iframe>)
         return (
@@ -140,19 +360,23 @@ def generate_table_route() -> str:
 @route("/generate_correlation", method="POST")
 def generate_correlation_route() -> str:
     """Сформировать отчёт о корреляциях."""
-    df = get_current_df()
+    dataset = get_current_dataset()
 
-    if df is None:
-        error_html = (
-            "<div class='alert alert-danger'>Сначала сгенерируйте или загрузите "
-            "таблицу</div>"
-        )
-        return render_page("", error_html)
+    if dataset is None:
+        return render_page("", _missing_df_html())
 
     try:
-        report_html, info_html = build_correlation_report(df)
         response.content_type = "text/html; charset=utf-8"
-        return render_page(report_html, info_html)
+        return _run_analysis(
+            dataset,
+            "generate_correlation",
+            (),
+            correlation_service.build_correlation_report,
+            (dataset,),
+            render=lambda result: render_page(*result),
+        )
+    except HTTPResponse:
+        raise
     except Exception as exc:  # noqa: WPS440
         error_html = (
             f"<div class='alert alert-danger'>{html.escape(str(exc))}</div>"
@@ -166,19 +390,31 @@ def generate_correlation_route() -> str:
 @route("/generate_plot", method="POST")
 def generate_plot_route() -> str:
     """Построить график по текущему датасету."""
-    df = get_current_df()
+    dataset = get_current_dataset()
 
-    if df is None:
-        return render_page(
-            "",
-            "<div class='alert alert-danger'>Сначала сгенерируйте или "
-            "загрузите таблицу</div>",
-        )
+    if dataset is None:
+        return render_page("", _missing_df_html())
+
+    plot_type = request.forms.get("plot_type") or request.query.get("plot_type")
+    if _wants_client_render():
+        return _chart_json(*_cached(
+            dataset,
+            "generate_plot",
+            (plot_type, "client"),
+            lambda: plot_service.build_plot_data(dataset, plot_type),
+            cacheable=lambda result: result[1] is None,
+        ))
 
-    plot_type = request.forms.get("plot_type")
-    html_snippet, error_html = build_plot(df, plot_type)
     response.content_type = "text/html; charset=utf-8"
-    return render_page(html_snippet, error_html)
+    return _run_analysis(
+        dataset,
+        "generate_plot",
+        (plot_type,),
+        plot_service.build_plot,
+        (dataset, plot_type),
+        render=lambda result: render_page(*result),
+        cacheable=lambda result: result[1] is None,
+    )
 
 
 # -----------------------------------------------------------------------------
@@ -187,16 +423,20 @@ def generate_plot_route() -> str:
 @route("/make_prediction", method="POST")
 def make_prediction_route() -> str:
     """Сделать прогноз и отобразить результат."""
-    df = get_current_df()
-
-    if df is None:
-        return render_page(
-            "",
-            "<div class='alert alert-danger'>Сначала сгенерируйте или "
-            "загрузите таблицу</div>",
-        )
-
-    html_block, error_html = build_prediction(df)
+    dataset = get_current_dataset()
+
+    if dataset is None:
+        return render_page("", _missing_df_html())
+
+    # Поля формы и ключ кэша, и аргументы прогноза
+    params = (request.forms.get("target_col"), request.forms.get("features"))
+    html_block, error_html = _cached(
+        dataset,
+        "make_prediction",
+        params,
+        lambda: prediction_service.build_prediction(dataset, *params),
+        cacheable=lambda result: result[1] is None,
+    )
     response.content_type = "text/html; charset=utf-8"
     return render_page(html_block, error_html)
 
@@ -204,9 +444,9 @@ def make_prediction_route() -> str:
 @route("/save_prediction", method="POST")
 def save_prediction_route() -> str:
     """Сохранить результаты предсказания вместе с датасетом."""
-    df = get_current_df()
+    dataset = get_current_dataset()
 
-    if df is None:
+    if dataset is None:
         return "<div class='alert alert-danger'>Нет данных для сохранения</div>"
 
     try:
@@ -214,7 +454,7 @@ def save_prediction_route() -> str:
         features_raw: List[str] = request.forms.get("features", "").split()
         features = [float(x) for x in features_raw]
 
-        return save_prediction(df, target_col, features)
+        return prediction_service.save_prediction(dataset, target_col, features)
     except Exception as exc:  # noqa: WPS440
         return f"<div class='alert alert-danger'>{exc}</div>"
 
@@ -225,18 +465,31 @@ def save_prediction_route() -> str:
 @route("/generate_distributions", method="POST")
 def generate_distributions_route() -> str:
     """Сформировать отчёт о распределениях признаков."""
-    df = get_current_df()
+    dataset = get_current_dataset()
 
-    if df is None:
-        return (
-            "<div class='alert alert-danger'>Сначала сгенерируйте или "
-            "загрузите таблицу</div>"
-        )
+    if dataset is None:
+        return _missing_df_html()
 
     try:
-        html_report = build_distribution_report(df)
+        if _wants_client_render():
+            return _chart_json(_cached(
+                dataset,
+                "generate_distributions",
+                ("client",),
+                lambda: distribution_service.build_distribution_data(dataset),
+            ))
+
         response.content_type = "text/html; charset=utf-8"
-        return html_report
+        return _run_analysis(
+            dataset,
+            "generate_distributions",
+            (),
+            distribution_service.build_distribution_report,
+            (dataset,),
+            render=lambda html_report: html_report,
+        )
+    except HTTPResponse:
+        raise
     except Exception:  # noqa: WPS440
         logging.error("Ошибка в generate_distributions_route", exc_info=True)
         return (
@@ -245,6 +498,118 @@ def generate_distributions_route() -> str:
         )
 
 
+# -----------------------------------------------------------------------------
+#   Сводный анализ
+# -----------------------------------------------------------------------------
+@route("/analyze_all", method=["GET", "POST"])
+def analyze_all_route() -> str:
+    """Все варианты анализа одним отчётом с общими промежуточными расчётами."""
+    dataset = get_current_dataset()
+
+    if dataset is None:
+        return render_page("", _missing_df_html())
+
+    params = request.forms if request.method == "POST" else request.query
+    plot_type = params.get("plot_type") or "hist"
+    target_raw = params.get("target_col")
+    features_raw = params.get("features")
+    try:
+        target_col = int(target_raw) - 1 if target_raw else None
+        features = [float(x) for x in features_raw.split()] if features_raw else None
+    except ValueError:
+        return render_page(
+            "",
+            "<div class='alert alert-danger'>Номер столбца и признаки должны быть числами.</div>",
+        )
+
+    try:
+        response.content_type = "text/html; charset=utf-8"
+        return _run_analysis(
+            dataset,
+            "analyze_all",
+            (plot_type, target_col, tuple(features) if features else None),
+            analysis_service.build_full_report,
+            (dataset, plot_type, target_col, features),
+            render=lambda report_html: report_html,
+        )
+    except HTTPResponse:
+        raise
+    except Exception as exc:  # noqa: WPS440
+        logging.error("Ошибка в analyze_all_route", exc_info=True)
+        return render_page("", f"<div class='alert alert-danger'>{html.escape(str(exc))}</div>")
+
+
+# -----------------------------------------------------------------------------
+#   Фоновые задачи
+# -----------------------------------------------------------------------------
+@route("/jobs/<job_id>")
+def job_status_route(job_id: str):
+    """Состояние фоновой задачи; по завершении — готовый HTML-отчёт."""
+    status = job_queue.status(job_id)
+
+    if status is None:
+        response.status = 404
+        return {"job_id": job_id, "status": "expired",
+                "error": "Задача не найдена или её результат устарел."}
+
+    timings = {
+        "queued_seconds": round(status.queued_seconds, 3),
+        "run_seconds": round(status.run_seconds, 3),
+    }
+    if status.state == "done":
+        response.content_type = "text/html; charset=utf-8"
+        response.set_header("X-Job-Run-Seconds", str(timings["run_seconds"]))
+        return status.result
+    if status.state == "failed":
+        response.status = 500
+        return {"job_id": job_id, "status": "failed", "error": status.error, **timings}
+
+    response.status = 202
+    return {
+        "job_id": job_id,
+        "status": status.state,
+        "progress": round(status.progress, 3),
+        **timings,
+    }
+
+
+# -----------------------------------------------------------------------------
+#   Картинки отчётов
+# -----------------------------------------------------------------------------
+IMAGE_MAX_AGE = 365 * 24 * 3600
+
+
+@route("/img/<name:re:[0-9a-f]{32}\\.(?:png|webp|svg)>")
+def image_route(name: str):
+    """Картинка из хранилища; адрес зависит от содержимого, поэтому immutable."""
+    headers = {
+        "ETag": f'"{name}"',
+        "Cache-Control": f"public, max-age={IMAGE_MAX_AGE}, immutable",
+    }
+    if_none_match = request.headers.get("If-None-Match", "")
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if headers["ETag"] in tags:
+        return HTTPResponse(status=304, headers=headers)
+
+    data = IMAGES.get(name)
+    if data is None:
+        response.status = 404
+        return {"error": "Картинка не найдена или вытеснена из хранилища."}
+    headers["Content-Type"] = media_type(name)
+    headers["Content-Length"] = str(len(data))
+    return HTTPResponse(b"" if request.method == "HEAD" else data, headers=headers)
+
+
+# -----------------------------------------------------------------------------
+#   Метрики
+# -----------------------------------------------------------------------------
+@route("/metrics")
+def metrics_route() -> str:
+    """Метрики процесса в текстовом формате Prometheus."""
+    response.content_type = "text/plain; version=0.0.4; charset=utf-8"
+    return REGISTRY.render()
+
+
 # -----------------------------------------------------------------------------
 #   Учебные статические варианты
 # -----------------------------------------------------------------------------
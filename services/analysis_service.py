@@ -0,0 +1,121 @@
+"""
+Сервис сводного анализа: все варианты по одной таблице за один запрос.
+
+Основные функции:
+    * build_full_report — распределения, корреляции, графики и прогноз
+      по общей :class:`generators.summary.NumericSummary` + сохранение в файл
+"""
+
+from __future__ import annotations
+
+import html
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from generators.correlation_generator import build_correlation_sections
+from generators.distrib_generator import analyze_distributions, render_distribution_html
+from generators.plot_generator import build_plot_html
+from generators.prediction_generator import build_prediction_numbers_
+from generators.summary import NumericSummary
+from utils.dataset_handle import Dataset, as_frame, handle_or_none
+from utils.image_store import IMAGES
+from utils.metrics import phase
+
+# Каталог сохранённых сводных отчётов
+REPORT_DIR = Path("data") / "analysis"
+
+
+def _alert(message: str, level: str = "warning") -> str:
+    return f"<div class='alert alert-{level}'>{html.escape(message)}</div>"
+
+
+def _section(title: str, body: str) -> str:
+    return f"""
+                <section class="mb-5">
+                    <h3 class="mb-3">{title}</h3>
+                    {body}
+                </section>"""
+
+
+def build_full_report(
+    data: Dataset,
+    plot_type: str = "hist",
+    target_col: Optional[int] = None,
+    features: Optional[Sequence[float]] = None,
+) -> str:
+    """
+    Построить единый HTML-отчёт по всем вариантам анализа.
+
+    Числовые столбцы, моменты, квартили и корреляционная матрица
+    считаются один раз и передаются всем генераторам; гистограммы раздела
+    графиков рисуются по корзинам ``summary.histograms``, общим с разделом
+    распределений. Раздел прогноза строится, только если заданы
+    *target_col* (индекс с нуля) и *features*.
+
+    Raises:
+        ValueError: Если в таблице нет числовых столбцов.
+    """
+    df = as_frame(data)
+    handle = handle_or_none(data)
+    summary = NumericSummary(df)
+    if summary.numeric.empty:
+        raise ValueError("Нет числовых столбцов для анализа.")
+
+    analysis = analyze_distributions(df, summary)
+    sections: List[str] = [
+        _section("Распределения", render_distribution_html(analysis)),
+    ]
+
+    if summary.numeric.shape[1] >= 2:
+        sections.append(_section("Корреляции", build_correlation_sections(df, summary)))
+    else:
+        sections.append(_section(
+            "Корреляции", _alert("Недостаточно числовых столбцов для анализа (нужно ≥ 2)."),
+        ))
+
+    try:
+        plots_html = build_plot_html(df, plot_type, summary, standalone=False)
+    except ValueError as exc:
+        plots_html = _alert(str(exc), "danger")
+    sections.append(_section("Графики", plots_html))
+
+    if target_col is not None and features is not None:
+        prediction_html = build_prediction_numbers_(summary.numeric, target_col, list(features))
+    else:
+        prediction_html = _alert(
+            "Укажите номер целевого столбца и значения признаков, чтобы получить прогноз.",
+            "secondary",
+        )
+    sections.append(_section("Прогноз", prediction_html))
+
+    report_html = f"""
+        <!DOCTYPE html>
+        <html lang="ru">
+        <head>
+            <meta charset="UTF-8">
+            <title>Сводный анализ</title>
+            <link href="/static/content/bootstrap.min.css" rel="stylesheet">
+            <style>
+                body {{ padding: 2rem; font-family: sans-serif; }}
+                img {{ max-width: 100%; height: auto; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <h2 class="mb-4">Сводный анализ таблицы</h2>
+                {"".join(sections)}
+            </div>
+        </body>
+        </html>
+    """
+
+    save_dir = REPORT_DIR
+    save_dir.mkdir(parents=True, exist_ok=True)
+    suffix = f"_{handle.short_id}" if handle else ""
+    filename = f"full_report_{datetime.now():%Y%m%d_%H%M%S}{suffix}.html"
+    saved_html = IMAGES.inline(report_html)  # файл открывается без сервера
+    with phase("disk_save"):
+        (save_dir / filename).write_text(saved_html, encoding="utf-8")
+
+    return report_html
@@ -10,32 +10,39 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Tuple
 
-import pandas as pd
-
 from generators.correlation_generator import (
     build_correlation_html,
     save_correlation_report,
 )
+from generators.summary import NumericSummary
+from utils.dataset_handle import Dataset, as_frame, handle_or_none
 
 
-def build_correlation_report(df: pd.DataFrame) -> Tuple[str, str]:
+def build_correlation_report(data: Dataset) -> Tuple[str, str]:
     """
     Выполнить корреляционный анализ и вернуть пару
     (полный HTML-отчёт, HTML-сообщение-уведомление).
 
+    Если передан ``DatasetHandle``, короткий отпечаток набора данных
+    добавляется к имени сохранённого файла.
+
     Исключения пробрасываются наружу.
     """
-    numeric_df = df.select_dtypes(include="number")
-    if numeric_df.shape[1] < 2:
+    df = as_frame(data)
+    handle = handle_or_none(data)
+    summary = NumericSummary(df)  # Числовые столбцы выделяются один раз на отчёт
+    if len(summary.columns) < 2:
         raise ValueError(
             "Недостаточно числовых столбцов для анализа (нужно ≥ 2).",
         )
 
     # Генерация отчёта
-    report_html: str = build_correlation_html(df)
+    report_html: str = build_correlation_html(df, summary)
 
     # Сохранение на диск
-    file_path: Path = save_correlation_report(report_html)
+    file_path: Path = save_correlation_report(
+        report_html, tag=handle.short_id if handle else None,
+    )
     info_html = (
         "<div class='alert alert-info'>Отчёт сохранён: "
         f"<code>{file_path}</code></div>"
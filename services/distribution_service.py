@@ -8,23 +8,38 @@ import os
 from datetime import datetime
 from pathlib import Path
 
-import pandas as pd
-
+from generators.chart_data import to_json
+from generators.distrib_generator import build_distribution_data as build_distribution_summary
 from generators.distrib_generator import generate_distribution_html
+from utils.dataset_handle import Dataset, as_frame, handle_or_none
+from utils.image_store import IMAGES
+from utils.metrics import phase
 
 
-def build_distribution_report(df: pd.DataFrame) -> str:
+def build_distribution_report(data: Dataset) -> str:
     """
     Сформировать отчёт о распределениях и сохранить его.
 
-    Возвращает HTML-отчёт (готов к отображению пользователю).
+    Возвращает HTML-отчёт (готов к отображению пользователю). Для
+    ``DatasetHandle`` в имя файла добавляется короткий отпечаток данных.
     """
-    html_report = generate_distribution_html(df)
+    html_report = generate_distribution_html(as_frame(data))
+    handle = handle_or_none(data)
 
     save_dir = Path("data") / "variant1"
     save_dir.mkdir(parents=True, exist_ok=True)
 
-    filename = f"distribution_analysis_{datetime.now():%Y%m%d_%H%M%S}.html"
-    (save_dir / filename).write_text(html_report, encoding="utf-8")
+    suffix = f"_{handle.short_id}" if handle else ""
+    filename = f"distribution_analysis_{datetime.now():%Y%m%d_%H%M%S}{suffix}.html"
+    saved_html = IMAGES.inline(html_report)  # файл открывается без сервера
+    with phase("disk_save"):
+        (save_dir / filename).write_text(saved_html, encoding="utf-8")
 
     return html_report
+
+
+def build_distribution_data(data: Dataset) -> str:
+    """
+    JSON-сводка распределений для отрисовки в браузере (файл не сохраняется).
+    """
+    return to_json(build_distribution_summary(as_frame(data)))
@@ -7,16 +7,26 @@ from __future__ import annotations
 from typing import Tuple
 import html
 
-import pandas as pd
+from generators.chart_data import to_json
+from generators.plot_generator import build_plot_data as build_plot_summary, build_plot_html
+from utils.dataset_handle import Dataset, as_frame
 
-from generators.plot_generator import build_plot_html
 
-
-def build_plot(df: pd.DataFrame, plot_type: str) -> Tuple[str, str | None]:
+def build_plot(data: Dataset, plot_type: str) -> Tuple[str, str | None]:
     """
     Вернуть (HTML-график, HTML-ошибка|None).
     """
     try:
-        return build_plot_html(df, plot_type), None
+        return build_plot_html(as_frame(data), plot_type), None
     except Exception as exc:  # noqa: WPS440
         return "", f"<div class='alert alert-danger'>Ошибка: {html.escape(str(exc))}</div>"
+
+
+def build_plot_data(data: Dataset, plot_type: str) -> Tuple[str, str | None]:
+    """
+    Вернуть (JSON-сводку графиков для браузера, текст ошибки|None).
+    """
+    try:
+        return to_json(build_plot_summary(as_frame(data), plot_type)), None
+    except Exception as exc:  # noqa: WPS440
+        return "", str(exc)
@@ -7,33 +7,39 @@ from __future__ import annotations
 from typing import Tuple, List
 import html
 
-import pandas as pd
-
 from generators.prediction_generator import (
     build_prediction_numbers,
     build_prediction_numbers_,
     save_data_with_prediction,
 )
+from utils.dataset_handle import Dataset, as_frame
 
 
 # -----------------------------------------------------------------------------
 
 
-def build_prediction(df: pd.DataFrame) -> Tuple[str, str | None]:
+def build_prediction(
+    data: Dataset,
+    target_col: str | None = None,
+    features: str | None = None,
+) -> Tuple[str, str | None]:
     """
     Сформировать числовой прогноз.
 
+    *target_col* и *features* — поля формы (номер целевого столбца с 1 и
+    значения признаков через пробел); если не переданы, берутся из запроса.
+
     Возвращает (HTML-фрагмент, HTML-ошибка|None).
     """
     try:
-        html_block = build_prediction_numbers(df)
+        html_block = build_prediction_numbers(as_frame(data), target_col, features)
         return html_block, None
     except Exception as exc:  # noqa: WPS440
         return "", f"<div class='alert alert-danger'>{html.escape(str(exc))}</div>"
 
 
 def save_prediction(
-    df: pd.DataFrame,
+    data: Dataset,
     target_col: int,
     features: List[float],
 ) -> str:
@@ -42,6 +48,7 @@ def save_prediction(
 
     Возвращает HTML-строку-уведомление.
     """
+    df = as_frame(data)
     prediction_text = build_prediction_numbers_(df, target_col, features)
     save_data_with_prediction(df, prediction_text)
     return "<div class='alert alert-success'>Данные и результат успешно сохранены</div>"
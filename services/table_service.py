@@ -3,6 +3,7 @@
 
 Зависимости:
     * utils.table_maker.build_table
+    * utils.dataset_handle
     * pandas
 """
 
@@ -13,6 +14,7 @@ from typing import Tuple, Optional
 
 import pandas as pd
 
+from utils.dataset_handle import Dataset, as_frame
 from utils.table_maker import build_table
 
 
@@ -55,15 +57,16 @@ def generate_table(  # noqa: WPS211
 # -----------------------------------------------------------------------------
 #   Получение выборки из таблицы
 # -----------------------------------------------------------------------------
-def build_sample_html(df: pd.DataFrame, n: int = 5, mode: str = "head") -> str:
+def build_sample_html(data: Dataset, n: int = 5, mode: str = "head") -> str:
     """
-    Вернуть HTML-страницу с выборкой ``n`` строк из ``df``.
+    Вернуть HTML-страницу с выборкой ``n`` строк из набора данных.
 
     mode:
         * head   — первые n строк
         * tail   — последние n строки
         * random — случайные n строки
     """
+    df = as_frame(data)
     warning_msg = ""
 
     if n < 1:
@@ -0,0 +1,341 @@
+// static/scripts/charts.js
+// ------------------------------------------------------------
+// Отрисовка графиков в браузере по JSON-сводкам сервера (render=client).
+// Без зависимостей: только <canvas> 2D. Подключается до скриптов страниц,
+// которые вызывают Charts.render(container, summary).
+//
+// Формат сводки: { title, items: [{ title, chart, stats_html }] }, где chart:
+//   hist    — { edges[n+1], heights[n], curves?: [{label, color?, x[], y[]}],
+//               mean?, xlabel, ylabel }
+//   box     — { boxes: [{name, q1, median, q3, whisker_low, whisker_high,
+//               outliers[]}], xlabel, ylabel }
+//   scatter — { columns[k], bounds[k][2], corr[k][k],
+//               diagonal: [{edges[], heights[]}],
+//               points?: [k][rows]                       (немного строк)
+//               bins?, pairs?: [{i, j, counts[bins*bins]}] (плотности пар) }
+// Значения null — пропуски (NaN), их не рисуем.
+const Charts = (() => {
+    const COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b'];
+    const PAD = { left: 56, right: 16, top: 16, bottom: 40 };
+
+    /** Создаёт canvas с учётом плотности пикселей экрана. */
+    function makeCanvas(width, height) {
+        const canvas = document.createElement('canvas');
+        const ratio = window.devicePixelRatio || 1;
+        canvas.width = Math.round(width * ratio);
+        canvas.height = Math.round(height * ratio);
+        canvas.style.width = '100%';
+        canvas.style.maxWidth = `${width}px`;
+        const ctx = canvas.getContext('2d');
+        ctx.scale(ratio, ratio);
+        ctx.font = '12px sans-serif';
+        return { canvas, ctx };
+    }
+
+    /** Линейное отображение [d0, d1] → [r0, r1]. */
+    function scale(d0, d1, r0, r1) {
+        const span = d1 - d0 || 1;
+        return (v) => r0 + ((v - d0) / span) * (r1 - r0);
+    }
+
+    function extent(values) {
+        let lo = Infinity;
+        let hi = -Infinity;
+        for (const v of values) {
+            if (v === null) { continue; }
+            if (v < lo) { lo = v; }
+            if (v > hi) { hi = v; }
+        }
+        return lo <= hi ? [lo, hi] : [0, 1];
+    }
+
+    /** «Красивые» деления оси: 1, 2 или 5 × 10^k. */
+    function ticks(lo, hi, count = 5) {
+        const step0 = (hi - lo) / count || 1;
+        const mag = 10 ** Math.floor(Math.log10(step0));
+        const step = [1, 2, 5, 10].map((m) => m * mag).find((s) => s >= step0);
+        const result = [];
+        for (let t = Math.ceil(lo / step) * step; t <= hi + step * 1e-9; t += step) {
+            result.push(Number(t.toPrecision(12)));
+        }
+        return result;
+    }
+
+    function drawAxes(ctx, box, x, y, xlim, ylim, labels) {
+        ctx.strokeStyle = '#333';
+        ctx.fillStyle = '#333';
+        ctx.strokeRect(box.left, box.top, box.width, box.height);
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'top';
+        if (x) {
+            for (const t of ticks(...xlim)) {
+                ctx.fillText(String(t), x(t), box.top + box.height + 4);
+            }
+        }
+        ctx.textAlign = 'right';
+        ctx.textBaseline = 'middle';
+        for (const t of ticks(...ylim)) {
+            ctx.fillText(String(t), box.left - 4, y(t));
+        }
+        if (labels.xlabel) {
+            ctx.textAlign = 'center';
+            ctx.textBaseline = 'bottom';
+            ctx.fillText(labels.xlabel, box.left + box.width / 2, box.top + box.height + PAD.bottom);
+        }
+        if (labels.ylabel) {
+            ctx.save();
+            ctx.translate(12, box.top + box.height / 2);
+            ctx.rotate(-Math.PI / 2);
+            ctx.textAlign = 'center';
+            ctx.fillText(labels.ylabel, 0, 0);
+            ctx.restore();
+        }
+    }
+
+    function polyline(ctx, xs, ys, x, y) {
+        ctx.beginPath();
+        let open = false;
+        xs.forEach((xv, k) => {
+            const yv = ys[k];
+            if (xv === null || yv === null) { open = false; return; }
+            if (open) { ctx.lineTo(x(xv), y(yv)); } else { ctx.moveTo(x(xv), y(yv)); open = true; }
+        });
+        ctx.stroke();
+    }
+
+    // ------------------------------------------------------------------
+    //   Гистограмма (+ кривые KDE и нормального распределения)
+    // ------------------------------------------------------------------
+    function drawHist(chart, width = 560, height = 340) {
+        const { canvas, ctx } = makeCanvas(width, height);
+        const box = { left: PAD.left, top: PAD.top, width: width - PAD.left - PAD.right,
+                      height: height - PAD.top - PAD.bottom };
+        const curves = chart.curves || [];
+        const xlim = extent(chart.edges);
+        const ymax = Math.max(extent(chart.heights)[1], ...curves.map((c) => extent(c.y)[1]));
+        const ylim = [0, ymax * 1.05 || 1];
+        const x = scale(...xlim, box.left, box.left + box.width);
+        const y = scale(...ylim, box.top + box.height, box.top);
+
+        ctx.fillStyle = 'rgba(31, 119, 180, 0.55)';
+        ctx.strokeStyle = '#fff';
+        chart.heights.forEach((h, k) => {
+            if (h === null) { return; }
+            const x0 = x(chart.edges[k]);
+            const x1 = x(chart.edges[k + 1]);
+            ctx.fillRect(x0, y(h), x1 - x0, y(0) - y(h));
+            ctx.strokeRect(x0, y(h), x1 - x0, y(0) - y(h));
+        });
+        ctx.lineWidth = 2;
+        curves.forEach((curve, k) => {
+            ctx.strokeStyle = curve.color || COLORS[k % COLORS.length];
+            polyline(ctx, curve.x, curve.y, x, y);
+        });
+        if (chart.mean !== undefined && chart.mean !== null) {
+            ctx.strokeStyle = 'red';
+            ctx.setLineDash([6, 4]);
+            polyline(ctx, [chart.mean, chart.mean], ylim, x, y);
+            ctx.setLineDash([]);
+        }
+        ctx.lineWidth = 1;
+        drawAxes(ctx, box, x, y, xlim, ylim, chart);
+        drawLegend(ctx, box, curves);
+        return canvas;
+    }
+
+    function drawLegend(ctx, box, curves) {
+        ctx.textAlign = 'left';
+        ctx.textBaseline = 'middle';
+        curves.forEach((curve, k) => {
+            const top = box.top + 12 + k * 16;
+            ctx.fillStyle = curve.color || COLORS[k % COLORS.length];
+            ctx.fillRect(box.left + box.width - 170, top - 1, 18, 3);
+            ctx.fillStyle = '#333';
+            ctx.fillText(curve.label, box.left + box.width - 146, top);
+        });
+    }
+
+    // ------------------------------------------------------------------
+    //   Box-plot всех столбцов
+    // ------------------------------------------------------------------
+    function drawBox(chart, width = 640, height = 380) {
+        const { canvas, ctx } = makeCanvas(width, height);
+        const box = { left: PAD.left, top: PAD.top, width: width - PAD.left - PAD.right,
+                      height: height - PAD.top - PAD.bottom };
+        const all = chart.boxes.flatMap((b) => [b.whisker_low, b.whisker_high, ...b.outliers]);
+        const [lo, hi] = extent(all);
+        const ylim = [lo - (hi - lo) * 0.05, hi + (hi - lo) * 0.05];
+        const y = scale(...ylim, box.top + box.height, box.top);
+        const slot = box.width / chart.boxes.length;
+
+        chart.boxes.forEach((b, k) => {
+            const cx = box.left + slot * (k + 0.5);
+            const half = Math.min(slot * 0.25, 40);
+            ctx.strokeStyle = '#333';
+            ctx.beginPath();
+            ctx.moveTo(cx, y(b.whisker_low)); ctx.lineTo(cx, y(b.q1));
+            ctx.moveTo(cx, y(b.q3)); ctx.lineTo(cx, y(b.whisker_high));
+            ctx.moveTo(cx - half / 2, y(b.whisker_low)); ctx.lineTo(cx + half / 2, y(b.whisker_low));
+            ctx.moveTo(cx - half / 2, y(b.whisker_high)); ctx.lineTo(cx + half / 2, y(b.whisker_high));
+            ctx.stroke();
+            ctx.fillStyle = 'rgba(31, 119, 180, 0.35)';
+            ctx.fillRect(cx - half, y(b.q3), 2 * half, y(b.q1) - y(b.q3));
+            ctx.strokeRect(cx - half, y(b.q3), 2 * half, y(b.q1) - y(b.q3));
+            ctx.strokeStyle = COLORS[1];
+            ctx.lineWidth = 2;
+            polyline(ctx, [cx - half, cx + half], [b.median, b.median], (v) => v, y);
+            ctx.lineWidth = 1;
+            ctx.strokeStyle = '#333';
+            for (const v of b.outliers) {
+                if (v === null) { continue; }
+                ctx.beginPath();
+                ctx.arc(cx, y(v), 3, 0, 2 * Math.PI);
+                ctx.stroke();
+            }
+            ctx.fillStyle = '#333';
+            ctx.textAlign = 'center';
+            ctx.textBaseline = 'top';
+            ctx.fillText(b.name, cx, box.top + box.height + 4);
+        });
+        drawAxes(ctx, box, null, y, null, ylim, { ...chart, xlabel: '' });
+        return canvas;
+    }
+
+    // ------------------------------------------------------------------
+    //   Scatter-matrix: точки либо карты плотности, ρ над диагональю
+    // ------------------------------------------------------------------
+    /** Цвет для логарифмической шкалы плотности (от светлого к тёмному). */
+    function densityColor(count, max) {
+        const t = Math.log(count) / Math.log(max || 2);
+        const r = Math.round(253 - t * 185);
+        const g = Math.round(231 - t * 230);
+        const b = Math.round(37 + t * 47);
+        return `rgb(${r}, ${g}, ${b})`;
+    }
+
+    function drawScatter(chart, size = 720) {
+        const k = chart.columns.length;
+        const { canvas, ctx } = makeCanvas(size, size);
+        const margin = 40;
+        const cell = (size - margin) / k;
+        const pairs = new Map((chart.pairs || []).map((p) => [`${p.i},${p.j}`, p.counts]));
+        const maxCount = Math.max(1, ...(chart.pairs || []).map((p) => Math.max(...p.counts)));
+
+        for (let i = 0; i < k; i += 1) {
+            for (let j = 0; j < k; j += 1) {
+                const left = margin + j * cell + 2;
+                const top = i * cell + 2;
+                const w = cell - 4;
+                ctx.strokeStyle = '#999';
+                ctx.strokeRect(left, top, w, w);
+                if (!chart.bounds[i] || !chart.bounds[j]) { continue; }
+                const x = scale(...chart.bounds[j], left, left + w);
+                const y = scale(...chart.bounds[i], top + w, top);
+
+                if (i === j) {
+                    const d = chart.diagonal[i];
+                    const hy = scale(0, Math.max(...d.heights) || 1, top + w, top + 4);
+                    ctx.fillStyle = 'rgba(31, 119, 180, 0.6)';
+                    d.heights.forEach((h, n) => {
+                        ctx.fillRect(x(d.edges[n]), hy(h), x(d.edges[n + 1]) - x(d.edges[n]), hy(0) - hy(h));
+                    });
+                } else if (chart.points) {
+                    ctx.fillStyle = 'rgba(31, 119, 180, 0.5)';
+                    const xs = chart.points[j];
+                    const ys = chart.points[i];
+                    for (let n = 0; n < xs.length; n += 1) {
+                        if (xs[n] === null || ys[n] === null) { continue; }
+                        ctx.fillRect(x(xs[n]) - 1, y(ys[n]) - 1, 2, 2);
+                    }
+                } else {
+                    // В сводке только пары i < j; для нижнего треугольника оси меняются местами
+                    const counts = pairs.get(i < j ? `${i},${j}` : `${j},${i}`);
+                    const bins = chart.bins;
+                    const step = w / bins;
+                    for (let a = 0; a < bins; a += 1) {
+                        for (let b = 0; b < bins; b += 1) {
+                            const c = counts[a * bins + b];
+                            if (!c) { continue; }
+                            // counts[a][b]: a — корзина столбца min(i,j), b — max(i,j)
+                            const row = i < j ? a : b;
+                            const col = i < j ? b : a;
+                            ctx.fillStyle = densityColor(c, maxCount);
+                            ctx.fillRect(left + col * step, top + w - (row + 1) * step, step + 0.5, step + 0.5);
+                        }
+                    }
+                }
+                if (i < j) {
+                    const rho = chart.corr[i][j];
+                    ctx.fillStyle = 'rgba(255, 255, 255, 0.8)';
+                    ctx.fillRect(left + w / 2 - 30, top + w / 2 - 9, 60, 18);
+                    ctx.fillStyle = '#000';
+                    ctx.textAlign = 'center';
+                    ctx.textBaseline = 'middle';
+                    ctx.fillText(`ρ=${rho === null ? '—' : rho.toFixed(2)}`, left + w / 2, top + w / 2);
+                }
+            }
+            ctx.fillStyle = '#333';
+            ctx.textAlign = 'center';
+            ctx.textBaseline = 'bottom';
+            ctx.fillText(chart.columns[i], margin + (i + 0.5) * cell, size);
+            ctx.save();
+            ctx.translate(12, (i + 0.5) * cell);
+            ctx.rotate(-Math.PI / 2);
+            ctx.fillText(chart.columns[i], 0, 0);
+            ctx.restore();
+        }
+        return canvas;
+    }
+
+    const DRAW = { hist: drawHist, box: drawBox, scatter: drawScatter };
+
+    /**
+     * Рисует все графики сводки в container: по карточке Bootstrap на элемент,
+     * график слева, HTML-таблица статистик справа.
+     */
+    function render(container, summary) {
+        container.innerHTML = '';
+        for (const item of summary.items) {
+            const card = document.createElement('div');
+            card.className = 'card mb-4';
+            card.innerHTML =
+                `<div class="card-header"><h4></h4></div>
+                 <div class="card-body"><div class="row">
+                     <div class="col-md-7 chart-cell"></div>
+                     <div class="col-md-5 stats-cell"></div>
+                 </div></div>`;
+            card.querySelector('h4').textContent = item.title;
+            card.querySelector('.chart-cell').append(DRAW[item.chart.type](item.chart));
+            card.querySelector('.stats-cell').innerHTML = item.stats_html;
+            container.append(card);
+        }
+        if (!summary.items.length) {
+            container.innerHTML = "<div class='alert alert-warning'>Нет числовых столбцов для анализа</div>";
+        }
+    }
+
+    /**
+     * POST-запрос с render=client; JSON рисуется, HTML (например, сообщение
+     * об отсутствии таблицы) вставляется как есть, {error} — как ошибка.
+     */
+    async function fetchAndRender(url, body, container) {
+        body.set('render', 'client');
+        const resp = await fetch(url, { method: 'POST', body });
+        const type = resp.headers.get('Content-Type') || '';
+        if (!type.includes('application/json')) {
+            container.innerHTML = await resp.text();
+            return;
+        }
+        const payload = await resp.json();
+        if (!resp.ok) {
+            const alert = document.createElement('div');
+            alert.className = 'alert alert-danger';
+            alert.textContent = `Ошибка: ${payload.error}`;
+            container.replaceChildren(alert);
+            return;
+        }
+        render(container, payload);
+    }
+
+    return { render, fetchAndRender };
+})();
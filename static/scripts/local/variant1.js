@@ -1,16 +1,59 @@
 document.addEventListener('DOMContentLoaded', function () {
     const analyzeBtn = document.getElementById('analyzeBtn');
     const resultDiv = document.getElementById('distributionsResult');
+    const clientRender = document.getElementById('clientRender');
     if (!analyzeBtn || !resultDiv) return;
+
+    const POLL_INTERVAL_MS = 1000;
+    const ERROR_HTML = '<div class="alert alert-danger">Ошибка при анализе данных</div>';
+
+    function showProgress(progress) {
+        const percent = Math.round((progress || 0) * 100);
+        resultDiv.innerHTML =
+            '<div class="text-center">' +
+            '<div class="spinner-border" role="status"><span class="visually-hidden">Загрузка...</span></div>' +
+            (percent > 0 ? '<div class="mt-2">Построено ' + percent + '%</div>' : '') +
+            '</div>';
+    }
+
+    // Ответ 202 содержит JSON с состоянием задачи, 200 — готовый HTML-отчёт
+    // (сразу на POST, если сервер выполняет анализ синхронно, JOB_ASYNC=0).
+    function handleResponse(response) {
+        if (response.status === 202) {
+            return response.json().then(job => {
+                showProgress(job.progress);
+                setTimeout(() => poll('/jobs/' + job.job_id), POLL_INTERVAL_MS);
+            });
+        }
+        if (!response.ok) throw new Error(response.statusText);
+        return response.text().then(html => {
+            resultDiv.innerHTML = html;
+        });
+    }
+
+    function poll(url) {
+        fetch(url)
+            .then(handleResponse)
+            .catch(() => {
+                resultDiv.innerHTML = ERROR_HTML;
+            });
+    }
+
     analyzeBtn.addEventListener('click', function () {
-        resultDiv.innerHTML = '<div class="text-center"><div class="spinner-border" role="status"><span class="visually-hidden">Загрузка...</span></div></div>';
-        fetch('/generate_distributions', {method: 'POST'})
-            .then(response => response.text())
-            .then(html => {
-                resultDiv.innerHTML = html;
-            })
+        showProgress(0);
+        // Графики по JSON-сводке рисует static/scripts/charts.js (без фоновой задачи)
+        if (clientRender && clientRender.checked) {
+            Charts.fetchAndRender('/generate_distributions', new URLSearchParams(), resultDiv)
+                .catch(() => {
+                    resultDiv.innerHTML = ERROR_HTML;
+                });
+            return;
+        }
+        const body = new URLSearchParams({async: '1'});
+        fetch('/generate_distributions', {method: 'POST', body: body})
+            .then(handleResponse)
             .catch(() => {
-                resultDiv.innerHTML = '<div class="alert alert-danger">Ошибка при анализе данных</div>';
+                resultDiv.innerHTML = ERROR_HTML;
             });
     });
 });
@@ -7,6 +7,8 @@ document.addEventListener('DOMContentLoaded', () => {
     /** @type {HTMLFormElement}  */ const form = document.getElementById('plotForm');
     /** @type {HTMLIFrameElement}*/ const frame = document.getElementById('plotFrame');
     /** @type {HTMLElement}      */ const spinner = document.getElementById('plotSpinner');
+    /** @type {HTMLElement}      */ const charts = document.getElementById('plotCharts');
+    /** @type {HTMLInputElement} */ const clientRender = document.getElementById('clientRender');
 
     /**
      * Подгоняет высоту iframe под фактическую высоту документа,
@@ -33,12 +35,25 @@ document.addEventListener('DOMContentLoaded', () => {
     /**
      * Показывает спиннер и прячет старый график до прихода нового HTML.
      */
-    form.addEventListener('submit', () => {
+    form.addEventListener('submit', (event) => {
         spinner.innerHTML =
             `<div class="spinner-border" role="status">
                  <span class="visually-hidden">Загрузка...</span>
              </div>`;
         frame.style.display = 'none';     // прежний график скрываем
+        charts.innerHTML = '';
+
+        // Режим «в браузере»: вместо HTML в iframe берём JSON-сводку
+        // и рисуем её на canvas (static/scripts/charts.js)
+        if (clientRender.checked) {
+            event.preventDefault();
+            const body = new URLSearchParams({ plot_type: event.submitter.value });
+            Charts.fetchAndRender(form.action, body, charts)
+                .catch(() => {
+                    charts.innerHTML = '<div class="alert alert-danger">Ошибка при построении графиков</div>';
+                })
+                .finally(() => { spinner.innerHTML = ''; });
+        }
     });
 
     /**
@@ -0,0 +1,94 @@
+"""
+Тестовые таблицы для проверок числовых сводок.
+
+:func:`sample_frame` собирает таблицу из описаний столбцов — функций
+``(rng, rows) -> значения``; столбцы строятся по порядку из одного
+генератора, поэтому при тех же *seed* и столбцах данные не меняются.
+Функции ниже описывают столбцы, общие для нескольких тестов.
+"""
+
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "constant",
+    "correlated_frame",
+    "exponential",
+    "heavy_tail",
+    "integers",
+    "normal",
+    "ramp_tail",
+    "sample_frame",
+    "sparse",
+    "spikes",
+]
+
+
+def sample_frame(columns, rows, seed, nan_every=0, nan_column='normal'):
+    """Таблица из *rows* строк со столбцами *columns* (``{имя: функция}``).
+
+    Если *nan_every* задано, каждое *nan_every*-е значение *nan_column*
+    заменяется пропуском.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({name: make(rng, rows) for name, make in columns.items()})
+    if nan_every:
+        df.loc[::nan_every, nan_column] = np.nan
+    return df
+
+
+def correlated_frame(rows=200, cols=12, seed=24):
+    """Столбцы с сильными связями обоих знаков, постоянный столбец и пропуски."""
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(rows, cols))
+    base[:, 1] = base[:, 0] * 3 + rng.normal(scale=0.1, size=rows) + 1e6
+    base[:, 2] = -base[:, 0] + rng.normal(scale=0.5, size=rows)
+    base[:, 3] = 7.0
+    return pd.DataFrame(base, columns=[f"c{i}" for i in range(cols)])
+
+
+# ---------------------------------------------------------------------------
+# Столбцы
+# ---------------------------------------------------------------------------
+
+def normal(rng, rows):
+    """Стандартное нормальное распределение."""
+    return rng.normal(size=rows)
+
+
+def exponential(scale=1.0):
+    """Экспоненциальное распределение, умноженное на *scale*."""
+    return lambda rng, rows: rng.exponential(size=rows) * scale
+
+
+def integers(low, high):
+    """Целые числа от *low* до *high* (не включая)."""
+    return lambda rng, rows: rng.integers(low, high, size=rows)
+
+
+def constant(value):
+    """Постоянный столбец (``np.nan`` — пустой)."""
+    return lambda rng, rows: np.full(rows, value)
+
+
+def spikes(count, step, jitter=0.0):
+    """Нули и *count* выбросов ``0, step, 2·step…`` в конце, с шумом *jitter*."""
+    def make(rng, rows):
+        values = np.r_[np.zeros(rows - count), np.arange(count) * step]
+        return values + rng.normal(size=rows) * jitter if jitter else values
+    return make
+
+
+def ramp_tail(count, step):
+    """Нормальные значения и *count* выбросов ``0, step, 2·step…`` в конце."""
+    return lambda rng, rows: np.r_[rng.normal(size=rows - count), np.arange(count) * step]
+
+
+def heavy_tail(count, scale):
+    """Нормальные значения и *count* нормальных, умноженных на *scale*, в конце."""
+    return lambda rng, rows: np.r_[rng.normal(size=rows - count), rng.normal(size=count) * scale]
+
+
+def sparse(size):
+    """*size* нормальных значений, остальные — пропуски."""
+    return lambda rng, rows: np.r_[rng.normal(size=size), [np.nan] * (rows - size)]
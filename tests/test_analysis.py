@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from generators.correlation import compute_correlation
+from generators.distrib_generator import analyze_distributions
+from generators.histograms import compute_histograms
+from generators.plot_generator import _HIST_DESCRIPTIONS, build_plot_html
+from generators.summary import NumericSummary
+from services.analysis_service import build_full_report
+
+
+class TestNumericSummary(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            'a': rng.normal(size=50),
+            'b': rng.exponential(size=50),
+            'label': ['x'] * 50,
+        })
+        self.df.loc[3, 'a'] = np.nan
+
+    def test_column_matches_series_methods(self):
+        """Показатели сводки совпадают с методами pandas.Series."""
+        summary = NumericSummary(self.df)
+        self.assertEqual(list(summary.columns), ['a', 'b'])
+        col = summary.column('a')
+        series = self.df['a']
+        self.assertEqual(col['count'], 49)
+        for key, expected in {
+            'mean': series.mean(), 'median': series.median(), 'std': series.std(),
+            'skewness': series.skew(), 'kurtosis': series.kurtosis(),
+            'q1': series.quantile(0.25), 'q3': series.quantile(0.75),
+        }.items():
+            self.assertAlmostEqual(col[key], expected, msg=key)
+
+    def test_distributions_same_with_shared_summary(self):
+        """Отчёт распределений не зависит от того, передана ли готовая сводка."""
+        own = analyze_distributions(self.df)
+        shared = analyze_distributions(self.df, NumericSummary(self.df))
+        for col in own:
+            # Время теста нормальности у двух запусков своё
+            own_time = own[col]['stats'].pop('normality_seconds')
+            shared_time = shared[col]['stats'].pop('normality_seconds')
+            self.assertGreaterEqual(min(own_time, shared_time), 0.0)
+            self.assertEqual(own[col]['stats'], shared[col]['stats'])
+
+
+class TestFullReport(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        x = rng.normal(size=80)
+        self.df = pd.DataFrame({'x': x, 'y': 2 * x + rng.normal(scale=0.1, size=80), 'z': rng.normal(size=80)})
+        # Отчёты сохраняются во временный каталог, а не в data/
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.report_dir = Path(tmp.name)
+        for patcher in (patch('services.analysis_service.REPORT_DIR', self.report_dir),
+                        patch('generators.plot_generator._save_html_file')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_sections_and_single_correlation(self):
+        """Все разделы в одном отчёте, корреляционная матрица считается один раз."""
+        with patch('generators.summary.compute_correlation', side_effect=compute_correlation) as corr:
+            report = build_full_report(self.df, 'scatter', target_col=1, features=[0.5, 0.1])
+        self.assertEqual(corr.call_count, 1)
+        for title in ('Распределения', 'Корреляции', 'Графики', 'Прогноз'):
+            self.assertIn(title, report)
+        self.assertIn('Сильная положительная корреляция', report)
+        self.assertIn('Прогнозируемое значение', report)
+        self.assertNotIn('overflow:hidden', report)
+        self.assertEqual(len(list(self.report_dir.glob('full_report_*.html'))), 1)
+
+    def test_hist_section_matches_plot_route(self):
+        """Раздел гистограмм совпадает с /generate_plot, корзины считаются один раз."""
+        df = self.df.assign(single=[1.0] + [np.nan] * 79)  # карточки распределений его пропускают
+        with patch('generators.summary.compute_histograms', side_effect=compute_histograms) as hist:
+            report = build_full_report(df, 'hist')
+        self.assertEqual(hist.call_count, 1)
+        self.assertIn(_HIST_DESCRIPTIONS['mean'], report)
+        plots = build_plot_html(df, 'hist', NumericSummary(df), standalone=False)
+        self.assertIn(plots, report)
+        self.assertIn("alt='single'", plots)
+
+    def test_no_numeric_columns(self):
+        with self.assertRaises(ValueError):
+            build_full_report(pd.DataFrame({'s': ['a', 'b']}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import io
+import json
+import math
+import unittest
+from unittest.mock import patch
+
+import bottle
+import numpy as np
+import pandas as pd
+
+from generators.chart_data import compact, compact_list, to_json
+from generators.distrib_generator import build_distribution_data
+from generators.plot_generator import (
+    CLIENT_DENSITY_BINS,
+    SCATTER_DENSITY_MIN_ROWS,
+    build_plot_data,
+)
+from utils.dataset_handle import DatasetHandle
+
+
+def post(app, path, form):
+    """Выполнить POST-запрос с формой и вернуть (код, заголовки, тело)."""
+    data = '&'.join(f'{key}={value}' for key, value in form.items()).encode()
+    environ = {
+        'REQUEST_METHOD': 'POST', 'PATH_INFO': path, 'QUERY_STRING': '',
+        'CONTENT_TYPE': 'application/x-www-form-urlencoded', 'CONTENT_LENGTH': str(len(data)),
+        'SERVER_NAME': 'test', 'SERVER_PORT': '80', 'wsgi.input': io.BytesIO(data),
+        'wsgi.errors': io.StringIO(), 'wsgi.url_scheme': 'http',
+    }
+    out = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        out['status'] = int(status.split()[0])
+        out['headers'] = dict(response_headers)
+
+    body = b''.join(app(environ, start_response))
+    return out['status'], out['headers'], body
+
+
+class TestCompact(unittest.TestCase):
+    def test_six_significant_digits_and_null(self):
+        self.assertEqual(compact(math.pi), 3.14159)
+        self.assertEqual(compact(123456789.0), 123457000.0)
+        self.assertIsNone(compact(float('nan')))
+        self.assertEqual(compact_list(np.array([1 / 3, np.inf, 2.0])), [0.333333, None, 2.0])
+
+    def test_json_rejects_nan(self):
+        """NaN в сводку не попадает: JSON.parse в браузере его не примет."""
+        self.assertEqual(to_json({'a': [1.5, None]}), '{"a":[1.5,null]}')
+        with self.assertRaises(ValueError):
+            to_json({'a': float('nan')})
+
+
+class TestPlotData(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.df = pd.DataFrame({
+            'a': rng.normal(size=400),
+            'b': rng.exponential(size=400),
+            'c': rng.uniform(size=400),
+        })
+        self.df.loc[::50, 'b'] = np.nan
+
+    def test_histogram_matches_numpy(self):
+        data = build_plot_data(self.df, 'hist')
+        self.assertEqual([item['title'] for item in data['items']], ['a', 'b', 'c'])
+        for item in data['items']:
+            values = self.df[item['title']].dropna().to_numpy()
+            counts, edges = np.histogram(values, bins='auto')
+            chart = item['chart']
+            np.testing.assert_allclose(chart['edges'], edges, rtol=1e-5)
+            # плотность × ширина × n восстанавливает число значений в корзине
+            restored = np.array(chart['heights']) * np.diff(edges) * len(values)
+            np.testing.assert_allclose(restored, counts, rtol=1e-4, atol=1e-6)
+            self.assertIn('<table', item['stats_html'])
+
+    def test_box_whiskers_and_outliers(self):
+        df = pd.DataFrame({'x': [1.0, 2, 3, 4, 5, 6, 7, 8, 9, 100]})
+        box = build_plot_data(df, 'box')['items'][0]['chart']['boxes'][0]
+        self.assertEqual(box['name'], 'x')
+        self.assertEqual(box['whisker_low'], 1.0)
+        self.assertEqual(box['whisker_high'], 9.0)
+        self.assertEqual(box['outliers'], [100.0])
+        self.assertEqual(box['median'], 5.5)
+
+    def test_scatter_points_below_threshold(self):
+        chart = build_plot_data(self.df, 'scatter')['items'][0]['chart']
+        self.assertEqual(chart['columns'], ['a', 'b', 'c'])
+        self.assertEqual(len(chart['points']), 3)
+        self.assertIsNone(chart['points'][1][0])  # пропуск передан как null
+        self.assertNotIn('pairs', chart)
+        self.assertAlmostEqual(chart['corr'][0][1], self.df['a'].corr(self.df['b']), places=5)
+
+    def test_scatter_densities_above_threshold(self):
+        rng = np.random.default_rng(8)
+        df = pd.DataFrame(rng.normal(size=(SCATTER_DENSITY_MIN_ROWS, 3)), columns=['x', 'y', 'z'])
+        chart = build_plot_data(df, 'scatter')['items'][0]['chart']
+        self.assertNotIn('points', chart)
+        self.assertEqual(chart['bins'], CLIENT_DENSITY_BINS)
+        self.assertEqual([(p['i'], p['j']) for p in chart['pairs']], [(0, 1), (0, 2), (1, 2)])
+        pair = chart['pairs'][0]
+        expected, _, _ = np.histogram2d(
+            df['x'], df['y'], bins=CLIENT_DENSITY_BINS, range=[chart['bounds'][0], chart['bounds'][1]],
+        )
+        np.testing.assert_array_equal(
+            np.array(pair['counts']).reshape(CLIENT_DENSITY_BINS, CLIENT_DENSITY_BINS), expected,
+        )
+
+    def test_invalid_plot_type(self):
+        with self.assertRaises(ValueError):
+            build_plot_data(self.df, 'pie')
+
+
+class TestDistributionData(unittest.TestCase):
+    def test_curves_and_stats(self):
+        rng = np.random.default_rng(9)
+        df = pd.DataFrame({'norm': rng.normal(5, 2, size=300), 'const': np.ones(300), 'text': ['t'] * 300})
+        items = build_distribution_data(df)['items']
+        self.assertEqual([item['title'] for item in items], ['Столбец: norm', 'Столбец: const'])
+        norm, const = (item['chart'] for item in items)
+        self.assertEqual([c['label'] for c in norm['curves']], ['KDE', 'Нормальное распределение'])
+        self.assertAlmostEqual(norm['mean'], df['norm'].mean(), places=4)
+        # у постоянного столбца KDE вырождена — кривой нет, сводка всё равно сериализуется
+        self.assertNotIn('KDE', [c['label'] for c in const['curves']])
+        json.loads(to_json({'items': items}))
+
+
+class TestClientRenderRoutes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import routes  # noqa: F401 — регистрирует маршруты в приложении по умолчанию
+        cls.app = bottle.default_app()
+        cls.dataset = DatasetHandle.from_frame(
+            pd.DataFrame({'a': np.arange(30.0), 'b': np.arange(30.0) ** 2}),
+        )
+
+    def setUp(self):
+        patcher = patch('routes.get_current_dataset', return_value=self.dataset)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_plot_json(self):
+        status, headers, body = post(self.app, '/generate_plot', {'plot_type': 'box', 'render': 'client'})
+        self.assertEqual(status, 200)
+        self.assertTrue(headers['Content-Type'].startswith('application/json'))
+        self.assertEqual(json.loads(body)['items'][0]['chart']['type'], 'box')
+
+    def test_plot_error_is_json(self):
+        status, _, body = post(self.app, '/generate_plot', {'plot_type': 'pie', 'render': 'client'})
+        self.assertEqual(status, 400)
+        self.assertIn('pie', json.loads(body)['error'])
+
+    def test_distributions_json(self):
+        status, _, body = post(self.app, '/generate_distributions', {'render': 'client'})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(json.loads(body)['items']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
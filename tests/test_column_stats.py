@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from generators.column_stats import column_positions, column_quantiles, compute_column_stats
+from tests import frames
+
+
+def sample_frame():
+    """Столбцы разной формы, с пропусками и вырожденными случаями."""
+    columns = {
+        'normal': frames.normal,
+        'exponential': frames.exponential(1000),
+        'integer': frames.integers(-3, 7),
+        'constant': frames.constant(0.1),
+        'outliers': frames.ramp_tail(10, 100.0),
+    }
+    for size in range(5):  # столбцы из 0…4 значений
+        columns[f'n{size}'] = frames.sparse(size)
+    return frames.sample_frame(columns, rows=500, seed=21, nan_every=5)
+
+
+class TestColumnStats(unittest.TestCase):
+    def test_matches_pandas(self):
+        """Показатели совпадают с методами pandas.Series, включая крайние случаи."""
+        df = sample_frame()
+        stats = compute_column_stats(df)
+        for col in df.columns:
+            series = df[col]
+            column = stats.column(col)
+            expected = {
+                'count': series.count(), 'mean': series.mean(), 'median': series.median(),
+                'std': series.std(), 'min': series.min(), 'max': series.max(),
+                'skewness': series.skew(), 'kurtosis': series.kurt(),
+                'q1': series.quantile(0.25), 'q3': series.quantile(0.75),
+            }
+            for key, value in expected.items():
+                with self.subTest(col=col, key=key):
+                    np.testing.assert_allclose(column[key], value, rtol=1e-9, atol=1e-12)
+
+    def test_outliers_and_whiskers(self):
+        df = sample_frame()
+        stats = compute_column_stats(df)
+        for col in ('normal', 'outliers', 'integer'):
+            values = df[col].dropna()
+            q1, q3 = values.quantile([0.25, 0.75])
+            low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+            inside = values[(values >= low) & (values <= high)]
+            column = stats.column(col)
+            self.assertEqual(column['outliers_count'], int(((values < low) | (values > high)).sum()))
+            self.assertAlmostEqual(column['outliers_percent'], column['outliers_count'] / len(values) * 100)
+            self.assertEqual((column['whisker_low'], column['whisker_high']), (inside.min(), inside.max()))
+        self.assertGreaterEqual(stats.column('outliers')['outliers_count'], 10)
+        self.assertEqual(stats.column('constant')['outliers_count'], 0)
+
+    def test_quantiles_single_partition(self):
+        """Квантили всех уровней совпадают с ``np.nanquantile`` по столбцам."""
+        values = sample_frame().to_numpy(dtype=float)
+        n = (~np.isnan(values)).sum(axis=0)
+        levels = (0.0, 0.1, 0.25, 0.5, 0.9, 1.0)
+        result = column_quantiles(values, n, levels)
+        for k in range(values.shape[1]):
+            column = values[~np.isnan(values[:, k]), k]
+            expected = np.quantile(column, levels) if column.size else np.full(len(levels), np.nan)
+            np.testing.assert_allclose(result[:, k], expected)
+
+    def test_column_lookup_by_dict(self):
+        """Столбцы ищутся по словарю номеров, построенному один раз."""
+        self.assertEqual(column_positions(('a', 'b', 'a', 2)), {'a': 0, 'b': 1, 2: 3})
+        df = sample_frame()
+        stats = compute_column_stats(df)
+        self.assertIs(stats._positions, stats._positions)
+        self.assertEqual(stats.column('outliers'), stats.column(df.columns[4]))
+        with self.assertRaises(KeyError):
+            stats.column('missing')
+
+    def test_empty_table(self):
+        stats = compute_column_stats(pd.DataFrame({'a': pd.Series(dtype=float)}))
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats.column('a')['count'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
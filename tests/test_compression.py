@@ -0,0 +1,124 @@
+import gzip
+import io
+import unittest
+
+import bottle
+
+from utils.compression import CompressionMiddleware, choose_encoding
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - зависит от окружения
+    brotli = None
+
+
+def call(app, path, accept_encoding=None, method='GET'):
+    """Выполнить запрос к WSGI-приложению и вернуть (код, заголовки, тело)."""
+    environ = {
+        'REQUEST_METHOD': method, 'PATH_INFO': path, 'QUERY_STRING': '',
+        'SERVER_NAME': 'test', 'SERVER_PORT': '80', 'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(), 'wsgi.url_scheme': 'http',
+    }
+    if accept_encoding:
+        environ['HTTP_ACCEPT_ENCODING'] = accept_encoding
+    out = {}
+
+    def start_response(status, headers, exc_info=None):
+        out['status'] = int(status.split()[0])
+        out['headers'] = dict(headers)
+
+    chunks = app(environ, start_response)
+    body = b''.join(chunks)
+    if hasattr(chunks, 'close'):
+        chunks.close()
+    return out['status'], out['headers'], body
+
+
+class TestCompressionMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.page = ('<div class="card">' + 'данные ' * 20 + '</div>\n') * 400
+        inner = bottle.Bottle()
+        inner.route('/big', callback=lambda: self.page)
+        inner.route('/tiny', callback=lambda: 'ok')
+
+        @inner.route('/stream')
+        def stream():
+            bottle.response.content_type = 'text/html; charset=utf-8'
+            return (part.encode() for part in self.page.splitlines(True))
+
+        @inner.route('/png')
+        def png():
+            bottle.response.content_type = 'image/png'
+            return b'\x89PNG' + b'\x00' * 5000
+
+        self.app = CompressionMiddleware(inner, min_size=1024, chunk_size=4096)
+
+    def test_gzip_roundtrip(self):
+        """Крупный HTML сжимается gzip и распаковывается в исходный текст."""
+        status, headers, body = call(self.app, '/big', 'gzip')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', headers['Vary'])
+        self.assertNotIn('Content-Length', headers)
+        self.assertEqual(gzip.decompress(body).decode(), self.page)
+        self.assertLess(len(body), len(self.page.encode()) / 5)
+
+    @unittest.skipIf(brotli is None, 'пакет brotli не установлен')
+    def test_brotli_preferred(self):
+        status, headers, body = call(self.app, '/big', 'gzip, deflate, br')
+        self.assertEqual(headers['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(body).decode(), self.page)
+
+    def test_streamed_body_without_length(self):
+        """Потоковый ответ без Content-Length тоже сжимается."""
+        _, headers, body = call(self.app, '/stream', 'gzip')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(body).decode(), self.page)
+
+    def test_skipped_responses(self):
+        """Крошечные ответы, картинки, HEAD и клиенты без gzip не сжимаются."""
+        for path, encoding, method in (
+            ('/tiny', 'gzip', 'GET'),
+            ('/png', 'gzip', 'GET'),
+            ('/big', None, 'GET'),
+            ('/big', 'gzip;q=0', 'GET'),
+            ('/big', 'gzip', 'HEAD'),
+        ):
+            with self.subTest(path=path, encoding=encoding, method=method):
+                _, headers, _ = call(self.app, path, encoding, method)
+                self.assertNotIn('Content-Encoding', headers)
+
+    def test_vary_on_uncompressed_negotiable_responses(self):
+        """Несжатые HTML-ответы тоже помечаются Vary: Accept-Encoding, картинки — нет."""
+        for path, encoding, method in (
+            ('/tiny', 'gzip', 'GET'),
+            ('/big', None, 'GET'),
+            ('/big', 'gzip;q=0', 'GET'),
+            ('/big', 'gzip', 'HEAD'),
+        ):
+            with self.subTest(path=path, encoding=encoding, method=method):
+                _, headers, _ = call(self.app, path, encoding, method)
+                self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        for encoding in ('gzip', None):
+            _, headers, _ = call(self.app, '/png', encoding)
+            self.assertNotIn('Vary', headers)
+
+    def test_legacy_write_is_rejected(self):
+        """write() из start_response даёт понятную ошибку, а не NotImplementedError."""
+        def legacy(environ, start_response):
+            write = start_response('200 OK', [('Content-Type', 'text/html')])
+            write(b'<p>' * 1000)
+            return []
+
+        with self.assertRaisesRegex(RuntimeError, 'RESPONSE_COMPRESSION=0'):
+            call(CompressionMiddleware(legacy), '/', 'gzip')
+
+    def test_choose_encoding(self):
+        self.assertIsNone(choose_encoding(None))
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertEqual(choose_encoding('gzip'), 'gzip')
+        self.assertEqual(choose_encoding('br;q=0.5, gzip'), 'gzip')
+
+
+if __name__ == '__main__':
+    unittest.main()
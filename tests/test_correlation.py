@@ -1,11 +1,17 @@
 import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
 import pandas as pd
 import numpy as np
+from generators.correlation import STRONG_NEGATIVE, STRONG_POSITIVE, WEAK, compute_correlation
 from generators.correlation_generator import (
     build_correlation_table,
     build_correlation_heatmap,
     analyze_correlations,
+    build_correlation_sections,
 )
+from tests.frames import correlated_frame
 
 class TestCorrelationGenerator(unittest.TestCase):
 
@@ -60,12 +66,12 @@ class TestCorrelationGenerator(unittest.TestCase):
                     self.assertIn(phrase, result)
 
     def test_build_correlation_heatmap_returns_img_tag(self):
-        # Проверка, что тепловая карта содержит <img> с base64
+        # Проверка, что тепловая карта содержит <img> со ссылкой на хранилище картинок
         for name, df in self.datasets.items():
             with self.subTest(name=name):
                 heatmap_html = build_correlation_heatmap(df)
                 self.assertIn("<img", heatmap_html)
-                self.assertIn("base64", heatmap_html)
+                self.assertIn('src="/img/', heatmap_html)
 
     def test_handle_empty_dataframe(self):
         # Проверка, что при пустом DataFrame возвращается сообщение, а не пустая таблица
@@ -105,5 +111,119 @@ class TestCorrelationGenerator(unittest.TestCase):
         table_html = build_correlation_table(df)
         self.assertIn("1.0", table_html)  # Не "1.00", а "1.0"
 
+
+class TestCorrelationResult(unittest.TestCase):
+
+    def assertMatchesPandas(self, df):
+        result = compute_correlation(df)
+        expected = df.corr().to_numpy()
+        np.testing.assert_allclose(result.matrix, expected, atol=1e-12)
+        np.testing.assert_array_equal(np.isnan(result.matrix), np.isnan(expected))
+        return result
+
+    def test_matrix_matches_pandas(self):
+        df = correlated_frame()
+        self.assertMatchesPandas(df)
+        # С пропусками — попарно по строкам, где заданы оба столбца
+        df.iloc[::5, 0] = np.nan
+        df.iloc[::3, 4] = np.nan
+        df.iloc[:190, 5] = np.nan
+        self.assertMatchesPandas(df)
+
+    def test_pairs_match_loop(self):
+        """Классы пар совпадают с перебором верхнего треугольника."""
+        df = correlated_frame(cols=30)
+        result = compute_correlation(df)
+        corr = df.corr()
+        expected = {"positive": set(), "negative": set(), "weak": set()}
+        for i in range(len(corr.columns)):
+            for j in range(i + 1, len(corr.columns)):
+                val = corr.iloc[i, j]
+                kind = ("negative" if val < STRONG_NEGATIVE else "positive" if val > STRONG_POSITIVE
+                        else "weak" if abs(val) < WEAK else None)
+                if kind:
+                    expected[kind].add((corr.columns[i], corr.columns[j]))
+
+        for kind, pairs in (("positive", result.strong_positive()), ("negative", result.strong_negative()),
+                            ("weak", result.weak())):
+            self.assertEqual({(a, b) for a, b, _ in pairs}, expected[kind], kind)
+        self.assertEqual(result.strong_positive()[0][:2], ("c0", "c1"))
+        self.assertAlmostEqual(result.strong_negative()[0][2], corr.min().min(), places=12)
+        weak = [abs(val) for _, _, val in result.weak()]
+        self.assertEqual(weak, sorted(weak))
+        self.assertEqual(len(result.weak(limit=5)), 5)
+        # Пары с постоянным столбцом (NaN) ни в один класс не попадают
+        self.assertEqual(result.values.size, 29 * 30 // 2 - 29)
+
+    def test_wide_table_top_pairs(self):
+        """Полосы матрицы и частичный отбор дают те же лучшие пары и число пар классов."""
+        df = correlated_frame(cols=40)
+        df.iloc[::5, 0] = np.nan
+        full = compute_correlation(df)
+        for float32, places in ((False, 12), (True, 5)):
+            # block_mb=0 — по одной строке матрицы на полосу
+            wide = compute_correlation(df, top_k=3, wide_columns=10, block_mb=0, float32=float32)
+            self.assertIsNone(wide.matrix)
+            self.assertEqual(wide.totals, full.totals)
+            for method in ("strong_positive", "strong_negative", "weak"):
+                got, expected = getattr(wide, method)(), getattr(full, method)(limit=3)
+                self.assertEqual([pair[:2] for pair in got], [pair[:2] for pair in expected], method)
+                for pair, other in zip(got, expected):
+                    self.assertAlmostEqual(pair[2], other[2], places=places)
+            np.testing.assert_allclose(wide.submatrix([0, 1, 2]), full.matrix[:3, :3], atol=1e-12)
+
+    def test_truncated_report(self):
+        """Широкая таблица: в матрице только столбцы сильных связей, списки выводов ограничены."""
+        df = correlated_frame(cols=40)
+        for k in range(4, 40):
+            df[f"c{k}"] = df["c0"] * (k % 3 - 1) + np.random.default_rng(k).normal(scale=0.05, size=len(df))
+        result = compute_correlation(df, top_k=5, wide_columns=10)
+        shown = result.leading_columns(6)
+        self.assertEqual(len(shown), 6)
+        self.assertIn(0, shown)
+        with patch("generators.correlation_generator.TABLE_MAX_COLUMNS", 6):
+            table_html = build_correlation_table(df, result)
+            heatmap_html = build_correlation_heatmap(df, result)
+        self.assertIn("Показаны 6 из 40 столбцов", table_html)
+        self.assertEqual(table_html.count("<tr"), 7)
+        self.assertIn("<img", heatmap_html)
+        with patch("generators.correlation_generator.STRONG_PAIRS_SHOWN", 5):
+            conclusions = analyze_correlations(df, result)
+        self.assertEqual(conclusions.count("<li><strong>"), 5 + 5 + min(5, result.totals["weak"]))
+        self.assertIn(f"и ещё {result.totals['positive'] - 5}", conclusions)
+
+    def test_narrow_report_not_truncated(self):
+        """Обычная таблица шире TABLE_MAX_COLUMNS показывается целиком, со всеми сильными парами."""
+        df = correlated_frame(cols=31)
+        for k in range(4, 31):
+            df[f"c{k}"] = df["c0"] * (k % 3 - 1) + np.random.default_rng(k).normal(scale=0.05, size=len(df))
+        result = compute_correlation(df)
+        self.assertIsNotNone(result.matrix)
+        self.assertGreater(result.totals["positive"], 5)
+        table_html = build_correlation_table(df, result)
+        self.assertNotIn("Показаны", table_html)
+        self.assertEqual(table_html.count("<tr"), 32)
+        with patch("generators.correlation_generator.STRONG_PAIRS_SHOWN", 5):
+            conclusions = analyze_correlations(df, result)
+        strong = result.totals["positive"] + result.totals["negative"]
+        self.assertEqual(conclusions.count("<li><strong>"), strong + min(5, result.totals["weak"]))
+
+    def test_sections_compute_shown_matrix_once(self):
+        """Подматрица широкой таблицы считается один раз на таблицу и тепловую карту."""
+        df = correlated_frame(cols=40)
+        result = compute_correlation(df, top_k=5, wide_columns=10)
+        summary = SimpleNamespace(numeric=df, correlation=result)
+        with patch("generators.correlation_generator.TABLE_MAX_COLUMNS", 6), \
+                patch.object(type(result), "frame", autospec=True, side_effect=type(result).frame) as frame:
+            html = build_correlation_sections(df, summary)
+        self.assertEqual(frame.call_count, 1)
+        self.assertIn("Показаны 6 из 40 столбцов", html)
+
+    def test_empty(self):
+        result = compute_correlation(pd.DataFrame())
+        self.assertEqual(len(result), 0)
+        self.assertEqual(result.strong_positive(), [])
+
+
 if __name__ == "__main__":
     unittest.main()
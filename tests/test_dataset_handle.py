@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_handle import DatasetHandle, as_frame, as_handle, compute_fingerprint
+
+
+class TestDatasetHandle(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'a': [1.0, 2.0, 3.0],
+            'b': [4, 5, 6],
+            'name': ['x', 'y', 'z'],
+        })
+
+    def test_same_content_same_fingerprint(self):
+        """Одинаковые таблицы дают одинаковый отпечаток."""
+        self.assertEqual(compute_fingerprint(self.df), compute_fingerprint(self.df.copy()))
+
+    def test_fingerprint_detects_changes(self):
+        """Изменение значения, подписи, типа или индекса меняет отпечаток."""
+        base = compute_fingerprint(self.df)
+
+        changed = self.df.copy()
+        changed.iloc[0, 0] = 1.5
+        self.assertNotEqual(base, compute_fingerprint(changed))
+
+        changed = self.df.copy()
+        changed.iloc[2, 2] = 'w'
+        self.assertNotEqual(base, compute_fingerprint(changed))
+
+        self.assertNotEqual(base, compute_fingerprint(self.df.rename(columns={'a': 'z'})))
+        self.assertNotEqual(base, compute_fingerprint(self.df.astype({'b': np.int32})))
+        self.assertNotEqual(base, compute_fingerprint(self.df.set_index(pd.Index([7, 8, 9]))))
+
+    def test_handle_properties(self):
+        """Дескриптор хранит версию, отпечаток и размер; помощники разворачивают его."""
+        handle = DatasetHandle.from_frame(self.df, version=4)
+        self.assertEqual(handle.version, 4)
+        self.assertEqual(handle.fingerprint, compute_fingerprint(self.df))
+        self.assertEqual(handle.etag, f'"{handle.fingerprint}"')
+        self.assertEqual(len(handle.short_id), 12)
+        self.assertGreater(handle.nbytes, 0)
+
+        self.assertIs(as_frame(handle), self.df)
+        self.assertIs(as_frame(self.df), self.df)
+        self.assertIs(as_handle(handle), handle)
+        self.assertEqual(as_handle(self.df).fingerprint, handle.fingerprint)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_handle import DatasetHandle
+from utils.disk_session_store import DiskSessionStore
+
+
+class FakeClock:
+    """Управляемые «настенные» часы."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestDiskSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.clock = FakeClock()
+        self.dataset = DatasetHandle.from_frame(pd.DataFrame({
+            'x': np.arange(10, dtype=float),
+            'name': list('abcdefghij'),
+            'n': np.arange(10, dtype=np.int64),
+            'y': np.linspace(0, 1, 10),
+        }), version=3)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_store(self, max_bytes=10 * 2**20, ttl=60.0):
+        return DiskSessionStore(self.tmp.name, max_bytes, ttl, clock=self.clock)
+
+    def test_roundtrip_preserves_frame(self):
+        """Таблица читается обратно с теми же столбцами, порядком и типами."""
+        store = self.make_store()
+        store.set('s1', self.dataset)
+        restored = store.get('s1')
+        pd.testing.assert_frame_equal(restored.df, self.dataset.df)
+        self.assertEqual(restored.version, 3)
+        self.assertEqual(restored.fingerprint, self.dataset.fingerprint)
+        self.assertEqual(restored.nbytes, self.dataset.nbytes)
+
+    def test_version_of_reads_only_meta(self):
+        """version_of не открывает данные, не трогает mtime и счётчики."""
+        store = self.make_store(ttl=10.0)
+        self.assertIsNone(store.version_of('s1'))
+        self.assertIsNone(store.version_of('../x'))
+        store.set('s1', self.dataset)
+        meta = Path(self.tmp.name) / 's1' / 'meta.json'
+        mtime = meta.stat().st_mtime
+        self.clock.now += 5.0
+        with patch.object(DiskSessionStore, '_read', side_effect=AssertionError):
+            self.assertEqual(store.version_of('s1'), (3, self.dataset.fingerprint))
+        self.assertEqual(meta.stat().st_mtime, mtime)
+        stats = store.stats()
+        self.assertEqual((stats.hits, stats.misses), (0, 0))
+        self.clock.now += 10.0
+        self.assertIsNone(store.version_of('s1'))
+
+    def test_numeric_columns_are_memory_mapped(self):
+        """Числовые данные читаются из файла без копирования."""
+        store = self.make_store()
+        store.set('s1', self.dataset)
+        restored = store.get('s1')
+        values = restored.df['x'].to_numpy()
+        bases = []
+        while isinstance(values, np.ndarray):
+            bases.append(values)
+            values = values.base
+        self.assertTrue(any(isinstance(b, np.memmap) for b in bases))
+        self.assertFalse(bases[0].flags.writeable)
+
+    def test_shared_between_instances(self):
+        """Другой экземпляр (процесс) видит ту же сессию после «перезапуска»."""
+        self.make_store().set('s1', self.dataset)
+        other = self.make_store()
+        self.assertIn('s1', other)
+        pd.testing.assert_frame_equal(other.get('s1').df, self.dataset.df)
+
+    def test_ttl_expiration(self):
+        """Просроченная сессия удаляется и помечается как устаревшая."""
+        store = self.make_store(ttl=10.0)
+        store.set('s1', self.dataset)
+        self.clock.now += 30.0
+        self.assertTrue(store.is_expired('s1'))
+        self.assertIsNone(store.get('s1'))
+        self.assertNotIn('s1', store)
+        self.assertTrue(store.is_expired('s1'))
+        self.assertEqual(store.stats().expirations, 1)
+
+    def test_budget_evicts_least_recently_used(self):
+        """При нехватке бюджета удаляется самая давно использованная сессия."""
+        probe = self.make_store()
+        probe.set('probe', self.dataset)
+        size = probe.stats().bytes_used
+        probe.delete('probe')
+
+        store = self.make_store(max_bytes=2 * size)
+        store.set('s1', self.dataset)
+        self.clock.now += 1
+        store.set('s2', self.dataset)
+        self.clock.now += 1
+        store.get('s1')
+        self.clock.now += 1
+        store.set('s3', self.dataset)
+
+        self.assertIn('s1', store)
+        self.assertNotIn('s2', store)
+        self.assertTrue(store.is_expired('s2'))
+        self.assertEqual(store.stats().evictions, 1)
+
+    def test_replace_and_invalid_sid(self):
+        """Повторная запись заменяет таблицу; опасные id отклоняются."""
+        store = self.make_store()
+        store.set('s1', self.dataset)
+        store.set('s1', DatasetHandle.from_frame(self.dataset.df.head(3)))
+        self.assertEqual(len(store.get('s1').df), 3)
+        self.assertEqual(len(store), 1)
+
+        with self.assertRaises(ValueError):
+            store.set('../evil', self.dataset)
+        self.assertIsNone(store.get('../evil'))
+
+    def test_replace_keeps_old_table_readable(self):
+        """Пока новая таблица пишется, читатели получают прежнюю, а не None."""
+        store = self.make_store()
+        store.set('s1', self.dataset)
+        seen = []
+        write = DiskSessionStore._write
+
+        def write_and_read(path, handle):
+            meta = write(path, handle)
+            seen.append(store.get('s1'))
+            return meta
+
+        with patch.object(DiskSessionStore, '_write', side_effect=write_and_read):
+            store.set('s1', DatasetHandle.from_frame(self.dataset.df.head(3)))
+        self.assertEqual(len(seen[0].df), 10)
+        self.assertEqual(len(store.get('s1').df), 3)
+        # Прежний каталог данных удалён, временных файлов не осталось
+        self.assertEqual(len(list(Path(self.tmp.name, 's1').iterdir())), 2)
+
+        # Устаревший meta.json, прочитанный до замены, — повторное чтение
+        read = DiskSessionStore._read
+        calls = []
+
+        def stale_read(path):
+            calls.append(path)
+            if len(calls) == 1:
+                raise FileNotFoundError(path)
+            return read(path)
+
+        with patch.object(DiskSessionStore, '_read', side_effect=stale_read):
+            self.assertEqual(len(store.get('s1').df), 3)
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
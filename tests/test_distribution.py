@@ -69,7 +69,7 @@ class TestDistribGenerator(unittest.TestCase):
         html_result = generate_distribution_html(self.normal_data)
         self.assertIn('<div class=\'card mb-4\'>', html_result)
         self.assertIn('<table class=\'table table-bordered\'>', html_result)
-        self.assertIn('base64', html_result)  # Проверяем наличие закодированных изображений
+        self.assertIn("src='/img/", html_result)  # Картинки отдаются по ссылкам из хранилища
     
     def test_outliers_detection(self):
         """Тест обнаружения выбросов"""
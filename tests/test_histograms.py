@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from generators.histograms import compute_histograms
+from generators.summary import NumericSummary
+from tests import frames
+
+
+def sample_frame():
+    """Столбцы с разной формой распределения, пропусками и вырожденными случаями."""
+    return frames.sample_frame({
+        'normal': frames.normal,
+        'exponential': frames.exponential(1000),
+        'integer': frames.integers(0, 6),
+        'constant': frames.constant(3.5),
+        'outliers': frames.spikes(7, 1e6),
+        'tiny': lambda rng, rows: 1 + rng.normal(size=rows) * 1e-12,
+        'empty': frames.constant(np.nan),
+    }, rows=997, seed=19, nan_every=7)
+
+
+class TestComputeHistograms(unittest.TestCase):
+    def assertMatchesNumpy(self, df, bins, **kwargs):
+        histograms = compute_histograms(df, bins)
+        for col in df.columns:
+            values = df[col].dropna().to_numpy()
+            expected_counts, expected_edges = np.histogram(values, bins=bins, **kwargs)
+            counts, edges = histograms.column(col, **kwargs)
+            np.testing.assert_allclose(edges, expected_edges, err_msg=f'{col}, {bins}')
+            np.testing.assert_allclose(counts, expected_counts, err_msg=f'{col}, {bins}')
+
+    def test_matches_numpy_for_every_rule(self):
+        """Границы и высоты корзин совпадают с ``np.histogram`` по каждому столбцу."""
+        df = sample_frame()
+        for bins in ('auto', 'fd', 'sturges', 10):
+            self.assertMatchesNumpy(df, bins)
+
+    def test_density(self):
+        df = sample_frame().drop(columns='empty')
+        self.assertMatchesNumpy(df, 'auto', density=True)
+
+    def test_weights(self):
+        """Веса строк суммируются в корзинах; пропуски не учитываются."""
+        df = sample_frame()[['normal', 'integer']]
+        weights = np.random.default_rng(1).random(len(df))
+        histograms = compute_histograms(df, weights=weights)
+        for col in df.columns:
+            present = df[col].notna().to_numpy()
+            counts, edges = histograms.column(col, density=True)
+            expected, _ = np.histogram(df[col][present], bins=edges, weights=weights[present], density=True)
+            np.testing.assert_allclose(counts, expected)
+        with self.assertRaises(ValueError):
+            compute_histograms(df, weights=weights[:-1])
+
+    def test_compact_layout(self):
+        df = sample_frame()
+        histograms = compute_histograms(df)
+        self.assertEqual(len(histograms), df.shape[1])
+        self.assertEqual(histograms.offsets[-1], histograms.counts.size)
+        self.assertEqual(histograms.edges.size, histograms.counts.size + df.shape[1])
+        np.testing.assert_array_equal(histograms.totals, df.notna().sum().to_numpy())
+        self.assertEqual(histograms.bins(histograms.position('empty')), 1)
+
+    def test_invalid_input(self):
+        df = sample_frame()
+        with self.assertRaises(ValueError):
+            compute_histograms(df, bins='scott')
+        with self.assertRaises(ValueError):
+            compute_histograms(df, bins=0)
+        with self.assertRaises(ValueError):
+            compute_histograms(pd.DataFrame({'a': [1.0, np.inf]}))
+
+    def test_summary_shares_histograms(self):
+        """Сводка считает гистограммы один раз для всех генераторов."""
+        summary = NumericSummary(sample_frame().assign(label='x'))
+        self.assertIs(summary.histograms, summary.histograms)
+        self.assertEqual(summary.histograms.columns, tuple(summary.columns))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import io
+import json
+import unittest
+from unittest.mock import patch
+
+import bottle
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from generators import parallel
+from generators.parallel import RenderPool
+from generators.plot_generator import _build_histograms
+from generators.rendering import new_figure, store_figure
+from utils.dataset_handle import DatasetHandle
+from utils import image_policy
+from utils.image_policy import ImagePolicy, current_image_policy, use_image_policy
+from utils.image_store import IMAGES
+from tests.test_chart_data import post
+
+
+def render(policy):
+    """Построить простую фигуру 6×4 дюйма по *policy*; вернуть (URL, байты)."""
+    fig = new_figure(figsize=(6, 4))
+    fig.add_subplot().plot([1, 3, 2, 4])
+    with use_image_policy(policy):
+        url = store_figure(fig)
+    return url, IMAGES.get(url[len('/img/'):])
+
+
+class TestImagePolicy(unittest.TestCase):
+    def test_validation_and_override(self):
+        with self.assertRaises(ValueError):
+            ImagePolicy(format='gif')
+        with self.assertRaises(ValueError):
+            ImagePolicy(dpi=1000)
+        with self.assertRaises(ValueError):
+            ImagePolicy().override(dpi='много')
+        policy = ImagePolicy(quantize=64).override(format='WEBP', dpi='72')
+        self.assertEqual(policy, ImagePolicy(format='webp', dpi=72, quantize=64))
+        self.assertIs(policy.override(), policy)
+
+    def test_max_px_lowers_dpi(self):
+        self.assertEqual(ImagePolicy(dpi=100, max_px=300).effective_dpi(6, 4), 50)
+        self.assertEqual(ImagePolicy(dpi=100, max_px=3000).effective_dpi(6, 4), 100)
+
+    def test_bad_env_falls_back_to_default(self):
+        for env in ({'IMAGE_DPI': '1000'}, {'IMAGE_FORMAT': 'gif'}):
+            with patch.dict('os.environ', env), self.assertLogs(level='WARNING'):
+                self.assertEqual(image_policy._policy_from_env(), ImagePolicy())
+        with patch.dict('os.environ', {'IMAGE_FORMAT': 'SVG', 'IMAGE_DPI': '72'}):
+            self.assertEqual(image_policy._policy_from_env(), ImagePolicy(format='svg', dpi=72))
+
+    def test_context_restores_default(self):
+        default = current_image_policy()
+        with use_image_policy(ImagePolicy(format='svg')):
+            self.assertEqual(current_image_policy().format, 'svg')
+        self.assertIs(current_image_policy(), default)
+
+
+class TestEncoding(unittest.TestCase):
+    def test_default_png_unchanged(self):
+        """Политика по умолчанию даёт те же байты, что и savefig без параметров."""
+        fig = new_figure(figsize=(6, 4))
+        fig.add_subplot().plot([1, 3, 2, 4])
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png')
+        url, data = render(ImagePolicy())
+        self.assertTrue(url.endswith('.png'))
+        self.assertEqual(data, buf.getvalue())
+
+    def test_formats(self):
+        url, data = render(ImagePolicy(format='webp'))
+        self.assertTrue(url.endswith('.webp'))
+        self.assertEqual((data[:4], data[8:12]), (b'RIFF', b'WEBP'))
+        url, data = render(ImagePolicy(format='svg'))
+        self.assertTrue(url.endswith('.svg'))
+        self.assertIn(b'<svg', data)
+
+    def test_dpi_max_px_and_palette(self):
+        _, data = render(ImagePolicy(dpi=50))
+        self.assertEqual(Image.open(io.BytesIO(data)).size, (300, 200))
+        _, data = render(ImagePolicy(max_px=240))
+        self.assertEqual(Image.open(io.BytesIO(data)).size, (240, 160))
+        _, plain = render(ImagePolicy())
+        _, data = render(ImagePolicy(quantize=16, optimize=True))
+        image = Image.open(io.BytesIO(data))
+        self.assertEqual(image.mode, 'P')
+        self.assertLessEqual(len(image.getcolors()), 16)
+        self.assertLess(len(data), len(plain))
+
+    def test_inline_uses_media_type(self):
+        url, _ = render(ImagePolicy(format='svg'))
+        self.assertTrue(IMAGES.inline(f"<img src='{url}'>").startswith("<img src='data:image/svg+xml;base64,"))
+
+    def test_policy_reaches_pool_processes(self):
+        """Процессы пула кодируют картинки по политике запроса."""
+        df = pd.DataFrame(np.random.default_rng(1).normal(size=(50, 2)), columns=['a', 'b'])
+        pool = RenderPool(workers=2, min_tasks=1)
+        previous = parallel.install(pool)
+        try:
+            with patch('generators.plot_generator._save_html_file'), \
+                    use_image_policy(ImagePolicy(format='webp')):
+                items = _build_histograms(df)
+        finally:
+            parallel.install(previous)
+            pool.shutdown()
+        self.assertTrue(all(url.endswith('.webp') for _, url, _ in items))
+        self.assertTrue(IMAGES.available([url for _, url, _ in items]))
+
+
+class TestPolicyRoutes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import routes  # noqa: F401 — регистрирует маршруты в приложении по умолчанию
+        cls.app = bottle.default_app()
+        cls.dataset = DatasetHandle.from_frame(
+            pd.DataFrame({'a': np.arange(30.0), 'b': np.arange(30.0) % 7}),
+        )
+
+    def setUp(self):
+        for patcher in (patch('routes.get_current_dataset', return_value=self.dataset),
+                        patch('generators.plot_generator._save_html_file')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_request_format_and_image_route(self):
+        status, _, body = post(self.app, '/generate_plot', {'plot_type': 'box', 'img_format': 'svg'})
+        self.assertEqual(status, 200)
+        refs = IMAGES.references(body.decode())
+        self.assertEqual(len(refs), 1)
+        name = refs.pop()
+        self.assertTrue(name.endswith('.svg'))
+
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': f'/img/{name}', 'SERVER_NAME': 'test',
+                   'SERVER_PORT': '80', 'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(),
+                   'wsgi.url_scheme': 'http'}
+        headers = {}
+        b''.join(self.app(environ, lambda status, h, exc_info=None: headers.update(h)))
+        self.assertEqual(headers['Content-Type'], 'image/svg+xml')
+
+    def test_invalid_policy_is_400(self):
+        status, _, body = post(self.app, '/generate_plot', {'plot_type': 'box', 'img_dpi': '5000'})
+        self.assertEqual(status, 400)
+        self.assertIn('DPI', json.loads(body)['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import bottle
+
+from utils.image_store import IMAGES, ImageStore, collect_images, image_url
+from utils.result_cache import ResultCache
+
+PNG = b'\x89PNG\r\n\x1a\n'
+
+
+def call(app, path, headers=None):
+    """Выполнить GET-запрос к WSGI-приложению и вернуть (код, заголовки, тело)."""
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+        'SERVER_NAME': 'test', 'SERVER_PORT': '80', 'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(), 'wsgi.url_scheme': 'http',
+    }
+    for key, value in (headers or {}).items():
+        environ['HTTP_' + key.upper().replace('-', '_')] = value
+    out = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        out['status'] = int(status.split()[0])
+        out['headers'] = dict(response_headers)
+
+    body = b''.join(app(environ, start_response))
+    return out['status'], out['headers'], body
+
+
+class TestImageStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_put_is_content_addressed(self):
+        """Одинаковые байты дают один хэш и одну запись."""
+        store = ImageStore(max_bytes=1024)
+        first = store.put(PNG + b'a')
+        self.assertEqual(store.put(PNG + b'a'), first)
+        self.assertNotEqual(store.put(PNG + b'b'), first)
+        self.assertEqual(store.get(first), PNG + b'a')
+        self.assertEqual(store.stats().entries, 2)
+        self.assertIsNone(store.get('0' * 32))
+
+    def test_lru_eviction_by_bytes(self):
+        store = ImageStore(max_bytes=100)
+        old = store.put(b'x' * 60)
+        new = store.put(b'y' * 60)
+        self.assertNotIn(old, store)
+        self.assertIn(new, store)
+        self.assertEqual(store.stats().evictions, 1)
+
+    def test_disk_copy_shared_between_instances(self):
+        """Картинка, вытесненная из памяти, читается с диска другим экземпляром."""
+        digest = ImageStore(max_bytes=1024, root=self.root).put(PNG)
+        other = ImageStore(max_bytes=1024, root=self.root)
+        self.assertIn(digest, other)
+        self.assertEqual(other.get(digest), PNG)
+
+    def test_disk_budget_prunes_oldest(self):
+        store = ImageStore(max_bytes=1024, root=self.root, max_disk_bytes=250)
+        oldest = store.put(b'a' * 100)
+        os.utime(store._path(oldest), (0, 0))
+        kept = store.put(b'b' * 100)
+        store.clear()
+        store.put(b'c' * 100)
+        self.assertNotIn(oldest, store)
+        self.assertIn(kept, store)
+        self.assertLessEqual(store.stats().disk_bytes, 250)
+
+    def test_inline_and_available(self):
+        """Сохраняемый HTML получает data:-URI, а кэш проверяет наличие картинок."""
+        store = ImageStore(max_bytes=1024)
+        html = f"<img src='{image_url(store.put(PNG))}'>"
+        self.assertTrue(store.available((html, None)))
+        self.assertIn("src='data:image/png;base64,iVBORw0KGgo", store.inline(html))
+
+        store.clear()
+        self.assertFalse(store.available(html))
+        self.assertEqual(store.inline(html), html)
+
+    def test_result_cache_drops_entries_with_missing_images(self):
+        store = ImageStore(max_bytes=1024)
+        cache = ResultCache(max_bytes=10_000)
+        key = ('fp', 'route', ())
+        cache.put(key, f"<img src='{image_url(store.put(PNG))}'>")
+        self.assertIsNotNone(cache.get(key, valid=store.available))
+        store.clear()
+        self.assertIsNone(cache.get(key, valid=store.available))
+        self.assertEqual(cache.stats().entries, 0)
+
+    def test_collect_images(self):
+        """Картинки фоновой задачи собираются для передачи родителю."""
+        store = ImageStore(max_bytes=1024)
+        with collect_images() as images:
+            digest = store.put(PNG)
+        self.assertEqual(images, [(digest, PNG)])
+
+        parent = ImageStore(max_bytes=1024)
+        parent.put_many(images)
+        self.assertEqual(parent.get(digest), PNG)
+
+
+class TestImageRoute(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import routes  # noqa: F401 — регистрирует маршруты в приложении по умолчанию
+        cls.app = bottle.default_app()
+
+    def test_serves_immutable_png_and_304(self):
+        url = image_url(IMAGES.put(PNG + b'route'))
+        status, headers, body = call(self.app, url)
+        self.assertEqual(status, 200)
+        self.assertEqual(body, PNG + b'route')
+        self.assertEqual(headers['Content-Type'], 'image/png')
+        self.assertIn('immutable', headers['Cache-Control'])
+
+        status, _, body = call(self.app, url, {'If-None-Match': headers['Etag']})
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b'')
+
+    def test_unknown_image(self):
+        status, _, _ = call(self.app, image_url('f' * 32))
+        self.assertEqual(status, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
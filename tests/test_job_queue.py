@@ -0,0 +1,115 @@
+import time
+import unittest
+from unittest.mock import patch
+
+import bottle
+import numpy as np
+import pandas as pd
+
+from tests.test_chart_data import post
+from utils.dataset_handle import DatasetHandle
+from utils.job_queue import JobQueue, QueueFullError, report_progress
+
+
+def square(value):
+    report_progress(1, 2)
+    return value * value
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class FakeClock:
+    """Управляемые часы для проверки срока хранения результатов."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_finished(queue, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = queue.status(job_id)
+        if status is None or status.state in ('done', 'failed'):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f'задача {job_id} не завершилась за {timeout} с')
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.queue = JobQueue(max_workers=1, max_pending=2, result_ttl=60.0, clock=self.clock)
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_result_and_on_done(self):
+        """Результат проходит через on_done в родительском процессе."""
+        job_id = self.queue.submit(square, 7, on_done=lambda value: f'<p>{value}</p>')
+        status = wait_finished(self.queue, job_id)
+        self.assertEqual(status.state, 'done')
+        self.assertEqual(status.result, '<p>49</p>')
+        self.assertEqual(status.progress, 1.0)
+
+    def test_failure_reports_error(self):
+        """Исключение задачи превращается в состояние failed с текстом ошибки."""
+        job_id = self.queue.submit(fail, 'нет данных')
+        status = wait_finished(self.queue, job_id)
+        self.assertEqual(status.state, 'failed')
+        self.assertIn('нет данных', status.error)
+
+    def test_queue_full(self):
+        """Сверх max_pending незавершённых задач очередь отказывает."""
+        first = self.queue.submit(sleep_for, 0.5)
+        second = self.queue.submit(sleep_for, 0.5)
+        with self.assertRaises(QueueFullError):
+            self.queue.submit(sleep_for, 0.5)
+        wait_finished(self.queue, first)
+        wait_finished(self.queue, second)
+        self.queue.submit(square, 2)   # место освободилось
+
+    def test_result_expires(self):
+        """Результат удаляется после result_ttl секунд."""
+        job_id = self.queue.submit(square, 3)
+        wait_finished(self.queue, job_id)
+        self.clock.now = 61.0
+        self.assertIsNone(self.queue.status(job_id))
+
+    def test_unknown_job(self):
+        self.assertIsNone(self.queue.status('missing'))
+
+    def test_report_progress_outside_job_is_noop(self):
+        report_progress(1, 2)   # не должно бросать исключений
+
+
+
+class TestAsyncDisabled(unittest.TestCase):
+    def test_async_request_answered_synchronously(self):
+        """С JOB_ASYNC=0 запрос с async=1 сразу получает HTML, а не 202."""
+        import routes
+
+        dataset = DatasetHandle.from_frame(pd.DataFrame({'a': np.arange(30.0), 'b': np.arange(30.0) % 7}))
+        with patch('routes.get_current_dataset', return_value=dataset), \
+                patch('routes.JOB_ASYNC', False), \
+                patch('generators.plot_generator._save_html_file'), \
+                patch.object(routes.job_queue, 'submit') as submit:
+            status, headers, body = post(bottle.default_app(), '/generate_plot',
+                                         {'plot_type': 'box', 'async': '1'})
+        self.assertEqual(status, 200)
+        self.assertTrue(headers['Content-Type'].startswith('text/html'))
+        self.assertIn(b'/img/', body)
+        submit.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from generators import kde as kde_module
+from generators.kde import MIN_GRID, compute_kde
+from generators.summary import NumericSummary
+from tests import frames
+
+# Допустимая ошибка бинированной KDE относительно максимума точной плотности
+TOLERANCE = 1e-3
+
+
+def sample_frame(rows=2000):
+    """Столбцы разной формы: гладкие, многомодальные, с тяжёлым хвостом и выбросами."""
+    return frames.sample_frame({
+        'normal': frames.normal,
+        'exponential': frames.exponential(1000),
+        'bimodal': lambda rng, rows: np.r_[rng.normal(-5, 1, rows // 2), rng.normal(5, 0.3, rows - rows // 2)],
+        'lognormal': lambda rng, rows: rng.lognormal(0, 2, rows),
+        'integer': frames.integers(0, 6),
+        'outliers': frames.spikes(7, 1e6, jitter=1e-3),
+    }, rows=rows, seed=20, nan_every=9)
+
+
+class TestBinnedKde(unittest.TestCase):
+    def test_matches_gaussian_kde(self):
+        """Кривые совпадают с ``scipy.stats.gaussian_kde`` с точностью 0.1 % от максимума."""
+        for rows in (50, 2000, 50000):
+            df = sample_frame(rows)
+            curves = compute_kde(df)
+            for col in df.columns:
+                values = df[col].dropna().to_numpy(dtype=float)
+                x, y = curves.curve(col, 200)
+                np.testing.assert_allclose(x, np.linspace(values.min(), values.max(), 200))
+                exact = stats.gaussian_kde(values)(x)
+                error = np.abs(y - exact).max() / exact.max()
+                self.assertLess(error, TOLERANCE, f'{col}, {rows} строк')
+
+    def test_bandwidth_is_scott(self):
+        df = sample_frame()
+        curves = compute_kde(df)
+        for k, col in enumerate(df.columns):
+            values = df[col].dropna().to_numpy(dtype=float)
+            kde = stats.gaussian_kde(values)
+            self.assertAlmostEqual(curves.bandwidth[k], np.sqrt(kde.covariance[0, 0]))
+
+    def test_degenerate_columns(self):
+        """Для константы, одного значения и пустого столбца кривой нет."""
+        df = pd.DataFrame({
+            'constant': np.ones(10),
+            'single': [1.0] + [np.nan] * 9,
+            'empty': np.nan,
+            'pair': [1.0, 2.0] + [np.nan] * 8,
+        })
+        curves = compute_kde(df)
+        for col in ('constant', 'single', 'empty'):
+            self.assertIsNone(curves.curve(col, 50))
+        x, y = curves.curve('pair', 50)
+        np.testing.assert_allclose(y, stats.gaussian_kde([1.0, 2.0])(x), rtol=0, atol=1e-3 * y.max())
+        with self.assertRaises(ValueError):
+            compute_kde(pd.DataFrame({'a': [1.0, np.inf]}))
+
+    def test_grid_sized_per_column(self):
+        """Столбец с выбросом не увеличивает сетку остальных; блоки не меняют результат."""
+        rng = np.random.default_rng(20)
+        df = pd.DataFrame(rng.normal(size=(2000, 6)), columns=list('abcdef'))
+        df.loc[0, 'f'] = 1e6
+        curves = compute_kde(df)
+        self.assertEqual({curves.density[k].size for k in range(5)}, {MIN_GRID})
+        self.assertGreater(curves.density[5].size, MIN_GRID)
+        np.testing.assert_array_equal(curves.density[0], compute_kde(df[['a']]).density[0])
+
+        with patch.object(kde_module, 'BLOCK_CELLS', 1):  # по столбцу на блок
+            blocked = compute_kde(df)
+        for got, want in zip(blocked.density, curves.density):
+            np.testing.assert_allclose(got, want, rtol=1e-12, atol=1e-15)
+
+    def test_summary_caches_kde(self):
+        summary = NumericSummary(sample_frame().assign(label='x'))
+        self.assertIs(summary.kde, summary.kde)
+        self.assertEqual(summary.kde.columns, tuple(summary.columns))
+
+
+if __name__ == '__main__':
+    unittest.main()
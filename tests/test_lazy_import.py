@@ -0,0 +1,67 @@
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from utils import lazy_import
+from utils.lazy_import import LazyModule, lazy_module, prewarm
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ['matplotlib', 'seaborn', 'scipy.stats', 'sklearn', 'pandas.plotting._matplotlib']
+
+
+class TestLazyModule(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        with open(os.path.join(self.root, 'lazy_probe.py'), 'w', encoding='utf-8') as file:
+            file.write('VALUE = 42\n\ndef double(x):\n    return 2 * x\n')
+        sys.path.insert(0, self.root)
+        self.registry = list(lazy_import._registry)
+
+    def tearDown(self):
+        sys.path.remove(self.root)
+        sys.modules.pop('lazy_probe', None)
+        lazy_import._registry[:] = self.registry
+        shutil.rmtree(self.root)
+
+    def test_imports_on_first_attribute(self):
+        module = lazy_module('lazy_probe')
+        self.assertNotIn('lazy_probe', sys.modules)
+        self.assertFalse(module.loaded)
+        self.assertEqual(module.VALUE, 42)
+        self.assertTrue(module.loaded)
+        # Атрибут — настоящая функция модуля: её можно передать в пул процессов
+        self.assertIs(pickle.loads(pickle.dumps(module.double)), sys.modules['lazy_probe'].double)
+
+    def test_prewarm_loads_registered(self):
+        module = lazy_module('lazy_probe')
+        prewarm()
+        self.assertTrue(module.loaded)
+        self.assertIn('lazy_probe', sys.modules)
+
+    def test_missing_module_fails_on_use(self):
+        module = LazyModule('no_such_module_here')
+        with self.assertRaises(ImportError):
+            module.anything
+
+
+class TestStartupImports(unittest.TestCase):
+    def test_app_import_skips_heavy_libraries(self):
+        """``import app`` не загружает matplotlib, seaborn, scipy.stats и scikit-learn."""
+        code = (
+            'import json, sys\n'
+            'import app\n'
+            f'print(json.dumps([name for name in {HEAVY!r} if name in sys.modules]))\n'
+        )
+        out = subprocess.run(
+            [sys.executable, '-c', code], cwd=PROJECT_ROOT, check=True, capture_output=True, text=True,
+        ).stdout
+        self.assertEqual(json.loads(out.strip().splitlines()[-1]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import io
+import unittest
+
+import bottle
+
+from utils.metrics import (
+    REGISTRY,
+    MetricsPlugin,
+    MetricsRegistry,
+    collect_phases,
+    phase,
+    record_phases,
+    route_context,
+)
+
+
+def call(app, path, **headers):
+    """Выполнить GET-запрос к WSGI-приложению и вернуть код ответа."""
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'SERVER_NAME': 'test',
+        'SERVER_PORT': '80', 'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(),
+        'wsgi.url_scheme': 'http', **headers,
+    }
+    out = {}
+    b''.join(app(environ, lambda status, headers, exc=None: out.update(status=status)))
+    return int(out['status'].split()[0])
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_render_prometheus_text(self):
+        """Счётчики и гистограммы выводятся в текстовом формате Prometheus."""
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        registry.describe('requests_total', 'counter', 'Запросы.')
+        registry.inc('requests_total', {'route': '/a"b'})
+        registry.observe('latency_seconds', {'route': '/a'}, 0.5)
+        registry.observe('latency_seconds', {'route': '/a'}, 2.0)
+
+        text = registry.render()
+        self.assertIn('# TYPE requests_total counter', text)
+        self.assertIn('requests_total{route="/a\\"b"} 1', text)
+        self.assertIn('latency_seconds_bucket{route="/a",le="0.1"} 0', text)
+        self.assertIn('latency_seconds_bucket{route="/a",le="1"} 1', text)
+        self.assertIn('latency_seconds_bucket{route="/a",le="+Inf"} 2', text)
+        self.assertIn('latency_seconds_sum{route="/a"} 2.5', text)
+        self.assertIn('latency_seconds_count{route="/a"} 2', text)
+
+    def test_collector_output(self):
+        registry = MetricsRegistry()
+        registry.register_collector(lambda: [('cache_entries', 'gauge', 'Записи.', [({}, 3)])])
+        self.assertIn('cache_entries 3', registry.render())
+
+
+class TestMetricsPlugin(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.app = bottle.Bottle(catchall=True)
+        self.app.install(MetricsPlugin(self.registry))
+
+        @self.app.route('/ok/<item>')
+        def ok(item):
+            with phase('statistics'):
+                return item
+
+        @self.app.route('/boom')
+        def boom():
+            raise RuntimeError('boom')
+
+        @self.app.route('/missing')
+        def missing():
+            bottle.abort(404)
+
+    def test_counts_by_route_template_and_status(self):
+        """Метка route — шаблон правила; ошибки 5xx считаются отдельно."""
+        self.assertEqual(call(self.app, '/ok/1'), 200)
+        self.assertEqual(call(self.app, '/ok/2'), 200)
+        self.assertEqual(call(self.app, '/boom'), 500)
+        self.assertEqual(call(self.app, '/missing'), 404)
+
+        get = self.registry.counter_value
+        self.assertEqual(get('http_requests_total', {'route': '/ok/<item>', 'method': 'GET', 'status': '200'}), 2)
+        self.assertEqual(get('http_requests_total', {'route': '/missing', 'method': 'GET', 'status': '404'}), 1)
+        self.assertEqual(get('http_request_errors_total', {'route': '/boom', 'method': 'GET'}), 1)
+        self.assertEqual(get('http_request_errors_total', {'route': '/missing', 'method': 'GET'}), 0)
+        self.assertEqual(
+            self.registry.histogram_count('http_request_duration_seconds', {'route': '/ok/<item>', 'method': 'GET'}),
+            2,
+        )
+
+    def test_phase_labelled_with_route(self):
+        """Фазы внутри обработчика получают метку маршрута."""
+        labels = {'route': '/ok/<item>', 'phase': 'statistics'}
+        before = REGISTRY.histogram_count('app_phase_duration_seconds', labels)
+        call(self.app, '/ok/1')
+        self.assertEqual(REGISTRY.histogram_count('app_phase_duration_seconds', labels), before + 1)
+
+
+class TestReturnedResponseStatus(unittest.TestCase):
+    def test_not_modified_image_counted_as_304(self):
+        """Код возвращённого HTTPResponse (304 картинки) попадает в метку status."""
+        import routes  # noqa: F401 — регистрирует маршруты в приложении по умолчанию
+        from utils.image_store import IMAGES
+
+        name = IMAGES.put(b'\x89PNG test-metrics-304', 'png')
+        labels = {'route': '/img/<name:re:[0-9a-f]{32}\\.(?:png|webp|svg)>', 'method': 'GET'}
+        get = REGISTRY.counter_value
+        before = {code: get('http_requests_total', {**labels, 'status': code}) for code in ('200', '304')}
+
+        app = bottle.default_app()
+        self.assertEqual(call(app, f'/img/{name}'), 200)
+        self.assertEqual(call(app, f'/img/{name}', HTTP_IF_NONE_MATCH=f'"{name}"'), 304)
+        self.assertEqual(get('http_requests_total', {**labels, 'status': '200'}), before['200'] + 1)
+        self.assertEqual(get('http_requests_total', {**labels, 'status': '304'}), before['304'] + 1)
+
+
+class TestPhaseForwarding(unittest.TestCase):
+    def test_collect_and_record(self):
+        """Фазы фоновой задачи собираются в список и переносятся в реестр."""
+        labels = {'route': '/job-route', 'phase': 'render'}
+        before = REGISTRY.histogram_count('app_phase_duration_seconds', labels)
+        with route_context('/job-route'), collect_phases() as samples:
+            with phase('render'):
+                pass
+        self.assertEqual(REGISTRY.histogram_count('app_phase_duration_seconds', labels), before)
+        self.assertEqual([(route, name) for route, name, _ in samples], [('/job-route', 'render')])
+
+        record_phases(samples)
+        self.assertEqual(REGISTRY.histogram_count('app_phase_duration_seconds', labels), before + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from generators.column_stats import compute_column_stats
+from generators.distrib_generator import analyze_distributions, generate_distribution_html
+from generators.normality import (
+    ANDERSON_MAX_N,
+    SHAPIRO_MAX_N,
+    anderson_darling,
+    check_normality,
+    check_sample,
+    choose_test,
+    moment_test,
+)
+from generators.summary import NumericSummary
+from tests import frames
+
+
+def sample_frame(rows=20_000):
+    """Нормальный, близкий к нормальному и явно ненормальные столбцы."""
+    return frames.sample_frame({
+        'normal': frames.normal,
+        'student': lambda rng, rows: rng.standard_t(8, size=rows),
+        'exponential': frames.exponential(),
+        'uniform': lambda rng, rows: rng.uniform(size=rows),
+    }, rows=rows, seed=23, nan_every=7)
+
+
+class TestChooseTest(unittest.TestCase):
+    def test_auto_by_sample_size(self):
+        self.assertIsNone(choose_test(2, 'auto'))
+        self.assertEqual(choose_test(SHAPIRO_MAX_N, 'auto'), 'shapiro')
+        self.assertEqual(choose_test(SHAPIRO_MAX_N + 1, 'auto'), 'anderson')
+        self.assertEqual(choose_test(ANDERSON_MAX_N + 1, 'auto'), 'dagostino')
+
+    def test_explicit_method(self):
+        self.assertEqual(choose_test(10**6, 'jarque_bera'), 'jarque_bera')
+        self.assertEqual(choose_test(10**6, 'shapiro'), 'shapiro_subsample')
+        self.assertEqual(choose_test(10, 'dagostino'), 'shapiro')  # Слишком короткий столбец
+        self.assertEqual(choose_test(100, 'unknown'), 'shapiro')
+
+
+class TestNormalityTests(unittest.TestCase):
+    def test_tests_match_scipy(self):
+        """Векторные тесты совпадают с функциями scipy по каждому столбцу."""
+        df = sample_frame()
+        column_stats = compute_column_stats(df)
+        dagostino = moment_test('dagostino', column_stats.count, column_stats.skew, column_stats.kurt)
+        jarque_bera = moment_test('jarque_bera', column_stats.count, column_stats.skew, column_stats.kurt)
+        anderson = anderson_darling(df.to_numpy(), column_stats.count)
+        for k, col in enumerate(df.columns):
+            values = df[col].dropna()
+            for (statistic, p_value), expected in ((dagostino, stats.normaltest(values)),
+                                                   (jarque_bera, stats.jarque_bera(values))):
+                self.assertAlmostEqual(statistic[k] / expected.statistic, 1.0, places=9, msg=col)
+                np.testing.assert_allclose(p_value[k], expected.pvalue, rtol=1e-6, atol=1e-300)
+            self.assertAlmostEqual(anderson[0][k] / stats.anderson(values).statistic, 1.0, places=9, msg=col)
+
+        # p-value Андерсона — Дарлинга согласован с критическими значениями scipy
+        critical = stats.anderson(df['student']).critical_values
+        self.assertLess(anderson[1][1], 0.01)
+        self.assertGreater(anderson[0][1], critical[-1])
+
+    def test_check_normality(self):
+        df = sample_frame()
+        result = check_normality(df)
+        self.assertEqual(result.test, ('anderson',) * 4)
+        self.assertFalse(result.column('exponential')['is_normal'])
+        self.assertFalse(result.column('uniform')['is_normal'])
+        self.assertTrue((result.seconds > 0).all())
+
+        subsample = check_normality(df, method='shapiro')
+        self.assertEqual(subsample.test, ('shapiro_subsample',) * 4)
+        np.testing.assert_array_equal(subsample.p_value, check_normality(df, method='shapiro').p_value)
+        self.assertTrue(subsample.column('normal')['is_normal'])
+
+    def test_short_columns_keep_shapiro(self):
+        """До 5000 значений результат тот же, что у scipy.stats.shapiro."""
+        df = sample_frame(rows=1000)
+        df['pair'] = np.r_[1.0, 2.0, np.full(998, np.nan)]
+        result = check_normality(df)
+        for col in df.columns[:-1]:
+            self.assertEqual(result.column(col)['normality_p'], stats.shapiro(df[col].dropna()).pvalue)
+        self.assertEqual(result.column('pair'), {
+            'normality_test': None, 'normality_statistic': None, 'normality_p': None,
+            'is_normal': False, 'normality_seconds': None,
+        })
+
+    def test_sample_only(self):
+        """Без всех значений тест Андерсона — Дарлинга заменяется K² по моментам."""
+        values = sample_frame()['exponential'].to_numpy()
+        skew, kurt = pd.Series(values).skew(), pd.Series(values).kurt()
+        result = check_sample(values[:SHAPIRO_MAX_N], False, values.size, skew, kurt)
+        self.assertEqual(result['normality_test'], 'dagostino')
+        self.assertAlmostEqual(result['normality_p'], stats.normaltest(values).pvalue)
+        self.assertGreater(result['normality_seconds'], 0.0)
+        result = check_sample(values[:1000], False, 1000 + 1, skew, kurt)
+        self.assertEqual(result['normality_test'], 'shapiro_subsample')
+        self.assertFalse(result['is_normal'])
+
+
+class TestDistributionReport(unittest.TestCase):
+    def test_large_columns_are_tested(self):
+        """Столбцы длиннее 5000 значений больше не считаются ненормальными без теста."""
+        df = sample_frame()
+        summary = NumericSummary(df)
+        result = analyze_distributions(df, summary)
+        self.assertIs(summary.normality, summary.normality)
+        self.assertEqual(result['normal']['stats']['normality_test'], 'anderson')
+        self.assertIsNotNone(result['normal']['stats']['normality_p'])
+        self.assertGreater(result['normal']['stats']['normality_seconds'], 0.0)
+        self.assertRegex(generate_distribution_html(df, summary), r'Андерсона — Дарлинга: p = [^<]+ \(\d+\.\d мс\)')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from generators import parallel
+from generators.distrib_generator import analyze_distributions
+from generators.parallel import RenderPool
+from generators.plot_generator import _build_histograms
+from utils.image_store import IMAGES
+
+
+class TestRenderPoolFallback(unittest.TestCase):
+    def test_serial_for_small_inputs_and_single_worker(self):
+        pool = RenderPool(workers=4, min_tasks=8)
+        self.assertFalse(pool.parallel_for(7))
+        self.assertTrue(pool.parallel_for(8))
+        self.assertFalse(RenderPool(workers=1, min_tasks=1).parallel_for(100))
+
+    def test_serial_inside_background_job(self):
+        """Внутри фоновой задачи пул не запускается: процессы уже заняты очередью."""
+        pool = RenderPool(workers=4, min_tasks=1)
+        with patch('generators.parallel.current_job', return_value='job'):
+            self.assertFalse(pool.parallel_for(10))
+
+    def test_serial_map_keeps_order(self):
+        pool = RenderPool(workers=1)
+        self.assertEqual(pool.map(pow, [(2, 3), (3, 2), (5, 0)]), [8, 9, 1])
+
+
+class TestParallelRendering(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = RenderPool(workers=2, min_tasks=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.df = pd.DataFrame({
+            'a': rng.normal(size=120),
+            'b': rng.exponential(size=120),
+            'c': rng.uniform(size=120),
+        })
+
+    def render_with(self, pool, func):
+        previous = parallel.install(pool)
+        try:
+            return func()
+        finally:
+            parallel.install(previous)
+
+    @patch('generators.plot_generator._save_html_file')
+    def test_histograms_match_serial(self, _mock_save):
+        """Параллельные гистограммы совпадают с последовательными и идут в порядке столбцов."""
+        serial = self.render_with(RenderPool(workers=1), lambda: _build_histograms(self.df))
+        IMAGES.clear()
+        parallel_items = self.render_with(self.pool, lambda: _build_histograms(self.df))
+        self.assertEqual(parallel_items, serial)
+        # Картинки из процессов пула переданы в хранилище родителя
+        self.assertTrue(IMAGES.available([url for _, url, _ in parallel_items]))
+
+    def test_distributions_match_serial(self):
+        serial = self.render_with(RenderPool(workers=1), lambda: analyze_distributions(self.df))
+        in_pool = self.render_with(self.pool, lambda: analyze_distributions(self.df))
+        self.assertEqual(list(in_pool), ['a', 'b', 'c'])
+        for col in serial:
+            self.assertEqual(in_pool[col]['plot'], serial[col]['plot'])
+            for stats in (in_pool[col]['stats'], serial[col]['stats']):
+                stats.pop('normality_seconds')  # время у запусков своё
+            self.assertEqual(in_pool[col]['stats'], serial[col]['stats'])
+
+
+if __name__ == '__main__':
+    unittest.main()
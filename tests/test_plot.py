@@ -1,15 +1,12 @@
 import unittest
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch
 import pandas as pd
 import numpy as np
-import base64
-import io
 import os
 
 # Импорт тестируемых функций
 from generators.plot_generator import (
     build_plot_html,
-    _fig_to_base64,
     _save_html_file,
     _basic_hist_stats,
     _hist_stats_table,
@@ -17,8 +14,12 @@ from generators.plot_generator import (
     _build_histograms,
     _build_boxplots,
     _build_scatter_matrix,
+    _draw_scatter_matrix,
+    _pair_densities,
     _HIST_DESCRIPTIONS
 )
+from generators.rendering import new_figure, store_figure
+from utils.image_store import IMAGES
 
 # Настройка неинтерактивного бэкенда Matplotlib для тестов
 import matplotlib
@@ -62,20 +63,22 @@ class TestPlotGenerator(unittest.TestCase):
         })
         self.sample_series = pd.Series([1, 2, 2, 3, 3, 3, 4, 4, 5, np.nan])
 
-    def test_fig_to_base64(self):
+    def assertStoredPng(self, url):
+        """URL ведёт на PNG, сохранённый в хранилище картинок."""
+        self.assertRegex(url, r"^/img/[0-9a-f]{32}\.png$")
+        data = IMAGES.get(url[len("/img/"):])
+        self.assertIsNotNone(data)
+        self.assertTrue(data.startswith(b"\x89PNG"))
+
+    def test_store_figure(self):
         """
-        Проверка конвертации объекта Figure Matplotlib в строку base64.
+        Проверка сохранения объекта Figure Matplotlib в хранилище картинок.
         """
         fig = plt.figure()
         plt.plot([1, 2, 3])
-        base64_str = _fig_to_base64(fig)
+        url = store_figure(fig, bbox_inches="tight")
         plt.close(fig)
-        self.assertIsInstance(base64_str, str)
-        self.assertTrue(len(base64_str) > 0)
-        try:
-            base64.b64decode(base64_str)
-        except Exception:
-            self.fail("_fig_to_base64 не вернул валидную строку base64.")
+        self.assertStoredPng(url)
 
     @patch('generators.plot_generator.os.makedirs')
     @patch('generators.plot_generator.open', new_callable=unittest.mock.mock_open)
@@ -147,7 +150,7 @@ class TestPlotGenerator(unittest.TestCase):
         self.assertEqual(len(results), 3)
         for col_name, img64, stats_html in results:
             self.assertIn(col_name, ['ColA', 'ColB', 'ColC'])
-            self.assertTrue(img64.startswith("iVBORw0KGgo"))
+            self.assertStoredPng(img64)
             self.assertIn(f"<td>{_HIST_DESCRIPTIONS['mean']}</td>", stats_html)
         self.assertEqual(mock_save_html.call_count, 3)
         mock_save_html.assert_any_call(unittest.mock.ANY, "histogram_ColA")
@@ -170,7 +173,7 @@ class TestPlotGenerator(unittest.TestCase):
         self.assertEqual(len(results), 1)
         label, img64, stats_html = results[0]
         self.assertEqual(label, "Box-plot")
-        self.assertTrue(img64.startswith("iVBORw0KGgo"))
+        self.assertStoredPng(img64)
         self.assertIn("<th>Столбец</th><th>Минимум</th>", stats_html)
         self.assertIn("<td>ColA</td>", stats_html)
         self.assertIn("<td>ColB</td>", stats_html)
@@ -191,7 +194,7 @@ class TestPlotGenerator(unittest.TestCase):
         self.assertEqual(len(results), 1)
         label, img64, stats_html = results[0]
         self.assertEqual(label, "Scatter-matrix")
-        self.assertTrue(img64.startswith("iVBORw0KGgo"))
+        self.assertStoredPng(img64)
         self.assertEqual(stats_html, "")
         mock_save_html.assert_called_once()
         mock_save_html.assert_called_with(unittest.mock.ANY, "scatter_matrix")
@@ -213,7 +216,7 @@ class TestPlotGenerator(unittest.TestCase):
         self.assertIn("alt='ColA'", html_output)
         self.assertIn("alt='ColB'", html_output)
         self.assertIn("alt='ColC'", html_output)
-        self.assertIn("src='data:image/png;base64,", html_output)
+        self.assertIn("src='/img/", html_output)
         self.assertIn("Количество наблюдений", html_output)
         self.assertEqual(mock_save_html.call_count, 3)
 
@@ -226,7 +229,7 @@ class TestPlotGenerator(unittest.TestCase):
         self.assertIn("<h3 class='mt-3 mb-4'>Box-plot</h3>", html_output)
         self.assertEqual(html_output.count("<div class='card mb-4'>"), 1)
         self.assertIn("alt='Box-plot'", html_output)
-        self.assertIn("src='data:image/png;base64,", html_output)
+        self.assertIn("src='/img/", html_output)
         self.assertIn("<th>Столбец</th><th>Минимум</th>", html_output)
         self.assertEqual(mock_save_html.call_count, 1)
 
@@ -239,7 +242,7 @@ class TestPlotGenerator(unittest.TestCase):
         self.assertIn("<h3 class='mt-3 mb-4'>Scatter-matrix</h3>", html_output)
         self.assertEqual(html_output.count("<div class='card mb-4'>"), 1)
         self.assertIn("alt='Scatter-matrix'", html_output)
-        self.assertIn("src='data:image/png;base64,", html_output)
+        self.assertIn("src='/img/", html_output)
         self.assertNotIn("<th>Код</th><th>Описание</th>", html_output)
         self.assertEqual(mock_save_html.call_count, 1)
 
@@ -298,5 +301,67 @@ class TestPlotGenerator(unittest.TestCase):
         self.assertIn("<div class='row justify-content-center'>", html_output)
         self.assertNotIn("table-bordered", html_output)
 
+class TestDensityScatterMatrix(unittest.TestCase):
+    """
+    Тесты режима scatter-matrix с картой плотности для больших таблиц.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        x = rng.normal(size=3000)
+        self.df = pd.DataFrame({'x': x, 'y': x + rng.normal(size=3000), 'z': rng.uniform(size=3000)})
+        self.df.loc[::5, 'z'] = np.nan
+
+    def test_pair_densities_match_histogram2d(self):
+        """
+        Гистограммы пар совпадают с np.histogram2d по общим непропущенным строкам.
+        """
+        values = self.df.to_numpy()
+        mask = self.df.notna().to_numpy()
+        bounds = [(np.nanmin(values[:, k]), np.nanmax(values[:, k])) for k in range(3)]
+        densities = _pair_densities(values, mask, bounds, 16)
+        self.assertEqual(sorted(densities), [(0, 1), (0, 2), (1, 2)])
+        for (i, j), counts in densities.items():
+            common = mask[:, i] & mask[:, j]
+            expected, _, _ = np.histogram2d(
+                values[common, i], values[common, j], bins=16, range=[bounds[i], bounds[j]],
+            )
+            np.testing.assert_array_equal(counts, expected)
+
+    def test_density_mode_draws_images_instead_of_points(self):
+        fig = new_figure()
+        axes = _draw_scatter_matrix(fig, self.df, density=True)
+        self.assertEqual(len(axes[0, 1].images), 1)
+        self.assertEqual(len(axes[2, 0].images), 1)
+        self.assertEqual(len(axes[0, 1].collections), 0)
+        self.assertEqual(len(axes[1, 1].images), 0)  # на диагонали — гистограмма
+
+        fig = new_figure()
+        axes = _draw_scatter_matrix(fig, self.df, density=False)
+        self.assertEqual(len(axes[0, 1].images), 0)
+        self.assertEqual(len(axes[0, 1].collections), 1)
+
+    @patch('generators.plot_generator._save_html_file')
+    @patch('generators.plot_generator.SCATTER_DENSITY_MIN_ROWS', 1000)
+    def test_threshold_selects_density_mode_and_keeps_annotations(self, _mock_save):
+        """
+        Выше порога строк режим выбирается автоматически, подписи ρ сохраняются.
+        """
+        figures = []
+
+        def capture(fig, **kwargs):
+            figures.append(fig)
+            return store_figure(fig, **kwargs)
+
+        with patch('generators.plot_generator.store_figure', side_effect=capture):
+            _build_scatter_matrix(self.df)
+        (fig,) = figures
+        off_diagonal = [ax for k, ax in enumerate(fig.axes) if k % 4 != 0]
+        self.assertTrue(all(len(ax.images) == 1 for ax in off_diagonal))
+        annotations = [text.get_text() for ax in off_diagonal for text in ax.texts]
+        self.assertEqual(len(annotations), 6)
+        self.assertTrue(all(text.startswith("ρ = ") for text in annotations))
+
+
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
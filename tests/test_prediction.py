@@ -27,7 +27,7 @@ class TestPredictionService(unittest.TestCase):
         html, err = ps.build_prediction(self.df)
         self.assertEqual(html, '<div>ok</div>')
         self.assertIsNone(err)
-        mock_build.assert_called_once_with(self.df)
+        mock_build.assert_called_once_with(self.df, None, None)
 
 
     @patch('services.prediction_service.build_prediction_numbers')
@@ -44,6 +44,13 @@ class TestPredictionService(unittest.TestCase):
         self.assertIn('alert-danger', err)
 
 
+    def test_build_prediction_with_form_values(self):
+        """Поля формы передаются явно, без обращения к запросу."""
+        html, err = ps.build_prediction(self.df, '3', '4 5')
+        self.assertIsNone(err)
+        self.assertIn('Прогнозируемое значение:</strong> 9.0000', html)
+
+
     @patch('services.prediction_service.save_data_with_prediction')
     @patch('services.prediction_service.build_prediction_numbers_')
     def test_save_prediction(self, mock_build, mock_save):
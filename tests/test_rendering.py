@@ -0,0 +1,147 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from generators.correlation_generator import build_correlation_heatmap
+from generators.distrib_generator import _render_distribution
+from generators.kde import compute_kde
+from generators.plot_generator import _build_histograms, _render_histogram
+from generators.rendering import clear_templates, figure_template, new_figure, store_figure
+
+THREADS = 4
+
+
+def render_line(seed):
+    """Построить простую фигуру, зависящую от *seed*, и вернуть её URL."""
+    rng = np.random.default_rng(seed)
+    fig = new_figure(figsize=(3, 2))
+    ax = fig.add_subplot()
+    ax.plot(rng.normal(size=50).cumsum())
+    ax.set_title(f'seed {seed}')
+    return store_figure(fig)
+
+
+def hist(values):
+    """Плотности и границы корзин гистограммы *values* (``bins="auto"``)."""
+    return np.histogram(values, bins='auto', density=True)
+
+
+def span(values):
+    """Минимум и максимум *values*."""
+    return values.min(), values.max()
+
+
+def kde(values):
+    """Кривая KDE *values* из 200 точек (или None для вырожденного столбца)."""
+    return compute_kde(pd.DataFrame({'v': values})).curve('v', 200)
+
+
+class TestConcurrentRendering(unittest.TestCase):
+    def run_concurrently(self, func, args):
+        """Запустить func(arg) во всех потоках одновременно (через барьер)."""
+        barrier = threading.Barrier(len(args))
+
+        def task(arg):
+            barrier.wait()
+            return func(arg)
+
+        with ThreadPoolExecutor(max_workers=len(args)) as pool:
+            return list(pool.map(task, args))
+
+    def test_concurrent_figures_match_serial(self):
+        """Картинки, построенные параллельно, побайтно совпадают с построенными по очереди.
+
+        URL картинки — хэш PNG, поэтому любое вмешательство соседнего потока
+        (чужая линия, заголовок, размер) изменило бы адрес.
+        """
+        seeds = list(range(THREADS)) * 2
+        serial = [render_line(seed) for seed in seeds]
+        self.assertEqual(len(set(serial)), THREADS)
+        self.assertEqual(self.run_concurrently(render_line, seeds), serial)
+
+    @patch('generators.plot_generator._save_html_file')
+    def test_generators_in_parallel_threads(self, _mock_save):
+        """Генераторы отчётов можно вызывать из нескольких потоков одновременно."""
+        rng = np.random.default_rng(3)
+        frames = [
+            pd.DataFrame(rng.normal(size=(60, 2)) * (k + 1), columns=['a', 'b'])
+            for k in range(THREADS)
+        ]
+
+        def render(df):
+            return [url for _, url, _ in _build_histograms(df)], build_correlation_heatmap(df)
+
+        serial = [render(df) for df in frames]
+        self.assertEqual(self.run_concurrently(render, frames), serial)
+
+    def test_pyplot_state_untouched(self):
+        """Генераторы не создают фигур в менеджере pyplot."""
+        import matplotlib.pyplot as plt
+
+        before = plt.get_fignums()
+        build_correlation_heatmap(pd.DataFrame({'x': [1, 2, 3, 4], 'y': [2, 1, 4, 3]}))
+        render_line(0)
+        self.assertEqual(plt.get_fignums(), before)
+
+
+class TestFigureTemplates(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.a = rng.normal(size=300)
+        self.b = rng.exponential(size=300) * 1000
+
+    def test_reused_template_matches_fresh(self):
+        """Картинка из повторно использованного шаблона совпадает с картинкой из нового.
+
+        Между двумя отрисовками столбца *a* шаблон рисует другой столбец с
+        иным масштабом: если бы от него что-то осталось (пределы, подписи,
+        легенда), хэш картинки изменился бы.
+        """
+        clear_templates()
+        fresh = [
+            _render_histogram('a', *hist(self.a)),
+            _render_distribution('a', span(self.a), hist(self.a), kde(self.a), (self.a.mean(), self.a.std())),
+        ]
+        _render_histogram('b', *hist(self.b))
+        _render_distribution('b', span(self.b), hist(self.b), kde(self.b), None)
+        reused = [
+            _render_histogram('a', *hist(self.a)),
+            _render_distribution('a', span(self.a), hist(self.a), kde(self.a), (self.a.mean(), self.a.std())),
+        ]
+        self.assertEqual(reused, fresh)
+
+    def test_constant_and_empty_columns(self):
+        """Вырожденные столбцы рисуются без ошибок (KDE для константы скрывается)."""
+        _render_histogram('empty', *hist(np.array([])))
+        _render_distribution('const', (1.0, 1.0), hist(np.ones(10)), kde(np.ones(10)), None)
+
+    def test_long_labels_use_tight_bbox(self):
+        """Длинное имя столбца не обрезается: фигура сохраняется с bbox_inches="tight"."""
+        long_name = 'очень длинное название столбца с единицами измерения (кг/м³)'
+        with patch('generators.rendering.store_figure', return_value='/img/x.png') as store:
+            _render_histogram('a', *hist(self.a))
+            _render_distribution('a', span(self.a), hist(self.a), kde(self.a), None)
+            self.assertEqual([call.kwargs for call in store.call_args_list], [{}, {}])
+            store.reset_mock()
+            _render_histogram(long_name, *hist(self.a))
+            _render_distribution(long_name * 2, span(self.a), hist(self.a), kde(self.a), None)
+            self.assertEqual([call.kwargs for call in store.call_args_list], [{'bbox_inches': 'tight'}] * 2)
+
+    def test_templates_are_per_thread(self):
+        """У каждого потока свой шаблон: потоки не рисуют в одной фигуре."""
+        def build():
+            return new_figure()
+
+        mine = figure_template('per-thread', build)
+        self.assertIs(figure_template('per-thread', build), mine)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            other = pool.submit(figure_template, 'per-thread', build).result()
+        self.assertIsNot(other, mine)
+
+
+if __name__ == '__main__':
+    unittest.main()
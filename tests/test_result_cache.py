@@ -0,0 +1,68 @@
+import unittest
+
+from utils.result_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.calls = 0
+
+    def compute(self, value='x' * 100):
+        def inner():
+            self.calls += 1
+            return value
+        return inner
+
+    def test_hit_after_miss(self):
+        """Второй запрос с тем же ключом не пересчитывает результат."""
+        cache = ResultCache(max_bytes=10_000)
+        key = ('fp', 'route', ('hist',))
+        first = cache.get_or_compute(key, self.compute())
+        second = cache.get_or_compute(key, self.compute())
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, 1)
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses), (1, 1))
+        self.assertAlmostEqual(stats.hit_rate, 0.5)
+
+    def test_lru_eviction_by_size(self):
+        """При превышении объёма вытесняется давно не использованная запись."""
+        probe = ResultCache(max_bytes=10_000)
+        probe.put(('fp', 'r', 0), 'x' * 100)
+        size = probe.stats().bytes_used
+
+        cache = ResultCache(max_bytes=2 * size)
+        cache.get_or_compute(('fp', 'r', 1), self.compute())
+        cache.get_or_compute(('fp', 'r', 2), self.compute())
+        cache.get_or_compute(('fp', 'r', 1), self.compute())   # 2 становится старейшим
+        cache.get_or_compute(('fp', 'r', 3), self.compute())
+        self.assertEqual(cache.stats().evictions, 1)
+        self.assertEqual(self.calls, 3)
+        cache.get_or_compute(('fp', 'r', 2), self.compute())
+        self.assertEqual(self.calls, 4)
+
+    def test_invalidate_by_fingerprint(self):
+        """Инвалидация удаляет только записи указанного набора данных."""
+        cache = ResultCache(max_bytes=10_000)
+        cache.put(('old', 'a', ()), 'v1')
+        cache.put(('old', 'b', ()), 'v2')
+        cache.put(('new', 'a', ()), 'v3')
+        self.assertEqual(cache.invalidate('old'), 2)
+        self.assertEqual(cache.stats().entries, 1)
+
+    def test_errors_are_not_cached(self):
+        """Исключения и отвергнутые предикатом значения не сохраняются."""
+        cache = ResultCache(max_bytes=10_000)
+
+        def boom():
+            raise RuntimeError('fail')
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute(('fp', 'r', ()), boom)
+        cache.get_or_compute(('fp', 'r', ()), self.compute(('', 'error')),
+                             cacheable=lambda result: result[1] is None)
+        self.assertEqual(cache.stats().entries, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_handle import DatasetHandle
+from utils.session_store import SessionStore
+
+
+class FakeClock:
+    """Управляемые часы для проверки TTL без ожидания."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.dataset = DatasetHandle.from_frame(pd.DataFrame({'a': np.arange(100, dtype=float)}))
+        self.size = self.dataset.nbytes
+
+    def make_store(self, entries=3, ttl=60.0):
+        return SessionStore(self.size * entries, ttl, clock=self.clock)
+
+    def test_get_set_and_counters(self):
+        """Повторное чтение возвращает тот же объект и считается попаданием."""
+        store = self.make_store()
+        self.assertIsNone(store.get('s1'))
+        store.set('s1', self.dataset)
+        self.assertIs(store.get('s1'), self.dataset)
+
+        stats = store.stats()
+        self.assertEqual(stats.hits, 1)
+        self.assertEqual(stats.misses, 1)
+        self.assertEqual(stats.entries, 1)
+        self.assertEqual(stats.bytes_used, self.size)
+
+    def test_version_of_has_no_side_effects(self):
+        """version_of не продлевает TTL, не меняет порядок LRU и счётчики."""
+        store = self.make_store(entries=2, ttl=10.0)
+        self.assertIsNone(store.version_of('s1'))
+        store.set('s1', self.dataset)
+        store.set('s2', DatasetHandle.from_frame(self.dataset.df.copy(), version=2))
+        self.clock.now = 5.0
+        self.assertEqual(store.version_of('s1'), (1, self.dataset.fingerprint))
+        store.set('s3', DatasetHandle.from_frame(self.dataset.df.copy()))
+        self.assertNotIn('s1', store)        # осталась самой старой
+        self.assertEqual(store.version_of('s2')[0], 2)
+        self.clock.now = 10.0
+        self.assertIsNone(store.version_of('s2'))
+        stats = store.stats()
+        self.assertEqual((stats.hits, stats.misses), (0, 0))
+
+    def test_lru_eviction_by_byte_budget(self):
+        """При превышении бюджета вытесняется давно не использованная сессия."""
+        store = self.make_store(entries=2)
+        store.set('s1', self.dataset)
+        store.set('s2', DatasetHandle.from_frame(self.dataset.df.copy()))
+        store.get('s1')                      # s2 становится самой старой
+        store.set('s3', DatasetHandle.from_frame(self.dataset.df.copy()))
+
+        self.assertIn('s1', store)
+        self.assertNotIn('s2', store)
+        self.assertTrue(store.is_expired('s2'))
+        self.assertEqual(store.stats().evictions, 1)
+        self.assertLessEqual(store.stats().bytes_used, store.max_bytes)
+
+    def test_ttl_expiration(self):
+        """Запись исчезает после истечения TTL и помечается как устаревшая."""
+        store = self.make_store(ttl=10.0)
+        store.set('s1', self.dataset)
+        self.clock.now = 5.0
+        self.assertIsNotNone(store.get('s1'))   # обращение продлевает TTL
+        self.clock.now = 14.0
+        self.assertIsNotNone(store.get('s1'))
+        self.clock.now = 30.0
+        self.assertIsNone(store.get('s1'))
+        self.assertTrue(store.is_expired('s1'))
+        self.assertEqual(store.stats().expirations, 1)
+        self.assertEqual(store.stats().bytes_used, 0)
+
+    def test_replace_resets_expired_flag(self):
+        """Новая таблица для сессии снимает пометку «устарела»."""
+        store = self.make_store(ttl=10.0)
+        store.set('s1', self.dataset)
+        self.clock.now = 20.0
+        store.get('s1')
+        store.set('s1', self.dataset)
+        self.assertFalse(store.is_expired('s1'))
+        self.assertEqual(store.stats().bytes_used, self.size)
+
+    def test_frame_larger_than_budget_rejected(self):
+        """Таблица больше всего бюджета не сохраняется."""
+        store = SessionStore(self.size - 1, 60.0, clock=self.clock)
+        with self.assertRaises(ValueError):
+            store.set('s1', self.dataset)
+        self.assertEqual(len(store), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
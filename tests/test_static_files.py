@@ -0,0 +1,131 @@
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import bottle
+
+from utils.static_files import StaticFiles, accepted_encodings, precompress
+
+
+def call(app, path, headers=None, method='GET'):
+    """Выполнить запрос к WSGI-приложению и вернуть (код, заголовки, тело)."""
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': method, 'PATH_INFO': path, 'QUERY_STRING': query,
+        'SERVER_NAME': 'test', 'SERVER_PORT': '80', 'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(), 'wsgi.url_scheme': 'http',
+    }
+    for key, value in (headers or {}).items():
+        environ['HTTP_' + key.upper().replace('-', '_')] = value
+    out = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        out['status'] = int(status.split()[0])
+        out['headers'] = dict(response_headers)
+
+    chunks = app(environ, start_response)
+    body = b''.join(chunks)
+    if hasattr(chunks, 'close'):
+        chunks.close()
+    return out['status'], out['headers'], body
+
+
+class TestStaticFiles(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.css = ('body { color: red; }\n' * 200).encode()
+        with open(os.path.join(self.root, 'site.css'), 'wb') as file:
+            file.write(self.css)
+
+        self.files = StaticFiles(self.root)
+        self.app = bottle.Bottle()
+        self.app.route('/static/<filepath:path>', callback=self.files.serve)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_etag_and_not_modified(self):
+        """Повторный запрос с ETag получает 304 без тела."""
+        status, headers, body = call(self.app, '/static/site.css')
+        self.assertEqual(status, 200)
+        self.assertEqual(body, self.css)
+        self.assertEqual(headers['Cache-Control'], 'no-cache')
+        etag = headers['Etag']
+        self.assertFalse(etag.startswith('W/'))
+
+        status, _, body = call(self.app, '/static/site.css', {'If-None-Match': etag})
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b'')
+
+    def test_versioned_url_is_immutable(self):
+        """URL с актуальной версией кэшируется надолго, устаревшая версия — нет."""
+        version = self.files.version('site.css')
+        _, headers, _ = call(self.app, f'/static/site.css?v={version}')
+        self.assertIn('immutable', headers['Cache-Control'])
+        _, headers, _ = call(self.app, '/static/site.css?v=stale')
+        self.assertEqual(headers['Cache-Control'], 'no-cache')
+
+    def test_precompressed_sibling(self):
+        """Клиент с gzip получает готовую .gz-копию и отдельный ETag."""
+        written = precompress(self.root)
+        self.assertIn(os.path.join(self.root, 'site.css.gz'), written)
+
+        status, headers, body = call(self.app, '/static/site.css', {'Accept-Encoding': 'gzip'})
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(body), self.css)
+        self.assertLess(len(body), len(self.css))
+        _, plain_headers, _ = call(self.app, '/static/site.css', {'Accept-Encoding': 'gzip;q=0'})
+        self.assertNotIn('Content-Encoding', plain_headers)
+        self.assertNotEqual(headers['Etag'], plain_headers['Etag'])
+
+    def test_stale_compressed_copy_ignored(self):
+        """Копия старше исходника не отдаётся."""
+        precompress(self.root)
+        path = os.path.join(self.root, 'site.css')
+        future = time.time() + 10
+        os.utime(path, (future, future))
+        _, headers, _ = call(self.app, '/static/site.css', {'Accept-Encoding': 'gzip, br'})
+        self.assertNotIn('Content-Encoding', headers)
+
+    def test_range_request(self):
+        """Range даёт 206 по несжатому файлу, If-Range с чужим ETag — весь файл."""
+        precompress(self.root)
+        status, headers, body = call(self.app, '/static/site.css')
+        self.assertEqual(headers['Accept-Ranges'], 'bytes')
+        etag = headers['Etag']
+
+        status, headers, body = call(self.app, '/static/site.css',
+                                     {'Range': 'bytes=10-19', 'Accept-Encoding': 'gzip'})
+        self.assertEqual(status, 206)
+        self.assertEqual(body, self.css[10:20])
+        self.assertEqual(headers['Content-Range'], f'bytes 10-19/{len(self.css)}')
+        self.assertEqual(headers['Content-Length'], '10')
+        self.assertNotIn('Content-Encoding', headers)
+
+        _, _, body = call(self.app, '/static/site.css', {'Range': 'bytes=-5', 'If-Range': etag})
+        self.assertEqual(body, self.css[-5:])
+        status, _, body = call(self.app, '/static/site.css', {'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+        self.assertEqual((status, body), (200, self.css))
+        status, headers, _ = call(self.app, '/static/site.css', {'Range': f'bytes={len(self.css)}-'})
+        self.assertEqual(status, 416)
+        self.assertEqual(headers['Content-Range'], f'bytes */{len(self.css)}')
+
+    def test_path_traversal_and_missing(self):
+        self.assertEqual(call(self.app, '/static/../etc/passwd')[0], 403)
+        self.assertEqual(call(self.app, '/static/missing.css')[0], 404)
+
+    def test_accepted_encodings(self):
+        self.assertEqual(
+            accepted_encodings('gzip;q=0.5, br, identity;q=0'),
+            {'gzip': 0.5, 'br': 1.0, 'identity': 0.0},
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from generators import streaming
+from generators.distrib_generator import _column_stats, analyze_distribution_stream
+from generators.streaming import BottomKSample, KllSketch, Moments, StreamHistogram, StreamingSummary
+from generators.summary import NumericSummary
+from utils.data_loader import iter_chunks
+from tests import frames
+
+
+def chunks(df, size):
+    return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+
+def sample_frame(rows=3000, seed=22):
+    return frames.sample_frame({
+        'normal': frames.normal,
+        'exponential': frames.exponential(100),
+        'integer': frames.integers(-50, 50),
+        'outliers': frames.heavy_tail(20, 1e6),
+        'label': lambda rng, rows: ['x'] * rows,
+    }, rows=rows, seed=seed, nan_every=13)
+
+
+class TestAccumulators(unittest.TestCase):
+    def test_moments_merge_matches_pandas(self):
+        """Моменты, собранные из частей в любом порядке, совпадают с pandas."""
+        df = sample_frame().select_dtypes('number')
+        parts = chunks(df, 701) + [df.iloc[:0]]
+        merged = Moments(df.shape[1])
+        for part in reversed(parts):
+            piece = Moments(df.shape[1])
+            piece.update(part.to_numpy(dtype=float))
+            merged.merge(piece)
+        std, skew, kurt = merged.statistics()
+        np.testing.assert_array_equal(merged.count, df.count())
+        np.testing.assert_allclose(merged.mean, df.mean(), rtol=1e-12)
+        np.testing.assert_allclose(std, df.std(), rtol=1e-12)
+        np.testing.assert_allclose(skew, df.skew(), rtol=1e-9)
+        np.testing.assert_allclose(kurt, df.kurt(), rtol=1e-9)
+        np.testing.assert_array_equal(merged.min, df.min())
+        np.testing.assert_array_equal(merged.max, df.max())
+
+    def test_kll_rank_error_within_bound(self):
+        rng = np.random.default_rng(1)
+        values = rng.lognormal(0, 2, size=300_000)
+        sketches = []
+        for part in np.array_split(values, 7):
+            sketch = KllSketch(rng=rng)
+            sketch.update(part)
+            sketches.append(sketch)
+        sketch = sketches[0]
+        for other in sketches[1:]:
+            sketch.merge(other)
+        self.assertEqual(sketch.count, values.size)
+        self.assertLess(sum(level.size for level in sketch.levels), 2000)
+
+        ordered = np.sort(values)
+        levels = np.linspace(0, 1, 41)
+        ranks = np.searchsorted(ordered, sketch.quantile(levels), side='right') / values.size
+        error = np.abs(ranks - levels).max()
+        self.assertLessEqual(error, sketch.normalized_error())
+        self.assertLess(error, 0.01)
+        self.assertLessEqual(abs(sketch.rank(1.0) - np.searchsorted(ordered, 1.0)), sketch.rank_error)
+
+    def test_histogram_merge_and_rebin(self):
+        """Объединённая гистограмма совпадает с построенной за один раз."""
+        rng = np.random.default_rng(2)
+        values = np.r_[rng.normal(size=5000), rng.normal(50, 1, size=500)]
+        whole = StreamHistogram()
+        whole.update(values)
+        merged = StreamHistogram()
+        for part in np.array_split(values, 5)[::-1]:
+            piece = StreamHistogram()
+            piece.update(part)
+            merged.merge(piece)
+        self.assertEqual(merged.exponent, whole.exponent)
+        np.testing.assert_array_equal(merged.edges, whole.edges)
+        np.testing.assert_array_equal(merged.counts, whole.counts)
+        self.assertLessEqual(merged.counts.size, merged.max_bins)
+
+        edges = np.linspace(values.min(), values.max(), 30)
+        expected, _ = np.histogram(values, bins=edges)
+        fine = merged.counts.max()
+        np.testing.assert_array_less(np.abs(merged.rebin(edges) - expected), 2 * fine + 1)
+        self.assertAlmostEqual(merged.rebin(edges).sum(), values.size)
+
+    def test_histogram_of_offset_values(self):
+        """Ширина корзин зависит от размаха, а не от удалённости значений от нуля."""
+        rng = np.random.default_rng(3)
+        values = rng.normal(1e6, 1, size=50_000)
+        histogram = StreamHistogram()
+        for part in np.array_split(values, 10):
+            histogram.update(part)
+        self.assertLess(histogram.width, np.ptp(values) / 100)
+        self.assertGreater(np.count_nonzero(histogram.counts), 100)
+
+        # Сначала одно значение, потом разброс вокруг него: корзины выбираются заново
+        for constant_first in (True, False):
+            point, spread = StreamHistogram(), StreamHistogram()
+            point.update(np.full(100, 5.0))
+            spread.update(rng.normal(5, 0.01, size=1000))
+            if constant_first:
+                point.merge(spread)
+                merged = point
+            else:
+                spread.merge(point)
+                merged = spread
+            self.assertLess(merged.width, 0.001)
+            self.assertEqual(merged.counts.sum(), 1100)
+            self.assertGreaterEqual(merged.counts[int(np.floor(5.0 / merged.width)) - merged.start], 100)
+
+    def test_bottom_k_sample(self):
+        rng = np.random.default_rng(3)
+        left, right = BottomKSample(100, rng), BottomKSample(100, rng)
+        left.update(np.arange(60.0))
+        self.assertTrue(left.complete)
+        right.update(np.arange(60.0, 200.0))
+        left.merge(right)
+        self.assertFalse(left.complete)
+        self.assertEqual(left.count, 200)
+        self.assertEqual(np.unique(left.values).size, 100)
+
+
+class TestStreamingSummary(unittest.TestCase):
+    def test_small_table_matches_in_memory_report(self):
+        """Пока столбец помещается в выборку, отчёт совпадает с analyze_distributions."""
+        df = sample_frame()
+        stream = StreamingSummary.from_chunks(chunks(df, 500), seed=1)
+        summary = NumericSummary(df)
+        self.assertEqual(stream.columns, tuple(summary.columns))
+        for col in stream.columns:
+            expected = _column_stats(summary.column(col), summary.normality.column(col))
+            actual = stream.distribution_stats(col)
+            self.assertEqual(actual.keys(), expected.keys())
+            for stats in (actual, expected):
+                seconds = stats.pop('normality_seconds')
+                self.assertTrue(seconds is None or seconds >= 0.0, f'{col}: normality_seconds')
+            for key, value in expected.items():
+                if isinstance(value, float):
+                    self.assertAlmostEqual(actual[key], value, places=9, msg=f'{col}: {key}')
+                else:
+                    self.assertEqual(actual[key], value, f'{col}: {key}')
+            for got, want in zip(stream.histogram(col, density=True), summary.histograms.column(col, density=True)):
+                np.testing.assert_allclose(got, want)
+
+    def test_large_table_within_error_bounds(self):
+        """Для длинных столбцов квантили и выбросы укладываются в заявленные границы."""
+        df = sample_frame(rows=60_000)
+        parts = [StreamingSummary(sample_size=1000, seed=seed).update(part)
+                 for seed, part in enumerate(chunks(df, 7000))]
+        stream = parts[0]
+        for part in parts[1:]:
+            stream.merge(part)
+        summary = NumericSummary(df)
+        for col in stream.columns:
+            column, exact = stream.column(col), summary.column(col)
+            self.assertFalse(column['exact'])
+            for key in ('count', 'mean', 'std', 'min', 'max', 'skewness', 'kurtosis'):
+                self.assertAlmostEqual(column[key], exact[key], delta=1e-9 * max(1.0, abs(exact[key])), msg=key)
+
+            values = np.sort(summary.numeric[col].dropna().to_numpy(dtype=float))
+            for key, level in (('q1', 0.25), ('median', 0.5), ('q3', 0.75)):
+                ranks = np.searchsorted(values, column[key], side='left'), np.searchsorted(values, column[key], side='right')
+                error = min(abs(rank / values.size - level) for rank in ranks)
+                self.assertLessEqual(error, column['rank_error'], f'{col}: {key}')
+
+            # Выбросы за найденными границами — в пределах outliers_error
+            low = column['q1'] - 1.5 * column['iqr']
+            high = column['q3'] + 1.5 * column['iqr']
+            actual = np.count_nonzero((values < low) | (values > high))
+            self.assertLessEqual(abs(column['outliers_count'] - actual), column['outliers_error'] + 1, col)
+            # Тест нормальности — по точным моментам, а не по выборке
+            normality = stream.distribution_stats(col)
+            self.assertEqual(normality['normality_test'], 'dagostino')
+            self.assertAlmostEqual(normality['normality_p'], summary.normality.column(col)['normality_p'], places=9)
+
+    def test_column_computed_once_per_card(self):
+        """Карточка столбца считает column() один раз, моменты и сортировка эскиза запоминаются."""
+        stream = StreamingSummary.from_chunks(chunks(sample_frame(rows=6000), 1000), sample_size=500, seed=0)
+        sketch = stream.sketches['normal']
+        self.assertIs(sketch.sorted_items(), sketch.sorted_items())
+        column = stream.column('normal')
+        stats = [stream.distribution_stats('normal', *args) for args in ((column,), ())]
+        for item in stats:
+            item.pop('normality_seconds')
+        self.assertEqual(*stats)
+        for got, expected in zip(stream.histogram('normal', column=column), stream.histogram('normal')):
+            np.testing.assert_array_equal(got, expected)
+
+        stream = StreamingSummary.from_chunks(chunks(sample_frame(rows=6000), 1000), sample_size=500, seed=0)
+        with patch.object(StreamingSummary, 'column', autospec=True, side_effect=StreamingSummary.column) as column, \
+                patch('generators.streaming.moment_statistics', wraps=streaming.moment_statistics) as moments, \
+                patch('generators.distrib_generator.render_pool') as pool:
+            pool.return_value.map.side_effect = lambda func, tasks: [None for _ in tasks]
+            analyze_distribution_stream(stream)
+        self.assertEqual(column.call_count, len(stream.columns))
+        self.assertEqual(moments.call_count, 1)
+        sorted_items = stream.sketches['normal'].sorted_items()
+        stream.update(sample_frame(rows=100))
+        self.assertIsNot(stream.sketches['normal'].sorted_items(), sorted_items)
+
+    def test_offset_column_within_error_bounds(self):
+        """Столбец далеко от нуля с малым разбросом не схлопывается в одну корзину."""
+        rng = np.random.default_rng(4)
+        df = pd.DataFrame({'offset': rng.normal(1e6, 1, size=200_000)})
+        stream = StreamingSummary(sample_size=1000)
+        for part in chunks(df, 20_000):
+            stream.update(part)
+        column = stream.column('offset')
+        values = df['offset'].to_numpy()
+        low = column['q1'] - 1.5 * column['iqr']
+        high = column['q3'] + 1.5 * column['iqr']
+        actual = np.count_nonzero((values < low) | (values > high))
+        self.assertLessEqual(abs(column['outliers_count'] - actual), column['outliers_error'] + 1)
+        self.assertLess(column['outliers_error'], actual / 2)
+
+    def test_mismatched_chunks_rejected(self):
+        stream = StreamingSummary().update(pd.DataFrame({'a': [1.0, 2.0]}))
+        with self.assertRaises(ValueError):
+            stream.update(pd.DataFrame({'b': [1.0]}))
+        with self.assertRaises(ValueError):
+            stream.update(pd.DataFrame({'a': [np.inf]}))
+
+    def test_report_from_file_chunks(self):
+        """Отчёт по CSV, прочитанному частями, содержит картинки всех столбцов."""
+        df = sample_frame(rows=400)
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'table.csv')
+            df.to_csv(path, index=False)
+            parts = list(iter_chunks(path, chunksize=150))
+            self.assertEqual([len(part) for part in parts], [150, 150, 100])
+            df.to_json(path.replace('.csv', '.json'))
+            with self.assertRaises(ValueError):
+                next(iter_chunks(path.replace('.csv', '.json')))
+            with patch('generators.distrib_generator.render_pool') as pool:
+                pool.return_value.map.side_effect = lambda func, tasks: [f'/img/{task[0]}' for task in tasks]
+                results = analyze_distribution_stream(StreamingSummary.from_chunks(parts, seed=0))
+        self.assertEqual(list(results), ['normal', 'exponential', 'integer', 'outliers'])
+        self.assertEqual(results['integer']['plot'], '/img/integer')
+
+
+if __name__ == '__main__':
+    unittest.main()
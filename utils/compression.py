@@ -0,0 +1,263 @@
+"""
+Сжатие динамических ответов (gzip / brotli) на уровне WSGI.
+
+Отчёты аналитических маршрутов — это HTML с таблицами статистик, которые
+для широких таблиц занимают сотни килобайт (картинки отдаются отдельно,
+см. :mod:`utils.image_store`). :class:`CompressionMiddleware`
+оборачивает WSGI-приложение и сжимает такие ответы, если клиент указал
+подходящее кодирование в ``Accept-Encoding`` (brotli предпочтительнее, если
+установлен пакет ``brotli``).
+
+Ответ сжимается потоково: тело обрабатывается кусками по ``chunk_size`` байт,
+и сжатые данные отдаются серверу по мере готовности, без второй полной копии
+тела в памяти. Не сжимаются:
+
+* ответы меньше ``min_size`` байт (по ``Content-Length`` или по первым
+  накопленным кускам, если длина неизвестна);
+* уже закодированные ответы (например, готовые ``.br``/``.gz`` статики);
+* типы содержимого вне ``mime_types`` (PNG, шрифты и т.п. уже сжаты);
+* ``HEAD``-запросы, коды ``204``/``304`` и ответы с ``Cache-Control: no-transform``.
+
+Ответы, которые сжимались бы при подходящем ``Accept-Encoding`` (по коду,
+типу и заголовкам), получают ``Vary: Accept-Encoding`` и тогда, когда
+отданы без сжатия, — иначе общий кэш мог бы отдать несжатую копию вместо
+сжатой или наоборот.
+
+Устаревший ``write()``, возвращаемый ``start_response``, при сжатии не
+поддерживается: заголовки отправляются только после чтения первых кусков
+тела. Вызов ``write()`` бросает :class:`RuntimeError`; такие приложения
+запускаются с ``RESPONSE_COMPRESSION=0``.
+
+Объём до и после сжатия учитывается в метрике
+``http_compression_bytes_total{encoding, stage}`` (см. :mod:`utils.metrics`).
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from utils.metrics import REGISTRY
+from utils.static_files import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - зависит от окружения
+    brotli = None
+
+__all__ = ["CompressionMiddleware", "choose_encoding"]
+
+DEFAULT_MIME_TYPES = (
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/csv",
+    "application/json",
+    "application/javascript",
+    "image/svg+xml",
+)
+
+REGISTRY.describe(
+    "http_compression_bytes_total", "counter",
+    "Байты сжимаемых ответов до (stage=in) и после (stage=out) сжатия.",
+)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Выбрать ``"br"`` или ``"gzip"`` по заголовку ``Accept-Encoding``."""
+    accepted = accepted_encodings(accept_encoding)
+    candidates = (("br", "gzip") if brotli is not None else ("gzip",))
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:  # при равных q побеждает первое (br)
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    """Единый интерфейс потокового сжатия для gzip и brotli."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        if encoding == "br":
+            self._impl = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._impl.process
+            self._finish = self._impl.finish
+        else:
+            # wbits=31: формат gzip (заголовок + CRC32), а не «сырой» zlib.
+            self._impl = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._compress = self._impl.compress
+            self._finish = self._impl.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressionMiddleware:
+    """WSGI-обёртка, сжимающая крупные текстовые ответы.
+
+    Args:
+        app: Оборачиваемое WSGI-приложение.
+        min_size: Ответы меньше этого размера (байт) не сжимаются.
+        gzip_level: Уровень zlib (1–9).
+        brotli_quality: Качество brotli (0–11); 4–5 — разумный баланс
+            скорости и степени сжатия для динамических ответов.
+        chunk_size: Размер кусков, которыми тело подаётся компрессору.
+        mime_types: Сжимаемые типы содержимого.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        *,
+        min_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        chunk_size: int = 64 * 1024,
+        mime_types: Iterable[str] = DEFAULT_MIME_TYPES,
+    ) -> None:
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.chunk_size = chunk_size
+        self.mime_types = frozenset(mime_types)
+
+    def __call__(self, environ, start_response):
+        encoding = None
+        if environ.get("REQUEST_METHOD") != "HEAD":
+            encoding = choose_encoding(environ.get("HTTP_ACCEPT_ENCODING"))
+        if encoding is None:
+            def plain(status, headers, exc_info=None):
+                if self._negotiable(status, headers):
+                    headers = _with_vary(headers)
+                return start_response(status, headers, exc_info)
+
+            return self.app(environ, plain)
+
+        captured: dict = {}
+
+        def capture(status, headers, exc_info=None):
+            if exc_info is not None and captured.get("sent"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            captured["status"], captured["headers"] = status, headers
+            return _unsupported_write
+
+        app_iter = self.app(environ, capture)
+        return self._respond(app_iter, captured, encoding, start_response)
+
+    # ------------------------------------------------------------------
+    # Внутренние помощники
+    # ------------------------------------------------------------------
+    def _negotiable(self, status: str, headers: List[Tuple[str, str]]) -> bool:
+        """Зависит ли кодирование ответа от ``Accept-Encoding`` (без учёта размера)."""
+        code = int(status.split(" ", 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+        values = {name.lower(): value for name, value in headers}
+        if "content-encoding" in values:
+            return False
+        if "no-transform" in values.get("cache-control", "").lower():
+            return False
+        mimetype = values.get("content-type", "").split(";", 1)[0].strip().lower()
+        return mimetype in self.mime_types
+
+    def _eligible(self, status: str, headers: List[Tuple[str, str]]) -> Tuple[bool, Optional[int]]:
+        """Можно ли сжимать ответ; заодно вернуть Content-Length, если известен."""
+        if not self._negotiable(status, headers):
+            return False, None
+        values = {name.lower(): value for name, value in headers}
+        length = values.get("content-length")
+        if length is not None and length.isdigit():
+            return int(length) >= self.min_size, int(length)
+        return True, None
+
+    def _respond(self, app_iter, captured, encoding, start_response) -> Iterator[bytes]:
+        try:
+            chunks = iter(app_iter)
+            # Тело приложения можно читать только после start_response:
+            # Bottle вызывает его до возврата итератора, но генераторы —
+            # только при первой итерации, поэтому заглядываем в первый кусок.
+            head: List[bytes] = []
+            for chunk in chunks:
+                if chunk:
+                    head.append(chunk)
+                    break
+            status, headers = captured["status"], captured["headers"]
+            eligible, length = self._eligible(status, headers)
+
+            if eligible and length is None:
+                # Длина неизвестна — накапливаем, пока не станет ясно,
+                # что ответ не «крошечный».
+                size = sum(len(c) for c in head)
+                for chunk in chunks:
+                    head.append(chunk)
+                    size += len(chunk)
+                    if size >= self.min_size:
+                        break
+                eligible = size >= self.min_size
+
+            if not eligible:
+                if self._negotiable(status, headers):
+                    headers = _with_vary(headers)
+                captured["sent"] = True
+                start_response(status, headers)
+                yield from head
+                yield from chunks
+                return
+
+            headers = [(name, value) for name, value in _with_vary(headers) if name.lower() != "content-length"]
+            headers.append(("Content-Encoding", encoding))
+            headers = [
+                (name, "W/" + value if name.lower() == "etag" and not value.startswith("W/") else value)
+                for name, value in headers
+            ]
+            captured["sent"] = True
+            start_response(status, headers)
+
+            compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+            raw_bytes = out_bytes = 0
+            for chunk in _chain(head, chunks):
+                view = memoryview(chunk)
+                for start in range(0, len(view), self.chunk_size):
+                    piece = view[start:start + self.chunk_size]
+                    raw_bytes += len(piece)
+                    data = compressor.compress(piece)
+                    if data:
+                        out_bytes += len(data)
+                        yield data
+            tail = compressor.finish()
+            out_bytes += len(tail)
+            yield tail
+            REGISTRY.inc("http_compression_bytes_total", {"encoding": encoding, "stage": "in"}, raw_bytes)
+            REGISTRY.inc("http_compression_bytes_total", {"encoding": encoding, "stage": "out"}, out_bytes)
+        finally:
+            close = getattr(app_iter, "close", None)
+            if close is not None:
+                close()
+
+
+def _with_vary(headers: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Заголовки с ``Accept-Encoding`` в ``Vary`` (прежние значения сохраняются)."""
+    vary = [value for name, value in headers if name.lower() == "vary"]
+    vary_values = {v.strip() for value in vary for v in value.split(",") if v.strip()}
+    vary_values.add("Accept-Encoding")
+    headers = [(name, value) for name, value in headers if name.lower() != "vary"]
+    headers.append(("Vary", ", ".join(sorted(vary_values))))
+    return headers
+
+
+def _unsupported_write(data: bytes) -> None:
+    raise RuntimeError(
+        "CompressionMiddleware не поддерживает write() из start_response: "
+        "верните тело ответа итерируемым объектом или отключите сжатие "
+        "(RESPONSE_COMPRESSION=0).",
+    )
+
+
+def _chain(head: List[bytes], rest: Iterator[bytes]) -> Iterator[bytes]:
+    yield from head
+    yield from rest
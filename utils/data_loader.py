@@ -9,13 +9,14 @@ from __future__ import annotations
 
 import pathlib
 import random
-from typing import Literal, Optional
+from typing import Iterator, Literal, Optional
 
 import numpy as np
 import pandas as pd
 
 __all__ = [
     "load_data",
+    "iter_chunks",
     "generate_synthetic",
     "get_preview",
 ]
@@ -92,6 +93,42 @@ def load_data(
     return generate_synthetic(rows=rows, cols=cols, pattern=pattern, seed=seed)
 
 
+def iter_chunks(
+    source: str | pathlib.Path, chunksize: int = 100_000,
+) -> Iterator[pd.DataFrame]:
+    """Читать файл по частям из *chunksize* строк.
+
+    Для таблиц, которые не помещаются в память: части передаются, например,
+    в :class:`generators.streaming.StreamingSummary`. Поддерживаются CSV
+    (`.csv`), TSV (`.tsv`) и JSON Lines (`.jsonl`); JSON-массив (`.json`)
+    по частям не читается.
+
+    Исключения
+    ----------
+    FileNotFoundError
+        Файл не найден или не является обычным файлом.
+    ValueError
+        Неподдерживаемое расширение файла или неположительный *chunksize*.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be positive.")
+    path = pathlib.Path(source).expanduser()
+    if not path.exists() or not path.is_file():
+        raise FileNotFoundError(f"File {path} not found.")
+
+    match path.suffix.lower():
+        case ".csv":
+            reader = pd.read_csv(path, chunksize=chunksize)
+        case ".tsv":
+            reader = pd.read_csv(path, sep="\t", chunksize=chunksize)
+        case ".jsonl":
+            reader = pd.read_json(path, lines=True, chunksize=chunksize)
+        case _:
+            raise ValueError(f"Unsupported extension for chunked reading: {path.suffix}")
+    with reader:
+        yield from reader
+
+
 # ---------------------------------------------------------------------------
 # Внутренние генераторы
 # ---------------------------------------------------------------------------
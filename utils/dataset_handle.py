@@ -0,0 +1,119 @@
+"""
+Версионированный дескриптор набора данных сессии.
+
+:class:`DatasetHandle` связывает таблицу с номером версии (растёт при каждой
+новой загрузке/генерации в сессии) и отпечатком содержимого. Отпечаток
+вычисляется один раз при сохранении таблицы и дальше переиспользуется
+кэшами, заголовками ETag и именами сохранённых отчётов без повторного
+хэширования данных.
+
+Сервисы из ``services/`` принимают как ``DatasetHandle``, так и обычный
+``DataFrame`` (тип :data:`Dataset`); таблицу из любого из них возвращает
+:func:`as_frame`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "Dataset",
+    "DatasetHandle",
+    "as_frame",
+    "as_handle",
+    "compute_fingerprint",
+    "handle_or_none",
+]
+
+
+def _update_with_values(digest, values) -> None:
+    """Добавить в хэш данные столбца или индекса."""
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biufcmM":
+        # Числовые буферы хэшируются напрямую, без поэлементного прохода.
+        digest.update(np.ascontiguousarray(values).view(np.uint8).data)
+    else:
+        digest.update(pd.util.hash_array(np.asarray(values, dtype=object)).data)
+
+
+def compute_fingerprint(df: pd.DataFrame) -> str:
+    """Вычислить отпечаток содержимого таблицы по буферам её столбцов.
+
+    Учитываются подписи и типы столбцов, индекс и значения. Для числовых
+    столбцов хэшируется их непрерывный буфер памяти, поэтому стоимость
+    близка к скорости чтения памяти.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(df.columns)).encode("utf-8"))
+    digest.update(repr([str(dtype) for dtype in df.dtypes]).encode("utf-8"))
+
+    index = df.index
+    if isinstance(index, pd.RangeIndex):
+        digest.update(repr((index.start, index.stop, index.step)).encode("ascii"))
+    else:
+        _update_with_values(digest, index.to_numpy())
+
+    for pos in range(df.shape[1]):
+        column = df.iloc[:, pos]
+        values = column.to_numpy() if isinstance(column.dtype, np.dtype) else column.array
+        _update_with_values(digest, values)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class DatasetHandle:
+    """Таблица сессии вместе с номером версии и отпечатком содержимого.
+
+    Attributes:
+        df: Сама таблица (не изменяйте её на месте — отпечаток устареет).
+        version: Порядковый номер таблицы в сессии, начиная с 1.
+        fingerprint: Шестнадцатеричный отпечаток содержимого (32 символа).
+        nbytes: Объём памяти таблицы (``memory_usage(deep=True)``), байт.
+    """
+
+    df: pd.DataFrame
+    version: int
+    fingerprint: str
+    nbytes: int
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, version: int = 1) -> "DatasetHandle":
+        """Создать дескриптор, посчитав отпечаток и размер таблицы."""
+        return cls(
+            df=df,
+            version=version,
+            fingerprint=compute_fingerprint(df),
+            nbytes=int(df.memory_usage(index=True, deep=True).sum()),
+        )
+
+    @property
+    def short_id(self) -> str:
+        """Короткий идентификатор для имён файлов."""
+        return self.fingerprint[:12]
+
+    @property
+    def etag(self) -> str:
+        """Сильный ETag для ответов, зависящих только от содержимого таблицы."""
+        return f'"{self.fingerprint}"'
+
+
+Dataset = Union[DatasetHandle, pd.DataFrame]
+
+
+def as_frame(data: Dataset) -> pd.DataFrame:
+    """Вернуть таблицу из дескриптора или саму таблицу."""
+    return data.df if isinstance(data, DatasetHandle) else data
+
+
+def as_handle(data: Dataset) -> DatasetHandle:
+    """Вернуть дескриптор; для обычной таблицы отпечаток считается на месте."""
+    return data if isinstance(data, DatasetHandle) else DatasetHandle.from_frame(data)
+
+
+def handle_or_none(data: Dataset) -> Optional[DatasetHandle]:
+    """Вернуть дескриптор, если он передан, иначе ``None`` (без хэширования)."""
+    return data if isinstance(data, DatasetHandle) else None
@@ -0,0 +1,381 @@
+"""
+Дисковое хранилище наборов данных сессий с чтением через memory mapping.
+
+В отличие от :class:`utils.session_store.SessionStore`, таблицы хранятся не
+в памяти процесса, а в локальном каталоге, поэтому любой рабочий процесс
+сервера может обслужить любую сессию, а данные переживают перезапуск.
+
+Раскладка каталога сессии ``<root>/<session_id>/``::
+
+    meta.json              служебные сведения (каталог данных, группы
+                           столбцов, размер, версия, отпечаток набора данных)
+    v-<uuid>/              данные одной записи таблицы:
+        numeric_<k>.npy    числовые столбцы одного dtype, по строке на столбец
+        frame.pkl          подписи столбцов, индекс и нечисловые столбцы
+
+Числовые столбцы одного типа сохраняются одним массивом формы
+``(n_columns, n_rows)``. При чтении файл открывается через
+``np.load(mmap_mode="r")`` и передаётся в DataFrame без копирования: данные
+остаются в page cache ОС и разделяются между процессами. Полученная таблица
+доступна только для чтения (pandas копирует блок при первой записи).
+
+Запись атомарна: данные пишутся в новый каталог ``v-<uuid>``, затем
+``meta.json``, указывающий на него, заменяется одним ``os.replace``. Читатель
+видит либо прежнюю, либо новую таблицу; прежний каталог данных удаляется
+после замены, и если читатель успел прочитать старый ``meta.json``, но не
+открыть файлы, чтение повторяется один раз по новому ``meta.json``.
+Время последнего обращения — ``mtime`` файла ``meta.json``; по нему
+считаются TTL и порядок вытеснения (LRU) при превышении бюджета диска.
+Удалённые по TTL/бюджету сессии отмечаются пустыми файлами в ``.expired/``.
+
+Версия и отпечаток :class:`~utils.dataset_handle.DatasetHandle` хранятся в
+``meta.json``, поэтому при чтении данные повторно не хэшируются.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import re
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_handle import DatasetHandle
+from utils.session_store import SessionStoreStats
+
+__all__ = ["DiskSessionStore"]
+
+_FORMAT_VERSION = 3
+_META = "meta.json"
+_FRAME = "frame.pkl"
+_EXPIRED_DIR = ".expired"
+# Идентификатор сессии приходит из cookie и становится именем каталога
+_SID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def _is_mappable(dtype) -> bool:
+    """Можно ли хранить столбец как сырой массив ``.npy``."""
+    return isinstance(dtype, np.dtype) and dtype.kind in "iufc"
+
+
+class DiskSessionStore:
+    """Хранилище таблиц на диске с тем же интерфейсом, что и ``SessionStore``.
+
+    Args:
+        root: Каталог хранилища (создаётся при необходимости).
+        max_bytes: Суммарный бюджет диска для всех сессий, байт.
+        ttl: Время жизни записи с момента последнего обращения, секунд.
+        max_expired_ids: Сколько отметок об удалённых сессиях хранить.
+        clock: Источник *настенного* времени (общий для всех процессов).
+    """
+
+    def __init__(
+        self,
+        root: str | os.PathLike,
+        max_bytes: int,
+        ttl: float,
+        *,
+        max_expired_ids: int = 10_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._max_expired_ids = max_expired_ids
+        self._clock = clock
+
+        self._expired_root = self.root / _EXPIRED_DIR
+        self._expired_root.mkdir(parents=True, exist_ok=True)
+
+        # Счётчики ведутся в пределах процесса
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    # ------------------------------------------------------------------
+    # Публичный интерфейс
+    # ------------------------------------------------------------------
+    def get(self, sid: str) -> Optional[DatasetHandle]:
+        """Открыть набор данных сессии *sid* через mmap или вернуть ``None``."""
+        path = self._session_dir(sid)
+        handle = None
+        if path is not None:
+            meta_path = path / _META
+            try:
+                if self._clock() - meta_path.stat().st_mtime > self.ttl:
+                    self._drop(sid, path)
+                    self._count("_expirations")
+                else:
+                    try:
+                        handle = self._read(path)
+                    except FileNotFoundError:
+                        # Таблицу заменили между чтением meta.json и данных
+                        handle = self._read(path)
+                    now = self._clock()
+                    os.utime(meta_path, (now, now))
+            except (FileNotFoundError, KeyError):
+                # Сессии нет, её удалил другой процесс во время чтения
+                # или каталог записан несовместимой версией формата
+                handle = None
+
+        self._count("_hits" if handle is not None else "_misses")
+        return handle
+
+    def version_of(self, sid: str) -> Optional[Tuple[int, str]]:
+        """Версия и отпечаток таблицы сессии *sid* или ``None``.
+
+        Читает только ``meta.json``: в отличие от :meth:`get`, не открывает
+        данные, не обновляет время обращения и не меняет счётчики.
+        """
+        path = self._session_dir(sid)
+        if path is None:
+            return None
+        meta_path = path / _META
+        try:
+            if self._clock() - meta_path.stat().st_mtime > self.ttl:
+                return None
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        if meta.get("format") != _FORMAT_VERSION:
+            return None
+        return meta["version"], meta["fingerprint"]
+
+    def set(self, sid: str, handle: DatasetHandle) -> None:
+        """Сохранить таблицу сессии *sid* на диск и соблюсти бюджет.
+
+        Raises:
+            ValueError: Некорректный идентификатор сессии или таблица
+                больше всего бюджета.
+        """
+        path = self._session_dir(sid)
+        if path is None:
+            raise ValueError("Некорректный идентификатор сессии.")
+
+        generation = f"v-{uuid.uuid4().hex}"
+        data_dir = path / generation
+        meta_tmp = path / f".{generation}.json"
+        data_dir.mkdir(parents=True)
+        try:
+            meta = self._write(data_dir, handle)
+            if meta["nbytes"] > self.max_bytes:
+                raise ValueError(
+                    "Таблица слишком велика для хранения "
+                    f"({meta['nbytes'] / 2**20:.1f} МБ при лимите "
+                    f"{self.max_bytes / 2**20:.1f} МБ).",
+                )
+            meta["data"] = generation
+            meta_tmp.write_text(json.dumps(meta), encoding="utf-8")
+            now = self._clock()
+            os.utime(meta_tmp, (now, now))
+            previous = self._generation(path)
+            os.replace(meta_tmp, path / _META)
+        except BaseException:
+            shutil.rmtree(data_dir, ignore_errors=True)
+            meta_tmp.unlink(missing_ok=True)
+            raise
+        if previous is not None and previous != generation:
+            # Процессы, успевшие открыть старые файлы через mmap, продолжат
+            # читать их; на Windows удаление может не удаться — это не ошибка.
+            shutil.rmtree(path / previous, ignore_errors=True)
+
+        (self._expired_root / sid).unlink(missing_ok=True)
+        self._enforce_budget(keep=sid)
+
+    def delete(self, sid: str) -> None:
+        """Удалить таблицу сессии *sid* (не считается вытеснением)."""
+        path = self._session_dir(sid)
+        if path is not None:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def is_expired(self, sid: str) -> bool:
+        """Была ли таблица сессии *sid* удалена по TTL или бюджету диска."""
+        path = self._session_dir(sid)
+        if path is None:
+            return False
+        if (self._expired_root / sid).exists():
+            return True
+        try:
+            return self._clock() - (path / _META).stat().st_mtime > self.ttl
+        except FileNotFoundError:
+            return False
+
+    def stats(self) -> SessionStoreStats:
+        """Вернуть счётчики процесса и текущий объём данных на диске."""
+        sessions = self._scan()
+        with self._lock:
+            return SessionStoreStats(
+                entries=len(sessions),
+                bytes_used=sum(nbytes for _, _, nbytes, _ in sessions),
+                max_bytes=self.max_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+            )
+
+    def __len__(self) -> int:
+        return len(self._scan())
+
+    def __contains__(self, sid: object) -> bool:
+        path = self._session_dir(sid) if isinstance(sid, str) else None
+        return path is not None and (path / _META).exists()
+
+    # ------------------------------------------------------------------
+    # Сериализация
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _write(path: Path, handle: DatasetHandle) -> dict:
+        """Записать таблицу в каталог данных *path*; вернуть содержимое ``meta.json``."""
+        df = handle.df
+        groups: Dict[np.dtype, List[int]] = {}
+        other: Dict[int, object] = {}
+        for pos, dtype in enumerate(df.dtypes):
+            if _is_mappable(dtype):
+                groups.setdefault(dtype, []).append(pos)
+            else:
+                other[pos] = df.iloc[:, pos].array
+
+        meta_groups = []
+        for k, (dtype, positions) in enumerate(groups.items()):
+            filename = f"numeric_{k}.npy"
+            # Строка массива — один столбец: так файл без копирования
+            # становится блоком pandas при чтении.
+            block = np.ascontiguousarray(df.iloc[:, positions].to_numpy(dtype=dtype).T)
+            np.save(path / filename, block, allow_pickle=False)
+            meta_groups.append({"file": filename, "positions": positions})
+
+        with open(path / _FRAME, "wb") as file:
+            pickle.dump(
+                {"columns": df.columns, "index": df.index, "other": other},
+                file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+        return {
+            "format": _FORMAT_VERSION,
+            "n_columns": df.shape[1],
+            "groups": meta_groups,
+            "nbytes": sum(item.stat().st_size for item in path.iterdir()),
+            "frame_nbytes": handle.nbytes,
+            "version": handle.version,
+            "fingerprint": handle.fingerprint,
+        }
+
+    @staticmethod
+    def _read(path: Path) -> DatasetHandle:
+        """Собрать DataFrame из каталога сессии без копирования числовых данных."""
+        meta = json.loads((path / _META).read_text(encoding="utf-8"))
+        if meta.get("format") != _FORMAT_VERSION:
+            raise KeyError("format")
+        path = path / meta["data"]
+        with open(path / _FRAME, "rb") as file:
+            frame = pickle.load(file)
+        index = frame["index"]
+
+        parts = []
+        for group in meta["groups"]:
+            block = np.load(path / group["file"], mmap_mode="r", allow_pickle=False)
+            parts.append(
+                pd.DataFrame(block.T, index=index, columns=group["positions"], copy=False),
+            )
+        if frame["other"]:
+            parts.append(pd.DataFrame(frame["other"], index=index))
+
+        if parts:
+            df = pd.concat(parts, axis=1)
+            df = df[list(range(meta["n_columns"]))]
+        else:
+            df = pd.DataFrame(index=index)
+        df.columns = frame["columns"]
+        return DatasetHandle(
+            df=df,
+            version=meta["version"],
+            fingerprint=meta["fingerprint"],
+            nbytes=meta["frame_nbytes"],
+        )
+
+    # ------------------------------------------------------------------
+    # Обслуживание каталога
+    # ------------------------------------------------------------------
+    def _session_dir(self, sid: str) -> Optional[Path]:
+        if not _SID_RE.match(sid or ""):
+            return None
+        return self.root / sid
+
+    @staticmethod
+    def _generation(path: Path) -> Optional[str]:
+        """Каталог данных, на который указывает ``meta.json`` сессии, или ``None``."""
+        try:
+            return json.loads((path / _META).read_text(encoding="utf-8")).get("data")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _scan(self) -> List[Tuple[float, str, int, Path]]:
+        """Список сессий: (время обращения, id, размер, каталог)."""
+        sessions = []
+        for path in self.root.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                meta_path = path / _META
+                mtime = meta_path.stat().st_mtime
+                nbytes = json.loads(meta_path.read_text(encoding="utf-8"))["nbytes"]
+            except (FileNotFoundError, NotADirectoryError, ValueError, KeyError):
+                continue
+            sessions.append((mtime, path.name, nbytes, path))
+        return sessions
+
+    def _enforce_budget(self, keep: str) -> None:
+        """Удалить просроченные сессии и самые старые сверх бюджета."""
+        now = self._clock()
+        alive = []
+        for mtime, sid, nbytes, path in sorted(self._scan()):
+            if sid != keep and now - mtime > self.ttl:
+                self._drop(sid, path)
+                self._count("_expirations")
+            else:
+                alive.append((sid, nbytes, path))
+
+        total = sum(nbytes for _, nbytes, _ in alive)
+        for sid, nbytes, path in alive:
+            if total <= self.max_bytes:
+                break
+            if sid == keep:
+                continue
+            self._drop(sid, path)
+            self._count("_evictions")
+            total -= nbytes
+
+    def _drop(self, sid: str, path: Path) -> None:
+        """Удалить каталог сессии и оставить отметку «устарела»."""
+        shutil.rmtree(path, ignore_errors=True)
+        (self._expired_root / sid).touch()
+
+        marks = list(self._expired_root.iterdir())
+        if len(marks) > self._max_expired_ids:
+            try:
+                marks.sort(key=lambda mark: mark.stat().st_mtime)
+            except FileNotFoundError:
+                return  # отметки чистит параллельный процесс
+            for mark in marks[: len(marks) - self._max_expired_ids]:
+                mark.unlink(missing_ok=True)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
@@ -0,0 +1,150 @@
+"""
+Политика вывода картинок: формат, DPI и ограничение размера.
+
+Все генераторы кодируют фигуры одной функцией
+:func:`generators.rendering.store_figure`, а она берёт параметры из
+:func:`current_image_policy`. Политика по умолчанию задаётся переменными
+окружения (на развёртывание), а маршрут может заменить её на время
+запроса полями ``img_format``/``img_dpi`` (см. :meth:`ImagePolicy.override`
+и :func:`use_image_policy`).
+
+Параметры:
+
+* ``format`` — ``png`` (по умолчанию), ``webp`` (меньше в 2–4 раза, нужна
+  сборка Pillow с WebP) или ``svg`` (вектор, без растеризации; DPI, палитра
+  и оптимизация к нему не применяются);
+* ``dpi`` — разрешение растра; ``100`` совпадает с прежним выводом;
+* ``max_px`` — предел большей стороны картинки в пикселях: если фигура
+  при ``dpi`` больше, DPI уменьшается (``0`` — без предела);
+* ``quantize`` — число цветов палитры PNG (``0`` — без палитры). Графики
+  содержат немного цветов, поэтому 64–256 цветов почти не видны, а файл
+  уменьшается в 2–3 раза;
+* ``optimize`` — ``optimize=True`` при записи PNG через Pillow (медленнее,
+  файл немного меньше);
+* ``quality`` — качество WebP (1–100).
+
+Политика — неизменяемый объект: он входит в ключ кэша результатов и
+передаётся в процессы пула и очереди задач вместе с задачей.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Iterator, Optional
+
+from utils.settings import env_int
+
+__all__ = [
+    "IMAGE_FORMATS",
+    "ImagePolicy",
+    "current_image_policy",
+    "default_image_policy",
+    "use_image_policy",
+]
+
+#: Поддерживаемые форматы и их MIME-типы.
+IMAGE_FORMATS = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "svg": "image/svg+xml",
+}
+
+MIN_DPI, MAX_DPI = 30, 300
+
+
+@dataclass(frozen=True)
+class ImagePolicy:
+    """Параметры кодирования картинок (см. описание модуля)."""
+
+    format: str = "png"
+    dpi: int = 100
+    max_px: int = 0
+    quantize: int = 0
+    optimize: bool = False
+    quality: int = 90
+
+    def __post_init__(self) -> None:
+        if self.format not in IMAGE_FORMATS:
+            raise ValueError(f"Неизвестный формат картинок: {self.format!r}")
+        if not MIN_DPI <= self.dpi <= MAX_DPI:
+            raise ValueError(f"DPI должно быть от {MIN_DPI} до {MAX_DPI}")
+        if self.max_px < 0:
+            raise ValueError("max_px не может быть отрицательным")
+        if self.quantize and not 2 <= self.quantize <= 256:
+            raise ValueError("Палитра должна содержать от 2 до 256 цветов")
+        if not 1 <= self.quality <= 100:
+            raise ValueError("Качество WebP должно быть от 1 до 100")
+
+    def override(self, format: Optional[str] = None, dpi: Optional[str] = None) -> "ImagePolicy":
+        """Политика запроса: *format*/*dpi* из формы заменяют значения развёртывания.
+
+        Raises:
+            ValueError: Если значения недопустимы.
+        """
+        changes = {}
+        if format:
+            changes["format"] = format.lower()
+        if dpi:
+            try:
+                changes["dpi"] = int(dpi)
+            except ValueError:
+                raise ValueError(f"DPI должно быть целым числом: {dpi!r}") from None
+        return replace(self, **changes) if changes else self
+
+    def effective_dpi(self, width_in: float, height_in: float) -> float:
+        """DPI для фигуры данного размера с учётом ``max_px``."""
+        if not self.max_px:
+            return self.dpi
+        return min(self.dpi, self.max_px / max(width_in, height_in))
+
+
+def _policy_from_env() -> ImagePolicy:
+    """Политика по переменным ``IMAGE_*`` окружения.
+
+    Недопустимые значения не мешают запуску: как и остальные параметры
+    развёртывания (см. :mod:`utils.settings`), они заменяются политикой по
+    умолчанию, а в журнал пишется предупреждение.
+    """
+    try:
+        return ImagePolicy(
+            format=os.environ.get("IMAGE_FORMAT", "png").lower(),
+            dpi=env_int("IMAGE_DPI", 100),
+            max_px=env_int("IMAGE_MAX_PX", 0),
+            quantize=env_int("IMAGE_QUANTIZE_COLORS", 0),
+            optimize=os.environ.get("IMAGE_PNG_OPTIMIZE", "0") == "1",
+            quality=env_int("IMAGE_WEBP_QUALITY", 90),
+        )
+    except ValueError as exc:
+        logging.warning("Недопустимые параметры IMAGE_*: %s; используется политика по умолчанию", exc)
+        return ImagePolicy()
+
+
+_default_policy = _policy_from_env()
+_current_policy: contextvars.ContextVar[Optional[ImagePolicy]] = contextvars.ContextVar(
+    "image_policy", default=None,
+)
+
+
+def default_image_policy() -> ImagePolicy:
+    """Политика развёртывания (из переменных окружения)."""
+    return _default_policy
+
+
+def current_image_policy() -> ImagePolicy:
+    """Политика текущего запроса или, вне :func:`use_image_policy`, развёртывания."""
+    return _current_policy.get() or _default_policy
+
+
+@contextmanager
+def use_image_policy(policy: Optional[ImagePolicy]) -> Iterator[ImagePolicy]:
+    """Кодировать картинки внутри блока по *policy* (``None`` — по умолчанию)."""
+    policy = policy or _default_policy
+    token = _current_policy.set(policy)
+    try:
+        yield policy
+    finally:
+        _current_policy.reset(token)
@@ -0,0 +1,335 @@
+"""
+Хранилище построенных картинок с адресацией по содержимому.
+
+Генераторы больше не встраивают картинки в HTML как base64 (+33 % к размеру
+и лишнее копирование), а кладут байты в :class:`ImageStore` и вставляют в
+отчёт ссылку ``/img/<хэш>.<формат>``. Картинка хранится под именем
+``<хэш>.<формат>`` (``png``, ``webp`` или ``svg``, см.
+:mod:`utils.image_policy`); маршрут ``/img/...`` отдаёт её с
+``Cache-Control: immutable``: адрес меняется вместе с
+содержимым, поэтому браузер загружает картинки отчёта параллельно, а при
+повторном просмотре берёт их из своего кэша.
+
+Хранение:
+
+* в памяти — LRU с ограничением суммарного объёма (``max_bytes``);
+* необязательно на диске (``root``) — файлы ``<root>/<имя>`` видны
+  всем рабочим процессам сервера и переживают вытеснение из памяти.
+  Объём каталога ограничен ``max_disk_bytes``: при превышении удаляются
+  самые старые файлы.
+
+Отчёты, которые сохраняются на диск как самостоятельные HTML-файлы,
+проходят через :meth:`ImageStore.inline` — ссылки заменяются обратно на
+``data:``-URI. HTML в кэше результатов ссылается на картинки, поэтому
+перед выдачей из кэша маршрут проверяет :meth:`ImageStore.available`.
+
+Фоновые задачи выполняются в дочерних процессах со своим экземпляром
+хранилища: картинки, сохранённые внутри :func:`collect_images`,
+передаются родителю вместе с результатом и записываются
+:meth:`ImageStore.put_many`.
+"""
+
+from __future__ import annotations
+
+import base64
+import contextvars
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from utils.image_policy import IMAGE_FORMATS
+from utils.metrics import phase
+from utils.settings import env_int
+
+__all__ = [
+    "IMAGES",
+    "ImageStore",
+    "ImageStoreStats",
+    "collect_images",
+    "image_url",
+    "media_type",
+]
+
+#: Шаблон ссылки на картинку хранилища: имя — 32 hex-символа blake2b-128 и формат.
+IMAGE_URL_RE = re.compile(r"/img/([0-9a-f]{32}\.(?:%s))" % "|".join(IMAGE_FORMATS))
+#: Имя картинки (файла в каталоге хранилища).
+IMAGE_NAME_RE = re.compile(r"[0-9a-f]{32}\.(?:%s)" % "|".join(IMAGE_FORMATS))
+
+_image_sink: contextvars.ContextVar[Optional[List[Tuple[str, bytes]]]] = contextvars.ContextVar(
+    "image_store_sink", default=None,
+)
+
+
+def image_url(name: str) -> str:
+    """URL картинки с именем *name* (``<хэш>.<формат>``)."""
+    return f"/img/{name}"
+
+
+def media_type(name: str) -> str:
+    """MIME-тип картинки по расширению имени."""
+    return IMAGE_FORMATS[name.rsplit(".", 1)[-1]]
+
+
+def _name(data: bytes, ext: str) -> str:
+    return f"{hashlib.blake2b(data, digest_size=16).hexdigest()}.{ext}"
+
+
+def _strings(value: Any) -> Iterator[str]:
+    """Все строки внутри значения (строки, кортежи/списки, словари)."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            yield from _strings(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+
+
+@dataclass(frozen=True)
+class ImageStoreStats:
+    """Снимок счётчиков хранилища."""
+
+    entries: int
+    bytes_used: int
+    max_bytes: int
+    disk_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class ImageStore:
+    """Потокобезопасное хранилище картинок по хэшу содержимого.
+
+    Args:
+        max_bytes: Максимальный объём картинок в памяти, байт.
+        root: Каталог для дисковых копий; ``None`` — только память.
+        max_disk_bytes: Максимальный объём каталога *root*, байт.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        root: Optional[str] = None,
+        max_disk_bytes: int = 512 * 2**20,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.root = root
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes_used = 0
+        self._disk_bytes: Optional[int] = None  # считается при первой записи
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        if root is not None:
+            os.makedirs(root, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Публичный интерфейс
+    # ------------------------------------------------------------------
+    def put(self, data: bytes, ext: str = "png") -> str:
+        """Сохранить картинку формата *ext* и вернуть её имя ``<хэш>.<ext>``."""
+        if ext not in IMAGE_FORMATS:
+            raise ValueError(f"Неизвестный формат картинки: {ext!r}")
+        name = _name(data, ext)
+        self._remember(name, data)
+        if self.root is not None:
+            self._write_file(name, data)
+        sink = _image_sink.get()
+        if sink is not None:
+            sink.append((name, data))
+        return name
+
+    def put_many(self, images: Iterable[Tuple[str, bytes]]) -> None:
+        """Записать картинки ``(имя, байты)``, полученные из другого процесса."""
+        for name, data in images:
+            self._remember(name, data)
+            if self.root is not None:
+                self._write_file(name, data)
+
+    def get(self, name: str) -> Optional[bytes]:
+        """Байты картинки или ``None``, если её нет ни в памяти, ни на диске."""
+        with self._lock:
+            data = self._entries.get(name)
+            if data is not None:
+                self._entries.move_to_end(name)
+                self._hits += 1
+                return data
+        data = self._read_file(name)
+        with self._lock:
+            if data is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        self._remember(name, data)
+        return data
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            if name in self._entries:
+                return True
+        return self.root is not None and os.path.isfile(self._path(name))
+
+    def available(self, value: Any) -> bool:
+        """Все ли картинки, на которые ссылается *value*, ещё хранятся."""
+        return all(name in self for name in self.references(value))
+
+    @staticmethod
+    def references(value: Any) -> Set[str]:
+        """Имена картинок, на которые ссылаются строки внутри *value*."""
+        return {
+            match.group(1)
+            for text in _strings(value)
+            for match in IMAGE_URL_RE.finditer(text)
+        }
+
+    def inline(self, html: str) -> str:
+        """Заменить ссылки ``/img/<имя>`` на ``data:``-URI.
+
+        Нужен для HTML, который сохраняется в файл и должен открываться
+        без сервера. Ссылки на отсутствующие картинки остаются как есть.
+        """
+        cache: Dict[str, str] = {}
+
+        def replace(match: re.Match) -> str:
+            name = match.group(1)
+            if name not in cache:
+                data = self.get(name)
+                if data is None:
+                    cache[name] = match.group(0)
+                else:
+                    cache[name] = (
+                        f"data:{media_type(name)};base64," + base64.b64encode(data).decode("ascii")
+                    )
+            return cache[name]
+
+        with phase("base64"):
+            return IMAGE_URL_RE.sub(replace, html)
+
+    def clear(self) -> None:
+        """Очистить память (дисковые копии и счётчики сохраняются)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes_used = 0
+
+    def stats(self) -> ImageStoreStats:
+        """Вернуть текущие значения счётчиков."""
+        with self._lock:
+            return ImageStoreStats(
+                entries=len(self._entries),
+                bytes_used=self._bytes_used,
+                max_bytes=self.max_bytes,
+                disk_bytes=self._disk_bytes or 0,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
+
+    # ------------------------------------------------------------------
+    # Внутренние помощники
+    # ------------------------------------------------------------------
+    def _remember(self, name: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if name in self._entries:
+                self._entries.move_to_end(name)
+                return
+            self._entries[name] = data
+            self._bytes_used += len(data)
+            while self._bytes_used > self.max_bytes:
+                _, victim = self._entries.popitem(last=False)
+                self._bytes_used -= len(victim)
+                self._evictions += 1
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _write_file(self, name: str, data: bytes) -> None:
+        path = self._path(name)
+        if os.path.exists(path):
+            return
+        tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp, "wb") as file:
+            file.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk()
+            else:
+                self._disk_bytes += len(data)
+            over = self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._prune_disk()
+
+    def _read_file(self, name: str) -> Optional[bytes]:
+        if self.root is None:
+            return None
+        try:
+            with open(self._path(name), "rb") as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def _files(self) -> List[Tuple[float, int, str]]:
+        files = []
+        for entry in os.scandir(self.root):
+            if IMAGE_NAME_RE.fullmatch(entry.name) and entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _scan_disk(self) -> int:
+        return sum(size for _, size, _ in self._files())
+
+    def _prune_disk(self) -> None:
+        """Удалить самые старые файлы, пока каталог не станет ≤ 90 % лимита."""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * 0.9
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue  # файл уже удалил другой процесс
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+
+@contextmanager
+def collect_images() -> Iterator[List[Tuple[str, bytes]]]:
+    """Собирать картинки, сохранённые внутри блока, в список ``(имя, байты)``.
+
+    Используется в дочерних процессах очереди задач: собранные картинки
+    передаются родителю и записываются :meth:`ImageStore.put_many`.
+    """
+    images: List[Tuple[str, bytes]] = []
+    token = _image_sink.set(images)
+    try:
+        yield images
+    finally:
+        _image_sink.reset(token)
+
+
+def _create_image_store() -> ImageStore:
+    """Хранилище по переменным ``IMAGE_STORE_*`` (каталог — только если задан)."""
+    return ImageStore(
+        max_bytes=env_int("IMAGE_STORE_MAX_MB", 128) * 2**20,
+        root=os.environ.get("IMAGE_STORE_DIR") or None,
+        max_disk_bytes=env_int("IMAGE_STORE_DISK_MAX_MB", 1024) * 2**20,
+    )
+
+
+#: Общее хранилище процесса: в него пишут генераторы, из него читает ``/img``.
+IMAGES = _create_image_store()
@@ -0,0 +1,349 @@
+"""
+Фоновая очередь тяжёлых аналитических задач.
+
+Маршрут кладёт задачу в пул процессов и сразу возвращает её идентификатор,
+а клиент опрашивает ``/jobs/<id>``, пока задача не завершится. Это
+освобождает поток сервера на время многосекундной отрисовки графиков.
+
+Ограничения:
+
+* одновременно в очереди (ожидают или выполняются) не более
+  ``max_pending`` задач — при переполнении :meth:`JobQueue.submit`
+  бросает :class:`QueueFullError`;
+* результат завершённой задачи хранится ``result_ttl`` секунд, после
+  чего запись удаляется и ``/jobs/<id>`` отвечает 404;
+* состояние задач хранится в памяти процесса, который принял задачу:
+  при нескольких рабочих процессах сервера опрос должен приходить в тот
+  же процесс (sticky routing), поэтому production-режим с несколькими
+  процессами выключает асинхронный режим (``JOB_ASYNC=0``) и маршруты
+  отвечают готовым отчётом сразу.
+
+Прогресс
+--------
+Функция задачи выполняется в дочернем процессе. Чтобы сообщить о ходе
+работы, код генераторов вызывает :func:`report_progress` — вне фоновой
+задачи вызов ничего не делает, а внутри передаёт долю выполненной работы
+родителю через разделяемый словарь ``multiprocessing.Manager``.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from utils.image_store import IMAGES, collect_images
+from utils.image_policy import ImagePolicy, current_image_policy, use_image_policy
+from utils.metrics import collect_phases, current_route, record_phases, route_context
+
+__all__ = [
+    "JobQueue",
+    "JobQueueStats",
+    "JobStatus",
+    "QueueFullError",
+    "current_job",
+    "default_mp_context",
+    "report_progress",
+]
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# --- Состояние внутри дочернего процесса -------------------------------------
+_progress_store = None
+_current_job_id: Optional[str] = None
+
+
+def _init_worker(progress_store) -> None:
+    """Инициализатор процесса пула: запомнить общий словарь прогресса."""
+    global _progress_store
+    _progress_store = progress_store
+
+
+def _run_job(
+    job_id: str, route: str, policy: ImagePolicy, func: Callable[..., Any], args: tuple,
+) -> tuple:
+    """Выполнить функцию задачи, привязав к потоку идентификатор задачи.
+
+    Картинки кодируются по политике вывода *policy* запроса, поставившего
+    задачу (см. :mod:`utils.image_policy`).
+
+    Возвращает ``(результат, фазы, картинки)``: фазы, измеренные в дочернем
+    процессе, записываются в реестр метрик родителя (см. :mod:`utils.metrics`),
+    а построенные картинки — в его хранилище (см. :mod:`utils.image_store`).
+    """
+    global _current_job_id
+    _current_job_id = job_id
+    try:
+        with route_context(route), use_image_policy(policy), \
+                collect_phases() as phases, collect_images() as images:
+            value = func(*args)
+        return value, phases, images
+    finally:
+        _current_job_id = None
+
+
+def current_job() -> Optional[str]:
+    """Идентификатор выполняемой фоновой задачи или ``None`` вне её."""
+    return _current_job_id
+
+
+def report_progress(done: int, total: int) -> None:
+    """Сообщить долю выполненной работы текущей фоновой задачи.
+
+    Вне фоновой задачи (обычный синхронный запрос, тесты) ничего не делает.
+    """
+    if _progress_store is None or _current_job_id is None or total <= 0:
+        return
+    try:
+        _progress_store[_current_job_id] = min(1.0, done / total)
+    except Exception:  # noqa: WPS440 — прогресс не должен ронять задачу
+        pass
+
+
+# --- Родительский процесс ----------------------------------------------------
+class QueueFullError(RuntimeError):
+    """В очереди уже максимальное число незавершённых задач."""
+
+
+@dataclass(frozen=True)
+class JobStatus:
+    """Снимок состояния задачи для ответа ``/jobs/<id>``."""
+
+    job_id: str
+    state: str
+    progress: float
+    result: Any = None
+    error: Optional[str] = None
+    queued_seconds: float = 0.0
+    run_seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class JobQueueStats:
+    """Снимок счётчиков очереди."""
+
+    pending: int
+    finished: int
+    submitted: int
+    rejected: int
+    failed: int
+
+
+@dataclass
+class _Job:
+    future: Future
+    submitted_at: float
+    on_done: Optional[Callable[[Any], Any]]
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+
+def default_mp_context():
+    """Контекст multiprocessing для пулов процессов приложения."""
+    # forkserver безопасен для многопоточного родителя (fork при захваченных
+    # блокировках может «заморозить» потомка); на Windows доступен только spawn.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class JobQueue:
+    """Очередь задач поверх :class:`ProcessPoolExecutor`.
+
+    Пул процессов и менеджер прогресса создаются лениво при первой задаче,
+    поэтому синхронный режим работы сервера не порождает лишних процессов.
+
+    Args:
+        max_workers: Число процессов пула.
+        max_pending: Максимум незавершённых задач.
+        result_ttl: Сколько секунд хранить результат завершённой задачи.
+        clock: Источник монотонного времени (подменяется в тестах).
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_pending: int,
+        result_ttl: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.result_ttl = result_ttl
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, _Job] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._progress = None
+
+        self._submitted = 0
+        self._rejected = 0
+        self._failed = 0
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        on_done: Optional[Callable[[Any], Any]] = None,
+    ) -> str:
+        """Поставить ``func(*args)`` в очередь и вернуть идентификатор задачи.
+
+        ``func`` и аргументы должны сериализоваться pickle (функция уровня
+        модуля). Необязательный *on_done* вызывается в родительском процессе
+        с результатом успешной задачи; его возвращаемое значение становится
+        результатом, который отдаёт :meth:`status` (например, готовый HTML).
+
+        Raises:
+            QueueFullError: Если очередь заполнена.
+        """
+        with self._lock:
+            self._purge_expired()
+            pending = sum(1 for job in self._jobs.values() if job.finished_at is None)
+            if pending >= self.max_pending:
+                self._rejected += 1
+                raise QueueFullError(
+                    f"Очередь задач заполнена ({pending} из {self.max_pending}).",
+                )
+
+            executor = self._ensure_executor()
+            job_id = uuid.uuid4().hex
+            future = executor.submit(
+                _run_job, job_id, current_route(), current_image_policy(), func, args,
+            )
+            self._jobs[job_id] = _Job(future, self._clock(), on_done)
+            self._submitted += 1
+
+        future.add_done_callback(lambda fut, jid=job_id: self._finish(jid, fut))
+        return job_id
+
+    def status(self, job_id: str) -> Optional[JobStatus]:
+        """Вернуть состояние задачи или ``None``, если она неизвестна/истекла."""
+        with self._lock:
+            self._purge_expired()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+
+            now = self._clock()
+            if job.finished_at is not None:
+                state = FAILED if job.error is not None else DONE
+                progress = 1.0
+            elif job.future.running():
+                state = RUNNING
+                if job.started_at is None:
+                    job.started_at = now  # момент, когда опрос впервые увидел запуск
+                progress = self._read_progress(job_id)
+            else:
+                state = QUEUED
+                progress = 0.0
+
+            started = job.started_at if job.started_at is not None else now
+            ended = job.finished_at if job.finished_at is not None else now
+            return JobStatus(
+                job_id=job_id,
+                state=state,
+                progress=progress,
+                result=job.result,
+                error=job.error,
+                queued_seconds=started - job.submitted_at,
+                run_seconds=ended - started,
+            )
+
+    def stats(self) -> JobQueueStats:
+        """Вернуть текущие значения счётчиков."""
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job.finished_at is None)
+            return JobQueueStats(
+                pending=pending,
+                finished=len(self._jobs) - pending,
+                submitted=self._submitted,
+                rejected=self._rejected,
+                failed=self._failed,
+            )
+
+    def shutdown(self) -> None:
+        """Остановить пул процессов и менеджер прогресса."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+                self._progress = None
+
+    # ------------------------------------------------------------------
+    # Внутренние помощники
+    # ------------------------------------------------------------------
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            ctx = default_mp_context()
+            self._manager = ctx.Manager()
+            self._progress = self._manager.dict()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(self._progress,),
+            )
+        return self._executor
+
+    def _read_progress(self, job_id: str) -> float:
+        try:
+            return float(self._progress.get(job_id, 0.0))
+        except Exception:  # noqa: WPS440 — менеджер мог быть остановлен
+            return 0.0
+
+    def _finish(self, job_id: str, future: Future) -> None:
+        """Колбэк завершения: сохранить результат или текст ошибки."""
+        error = None
+        result = None
+        try:
+            result, phases, images = future.result()
+            record_phases(phases)
+            IMAGES.put_many(images)
+            job = self._jobs.get(job_id)
+            if job is not None and job.on_done is not None:
+                result = job.on_done(result)
+        except Exception as exc:  # noqa: WPS440
+            error = str(exc) or exc.__class__.__name__
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            now = self._clock()
+            if job.started_at is None:
+                job.started_at = job.submitted_at
+            job.finished_at = now
+            job.result = result
+            job.error = error
+            if error is not None:
+                self._failed += 1
+        if self._progress is not None:
+            try:
+                self._progress.pop(job_id, None)
+            except Exception:  # noqa: WPS440
+                pass
+
+    def _purge_expired(self) -> None:
+        """Удалить завершённые задачи старше ``result_ttl`` (под блокировкой)."""
+        now = self._clock()
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,79 @@
+"""
+Отложенный импорт тяжёлых модулей.
+
+Сервисы отчётов тянут за собой matplotlib, seaborn, scipy.stats и
+scikit-learn — около трёх секунд импорта и сотни мегабайт памяти. Процессу,
+который отдаёт только ``/``, ``/about`` и статику, они не нужны, поэтому
+``routes`` подключает сервисы через :func:`lazy_module`: модуль
+импортируется при первом обращении к его атрибуту, то есть при первом
+запросе к соответствующему маршруту.
+
+:func:`prewarm` заранее импортирует все отложенные модули. Production-сервер
+вызывает её до ``fork()`` (см. ``app.preload_heavy_modules``), чтобы
+рабочие процессы делили уже загруженные страницы; в режиме разработки
+прогрев включается переменной ``SERVER_PREWARM=1`` и идёт в фоновом потоке.
+
+Импорт в Python потокобезопасен (блокировка на модуль), поэтому два
+одновременных первых запроса не загрузят модуль дважды.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, List, Optional
+
+__all__ = ["LazyModule", "lazy_module", "prewarm", "prewarm_in_background"]
+
+_registry: List["LazyModule"] = []
+
+
+class LazyModule:
+    """Заместитель модуля *name*, импортирующий его при первом обращении.
+
+    Атрибуты (функции) возвращаются настоящими объектами модуля, поэтому
+    их можно передавать в пулы процессов — pickle сохранит ссылку на модуль.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Импортирован ли модуль."""
+        return self._module is not None
+
+    def load(self) -> ModuleType:
+        """Импортировать модуль (повторные вызовы ничего не стоят)."""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Отложенный модуль *name*; попадает в список :func:`prewarm`."""
+    module = LazyModule(name)
+    _registry.append(module)
+    return module
+
+
+def prewarm() -> None:
+    """Импортировать все отложенные модули сейчас."""
+    for module in list(_registry):
+        module.load()
+
+
+def prewarm_in_background() -> threading.Thread:
+    """Импортировать отложенные модули в фоновом потоке (сервер уже отвечает)."""
+    thread = threading.Thread(target=prewarm, name="prewarm", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,314 @@
+"""
+Метрики приложения в текстовом формате Prometheus.
+
+Что собирается
+--------------
+* ``http_requests_total{route, method, status}`` — число запросов;
+* ``http_request_errors_total{route, method}`` — ответы с кодом 5xx;
+* ``http_request_duration_seconds{route, method}`` — гистограмма времени
+  обработчика маршрута;
+* ``app_phase_duration_seconds{route, phase}`` — гистограмма времени
+  отдельных фаз внутри генераторов: ``statistics`` (расчёт статистик),
+  ``render`` (построение фигуры), ``png_encode`` (``savefig`` — растеризация
+  Agg и кодирование картинки в формат политики вывода, обычно PNG), ``base64`` (встраивание картинок в сохраняемые
+  файлы), ``disk_save`` (запись отчёта на диск).
+
+Маршруты измеряет :class:`MetricsPlugin` (плагин Bottle), фазы — контекстный
+менеджер :func:`phase`. Метка ``route`` фазы берётся из текущего запроса;
+для фоновых задач её переносит :mod:`utils.job_queue`.
+
+Дополнительные показатели (например, счётчики кэшей) подключаются через
+:meth:`MetricsRegistry.register_collector`.
+
+Каждый процесс сервера ведёт собственный реестр, поэтому при нескольких
+рабочих процессах ``/metrics`` показывает данные того процесса, который
+принял запрос (метка ``pid`` в ``process_info`` помогает их различать).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bottle import HTTPResponse, response
+
+__all__ = [
+    "MetricsPlugin",
+    "MetricsRegistry",
+    "REGISTRY",
+    "collect_phases",
+    "current_route",
+    "phase",
+    "record_phases",
+    "route_context",
+]
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[Dict[str, str], float]
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+# Границы корзин, секунд: от быстрых ответов из кэша до многосекундной отрисовки.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+_route_var: contextvars.ContextVar[str] = contextvars.ContextVar("metrics_route", default="")
+_phase_sink: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar(
+    "metrics_phase_sink", default=None,
+)
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    body = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels)
+    return f"{{{body}}}" if body else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Histogram:
+    """Накопительная гистограмма одной серии меток."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, n_buckets: int) -> None:
+        self.counts = [0] * n_buckets
+        self.total = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """Потокобезопасный реестр счётчиков и гистограмм.
+
+    Args:
+        buckets: Верхние границы корзин гистограмм, секунд.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._collectors: List[Collector] = []
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        """Задать тип (``counter``/``histogram``/``gauge``) и описание метрики."""
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, labels: Dict[str, str], value: float = 1.0) -> None:
+        """Увеличить счётчик *name* с метками *labels*."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: Dict[str, str], value: float) -> None:
+        """Добавить наблюдение *value* в гистограмму *name*."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist.counts[i] += 1
+            hist.total += value
+            hist.count += 1
+
+    def register_collector(self, collector: Collector) -> None:
+        """Подключить функцию, возвращающую ``(имя, тип, описание, [(метки, значение)])``.
+
+        Вызывается при каждом рендеринге ``/metrics``.
+        """
+        self._collectors.append(collector)
+
+    def counter_value(self, name: str, labels: Dict[str, str]) -> float:
+        """Текущее значение счётчика (0.0, если серии нет)."""
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels(labels), 0.0)
+
+    def histogram_count(self, name: str, labels: Dict[str, str]) -> int:
+        """Число наблюдений в серии гистограммы (0, если серии нет)."""
+        with self._lock:
+            hist = self._histograms.get(name, {}).get(_labels(labels))
+            return hist.count if hist is not None else 0
+
+    def render(self) -> str:
+        """Сформировать текст в формате Prometheus (version 0.0.4)."""
+        lines: List[str] = []
+
+        def header(name: str, default_kind: str) -> None:
+            kind, help_text = self._help.get(name, (default_kind, ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for name in sorted(self._counters):
+                header(name, "counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+            for name in sorted(self._histograms):
+                header(name, "histogram")
+                for key, hist in sorted(self._histograms[name].items()):
+                    for bound, count in zip(self.buckets, hist.counts):
+                        le = key + (("le", _format_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(le)} {count}")
+                    le = key + (("le", "+Inf"),)
+                    lines.append(f"{name}_bucket{_format_labels(le)} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(hist.total)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+            collectors = list(self._collectors)
+
+        for collector in collectors:
+            for name, kind, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+REGISTRY.describe("http_requests_total", "counter", "Обработанные HTTP-запросы.")
+REGISTRY.describe("http_request_errors_total", "counter", "Ответы с кодом 5xx.")
+REGISTRY.describe(
+    "http_request_duration_seconds", "histogram", "Время обработчика маршрута, секунд.",
+)
+REGISTRY.describe(
+    "app_phase_duration_seconds", "histogram", "Время фаз построения отчётов, секунд.",
+)
+REGISTRY.register_collector(
+    lambda: [("process_info", "gauge", "Идентификатор процесса сервера.",
+              [({"pid": str(os.getpid())}, 1.0)])],
+)
+
+
+# ---------------------------------------------------------------------------
+#   Фазы
+# ---------------------------------------------------------------------------
+def current_route() -> str:
+    """Шаблон маршрута текущего запроса (пустая строка вне запроса)."""
+    return _route_var.get()
+
+
+@contextmanager
+def route_context(route: str) -> Iterator[None]:
+    """Привязать последующие фазы к маршруту *route* (для фоновых задач)."""
+    token = _route_var.set(route)
+    try:
+        yield
+    finally:
+        _route_var.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Измерить длительность блока как фазу *name* текущего маршрута."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        route = _route_var.get() or "-"
+        sink = _phase_sink.get()
+        if sink is not None:
+            sink.append((route, name, elapsed))
+        else:
+            REGISTRY.observe("app_phase_duration_seconds", {"route": route, "phase": name}, elapsed)
+
+
+@contextmanager
+def collect_phases() -> Iterator[List[Tuple[str, str, float]]]:
+    """Собирать фазы блока в список вместо реестра.
+
+    Используется в дочерних процессах очереди задач: собранные
+    ``(route, phase, seconds)`` передаются родителю и записываются
+    функцией :func:`record_phases`.
+    """
+    samples: List[Tuple[str, str, float]] = []
+    token = _phase_sink.set(samples)
+    try:
+        yield samples
+    finally:
+        _phase_sink.reset(token)
+
+
+def record_phases(samples: Iterable[Tuple[str, str, float]]) -> None:
+    """Записать в реестр фазы, измеренные в другом процессе."""
+    for route, name, elapsed in samples:
+        REGISTRY.observe("app_phase_duration_seconds", {"route": route, "phase": name}, elapsed)
+
+
+# ---------------------------------------------------------------------------
+#   Плагин Bottle
+# ---------------------------------------------------------------------------
+class MetricsPlugin:
+    """Плагин Bottle: считает запросы, ошибки и время каждого маршрута.
+
+    Метка ``route`` — шаблон правила (``/jobs/<job_id>``), а не фактический
+    путь, чтобы число серий не росло с числом идентификаторов.
+
+    Args:
+        registry: Реестр, куда пишутся метрики.
+        skip: Правила, которые не измеряются (например, сам ``/metrics``).
+    """
+
+    name = "metrics"
+    api = 2
+
+    def __init__(
+        self,
+        registry: MetricsRegistry = REGISTRY,
+        skip: Tuple[str, ...] = ("/metrics",),
+    ) -> None:
+        self.registry = registry
+        self.skip = skip
+
+    def apply(self, callback, route):
+        if route.rule in self.skip:
+            return callback
+        rule, method, registry = route.rule, route.method, self.registry
+
+        def wrapper(*args, **kwargs):
+            token = _route_var.set(rule)
+            start = time.perf_counter()
+            status = 500
+            try:
+                body = callback(*args, **kwargs)
+                # Возвращённый HTTPResponse несёт свой код, а не глобального response
+                status = body.status_code if isinstance(body, HTTPResponse) else response.status_code
+                return body
+            except HTTPResponse as resp:
+                status = resp.status_code
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                _route_var.reset(token)
+                labels = {"route": rule, "method": method}
+                registry.inc("http_requests_total", {**labels, "status": str(status)})
+                registry.observe("http_request_duration_seconds", labels, elapsed)
+                if status >= 500:
+                    registry.inc("http_request_errors_total", labels)
+
+        return wrapper
@@ -0,0 +1,172 @@
+"""
+Кэш результатов аналитических маршрутов.
+
+Ключ записи — ``(отпечаток набора данных, маршрут, параметры формы)``
+(отпечаток берётся из :class:`utils.dataset_handle.DatasetHandle`),
+поэтому повторная отправка той же формы по той же таблице возвращает уже
+построенный HTML вместо повторного расчёта и отрисовки PNG. Одинаковые
+таблицы разных пользователей дают одинаковый отпечаток и разделяют записи.
+
+Объём кэша ограничен суммарным размером сохранённых значений; при
+превышении вытесняются давно не использовавшиеся записи (LRU).
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+__all__ = ["ResultCache", "CacheStats"]
+
+CacheKey = Tuple[str, str, Hashable]
+
+_MISSING = object()
+
+
+def _value_size(value: Any) -> int:
+    """Оценить объём памяти значения (строки, байты и кортежи из них)."""
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_value_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Снимок счётчиков кэша."""
+
+    entries: int
+    bytes_used: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля попаданий среди всех обращений (0.0, если обращений не было)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResultCache:
+    """Потокобезопасный LRU-кэш результатов с ограничением по объёму.
+
+    Args:
+        max_bytes: Максимальный суммарный размер значений, байт.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[CacheKey, Tuple[Any, int]] = OrderedDict()
+        self._bytes_used = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(
+        self,
+        key: CacheKey,
+        default: Any = None,
+        valid: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Вернуть значение по ключу или *default* (учитывается в статистике).
+
+        Если задан *valid* и он отвергает сохранённое значение (например,
+        HTML ссылается на уже вытесненные картинки), запись удаляется и
+        обращение считается промахом.
+        """
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and valid is not None and not valid(item[0]):
+                self._bytes_used -= self._entries.pop(key)[1]
+                self._invalidations += 1
+                item = None
+            if item is None:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return item[0]
+
+    def get_or_compute(
+        self,
+        key: CacheKey,
+        compute: Callable[[], Any],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+        valid: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Вернуть значение по ключу либо вычислить и сохранить его.
+
+        Исключения из *compute* не кэшируются. Если задан *cacheable*,
+        сохраняются только значения, для которых он вернул ``True``
+        (например, без сообщения об ошибке); *valid* — см. :meth:`get`.
+        """
+        value = self.get(key, _MISSING, valid)
+        if value is not _MISSING:
+            return value
+
+        # Расчёт выполняется вне блокировки: параллельные запросы с тем же
+        # ключом могут посчитать значение дважды, но не ждут друг друга.
+        value = compute()
+        self.put_if(key, value, cacheable)
+        return value
+
+    def put_if(
+        self,
+        key: CacheKey,
+        value: Any,
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> None:
+        """Сохранить значение, если *cacheable* не задан или одобряет его."""
+        if cacheable is None or cacheable(value):
+            self.put(key, value)
+
+    def put(self, key: CacheKey, value: Any) -> None:
+        """Сохранить значение; слишком большие значения не кэшируются."""
+        size = _value_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes_used -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes_used += size
+            while self._bytes_used > self.max_bytes:
+                _, (_, victim_size) = self._entries.popitem(last=False)
+                self._bytes_used -= victim_size
+                self._evictions += 1
+
+    def invalidate(self, fingerprint: str) -> int:
+        """Удалить все записи для набора данных *fingerprint*; вернуть их число."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == fingerprint]
+            for key in stale:
+                self._bytes_used -= self._entries.pop(key)[1]
+            self._invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        """Очистить кэш (счётчики сохраняются)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes_used = 0
+
+    def stats(self) -> CacheStats:
+        """Вернуть текущие значения счётчиков."""
+        with self._lock:
+            return CacheStats(
+                entries=len(self._entries),
+                bytes_used=self._bytes_used,
+                max_bytes=self.max_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                invalidations=self._invalidations,
+            )
@@ -0,0 +1,198 @@
+"""
+Ограниченное по памяти хранилище наборов данных пользовательских сессий.
+
+Каждой сессии (cookie ``session_id``) соответствует один
+:class:`utils.dataset_handle.DatasetHandle`. Хранилище следит за суммарным
+объёмом памяти таблиц (``DataFrame.memory_usage(deep=True)``, посчитанным
+при создании дескриптора) и при превышении бюджета вытесняет давно не
+использовавшиеся записи (LRU). Кроме того, у каждой записи есть время
+жизни (TTL): по его истечении таблица удаляется при следующем обращении
+к хранилищу.
+
+Хранилище запоминает идентификаторы вытесненных сессий, чтобы маршруты
+могли отличить «таблица ещё не загружена» от «таблица устарела и была
+удалена».
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from utils.dataset_handle import DatasetHandle
+
+__all__ = ["SessionStore", "SessionStoreStats"]
+
+
+@dataclass(frozen=True)
+class SessionStoreStats:
+    """Снимок счётчиков хранилища."""
+
+    entries: int
+    bytes_used: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+
+@dataclass
+class _Entry:
+    handle: DatasetHandle
+    expires_at: float
+
+
+class SessionStore:
+    """Потокобезопасное LRU-хранилище таблиц с бюджетом памяти и TTL.
+
+    Args:
+        max_bytes: Суммарный бюджет памяти всех таблиц, байт.
+        ttl: Время жизни записи с момента последнего обращения, секунд.
+        max_expired_ids: Сколько идентификаторов вытесненных сессий помнить.
+        clock: Источник монотонного времени (подменяется в тестах).
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float,
+        *,
+        max_expired_ids: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._max_expired_ids = max_expired_ids
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._expired_ids: OrderedDict[str, None] = OrderedDict()
+        self._bytes_used = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    # ------------------------------------------------------------------
+    # Публичный интерфейс
+    # ------------------------------------------------------------------
+    def get(self, sid: str) -> Optional[DatasetHandle]:
+        """Вернуть набор данных сессии *sid* или ``None``; продлевает TTL."""
+        with self._lock:
+            now = self._clock()
+            self._purge_expired(now)
+
+            entry = self._entries.get(sid)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            entry.expires_at = now + self.ttl
+            self._entries.move_to_end(sid)
+            return entry.handle
+
+    def version_of(self, sid: str) -> Optional[Tuple[int, str]]:
+        """Версия и отпечаток таблицы сессии *sid* или ``None``.
+
+        В отличие от :meth:`get`, не продлевает TTL, не меняет порядок
+        вытеснения и не учитывается в счётчиках попаданий.
+        """
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None or entry.expires_at <= self._clock():
+                return None
+            return entry.handle.version, entry.handle.fingerprint
+
+    def set(self, sid: str, handle: DatasetHandle) -> None:
+        """Сохранить набор данных сессии *sid*, вытеснив старые при нехватке памяти.
+
+        Raises:
+            ValueError: Если таблица сама по себе больше всего бюджета.
+        """
+        nbytes = handle.nbytes
+        if nbytes > self.max_bytes:
+            raise ValueError(
+                "Таблица слишком велика для хранения "
+                f"({nbytes / 2**20:.1f} МБ при лимите {self.max_bytes / 2**20:.1f} МБ).",
+            )
+
+        with self._lock:
+            now = self._clock()
+            self._purge_expired(now)
+
+            old = self._entries.pop(sid, None)
+            if old is not None:
+                self._bytes_used -= old.handle.nbytes
+            self._expired_ids.pop(sid, None)
+
+            self._entries[sid] = _Entry(handle, now + self.ttl)
+            self._bytes_used += nbytes
+
+            while self._bytes_used > self.max_bytes:
+                victim, entry = self._entries.popitem(last=False)
+                self._forget(victim, entry)
+                self._evictions += 1
+
+    def delete(self, sid: str) -> None:
+        """Удалить таблицу сессии *sid* (не считается вытеснением)."""
+        with self._lock:
+            entry = self._entries.pop(sid, None)
+            if entry is not None:
+                self._bytes_used -= entry.handle.nbytes
+
+    def is_expired(self, sid: str) -> bool:
+        """Была ли таблица сессии *sid* удалена по TTL или бюджету памяти."""
+        with self._lock:
+            self._purge_expired(self._clock())
+            return sid in self._expired_ids
+
+    def stats(self) -> SessionStoreStats:
+        """Вернуть текущие значения счётчиков."""
+        with self._lock:
+            return SessionStoreStats(
+                entries=len(self._entries),
+                bytes_used=self._bytes_used,
+                max_bytes=self.max_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, sid: object) -> bool:
+        return sid in self._entries
+
+    # ------------------------------------------------------------------
+    # Внутренние помощники (вызываются под блокировкой)
+    # ------------------------------------------------------------------
+    def _purge_expired(self, now: float) -> None:
+        # Записи упорядочены по последнему обращению, а TTL одинаков для всех,
+        # поэтому просроченные всегда находятся в начале словаря.
+        while self._entries:
+            sid, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            del self._entries[sid]
+            self._forget(sid, entry)
+            self._expirations += 1
+
+    def _forget(self, sid: str, entry: _Entry) -> None:
+        self._bytes_used -= entry.handle.nbytes
+        self._expired_ids[sid] = None
+        while len(self._expired_ids) > self._max_expired_ids:
+            self._expired_ids.popitem(last=False)
@@ -0,0 +1,29 @@
+"""
+Чтение параметров развёртывания из переменных окружения.
+
+Все функции возвращают значение по умолчанию, если переменная не задана
+или не может быть разобрана — так же, как это делает ``app.py`` для
+``SERVER_PORT``.
+"""
+
+from __future__ import annotations
+
+import os
+
+__all__ = ["env_int", "env_float"]
+
+
+def env_int(name: str, default: int) -> int:
+    """Прочитать целое число из переменной окружения *name*."""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Прочитать вещественное число из переменной окружения *name*."""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
@@ -0,0 +1,344 @@
+"""
+Раздача статических файлов с кэшированием на стороне браузера.
+
+Возможности по сравнению с ``bottle.static_file``:
+
+* **сильный ETag** — хэш содержимого файла (у сжатых вариантов свой ETag,
+  так как это другое представление ресурса);
+* **условные запросы** — ``If-None-Match`` / ``If-Modified-Since`` дают
+  ``304 Not Modified`` без тела;
+* **версионированные URL** — :func:`static_url` добавляет к пути
+  ``?v=<хэш>``; если версия в запросе совпадает с текущим содержимым,
+  ответ помечается ``Cache-Control: public, max-age=31536000, immutable``,
+  и браузер не перепроверяет файл вовсе. Остальные ответы получают
+  ``no-cache`` (каждый раз короткая проверка ETag);
+* **предварительно сжатые файлы** — если рядом с файлом лежит ``.br`` или
+  ``.gz`` и клиент принимает это кодирование, отдаётся сжатый вариант с
+  ``Content-Encoding`` и ``Vary: Accept-Encoding``. Сжатые копии создаёт
+  :func:`precompress` (``python -m utils.static_files static``);
+* **частичные ответы** — ``Range`` (с учётом ``If-Range``) даёт
+  ``206 Partial Content`` по несжатому файлу, как у ``bottle.static_file``;
+  все ответы объявляют ``Accept-Ranges: bytes``.
+
+Brotli — необязательная зависимость: без пакета ``brotli`` файлы ``.br``
+не создаются, но уже существующие отдаются.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_tz, mktime_tz
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bottle import HTTPError, HTTPResponse, parse_range_header, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - зависит от окружения
+    brotli = None
+
+__all__ = [
+    "StaticFiles",
+    "accepted_encodings",
+    "install",
+    "precompress",
+    "static_url",
+]
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Порядок предпочтения кодирований: (имя в Accept-Encoding, расширение файла).
+_ENCODINGS: Tuple[Tuple[str, str], ...] = (("br", ".br"), ("gzip", ".gz"))
+# Что имеет смысл сжимать заранее: текстовые форматы, картинки уже сжаты.
+_COMPRESSIBLE = (".css", ".js", ".html", ".svg", ".json", ".txt", ".map")
+_MIN_PRECOMPRESS_BYTES = 1024
+_RANGE_CHUNK = 1 << 16
+
+
+def accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """Разобрать ``Accept-Encoding`` в словарь ``кодирование → q``.
+
+    Кодирования с ``q=0`` явно запрещены и в словарь попадают с нулём.
+    """
+    result: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        result[token] = q
+    return result
+
+
+def _accepts(accepted: Dict[str, float], encoding: str) -> bool:
+    if encoding in accepted:
+        return accepted[encoding] > 0
+    return accepted.get("*", 0.0) > 0
+
+
+def _read_range(file: BinaryIO, offset: int, length: int) -> Iterator[bytes]:
+    """Прочитать *length* байт файла с *offset* кусками и закрыть файл."""
+    try:
+        file.seek(offset)
+        while length > 0:
+            chunk = file.read(min(length, _RANGE_CHUNK))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+@dataclass(frozen=True)
+class _Variant:
+    path: str
+    size: int
+    mtime: float
+    etag: str
+
+
+class StaticFiles:
+    """Раздача файлов из каталога *root* с ETag, 304 и сжатыми копиями.
+
+    Хэши содержимого кэшируются по ``(путь, mtime, размер)``, поэтому файл
+    читается для хэширования только после изменения.
+
+    Args:
+        root: Каталог статических файлов.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+        self._digests: Dict[str, Tuple[float, int, str]] = {}
+
+    # ------------------------------------------------------------------
+    # Публичный интерфейс
+    # ------------------------------------------------------------------
+    def version(self, filepath: str) -> Optional[str]:
+        """Короткая версия (префикс хэша содержимого) или ``None``, если файла нет."""
+        path = self._resolve(filepath)
+        if path is None or not os.path.isfile(path):
+            return None
+        return self._digest(path)[:12]
+
+    def serve(self, filepath: str) -> HTTPResponse:
+        """Сформировать ответ на ``GET``/``HEAD`` запрос файла *filepath*."""
+        path = self._resolve(filepath)
+        if path is None:
+            return HTTPError(403, "Access denied.")
+        if not os.path.isfile(path):
+            return HTTPError(404, "File does not exist.")
+        if not os.access(path, os.R_OK):
+            return HTTPError(403, "You do not have permission to access this file.")
+
+        original = self._variant(path)
+        immutable = request.query.get("v") == self.version(filepath)
+
+        # Диапазоны считаются по несжатому файлу: сжатую копию не выбираем
+        byte_range = self._requested_range(original)
+        variant, encoding = (original, None) if byte_range else self._negotiate(path, original)
+        headers = {
+            "Accept-Ranges": "bytes",
+            "ETag": variant.etag,
+            "Last-Modified": formatdate(original.mtime, usegmt=True),
+            "Cache-Control": (
+                f"public, max-age={IMMUTABLE_MAX_AGE}, immutable" if immutable else "no-cache"
+            ),
+            "Vary": "Accept-Encoding",
+        }
+
+        if self._not_modified(variant, original):
+            return HTTPResponse(status=304, **headers)
+
+        mimetype, _ = mimetypes.guess_type(path)
+        content_type = mimetype or "application/octet-stream"
+        if content_type.startswith("text/") or content_type in (
+            "application/javascript", "application/json",
+        ):
+            content_type += "; charset=UTF-8"
+        headers["Content-Type"] = content_type
+        headers["Content-Length"] = str(variant.size)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+        if byte_range:
+            ranges = list(parse_range_header(byte_range, variant.size))
+            if not ranges:
+                return HTTPError(416, "Requested Range Not Satisfiable",
+                                 **{"Content-Range": f"bytes */{variant.size}"})
+            offset, end = ranges[0]
+            headers["Content-Range"] = f"bytes {offset}-{end - 1}/{variant.size}"
+            headers["Content-Length"] = str(end - offset)
+            body = "" if request.method == "HEAD" else _read_range(
+                open(variant.path, "rb"), offset, end - offset)
+            return HTTPResponse(body, status=206, **headers)
+
+        body = "" if request.method == "HEAD" else open(variant.path, "rb")
+        return HTTPResponse(body, **headers)
+
+    # ------------------------------------------------------------------
+    # Внутренние помощники
+    # ------------------------------------------------------------------
+    def _resolve(self, filepath: str) -> Optional[str]:
+        path = os.path.abspath(os.path.join(self.root, filepath.strip("/\\")))
+        if not path.startswith(self.root + os.sep):
+            return None
+        return path
+
+    def _digest(self, path: str) -> str:
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._digests.get(path)
+            if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+                return cached[2]
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 16), b""):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        with self._lock:
+            self._digests[path] = (stat.st_mtime, stat.st_size, value)
+        return value
+
+    def _variant(self, path: str) -> _Variant:
+        stat = os.stat(path)
+        return _Variant(path, stat.st_size, stat.st_mtime, f'"{self._digest(path)}"')
+
+    def _negotiate(self, path: str, original: _Variant) -> Tuple[_Variant, Optional[str]]:
+        """Выбрать сжатую копию, которую принимает клиент и которая не устарела."""
+        accepted = accepted_encodings(request.headers.get("Accept-Encoding"))
+        for encoding, ext in _ENCODINGS:
+            candidate = path + ext
+            if not _accepts(accepted, encoding) or not os.path.isfile(candidate):
+                continue
+            stat = os.stat(candidate)
+            if stat.st_mtime < original.mtime:
+                continue  # копия старше исходника — не доверяем ей
+            # ETag сжатой копии выводится из хэша исходника: тот же контент,
+            # другое представление.
+            return _Variant(
+                candidate, stat.st_size, original.mtime,
+                original.etag[:-1] + f'-{encoding}"',
+            ), encoding
+        return original, None
+
+    @staticmethod
+    def _requested_range(original: _Variant) -> Optional[str]:
+        """Заголовок ``Range``, если его нужно выполнить.
+
+        При ``If-Range`` с другим ETag или датой файл изменился, и клиент
+        получает его целиком.
+        """
+        byte_range = request.headers.get("Range")
+        if not byte_range:
+            return None
+        if_range = request.headers.get("If-Range")
+        if if_range and if_range.strip() not in (
+            original.etag, formatdate(original.mtime, usegmt=True),
+        ):
+            return None
+        return byte_range
+
+    @staticmethod
+    def _not_modified(variant: _Variant, original: _Variant) -> bool:
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            # Для If-None-Match используется слабое сравнение (RFC 9110 §13.1.2).
+            tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+            return "*" in tags or variant.etag in tags
+        if_modified_since = request.headers.get("If-Modified-Since")
+        if if_modified_since:
+            parsed = parsedate_tz(if_modified_since.split(";")[0].strip())
+            if parsed is not None and mktime_tz(parsed) >= int(original.mtime):
+                return True
+        return False
+
+
+# ---------------------------------------------------------------------------
+#   Версионированные URL для шаблонов
+# ---------------------------------------------------------------------------
+_default_files: Optional[StaticFiles] = None
+
+
+def static_url(filepath: str) -> str:
+    """URL статического файла с версией содержимого: ``/static/<path>?v=<хэш>``.
+
+    В шаблонах: ``% from utils.static_files import static_url`` и
+    ``{{static_url('content/site.css')}}``. Пока приложение не вызвало
+    :func:`install`, возвращается путь без версии.
+    """
+    url = "/static/" + filepath.lstrip("/")
+    version = _default_files.version(filepath) if _default_files is not None else None
+    return f"{url}?v={version}" if version else url
+
+
+def install(files: StaticFiles) -> StaticFiles:
+    """Сделать *files* источником версий для :func:`static_url`."""
+    global _default_files
+    _default_files = files
+    return files
+
+
+# ---------------------------------------------------------------------------
+#   Предварительное сжатие
+# ---------------------------------------------------------------------------
+def _write_if_smaller(target: str, data: bytes, original_size: int) -> bool:
+    if len(data) >= original_size:
+        return False
+    tmp = f"{target}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as file:
+        file.write(data)
+    os.replace(tmp, target)  # свежий mtime копии ≥ mtime исходника
+    return True
+
+
+def precompress(root: str, extensions: Iterable[str] = _COMPRESSIBLE) -> List[str]:
+    """Создать рядом с текстовыми файлами сжатые копии ``.gz`` (и ``.br``).
+
+    Копия записывается, только если она меньше исходника; актуальные
+    копии не пересоздаются. Возвращает список записанных файлов.
+    """
+    written: List[str] = []
+    extensions = tuple(extensions)
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if not name.endswith(extensions):
+                continue
+            path = os.path.join(dirpath, name)
+            stat = os.stat(path)
+            if stat.st_size < _MIN_PRECOMPRESS_BYTES:
+                continue
+            with open(path, "rb") as file:
+                data = file.read()
+
+            codecs = [(".gz", lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                codecs.append((".br", lambda raw: brotli.compress(raw, quality=11)))
+            for ext, compress in codecs:
+                target = path + ext
+                if os.path.exists(target) and os.path.getmtime(target) >= stat.st_mtime:
+                    continue
+                if _write_if_smaller(target, compress(data), stat.st_size):
+                    written.append(target)
+    return written
+
+
+if __name__ == "__main__":
+    for written_path in precompress(sys.argv[1] if len(sys.argv) > 1 else "static"):
+        print(written_path)
@@ -1,4 +1,5 @@
 % rebase('base/layout.tpl', title='О команде', year=year)
+% from utils.static_files import static_url
 
 <h2 style="padding-top: 40px;">О команде</h2>
 <p><strong>Команда 7</strong>: Безруких, Катаван, Сапрыкин, Володин</p>
@@ -28,7 +29,7 @@
 <h3>Личный вклад участников</h3>
 <div class="team-members" style="display: flex; flex-wrap: wrap; gap: 20px; justify-content: center;">
     <div style="flex: 0 1 220px; background: #f9f9f9; border-radius: 12px; padding: 15px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); text-align: center;">
-        <img src="/static/images/team/bezrukih.png" alt="Безруких Алексей Петрович" 
+        <img src="{{static_url('images/team/bezrukih.png')}}" alt="Безруких Алексей Петрович" 
             style="width:100px; height:100px; object-fit:cover; border-radius:8px; margin-bottom:10px;">
         <div>
             <strong>Безруких Алексей Петрович</strong><br>
@@ -36,7 +37,7 @@
         </div>
     </div>
     <div style="flex: 0 1 220px; background: #f9f9f9; border-radius: 12px; padding: 15px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); text-align: center;">
-        <img src="/static/images/team/katavan.png" alt="Катаван Максим Андреевич" 
+        <img src="{{static_url('images/team/katavan.png')}}" alt="Катаван Максим Андреевич" 
             style="width:100px; height:100px; object-fit:cover; border-radius:8px; margin-bottom:10px;">
         <div>
             <strong>Катаван Максим Андреевич</strong><br>
@@ -44,7 +45,7 @@
         </div>
     </div>
     <div style="flex: 0 1 220px; background: #f9f9f9; border-radius: 12px; padding: 15px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); text-align: center;">
-        <img src="/static/images/team/saprykin.png" alt="Сапрыкин Семён Максимович" 
+        <img src="{{static_url('images/team/saprykin.png')}}" alt="Сапрыкин Семён Максимович" 
             style="width:100px; height:100px; object-fit:cover; border-radius:8px; margin-bottom:10px;">
         <div>
             <strong>Сапрыкин Семён Максимович</strong><br>
@@ -52,7 +53,7 @@
         </div>
     </div>
     <div style="flex: 0 1 220px; background: #f9f9f9; border-radius: 12px; padding: 15px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); text-align: center;">
-        <img src="/static/images/team/volodin.png" alt="Володин Андрей Алексеевич" 
+        <img src="{{static_url('images/team/volodin.png')}}" alt="Володин Андрей Алексеевич" 
             style="width:100px; height:100px; object-fit:cover; border-radius:8px; margin-bottom:10px;">
         <div>
             <strong>Володин Андрей Алексеевич</strong><br>
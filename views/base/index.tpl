@@ -1,4 +1,5 @@
 % rebase('base/layout.tpl', title='Главная', year=year)
+% from utils.static_files import static_url
 <ul class="nav nav-tabs" id="variantTabs" role="tablist" style="padding-top: 40px;">
    <li class="nav-item" role="presentation">
       <button class="nav-link active" id="variant1-tab" data-bs-toggle="tab" data-bs-target="#variant1" type="button" role="tab" aria-controls="variant1" aria-selected="true">Вариант 1 <small>Статистика</small></button>
@@ -54,7 +55,7 @@
                         <h4>Пример гистограммы с пояснениями</h4>
                         <div class="row">
                            <div class="col-md-6">
-                              <img src="/static/images/primeri/gistogramma.png" class="img-fluid" alt="Гистограмма">
+                              <img src="{{static_url('images/primeri/gistogramma.png')}}" class="img-fluid" alt="Гистограмма">
                            </div>
                            <div class="col-md-6">
                               <ul class="list-unstyled">
@@ -119,6 +120,10 @@
                          \( x_{(i)} \) — упорядоченные данные (по возрастанию),<br>
                          \( \bar{x} \) — среднее значение выборки.
                      </p>
+                     <p class="small">
+                         Для столбцов длиннее 5000 значений применяется тест Андерсона — Дарлинга,
+                         длиннее 50 000 — тест K² Д'Агостино; использованный тест указан в таблице статистик.
+                     </p>
                   </div>
                   <div class="col-md-6">
                      <h5>4. Метод IQR для выбросов:</h5>
@@ -383,15 +388,15 @@
                   <h4 class="d-md-none d-lg-none">&nbsp;</h4>
                   <div class="row d-flex flex-wrap">
                      <div class="col-4">
-                       <img src="/static/images/primeri/gistogramma.png" class="img-thumbnail" style="max-width:100%;" alt="Гистограмма">
+                       <img src="{{static_url('images/primeri/gistogramma.png')}}" class="img-thumbnail" style="max-width:100%;" alt="Гистограмма">
                        <p class="small mt-1">Гистограмма</p>
                      </div>
                      <div class="col-4">
-                       <img src="/static/images/primeri/boxplot.png" class="img-thumbnail" style="max-width:100%;" alt="Box-plot">
+                       <img src="{{static_url('images/primeri/boxplot.png')}}" class="img-thumbnail" style="max-width:100%;" alt="Box-plot">
                        <p class="small mt-1">Box-plot</p>
                      </div>
                      <div class="col-4">
-                       <img src="/static/images/primeri/scattermatrix.png" class="img-thumbnail" style="max-width:100%;" alt="Scatter-matrix">
+                       <img src="{{static_url('images/primeri/scattermatrix.png')}}" class="img-thumbnail" style="max-width:100%;" alt="Scatter-matrix">
                        <p class="small mt-1">Scatter-matrix</p>
                      </div>
                   </div>
@@ -766,4 +771,4 @@
       </div>
    </div>
 </div>
-<script src="/static/scripts/variant-tabs.js"></script>
+<script src="{{static_url('scripts/variant-tabs.js')}}"></script>
@@ -1,13 +1,14 @@
+% from utils.static_files import static_url
 <!DOCTYPE html>
 <html>
     <head>
         <meta charset="utf-8" />
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>{{ title }} - Элементы машинного обучения и анализа данных</title>
-        <link rel="stylesheet" href="/static/content/bootstrap.min.css" />
-        <link rel="stylesheet" href="/static/content/site.css" />
-        <link rel="icon" type="image/png" href="/static/images/favicon.png">
-        <script src="/static/scripts/bootstrap.bundle.min.js"></script>
+        <link rel="stylesheet" href="{{static_url('content/bootstrap.min.css')}}" />
+        <link rel="stylesheet" href="{{static_url('content/site.css')}}" />
+        <link rel="icon" type="image/png" href="{{static_url('images/favicon.png')}}">
+        <script src="{{static_url('scripts/bootstrap.bundle.min.js')}}"></script>
     </head>
     <body>
         <nav class="navbar navbar-expand-lg navbar-dark bg-dark fixed-top">
@@ -1,15 +1,16 @@
+% from utils.static_files import static_url
 <!DOCTYPE html>
 <html>
    <head>
       <meta charset="utf-8" />
       <meta name="viewport" content="width=device-width, initial-scale=1.0">
       <title>{{ title }} - Элементы машинного обучения и анализа данных</title>
-      <link rel="stylesheet" href="/static/content/bootstrap.min.css">
-      <script src="/static/scripts/bootstrap.bundle.min.js"></script>
-      <script src="/static/scripts/mapper.js"></script>
-      <link rel="stylesheet" type="text/css" href="/static/content/site.css" />
-      <link rel="stylesheet" href="/static/content/custom-navbar.css" />
-      <link rel="icon" type="image/png" href="/static/images/favicon.png">
+      <link rel="stylesheet" href="{{static_url('content/bootstrap.min.css')}}">
+      <script src="{{static_url('scripts/bootstrap.bundle.min.js')}}"></script>
+      <script src="{{static_url('scripts/mapper.js')}}"></script>
+      <link rel="stylesheet" type="text/css" href="{{static_url('content/site.css')}}" />
+      <link rel="stylesheet" href="{{static_url('content/custom-navbar.css')}}" />
+      <link rel="icon" type="image/png" href="{{static_url('images/favicon.png')}}">
    </head>
    <body style="padding-top:40px;">
       <nav class="navbar navbar-expand-lg navbar-dark bg-dark fixed-top">
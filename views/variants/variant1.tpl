@@ -1,6 +1,8 @@
 % rebase('variants/layout_variants.tpl', title='Вариант 1 - Распределение данных', year=year)
+% from utils.static_files import static_url
 
-<script src="/static/scripts/local/variant1.js"></script>
+<script src="{{static_url('scripts/charts.js')}}"></script>
+<script src="{{static_url('scripts/local/variant1.js')}}"></script>
 <div class="container mt-4">
     <h2 class="mb-4">Анализ распределений данных</h2>
     <div class="card mb-4">
@@ -12,6 +14,10 @@
                 <li>Сгенерируйте или загрузите таблицу на главной странице</li>
                 <li>Нажмите кнопку ниже для анализа распределений</li>
             </ol>
+            <div class="form-check mb-3">
+                <input class="form-check-input" type="checkbox" id="clientRender">
+                <label class="form-check-label" for="clientRender">Рисовать графики в браузере</label>
+            </div>
             <button id="analyzeBtn" class="btn btn-success">Анализировать распределения</button>
         </div>
     </div>
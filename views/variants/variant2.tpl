@@ -1,6 +1,7 @@
 % rebase('variants/layout_variants.tpl', title='Вариант 2 — Корреляции и тепловая карта', year=year)
+% from utils.static_files import static_url
 
-<script src="/static/scripts/local/variant2.js"></script>
+<script src="{{static_url('scripts/local/variant2.js')}}"></script>
 <h2>Построить корреляционную матрицу и тепловую карту</h2>
 <p class="mb-3">
     Нажмите кнопку, чтобы построить <strong>таблицу коэффициентов корреляции</strong> и <strong>тепловую карту</strong> по уже сгенерированной таблице.
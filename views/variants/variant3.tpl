@@ -1,6 +1,8 @@
 % rebase('variants/layout_variants.tpl', title='Вариант 3 — Таблицы и диаграммы', year=year)
+% from utils.static_files import static_url
 
-<script src="/static/scripts/local/variant3.js"></script>
+<script src="{{static_url('scripts/charts.js')}}"></script>
+<script src="{{static_url('scripts/local/variant3.js')}}"></script>
 <h2>Выберите диаграмму</h2>
 <p class="mb-3">
     Нажмите кнопку, чтобы построить нужный график по уже сгенерированной таблице.
@@ -11,8 +13,13 @@
         <button type="submit" name="plot_type" value="box"     class="btn btn-secondary">Box-plots</button>
         <button type="submit" name="plot_type" value="scatter" class="btn btn-secondary">Scatter Matrix</button>
     </div>
+    <div class="form-check mt-2">
+        <input class="form-check-input" type="checkbox" id="clientRender">
+        <label class="form-check-label" for="clientRender">Рисовать графики в браузере</label>
+    </div>
 </form>
 <div id="plotSpinner" class="text-center my-3"></div>
+<div id="plotCharts"></div>
 <iframe id="plotFrame"
     name="plotFrame"
     class="table-frame w-100 border"
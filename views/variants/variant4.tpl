@@ -1,6 +1,7 @@
 % rebase('variants/layout_variants.tpl', title='Вариант 4 - Предсказание числа', year=year)
+% from utils.static_files import static_url
 
-<script src="/static/scripts/local/variant4.js"></script>
+<script src="{{static_url('scripts/local/variant4.js')}}"></script>
 <h2>Предсказание целевой переменной</h2>
 <p class="mb-3">
     Выберите целевой столбец и введите значения признаков для предсказания: